@@ -198,3 +198,17 @@ async def get_arweave_wallet_info(orchestrator: MainOrchestrator = Depends(get_o
             status_code=500, 
             detail="Internal server error retrieving wallet information"
         )
+
+
+@router.get("/matrix/send-stats")
+async def get_matrix_send_stats(orchestrator: MainOrchestrator = Depends(get_orchestrator)):
+    """Get Matrix outbound send shaping, coalescing and per-room latency statistics."""
+    matrix_observer = getattr(orchestrator, "matrix_observer", None)
+    if not matrix_observer:
+        raise HTTPException(status_code=503, detail="Matrix integration not configured")
+
+    return {
+        "status": "success",
+        "data": matrix_observer.room_sender.get_stats(),
+        "timestamp": datetime.now().isoformat(),
+    }
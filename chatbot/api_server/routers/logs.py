@@ -4,11 +4,13 @@ Logs and history management router for the chatbot API.
 This module handles all logging and history-related endpoints including:
 - Getting recent log entries
 - Accessing action history
+- Paging through recorded state changes
+- History database size and compaction status
 - WebSocket log streaming (handled in main.py)
 """
 
-from typing import Dict, Any, List
-from fastapi import APIRouter, HTTPException, Depends
+from typing import Dict, Any, List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query
 from datetime import datetime
 import logging
 
@@ -72,3 +74,47 @@ async def get_action_history(orchestrator: MainOrchestrator = Depends(get_orches
     except Exception as e:
         logger.error(f"Error getting action history: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/history/state-changes")
+async def get_state_change_history(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    change_type: Optional[str] = None,
+    channel_id: Optional[str] = None,
+    orchestrator: MainOrchestrator = Depends(get_orchestrator),
+):
+    """Page through recorded state changes, newest first; pass next_cursor to continue."""
+    try:
+        page = await orchestrator.context_manager.history_recorder.get_state_changes_page(
+            limit=limit, cursor=cursor, change_type=change_type, channel_id=channel_id
+        )
+        return {
+            "state_changes": [
+                {
+                    "timestamp": change.timestamp,
+                    "change_type": change.change_type,
+                    "source": change.source,
+                    "channel_id": change.channel_id,
+                    "observations": change.observations,
+                    "reasoning": change.reasoning,
+                }
+                for change in page["items"]
+            ],
+            "next_cursor": page["next_cursor"],
+            "timestamp": datetime.now().isoformat()
+        }
+    except Exception as e:
+        logger.error(f"Error getting state change history: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/history/database")
+async def get_history_database_stats(orchestrator: MainOrchestrator = Depends(get_orchestrator)):
+    """History database size, free pages, retention tiers and compaction status."""
+    try:
+        status = await orchestrator.history_compaction.get_status()
+        return {**status, "timestamp": datetime.now().isoformat()}
+    except Exception as e:
+        logger.error(f"Error getting history database stats: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
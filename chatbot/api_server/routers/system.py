@@ -69,6 +69,26 @@ async def get_system_status(orchestrator: MainOrchestrator = Depends(get_orchest
             logger.warning(f"Failed to get integration status: {e}")
             integration_status = {"error": str(e)}
         
+        # In-memory history tiers
+        memory = None
+        context_manager = getattr(orchestrator, "context_manager", None)
+        if context_manager is not None:
+            try:
+                memory = context_manager.get_memory_stats()
+            except Exception as e:
+                logger.warning(f"Failed to get memory stats: {e}")
+                memory = {"error": str(e)}
+
+        # Farcaster outbound queue
+        farcaster_outbound = None
+        farcaster_observer = getattr(orchestrator, "farcaster_observer", None)
+        if farcaster_observer and getattr(farcaster_observer, "scheduler", None):
+            try:
+                farcaster_outbound = farcaster_observer.scheduler.get_queue_status()
+            except Exception as e:
+                logger.warning(f"Failed to get Farcaster outbound queue status: {e}")
+                farcaster_outbound = {"error": str(e)}
+        
         logger.info("Assembling final status response")
         status = {
             "system_running": orchestrator.running,
@@ -81,6 +101,8 @@ async def get_system_status(orchestrator: MainOrchestrator = Depends(get_orchest
             "tools": tool_stats,
             "rate_limits": rate_limit_status,
             "integrations": integration_status,
+            "farcaster_outbound": farcaster_outbound,
+            "memory": memory,
             "processing": processing_status,
             "uptime_seconds": (datetime.now() - orchestrator.start_time).total_seconds() if hasattr(orchestrator, 'start_time') else 0
         }
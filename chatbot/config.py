@@ -8,7 +8,7 @@ to load and validate all configuration from environment variables and .env files
 import json
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -38,6 +38,23 @@ class AppConfig(BaseSettings):
 
     # Chatbot Core
     CHATBOT_DB_PATH: str = "data/chatbot.db"
+    HISTORY_SEGMENT_MAX_BYTES: int = 16 * 1024 * 1024  # Rotate the state-change JSONL segment at this size
+    HISTORY_SEGMENT_COMPRESS: bool = True  # Gzip sealed segments
+    HISTORY_SEGMENT_FSYNC: str = "rotate"  # "none", "rotate" (fsync on seal) or "batch" (fsync every write)
+    HISTORY_MEMORY_STATE_CHANGES: int = 10000  # Recent state changes HistoryRecorder keeps in memory
+    HISTORY_COMPACTION_ENABLED: bool = True  # Run tiered retention and incremental VACUUM when idle
+    HISTORY_RETENTION_FULL_DAYS: float = 30  # Keep state changes in full for this long
+    HISTORY_RETENTION_SUMMARY_DAYS: float = 365  # Keep summarized state changes until this age, then drop
+    HISTORY_COMPACTION_INTERVAL: float = 300.0  # Seconds between compaction checks
+    HISTORY_COMPACTION_IDLE_SECONDS: float = 30.0  # Processing must have been idle this long before compacting
+    HISTORY_COMPACTION_BATCH_SIZE: int = 500  # Rows summarized/dropped per writer transaction
+    HISTORY_VACUUM_PAGES: int = 1000  # Pages returned per incremental_vacuum step
+    HISTORY_VACUUM_CONVERT: bool = False  # Allow one blocking full VACUUM to switch an old database to incremental
+    CONTEXT_MEMORY_STATE_CHANGES: int = 1000  # Recent state changes ContextManager keeps in memory
+    CONTEXT_MAX_MESSAGES_PER_CHANNEL: int = 200  # Per-channel user/assistant messages kept in memory
+    STORAGE_BACKEND: str = "sqlite"  # Key-value/append-log backend: "sqlite" (WAL) or "lmdb" (needs the lmdb package)
+    STORAGE_PATH: str = "data/storage"  # Directory holding the storage backend's files
+    STORAGE_LMDB_MAP_SIZE: int = 256 * 1024 * 1024  # Initial LMDB map size; doubled automatically when full
     OBSERVATION_INTERVAL: float = 2.0
     MAX_CYCLES_PER_HOUR: int = 300
     MAX_ACTIONS_PER_HOUR: int = 600
@@ -59,12 +76,28 @@ class AppConfig(BaseSettings):
     MATRIX_DEVICE_ID: Optional[str] = None
     MATRIX_MEDIA_GALLERY_ROOM_ID: Optional[str] = None  # Dedicated channel for auto-posting generated media
     DEVICE_NAME: str = "ratichat_bot"
+    MATRIX_MEDIA_WORKERS: int = 3  # Concurrent background image download/upload workers
+    MATRIX_MEDIA_MAX_RETRIES: int = 3  # Retries per image before falling back to the mxc HTTP URL
+    MATRIX_JOIN_CONCURRENCY: int = 4  # Concurrent room joins / invite acceptances
+    MATRIX_JOIN_MAX_RETRIES: int = 5  # Retries per join after M_LIMIT_EXCEEDED
+    MATRIX_AUTO_ACCEPT_INVITES: bool = False  # Bulk-accept pending invites as they arrive
+    MATRIX_SEND_RATE_PER_SECOND: float = 2.0  # Outbound messages per second across all rooms
+    MATRIX_SEND_BURST: int = 5  # Messages that may be sent back-to-back before shaping kicks in
+    MATRIX_SEND_COALESCE_WINDOW: float = 0.0  # Seconds to merge plain messages to one room (0 disables)
 
     # Farcaster (Optional)
     NEYNAR_API_KEY: Optional[str] = None
     FARCASTER_BOT_FID: Optional[str] = None
     FARCASTER_BOT_SIGNER_UUID: Optional[str] = None
     FARCASTER_BOT_USERNAME: Optional[str] = None  # Bot's username for filtering
+    NEYNAR_CACHE_ENABLED: bool = True  # Read-through cache for idempotent Neynar GETs
+    NEYNAR_CACHE_MAX_ENTRIES: int = 1000  # LRU bound on cached Neynar responses
+    NEYNAR_RATE_LIMIT_PER_MINUTE: int = 300  # Initial client-side budget, corrected from response headers
+    NEYNAR_MAX_RATE_LIMIT_RETRIES: int = 3  # Automatic retries for 429 responses
+    FARCASTER_SENDER_CONCURRENCY: int = 2  # Parallel senders draining the prioritized outbound queue
+    FARCASTER_CHANNEL_WEIGHTS: Dict[str, float] = {}  # Fair-share weight per target channel (JSON), default 1.0
+    FARCASTER_MENTION_REPLY_DEADLINE_SECONDS: float = 3600.0  # Drop queued mention replies older than this
+    FARCASTER_THREAD_REPLY_DEADLINE_SECONDS: float = 1800.0  # Drop queued thread replies older than this
 
     # Ecosystem Token Tracking
     ECOSYSTEM_TOKEN_CONTRACT_ADDRESS: Optional[str] = "Ci6Y1UX8bY4jxn6YiogJmdCxFEu2jmZhCcG65PStpump"  # Contract address of the token
@@ -152,6 +185,10 @@ class AppConfig(BaseSettings):
         "system.rate_limits"       # Rate limit status
     ]
     AI_SUMMARY_MODEL: str = "openai/gpt-4o-mini"  # Model for generating node summaries
+    NODE_PRESUMMARY_ENABLED: bool = True  # Summarize likely-shown collapsed nodes ahead of cycles when idle
+    NODE_PRESUMMARY_INTERVAL: float = 20.0  # Seconds between pre-summary checks
+    NODE_PRESUMMARY_IDLE_SECONDS: float = 5.0  # Processing must have been idle this long before summarizing
+    NODE_PRESUMMARY_BATCH_SIZE: int = 4  # Most active nodes summarized per idle window
     ENABLE_TWO_PHASE_AI_PROCESS: bool = False  # Enable separate exploration/action phases
     MAX_EXPLORATION_ROUNDS: int = 3  # Max rounds in exploration phase if two-phase enabled
     
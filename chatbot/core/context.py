@@ -12,10 +12,12 @@ import logging
 import time
 from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Union
 
+from ..config import settings
 from .world_state import WorldStateManager
 from .history_recorder import HistoryRecorder, StateChangeBlock
+from .ring_buffer import RingBuffer
 
 logger = logging.getLogger(__name__)
 
@@ -23,15 +25,64 @@ logger = logging.getLogger(__name__)
 # Remove duplicate StateChangeBlock definition - now imported from history_recorder
 
 
+class WorldStatePrompt:
+    """System prompt embedding the world state, rendered lazily.
+
+    Holds a reference to the WorldStateManager and only serializes the state
+    when the prompt is read after the manager's version has changed. All
+    channels share one instance, so a state change costs at most one render.
+    """
+
+    def __init__(self, world_state_manager: WorldStateManager, render: Callable[[Dict[str, Any]], str]):
+        self.world_state_manager = world_state_manager
+        self._render = render
+        self._version: Optional[int] = None
+        self._world_state: Dict[str, Any] = {}
+        self._text = ""
+        self.renders = 0
+
+    @property
+    def world_state(self) -> Dict[str, Any]:
+        self._refresh()
+        return self._world_state
+
+    @property
+    def text(self) -> str:
+        self._refresh()
+        return self._text
+
+    @property
+    def last_update(self) -> float:
+        return self.world_state_manager.state.last_update
+
+    def _refresh(self):
+        version = self.world_state_manager.version
+        if version != self._version:
+            self._world_state = self.world_state_manager.to_dict()
+            self._text = self._render(self._world_state)
+            self._version = version
+            self.renders += 1
+
+
 @dataclass
 class ConversationContext:
     """Represents the conversation context structure"""
 
-    world_state: Dict[str, Any]
-    user_messages: List[Dict[str, Any]]
-    assistant_messages: List[Dict[str, Any]]
-    system_prompt: str
-    last_update: float
+    prompt: WorldStatePrompt
+    user_messages: RingBuffer[Dict[str, Any]]
+    assistant_messages: RingBuffer[Dict[str, Any]]
+
+    @property
+    def world_state(self) -> Dict[str, Any]:
+        return self.prompt.world_state
+
+    @property
+    def system_prompt(self) -> str:
+        return self.prompt.text
+
+    @property
+    def last_update(self) -> float:
+        return self.prompt.last_update
 
 
 class ContextManager:
@@ -41,11 +92,15 @@ class ContextManager:
         self.world_state = world_state_manager
         self.db_path = db_path
         self.contexts: Dict[str, ConversationContext] = {}
+        self.world_state_prompt = WorldStatePrompt(world_state_manager, self._build_world_state_system_prompt)
         
         # Use HistoryRecorder for state change persistence
         self.history_recorder = HistoryRecorder(db_path)
-        # Track state changes in-memory for easy inspection
-        self.state_changes: List[StateChangeBlock] = []
+        # Track recent state changes in-memory for easy inspection; all of
+        # them are persisted, so eviction only drops the in-memory copy
+        self.state_changes: RingBuffer[StateChangeBlock] = RingBuffer(
+            settings.CONTEXT_MEMORY_STATE_CHANGES
+        )
 
         # Initialize storage directory (ensure parent directories exist)
         self.storage_path = Path("context_storage")
@@ -58,49 +113,20 @@ class ContextManager:
         if channel_id not in self.contexts:
             await self._initialize_context(channel_id)
 
-        # Update world state in system prompt
-        await self._update_world_state_in_context(channel_id)
-
         return self.contexts[channel_id]
 
     async def _initialize_context(self, channel_id: str):
         """Initialize a new conversation context"""
-        world_state_dict = self.world_state.to_dict()
-
         context = ConversationContext(
-            world_state=world_state_dict,
-            user_messages=[],
-            assistant_messages=[],
-            system_prompt=await self._build_world_state_system_prompt(world_state_dict),
-            last_update=time.time(),
+            prompt=self.world_state_prompt,
+            user_messages=RingBuffer(settings.CONTEXT_MAX_MESSAGES_PER_CHANNEL),
+            assistant_messages=RingBuffer(settings.CONTEXT_MAX_MESSAGES_PER_CHANNEL),
         )
 
         self.contexts[channel_id] = context
         logger.info(f"ContextManager: Initialized context for channel {channel_id}")
 
-    async def _update_world_state_in_context(self, channel_id: str):
-        """Update the world state in the system prompt"""
-        if channel_id not in self.contexts:
-            return
-
-        context = self.contexts[channel_id]
-        current_world_state = self.world_state.to_dict()
-
-        # Only update if world state has changed
-        if current_world_state != context.world_state:
-            context.world_state = current_world_state
-            context.system_prompt = await self._build_world_state_system_prompt(
-                current_world_state
-            )
-            context.last_update = time.time()
-
-            logger.debug(
-                f"ContextManager: Updated world state in context for {channel_id}"
-            )
-
-    async def _build_world_state_system_prompt(
-        self, world_state: Dict[str, Any]
-    ) -> str:
+    def _build_world_state_system_prompt(self, world_state: Dict[str, Any]) -> str:
         """Build system prompt with embedded world state"""
         return f"""You are an AI assistant with access to the current world state.
 
@@ -171,7 +197,9 @@ Base your decisions on the current world state and user messages."""
             "parsed_response": parsed_response,
         }
 
-        context.assistant_messages.append(assistant_msg)
+        evicted = context.assistant_messages.append(assistant_msg)
+        if evicted is not None and not evicted.get("parsed_response"):
+            await self._spill_assistant_message(channel_id, evicted)
 
         # Store as state change if it contains valid structured response
         if parsed_response:
@@ -266,6 +294,26 @@ Base your decisions on the current world state and user messages."""
 
         logger.debug(f"ContextManager: Added world state update: {update_type}")
 
+    async def _spill_assistant_message(self, channel_id: str, message: Dict[str, Any]):
+        """Persist an evicted assistant message that was never stored as a state change.
+
+        User messages and structured assistant responses are recorded when they
+        arrive, so only free-form assistant replies need saving on eviction.
+        """
+        await self.history_recorder.record_state_change(
+            StateChangeBlock(
+                timestamp=message.get("timestamp", time.time()),
+                change_type="assistant_message",
+                source="llm",
+                channel_id=channel_id,
+                observations=None,
+                potential_actions=None,
+                selected_actions=None,
+                reasoning=None,
+                raw_content={k: v for k, v in message.items() if k != "parsed_response"},
+            )
+        )
+
     async def _store_state_change(self, state_change: StateChangeBlock):
         """Permanently store a state change block using HistoryRecorder"""
         # Record in-memory state changes list
@@ -335,6 +383,30 @@ Base your decisions on the current world state and user messages."""
             del self.contexts[channel_id]
             logger.info(f"ContextManager: Cleared context for {channel_id}")
 
+    def get_memory_stats(self) -> Dict[str, Any]:
+        """Entry counts and approximate bytes held by the in-memory tiers."""
+        user = [c.user_messages.get_stats() for c in self.contexts.values()]
+        assistant = [c.assistant_messages.get_stats() for c in self.contexts.values()]
+
+        def total(stats: List[Dict[str, int]]) -> Dict[str, int]:
+            return {
+                key: sum(s[key] for s in stats) for key in ("count", "evicted", "approx_bytes")
+            }
+
+        recorder = self.history_recorder.get_memory_stats()
+        buffers = {
+            "context_state_changes": self.state_changes.get_stats(),
+            "history_state_changes": recorder["state_changes"],
+            "user_messages": {**total(user), "capacity_per_channel": settings.CONTEXT_MAX_MESSAGES_PER_CHANNEL},
+            "assistant_messages": {**total(assistant), "capacity_per_channel": settings.CONTEXT_MAX_MESSAGES_PER_CHANNEL},
+        }
+        return {
+            "channels": len(self.contexts),
+            "buffers": buffers,
+            "history_write_queue": recorder["write_queue"],
+            "total_approx_bytes": sum(b["approx_bytes"] for b in buffers.values()),
+        }
+
     async def get_context_summary(self, channel_id: str) -> Dict[str, Any]:
         """Get a summary of the conversation context"""
         if channel_id not in self.contexts:
@@ -0,0 +1,149 @@
+"""
+History Compaction
+
+Background retention for the state_changes table and its segment log.
+Records are kept in full for ``full_retention_days``, then reduced to a
+summary (truncated text, action names, raw_content keys), and dropped once
+older than ``summary_retention_days``. Sealed segments follow the same tiers
+a whole segment at a time. Freed pages are handed back to the filesystem
+with incremental VACUUM. A database created without incremental
+auto_vacuum needs one full VACUUM to switch, which blocks history writes for
+its whole duration, so it only runs when ``convert_legacy`` is set.
+
+All work happens in small batches on the HistoryRecorder's writer thread and
+only while the ProcessingHub has been idle for ``idle_seconds``, so it never
+competes with a processing cycle for the database.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from ..config import settings
+from .history_recorder import AUTO_VACUUM_INCREMENTAL, HistoryRecorder
+from .idle_task import IdleTask
+
+logger = logging.getLogger(__name__)
+
+DAY_SECONDS = 24 * 3600
+
+
+class HistoryCompactionService(IdleTask):
+    """Runs tiered retention and incremental VACUUM during processing idle windows."""
+
+    def __init__(
+        self,
+        history_recorder: HistoryRecorder,
+        processing_hub: Optional[Any] = None,
+        full_retention_days: Optional[float] = None,
+        summary_retention_days: Optional[float] = None,
+        check_interval: Optional[float] = None,
+        idle_seconds: Optional[float] = None,
+        batch_size: Optional[int] = None,
+        vacuum_pages: Optional[int] = None,
+        convert_legacy: Optional[bool] = None,
+    ):
+        super().__init__(
+            processing_hub,
+            check_interval if check_interval is not None else settings.HISTORY_COMPACTION_INTERVAL,
+            idle_seconds if idle_seconds is not None else settings.HISTORY_COMPACTION_IDLE_SECONDS,
+        )
+        self.history_recorder = history_recorder
+        self.full_retention_days = full_retention_days if full_retention_days is not None else settings.HISTORY_RETENTION_FULL_DAYS
+        self.summary_retention_days = (
+            summary_retention_days if summary_retention_days is not None else settings.HISTORY_RETENTION_SUMMARY_DAYS
+        )
+        self.batch_size = batch_size or settings.HISTORY_COMPACTION_BATCH_SIZE
+        self.vacuum_pages = vacuum_pages or settings.HISTORY_VACUUM_PAGES
+        self.convert_legacy = convert_legacy if convert_legacy is not None else settings.HISTORY_VACUUM_CONVERT
+        self._legacy_warned = False
+
+        self.last_run: Optional[float] = None
+        self.stats: Dict[str, int] = {
+            "runs": 0, "summarized": 0, "dropped": 0, "pages_freed": 0, "full_vacuums": 0,
+            "segments_summarized": 0, "segments_dropped": 0, "segment_bytes_freed": 0,
+        }
+
+    def describe(self) -> str:
+        return f"full {self.full_retention_days}d, summary {self.summary_retention_days}d"
+
+    async def run_once(self) -> Dict[str, int]:
+        """Compact and vacuum until done or until a processing cycle starts."""
+        now = time.time()
+        summarize_before = now - self.full_retention_days * DAY_SECONDS
+        drop_before = now - self.summary_retention_days * DAY_SECONDS
+        result = {
+            "summarized": 0, "dropped": 0, "pages_freed": 0,
+            "segments_summarized": 0, "segments_dropped": 0, "segment_bytes_freed": 0,
+        }
+
+        while self.is_idle():
+            step = await self.history_recorder.compact_batch(summarize_before, drop_before, self.batch_size)
+            result["summarized"] += step["summarized"]
+            result["dropped"] += step["dropped"]
+            if step["summarized"] < self.batch_size and step["dropped"] < self.batch_size:
+                break
+            await asyncio.sleep(0)  # let queued history writes through between batches
+
+        while self.is_idle():
+            step = await self.history_recorder.compact_segments(summarize_before, drop_before)
+            for key, value in step.items():
+                result[key] += value
+            if not step["segments_summarized"] and not step["segments_dropped"]:
+                break
+            await asyncio.sleep(0)
+
+        if self.is_idle():
+            result["pages_freed"] = await self._vacuum()
+
+        self.last_run = time.time()
+        self.stats["runs"] += 1
+        for key, value in result.items():
+            self.stats[key] += value
+        if any(result.values()):
+            logger.info(
+                f"HistoryCompactionService: Summarized {result['summarized']}, dropped {result['dropped']}, "
+                f"freed {result['pages_freed']} pages; summarized {result['segments_summarized']} and dropped "
+                f"{result['segments_dropped']} segments, freeing {result['segment_bytes_freed']} bytes"
+            )
+        return result
+
+    async def _vacuum(self) -> int:
+        stats = await self.history_recorder.get_database_stats()
+        if stats["auto_vacuum"] != AUTO_VACUUM_INCREMENTAL:
+            # Databases created before incremental auto_vacuum need one full VACUUM to switch
+            if not self.convert_legacy:
+                if not self._legacy_warned:
+                    logger.warning(
+                        f"HistoryCompactionService: History database ({stats['size_bytes']} bytes) does not use "
+                        "incremental auto_vacuum, so freed pages stay in the file. Set HISTORY_VACUUM_CONVERT=true "
+                        "to run the one-time full VACUUM that converts it; history writes block while it runs."
+                    )
+                    self._legacy_warned = True
+                return 0
+            logger.info("HistoryCompactionService: Converting history database to incremental auto_vacuum")
+            await self.history_recorder.vacuum()
+            self.stats["full_vacuums"] += 1
+            return stats["freelist_count"]
+
+        freed = 0
+        while self.is_idle():
+            step = await self.history_recorder.incremental_vacuum(self.vacuum_pages)
+            freed += step
+            if step < self.vacuum_pages:
+                break
+            await asyncio.sleep(0)
+        return freed
+
+    async def get_status(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "full_retention_days": self.full_retention_days,
+            "summary_retention_days": self.summary_retention_days,
+            "convert_legacy": self.convert_legacy,
+            "idle": self.is_idle(),
+            "last_run": self.last_run,
+            "totals": dict(self.stats),
+            "database": await self.history_recorder.get_database_stats(),
+        }
@@ -7,17 +7,66 @@ providing a clean interface for storing bot actions and decisions for later anal
 """
 
 import asyncio
+import itertools
 import json
 import logging
+import sqlite3
 import time
-from dataclasses import asdict, dataclass
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
 
 import aiosqlite
 
+from ..config import settings
+from .ring_buffer import RingBuffer
+from .segment_log import SegmentedLog
+
 logger = logging.getLogger(__name__)
 
+STATE_CHANGES_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS state_changes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp REAL NOT NULL,
+        change_type TEXT NOT NULL,
+        source TEXT NOT NULL,
+        channel_id TEXT,
+        observations TEXT,
+        potential_actions TEXT,
+        selected_actions TEXT,
+        reasoning TEXT,
+        raw_content TEXT NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        compacted INTEGER NOT NULL DEFAULT 0
+    )
+"""
+
+STATE_CHANGES_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_state_changes_timestamp ON state_changes(timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_state_changes_type_timestamp ON state_changes(change_type, timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_state_changes_channel_timestamp ON state_changes(channel_id, timestamp)",
+    # Lets compaction find rows still holding full content without rescanning compacted ones
+    "CREATE INDEX IF NOT EXISTS idx_state_changes_uncompacted ON state_changes(timestamp) WHERE compacted = 0",
+)
+
+# Text kept per field when a record is compacted to its summary tier
+COMPACTED_TEXT_LIMIT = 280
+
+AUTO_VACUUM_INCREMENTAL = 2
+
+INSERT_STATE_CHANGE = """
+    INSERT INTO state_changes (
+        timestamp, change_type, source, channel_id,
+        observations, potential_actions, selected_actions,
+        reasoning, raw_content
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Queued by flush() so the writer commits without waiting out commit_interval
+_FLUSH = object()
+
 
 @dataclass
 class StateChangeBlock:
@@ -34,6 +83,68 @@ class StateChangeBlock:
     raw_content: Dict[str, Any]  # Original content for training
 
 
+def summarize_row(
+    observations: Optional[str],
+    selected_actions: Optional[str],
+    reasoning: Optional[str],
+    raw_content: str,
+) -> Tuple[Optional[str], Optional[str], Optional[str], str]:
+    """Reduce a stored row to its summary tier: truncated text, action names and raw_content keys."""
+
+    def truncate(text: Optional[str]) -> Optional[str]:
+        if text is None or len(text) <= COMPACTED_TEXT_LIMIT:
+            return text
+        return text[: COMPACTED_TEXT_LIMIT - 3] + "..."
+
+    try:
+        actions = json.loads(selected_actions) if selected_actions else None
+        if isinstance(actions, list):
+            actions = [a.get("action_type") if isinstance(a, dict) else a for a in actions]
+            selected_actions = json.dumps(actions)
+    except (TypeError, ValueError):
+        selected_actions = None
+
+    try:
+        raw = json.loads(raw_content)
+    except (TypeError, ValueError):
+        raw = raw_content
+    summary = {
+        "compacted": True,
+        "keys": sorted(raw)[:20] if isinstance(raw, dict) else [],
+        "summary": truncate(observations or reasoning or json.dumps(raw, default=str)),
+    }
+    return truncate(observations), selected_actions, truncate(reasoning), json.dumps(summary)
+
+
+def _summarize_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """summarize_row applied to a segment log record."""
+    selected = record.get("selected_actions")
+    observations, selected, reasoning, raw_content = summarize_row(
+        record.get("observations"),
+        json.dumps(selected, default=str) if selected is not None else None,
+        record.get("reasoning"),
+        json.dumps(record.get("raw_content"), default=str),
+    )
+    return {
+        **record,
+        "observations": observations,
+        "potential_actions": None,
+        "selected_actions": json.loads(selected) if selected else None,
+        "reasoning": reasoning,
+        "raw_content": json.loads(raw_content),
+    }
+
+
+def encode_cursor(timestamp: float, row_id: int) -> str:
+    """Opaque pagination cursor for the row at (timestamp, id)."""
+    return f"{timestamp!r}:{row_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    timestamp, _, row_id = cursor.rpartition(":")
+    return float(timestamp), int(row_id)
+
+
 class HistoryRecorder:
     """
     Records and persists StateChangeBlock instances for analysis and training.
@@ -43,43 +154,118 @@ class HistoryRecorder:
     2. Persisting state changes to database and files
     3. Retrieving historical records for analysis
     4. Managing storage limits and cleanup
+
+    Writes go through a bounded queue to a single writer task that holds one
+    WAL-mode connection (driven on its own thread) and commits in groups of
+    ``batch_size`` records or every ``commit_interval`` seconds, whichever
+    comes first. The same batches are appended to a rotated JSONL segment log
+    that training exports stream from. Reads flush the queue first, so callers always see their own
+    writes, and use short-lived connections that WAL lets run alongside the
+    writer.
     """
 
-    def __init__(self, db_path: str):
+    def __init__(
+        self,
+        db_path: str,
+        batch_size: int = 100,
+        commit_interval: float = 0.05,
+        queue_size: int = 1000,
+        storage_path: Optional[str] = None,
+        memory_capacity: Optional[int] = None,
+    ):
         self.db_path = db_path
-        self.state_changes: List[StateChangeBlock] = []
-
-        # Initialize storage directory
-        self.storage_path = Path("data/context_storage")
+        # Recent state changes; older ones are only read back from the database
+        self.state_changes: RingBuffer[StateChangeBlock] = RingBuffer(
+            memory_capacity or settings.HISTORY_MEMORY_STATE_CHANGES
+        )
+        self.batch_size = max(1, batch_size)
+        self.commit_interval = commit_interval
+        self.queue_size = queue_size
+
+        self._db: Optional[sqlite3.Connection] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._init_lock = asyncio.Lock()
+        self.writer_stats: Dict[str, int] = {"written": 0, "batches": 0, "failed": 0}
+        # (name, mtime_ns, size) -> (newest timestamp, all records compacted) of sealed segments
+        self._segment_ages: Dict[Tuple[str, int, int], Tuple[float, bool]] = {}
+
+        # Append-only JSONL segments for training/analysis export
+        self.storage_path = Path(storage_path or "data/context_storage")
         self.storage_path.mkdir(parents=True, exist_ok=True)
+        self.segment_log = SegmentedLog(
+            self.storage_path,
+            "state_changes",
+            max_segment_bytes=settings.HISTORY_SEGMENT_MAX_BYTES,
+            compress=settings.HISTORY_SEGMENT_COMPRESS,
+            fsync=settings.HISTORY_SEGMENT_FSYNC,
+        )
 
         logger.info("HistoryRecorder: Initialized")
 
     async def initialize(self):
-        """Initialize the database and ensure tables exist."""
-        try:
-            async with aiosqlite.connect(self.db_path) as db:
-                await db.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS state_changes (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        timestamp REAL NOT NULL,
-                        change_type TEXT NOT NULL,
-                        source TEXT NOT NULL,
-                        channel_id TEXT,
-                        observations TEXT,
-                        potential_actions TEXT,
-                        selected_actions TEXT,
-                        reasoning TEXT,
-                        raw_content TEXT NOT NULL,
-                        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                    )
-                    """
+        """Open the writer connection, create the schema and start the writer task."""
+        async with self._init_lock:
+            if self._db is not None:
+                return
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history-writer")
+            try:
+                self._db = await asyncio.get_running_loop().run_in_executor(
+                    executor, self._open_writer_connection
                 )
-                await db.commit()
-                logger.info("HistoryRecorder: Database initialized")
-        except Exception as e:
-            logger.error(f"HistoryRecorder: Error initializing database: {e}")
+            except Exception as e:
+                logger.error(f"HistoryRecorder: Error initializing database: {e}")
+                executor.shutdown(wait=False)
+                return
+
+            self._executor = executor
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._writer_task = asyncio.create_task(self._writer_loop())
+            logger.info("HistoryRecorder: Database initialized")
+
+    def _open_writer_connection(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.db_path)
+        try:
+            # Only takes effect for a new database; existing ones convert on their first VACUUM
+            db.execute(f"PRAGMA auto_vacuum={AUTO_VACUUM_INCREMENTAL}")
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(STATE_CHANGES_SCHEMA)
+            columns = {row[1] for row in db.execute("PRAGMA table_info(state_changes)")}
+            if "compacted" not in columns:
+                db.execute("ALTER TABLE state_changes ADD COLUMN compacted INTEGER NOT NULL DEFAULT 0")
+            for statement in STATE_CHANGES_INDEXES:
+                db.execute(statement)
+            db.commit()
+        except Exception:
+            db.close()
+            raise
+        return db
+
+    async def flush(self):
+        """Wait until every queued state change has been committed."""
+        if self._queue is not None and self._writer_task and not self._writer_task.done():
+            await self._queue.put(_FLUSH)
+            await self._queue.join()
+
+    async def close(self):
+        """Flush pending writes, stop the writer and close the connection."""
+        await self.flush()
+        if self._writer_task:
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+            self._writer_task = None
+        if self._db is not None:
+            await asyncio.get_running_loop().run_in_executor(self._executor, self._close_writer)
+            self._db = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        self._queue = None
 
     async def record_action(self, action_name: str, action_data: Dict[str, Any], result: Any):
         """Record a tool action execution."""
@@ -215,86 +401,246 @@ class HistoryRecorder:
         except Exception as e:
             logger.error(f"HistoryRecorder: Failed to persist state change to database: {e}")
 
-        # Store as JSON file for training/analysis (best effort)
-        try:
-            await self._store_state_change_file(state_change)
-        except Exception as e:
-            logger.warning(f"HistoryRecorder: Failed to store state change file: {e}")
-
-        # Maintain memory limit
-        if len(self.state_changes) > 10000:
-            self.state_changes = self.state_changes[-10000:]
-
     async def _persist_state_change(self, state_change: StateChangeBlock):
-        """Store state change in database."""
-        try:
-            async with aiosqlite.connect(self.db_path) as db:
-                # Ensure state_changes table exists
-                await db.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS state_changes (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        timestamp REAL NOT NULL,
-                        change_type TEXT NOT NULL,
-                        source TEXT NOT NULL,
-                        channel_id TEXT,
-                        observations TEXT,
-                        potential_actions TEXT,
-                        selected_actions TEXT,
-                        reasoning TEXT,
-                        raw_content TEXT NOT NULL,
-                        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                    )
-                    """
-                )
-                await db.commit()
-                logger.debug(f"HistoryRecorder: Table ensured for database: {self.db_path}")
-
-                # Store the state change
-                await db.execute(
-                    """
-                    INSERT INTO state_changes (
-                        timestamp, change_type, source, channel_id,
-                        observations, potential_actions, selected_actions,
-                        reasoning, raw_content
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        state_change.timestamp,
-                        state_change.change_type,
-                        state_change.source,
-                        state_change.channel_id,
-                        state_change.observations,
-                        json.dumps(state_change.potential_actions) if state_change.potential_actions else None,
-                        json.dumps(state_change.selected_actions) if state_change.selected_actions else None,
-                        state_change.reasoning,
-                        json.dumps(state_change.raw_content),
-                    ),
-                )
-                await db.commit()
-                logger.debug(f"HistoryRecorder: Successfully inserted state change into database")
+        """Queue a state change for the writer task (blocks while the queue is full)."""
+        if self._db is None:
+            await self.initialize()
+        if self._db is None:
+            raise RuntimeError(f"History database unavailable: {self.db_path}")
+        await self._queue.put(state_change)
+
+    @staticmethod
+    def _to_row(state_change: StateChangeBlock) -> Tuple[Any, ...]:
+        return (
+            state_change.timestamp,
+            state_change.change_type,
+            state_change.source,
+            state_change.channel_id,
+            state_change.observations,
+            json.dumps(state_change.potential_actions, default=str) if state_change.potential_actions else None,
+            json.dumps(state_change.selected_actions, default=str) if state_change.selected_actions else None,
+            state_change.reasoning,
+            json.dumps(state_change.raw_content, default=str),
+        )
 
-        except Exception as e:
-            logger.error(f"HistoryRecorder: Error persisting state change: {e}")
-            raise  # Re-raise to let caller handle
+    async def _writer_loop(self):
+        """Group-commit queued rows: up to batch_size rows or commit_interval seconds."""
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self._queue.get()]
+            deadline = loop.time() + self.commit_interval
+            while len(items) < self.batch_size and items[-1] is not _FLUSH:
+                if not self._queue.empty():
+                    items.append(self._queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            batch = [item for item in items if item is not _FLUSH]
+            try:
+                if batch:
+                    written = await loop.run_in_executor(self._executor, self._write_batch, batch)
+                    self.writer_stats["written"] += written
+                    self.writer_stats["failed"] += len(batch) - written
+                    self.writer_stats["batches"] += 1
+            except Exception as e:
+                self.writer_stats["failed"] += len(batch)
+                logger.error(f"HistoryRecorder: Error persisting {len(batch)} state changes: {e}")
+            finally:
+                for _ in items:
+                    self._queue.task_done()
+
+    def _write_batch(self, batch: List[StateChangeBlock]) -> int:
+        """
+        Runs on the writer thread: one transaction, then one segment append.
 
-    async def _store_state_change_file(self, state_change: StateChangeBlock):
-        """Store state change as JSON file for analysis."""
+        Rows are built one at a time so a record that cannot be serialized is
+        logged and skipped rather than failing the whole batch. Returns the
+        number of records written.
+        """
+        rows, written = [], []
+        for sc in batch:
+            try:
+                rows.append(self._to_row(sc))
+                written.append(sc)
+            except Exception as e:
+                logger.error(f"HistoryRecorder: Skipping unserializable {sc.change_type} state change: {e}")
+        if not rows:
+            return 0
         try:
-            timestamp_str = time.strftime("%Y%m%d_%H%M%S", time.localtime(state_change.timestamp))
-            filename = f"state_change_{timestamp_str}_{state_change.change_type}_{state_change.source}.json"
-            file_path = self.storage_path / filename
-
-            # Convert to dict for JSON serialization
-            state_dict = asdict(state_change)
+            self._db.executemany(INSERT_STATE_CHANGE, rows)
+            self._db.commit()
+        except Exception:
+            self._db.rollback()
+            raise
+        try:
+            self.segment_log.append(vars(sc) for sc in written)
+        except Exception as e:
+            logger.warning(f"HistoryRecorder: Failed to append state changes to segment log: {e}")
+        return len(written)
+
+    def _close_writer(self):
+        self.segment_log.close()
+        self._db.close()
+
+    async def _run_on_writer(self, fn, *args):
+        """Run blocking maintenance on the writer thread, between write batches."""
+        if self._db is None:
+            await self.initialize()
+        if self._db is None:
+            raise RuntimeError(f"History database unavailable: {self.db_path}")
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def compact_batch(self, summarize_before: float, drop_before: float, batch_size: int = 500) -> Dict[str, int]:
+        """
+        Apply one bounded step of tiered retention.
 
-            with open(file_path, "w") as f:
-                json.dump(state_dict, f, indent=2, default=str)
+        Rows older than ``drop_before`` are deleted; the remaining rows older
+        than ``summarize_before`` are reduced to their summary (see summarize_row).
+        At most ``batch_size`` rows of each kind are touched, so the writer
+        thread is never held for long; call repeatedly until both counts are 0.
+        """
+        return await self._run_on_writer(self._compact_batch, summarize_before, drop_before, batch_size)
 
-            logger.debug(f"HistoryRecorder: Stored state change file: {filename}")
+    def _compact_batch(self, summarize_before: float, drop_before: float, batch_size: int) -> Dict[str, int]:
+        db = self._db
+        try:
+            dropped = db.execute(
+                "DELETE FROM state_changes WHERE id IN "
+                "(SELECT id FROM state_changes WHERE timestamp < ? ORDER BY timestamp LIMIT ?)",
+                (drop_before, batch_size),
+            ).rowcount
+            rows = db.execute(
+                """
+                SELECT id, observations, selected_actions, reasoning, raw_content
+                FROM state_changes
+                WHERE compacted = 0 AND timestamp >= ? AND timestamp < ?
+                ORDER BY timestamp LIMIT ?
+                """,
+                (drop_before, summarize_before, batch_size),
+            ).fetchall()
+            db.executemany(
+                """
+                UPDATE state_changes
+                SET observations = ?, potential_actions = NULL, selected_actions = ?,
+                    reasoning = ?, raw_content = ?, compacted = 1
+                WHERE id = ?
+                """,
+                [(*summarize_row(*row[1:]), row[0]) for row in rows],
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return {"summarized": len(rows), "dropped": dropped}
+
+    async def compact_segments(self, summarize_before: float, drop_before: float) -> Dict[str, int]:
+        """
+        Apply the same retention tiers to one sealed segment of the segment log.
 
-        except Exception as e:
-            logger.error(f"HistoryRecorder: Error storing state change file: {e}")
+        A segment is handled whole: it is deleted once its newest record is
+        older than ``drop_before`` and rewritten with summarized records once
+        its newest record is older than ``summarize_before``. Call repeatedly
+        until both counts are 0.
+        """
+        return await self._run_on_writer(self._compact_segments, summarize_before, drop_before)
+
+    def _compact_segments(self, summarize_before: float, drop_before: float) -> Dict[str, int]:
+        result = {"segments_summarized": 0, "segments_dropped": 0, "segment_bytes_freed": 0}
+        for path in self.segment_log.sealed_segments():
+            try:
+                newest, compacted = self._segment_age(path)
+                if newest < drop_before:
+                    result["segment_bytes_freed"] = self.segment_log.delete_segment(path)
+                    result["segments_dropped"] = 1
+                elif newest < summarize_before and not compacted:
+                    records = [_summarize_record(json.loads(line)) for line in self.segment_log.read_segment(path)]
+                    result["segment_bytes_freed"] = self.segment_log.rewrite_segment(path, records)
+                    result["segments_summarized"] = 1
+                else:
+                    continue
+            except FileNotFoundError:
+                # Compressed or removed since it was listed
+                continue
+            return result
+        return result
+
+    def _segment_age(self, path: Path) -> Tuple[float, bool]:
+        """Newest timestamp in a sealed segment and whether every record is already summarized."""
+        st = path.stat()
+        key = (path.name, st.st_mtime_ns, st.st_size)
+        if key not in self._segment_ages:
+            newest, compacted = float("-inf"), True
+            for line in self.segment_log.read_segment(path):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                newest = max(newest, record.get("timestamp", newest))
+                raw = record.get("raw_content")
+                compacted = compacted and isinstance(raw, dict) and raw.get("compacted") is True
+            self._segment_ages = {k: v for k, v in self._segment_ages.items() if k[0] != path.name}
+            self._segment_ages[key] = (newest, compacted)
+        return self._segment_ages[key]
+
+    async def incremental_vacuum(self, pages: int) -> int:
+        """Return up to ``pages`` free pages to the filesystem; returns pages freed."""
+        return await self._run_on_writer(self._incremental_vacuum, pages)
+
+    def _incremental_vacuum(self, pages: int) -> int:
+        before = self._db.execute("PRAGMA freelist_count").fetchone()[0]
+        # executescript steps the pragma to completion; execute() frees only one page
+        self._db.executescript(f"PRAGMA incremental_vacuum({int(pages)});")
+        return before - self._db.execute("PRAGMA freelist_count").fetchone()[0]
+
+    async def vacuum(self):
+        """Full VACUUM; also switches a database created without auto_vacuum to incremental."""
+        await self._run_on_writer(self._vacuum)
+
+    def _vacuum(self):
+        self._db.execute(f"PRAGMA auto_vacuum={AUTO_VACUUM_INCREMENTAL}")
+        self._db.execute("VACUUM")
+
+    async def get_database_stats(self) -> Dict[str, Any]:
+        """Size and fragmentation of the history database plus retention tier counts."""
+        pragmas = await self._run_on_writer(self._database_pragmas)
+        async with self._reader() as db:
+            async with db.execute("SELECT COUNT(*), COALESCE(SUM(compacted), 0) FROM state_changes") as cursor:
+                total, compacted = await cursor.fetchone()
+        files = {}
+        if self.db_path != ":memory:":
+            for suffix in ("", "-wal"):
+                path = Path(self.db_path + suffix)
+                files[f"db{suffix.replace('-', '_')}_file_bytes"] = path.stat().st_size if path.exists() else 0
+        return {
+            **pragmas,
+            **files,
+            "size_bytes": pragmas["page_count"] * pragmas["page_size"],
+            "free_bytes": pragmas["freelist_count"] * pragmas["page_size"],
+            "records": total,
+            "full_records": total - compacted,
+            "summarized_records": compacted,
+        }
+
+    def _database_pragmas(self) -> Dict[str, int]:
+        return {
+            name: self._db.execute(f"PRAGMA {name}").fetchone()[0]
+            for name in ("page_size", "page_count", "freelist_count", "auto_vacuum")
+        }
+
+    @asynccontextmanager
+    async def _reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Connection for queries, after pending writes have been committed."""
+        if self._db is None:
+            await self.initialize()
+        await self.flush()
+        async with aiosqlite.connect(self.db_path) as db:
+            yield db
 
     async def get_recent_state_changes(
         self, 
@@ -303,78 +649,113 @@ class HistoryRecorder:
         channel_id: Optional[str] = None
     ) -> List[StateChangeBlock]:
         """Retrieve recent state changes from database."""
-        try:
-            async with aiosqlite.connect(self.db_path) as db:
-                # Ensure table exists before querying
-                await db.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS state_changes (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        timestamp REAL NOT NULL,
-                        change_type TEXT NOT NULL,
-                        source TEXT NOT NULL,
-                        channel_id TEXT,
-                        observations TEXT,
-                        potential_actions TEXT,
-                        selected_actions TEXT,
-                        reasoning TEXT,
-                        raw_content TEXT NOT NULL,
-                        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                    )
-                    """
-                )
-                
-                query = """
-                    SELECT timestamp, change_type, source, channel_id,
-                           observations, potential_actions, selected_actions,
-                           reasoning, raw_content
-                    FROM state_changes
-                """
-                params = []
-                
-                conditions = []
-                if change_type:
-                    conditions.append("change_type = ?")
-                    params.append(change_type)
-                
-                if channel_id:
-                    conditions.append("channel_id = ?")
-                    params.append(channel_id)
-                
-                if conditions:
-                    query += " WHERE " + " AND ".join(conditions)
-                
-                query += " ORDER BY timestamp DESC LIMIT ?"
-                params.append(limit)
-
-                async with db.execute(query, params) as cursor:
-                    rows = await cursor.fetchall()
-
-                state_changes = []
-                for row in rows:
-                    state_change = StateChangeBlock(
-                        timestamp=row[0],
-                        change_type=row[1],
-                        source=row[2],
-                        channel_id=row[3],
-                        observations=row[4],
-                        potential_actions=json.loads(row[5]) if row[5] else None,
-                        selected_actions=json.loads(row[6]) if row[6] else None,
-                        reasoning=row[7],
-                        raw_content=json.loads(row[8])
-                    )
-                    state_changes.append(state_change)
-
-                return state_changes
+        page = await self.get_state_changes_page(
+            limit=limit, change_type=change_type, channel_id=channel_id
+        )
+        return page["items"]
+
+    async def get_state_changes(
+        self,
+        channel_id: Optional[str] = None,
+        change_type: Optional[str] = None,
+        since_timestamp: Optional[float] = None,
+        limit: int = 100,
+    ) -> List[StateChangeBlock]:
+        """Retrieve state changes newest first, optionally only those after since_timestamp."""
+        page = await self.get_state_changes_page(
+            limit=limit,
+            change_type=change_type,
+            channel_id=channel_id,
+            since_timestamp=since_timestamp,
+        )
+        return page["items"]
+
+    async def get_state_changes_page(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        change_type: Optional[str] = None,
+        channel_id: Optional[str] = None,
+        since_timestamp: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Keyset-paginated state changes, newest first.
+
+        Pass the returned ``next_cursor`` back as ``cursor`` to get the next
+        (older) page; it is None on the last page. Each page is an index range
+        scan, so deep pages cost the same as the first.
+        """
+        conditions = []
+        params: List[Any] = []
+        if change_type:
+            conditions.append("change_type = ?")
+            params.append(change_type)
+        if channel_id:
+            conditions.append("channel_id = ?")
+            params.append(channel_id)
+        if since_timestamp is not None:
+            conditions.append("timestamp > ?")
+            params.append(since_timestamp)
+        if cursor:
+            try:
+                cursor_timestamp, cursor_id = decode_cursor(cursor)
+            except ValueError:
+                logger.warning(f"HistoryRecorder: Ignoring malformed cursor {cursor!r}")
+                return {"items": [], "next_cursor": None}
+            conditions.append("(timestamp, id) < (?, ?)")
+            params.extend([cursor_timestamp, cursor_id])
+
+        query = """
+            SELECT id, timestamp, change_type, source, channel_id,
+                   observations, potential_actions, selected_actions,
+                   reasoning, raw_content
+            FROM state_changes
+        """
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+        # One extra row tells us whether another page exists
+        params.append(limit + 1)
 
+        try:
+            async with self._reader() as db:
+                async with db.execute(query, params) as db_cursor:
+                    rows = await db_cursor.fetchall()
         except Exception as e:
             logger.error(f"HistoryRecorder: Error retrieving state changes: {e}")
-            return []
+            return {"items": [], "next_cursor": None}
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        items = [self._from_row(row[1:]) for row in rows]
+        next_cursor = encode_cursor(rows[-1][1], rows[-1][0]) if has_more and rows else None
+        return {"items": items, "next_cursor": next_cursor}
+
+    @staticmethod
+    def _from_row(row: Tuple[Any, ...]) -> StateChangeBlock:
+        return StateChangeBlock(
+            timestamp=row[0],
+            change_type=row[1],
+            source=row[2],
+            channel_id=row[3],
+            observations=row[4],
+            potential_actions=json.loads(row[5]) if row[5] else None,
+            selected_actions=json.loads(row[6]) if row[6] else None,
+            reasoning=row[7],
+            raw_content=json.loads(row[8])
+        )
+
+    def get_memory_stats(self) -> Dict[str, Any]:
+        """Size of the in-memory state change tier and the pending write queue."""
+        return {
+            "state_changes": self.state_changes.get_stats(),
+            "write_queue": self._queue.qsize() if self._queue is not None else 0,
+        }
 
     async def get_statistics(self) -> Dict[str, Any]:
         """Get statistics about recorded state changes."""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self._reader() as db:
                 # Get total count
                 async with db.execute("SELECT COUNT(*) FROM state_changes") as cursor:
                     total_count = (await cursor.fetchone())[0]
@@ -422,14 +803,14 @@ class HistoryRecorder:
         try:
             cutoff_time = time.time() - (days_to_keep * 24 * 3600)
             
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self._reader() as db:
                 # Delete old records
-                await db.execute("""
+                cursor = await db.execute("""
                     DELETE FROM state_changes 
                     WHERE timestamp < ?
                 """, (cutoff_time,))
                 
-                deleted_count = db.total_changes
+                deleted_count = cursor.rowcount
                 await db.commit()
                 
                 logger.info(f"HistoryRecorder: Cleaned up {deleted_count} old records")
@@ -444,6 +825,10 @@ class HistoryRecorder:
     ) -> str:
         """
         Export state changes for training or analysis.
+
+        Streams database rows older than the first segment record (written
+        before the segment log existed), then the JSONL segment log; memory
+        use is constant.
         
         Args:
             output_path: Path where to save the exported data
@@ -453,60 +838,17 @@ class HistoryRecorder:
             Status message about the export
         """
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                # Get all state changes ordered by timestamp
-                async with db.execute("""
-                    SELECT timestamp, change_type, source, channel_id, 
-                           observations, potential_actions, selected_actions, 
-                           reasoning, raw_content
-                    FROM state_changes 
-                    ORDER BY timestamp ASC
-                """) as cursor:
-                    records = await cursor.fetchall()
-
-            if not records:
-                return "No state changes found to export"
-
-            # Prepare data for export
-            export_data = []
-            for record in records:
-                timestamp, change_type, source, channel_id, observations, potential_actions, selected_actions, reasoning, raw_content = record
-                
-                # Parse JSON fields
-                try:
-                    potential_actions = json.loads(potential_actions) if potential_actions else None
-                    selected_actions = json.loads(selected_actions) if selected_actions else None
-                    raw_content = json.loads(raw_content) if raw_content else {}
-                except json.JSONDecodeError:
-                    logger.warning(f"Failed to parse JSON for record at {timestamp}")
-                    continue
-
-                export_record = {
-                    "timestamp": timestamp,
-                    "change_type": change_type,
-                    "source": source,
-                    "channel_id": channel_id,
-                    "observations": observations,
-                    "potential_actions": potential_actions,
-                    "selected_actions": selected_actions,
-                    "reasoning": reasoning,
-                    "raw_content": raw_content
-                }
-                export_data.append(export_record)
-
-            # Write to file
+            await self.flush()
             output_file = Path(output_path)
             output_file.parent.mkdir(parents=True, exist_ok=True)
+            exported = await asyncio.get_running_loop().run_in_executor(
+                None, self._export_stream, output_file, format.lower()
+            )
 
-            if format.lower() == "jsonl":
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    for record in export_data:
-                        f.write(json.dumps(record, ensure_ascii=False) + '\n')
-            else:  # JSON format
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    json.dump(export_data, f, indent=2, ensure_ascii=False)
+            if not exported:
+                return "No state changes found to export"
 
-            message = f"Exported {len(export_data)} state changes to {output_path}"
+            message = f"Exported {exported} state changes to {output_path}"
             logger.info(f"HistoryRecorder: {message}")
             return message
 
@@ -514,3 +856,55 @@ class HistoryRecorder:
             error_msg = f"Error exporting state changes: {e}"
             logger.error(f"HistoryRecorder: {error_msg}")
             return error_msg
+
+    def _export_stream(self, output_file: Path, format: str) -> int:
+        """Copy records to output_file one line at a time (runs on a worker thread)."""
+        segments_start = self._first_segment_timestamp()
+        if segments_start is None:
+            lines = self._iter_database_lines()
+        else:
+            lines = itertools.chain(self._iter_database_lines(before=segments_start), self.segment_log.iter_lines())
+        exported = 0
+        with open(output_file, "w", encoding="utf-8") as f:
+            if format != "jsonl":
+                f.write("[\n")
+            for line in lines:
+                if format == "jsonl":
+                    f.write(line)
+                else:
+                    f.write((",\n" if exported else "") + line.rstrip("\n"))
+                exported += 1
+            if format != "jsonl":
+                f.write("\n]\n")
+        return exported
+
+    def _first_segment_timestamp(self) -> Optional[float]:
+        """Timestamp of the oldest record in the segment log, or None if it is empty."""
+        for line in self.segment_log.iter_lines():
+            try:
+                return json.loads(line)["timestamp"]
+            except (json.JSONDecodeError, KeyError):
+                continue
+        return None
+
+    def _iter_database_lines(self, before: Optional[float] = None) -> Iterator[str]:
+        """JSONL lines straight off a database cursor, oldest first, optionally only before a timestamp."""
+        db = sqlite3.connect(self.db_path)
+        try:
+            rows = db.execute("""
+                SELECT timestamp, change_type, source, channel_id,
+                       observations, potential_actions, selected_actions,
+                       reasoning, raw_content
+                FROM state_changes
+                WHERE timestamp < ?
+                ORDER BY timestamp ASC
+            """, (before if before is not None else float("inf"),))
+            for row in rows:
+                try:
+                    record = vars(self._from_row(row))
+                except json.JSONDecodeError:
+                    logger.warning(f"Failed to parse JSON for record at {row[0]}")
+                    continue
+                yield json.dumps(record, ensure_ascii=False) + "\n"
+        finally:
+            db.close()
@@ -0,0 +1,70 @@
+"""
+Idle Task
+
+Base class for background services that only work while the ProcessingHub
+is idle. Every ``check_interval`` seconds the task checks whether the hub has
+been idle for ``idle_seconds`` (see ``ProcessingHub.idle_seconds``) and, if
+so, calls ``run_once``. Failures are logged and the loop carries on.
+
+Kept outside the orchestration package because the orchestrator imports the
+services built on it.
+"""
+
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class IdleTask(ABC):
+    """Periodic background task gated on processing idle windows."""
+
+    def __init__(self, processing_hub: Optional[Any], check_interval: float, idle_seconds: float):
+        self.processing_hub = processing_hub
+        self.check_interval = check_interval
+        self.idle_seconds = idle_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run_loop())
+            logger.info(f"{type(self).__name__}: Started ({self.describe()})")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def is_idle(self) -> bool:
+        """True when no cycle is running and the last one ended at least idle_seconds ago."""
+        if self.processing_hub is None:
+            return True
+        return self.processing_hub.idle_seconds() >= self.idle_seconds
+
+    def describe(self) -> str:
+        """Settings summary for the start log line."""
+        return f"idle {self.idle_seconds}s"
+
+    @abstractmethod
+    async def run_once(self) -> Any:
+        """Do one round of work; expected to return early once the hub stops being idle."""
+
+    async def _run_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            if not self.is_idle():
+                continue
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"{type(self).__name__}: Idle run failed: {e}", exc_info=True)
@@ -31,9 +31,14 @@ class IntegrationManager:
         self.active_integrations: Dict[str, Integration] = {}
         self.integration_types: Dict[str, Type[Integration]] = {}
         
-        # For in-memory databases, we need to maintain a persistent connection
+        # One shared connection, opened on first use; operations are serialized
+        # so a multi-statement write is never interleaved with another caller
         self._persistent_db = None
+        self._db_lock = asyncio.Lock()
         self._is_memory_db = db_path == ":memory:"
+
+        # Decrypted credentials by integration ID, invalidated on every write
+        self._credential_cache: Dict[str, Dict[str, str]] = {}
         
         # Initialize encryption for credentials
         if encryption_key:
@@ -45,42 +50,39 @@ class IntegrationManager:
             
     async def initialize(self):
         """Initialize the integration manager and database schema"""
-        if self._is_memory_db:
-            # For in-memory databases, create a persistent connection
-            self._persistent_db = await aiosqlite.connect(self.db_path)
-            
         await self._create_database_schema()
         await self._register_integration_types()
         logger.info("IntegrationManager initialized")
     
     async def _get_db_connection(self):
-        """Get a database connection, reusing persistent connection for in-memory databases"""
-        if self._is_memory_db and self._persistent_db:
-            return self._persistent_db
-        else:
-            return aiosqlite.connect(self.db_path)
+        """Get the shared database connection, opening it on first use"""
+        if self._persistent_db is None:
+            self._persistent_db = await aiosqlite.connect(self.db_path)
+        return self._persistent_db
     
     async def _execute_db_operation(self, operation_func):
-        """Execute a database operation with proper connection handling"""
-        if self._is_memory_db:
-            # Use persistent connection for in-memory database
-            return await operation_func(self._persistent_db)
-        else:
-            # Use context manager for file databases
-            async with aiosqlite.connect(self.db_path) as db:
+        """Execute a database operation on the shared connection, one at a time"""
+        async with self._db_lock:
+            db = await self._get_db_connection()
+            try:
                 return await operation_func(db)
+            except Exception:
+                # Don't leave a half-applied write open for the next caller
+                if db.in_transaction:
+                    await db.rollback()
+                raise
             
     async def cleanup(self):
         """Clean up resources"""
-        if self._persistent_db:
-            await self._persistent_db.close()
-            self._persistent_db = None
+        async with self._db_lock:
+            if self._persistent_db:
+                await self._persistent_db.close()
+                self._persistent_db = None
+        self._credential_cache.clear()
         
     async def _create_database_schema(self):
         """Create the database tables for integration management"""
-        if self._is_memory_db:
-            # Use persistent connection for in-memory database
-            db = self._persistent_db
+        async def db_operation(db):
             # Integrations table
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS integrations (
@@ -109,37 +111,8 @@ class IntegrationManager:
             """)
             
             await db.commit()
-        else:
-            # Use regular connection for file databases
-            async with aiosqlite.connect(self.db_path) as db:
-                # Integrations table
-                await db.execute("""
-                    CREATE TABLE IF NOT EXISTS integrations (
-                        id TEXT PRIMARY KEY,
-                        user_id TEXT,
-                        integration_type TEXT NOT NULL,
-                        display_name TEXT NOT NULL,
-                        is_active BOOLEAN DEFAULT TRUE,
-                        config TEXT NOT NULL,
-                        created_at REAL NOT NULL,
-                        updated_at REAL NOT NULL
-                    )
-                """)
-                
-                # Credentials table
-                await db.execute("""
-                    CREATE TABLE IF NOT EXISTS credentials (
-                        id TEXT PRIMARY KEY,
-                        integration_id TEXT NOT NULL,
-                        credential_key TEXT NOT NULL,
-                        credential_value_encrypted BLOB NOT NULL,
-                        created_at REAL NOT NULL,
-                        FOREIGN KEY (integration_id) REFERENCES integrations (id) ON DELETE CASCADE,
-                        UNIQUE(integration_id, credential_key)
-                    )
-                """)
-                
-                await db.commit()
+        
+        await self._execute_db_operation(db_operation)
             
     async def _register_integration_types(self):
         """Register available integration types"""
@@ -312,11 +285,18 @@ class IntegrationManager:
             return await cursor.fetchall()
         
         rows = await self._execute_db_operation(db_operation)
-            
-        for row in rows:
-            integration_id = row[0]
-            success = await self.connect_integration(integration_id, self.world_state_manager)
-            results[integration_id] = success
+        integration_ids = [row[0] for row in rows]
+        
+        # Integrations are independent, so connect them concurrently
+        outcomes = await asyncio.gather(
+            *(self.connect_integration(integration_id, self.world_state_manager) for integration_id in integration_ids),
+            return_exceptions=True
+        )
+        for integration_id, outcome in zip(integration_ids, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"Error connecting integration {integration_id}: {outcome}")
+                outcome = False
+            results[integration_id] = outcome
             
         logger.info(f"Connected {sum(results.values())}/{len(results)} active integrations")
         return results
@@ -426,7 +406,11 @@ class IntegrationManager:
         return None
         
     async def _load_credentials(self, integration_id: str) -> Dict[str, str]:
-        """Load and decrypt credentials for an integration"""
+        """Load and decrypt credentials for an integration, caching the result"""
+        cached = self._credential_cache.get(integration_id)
+        if cached is not None:
+            return dict(cached)
+        
         credentials = {}
         
         async def db_operation(db):
@@ -447,12 +431,20 @@ class IntegrationManager:
                 logger.warning(f"Failed to decrypt credential '{cred_key}' for integration '{integration_id}': {e}")
                 logger.warning(f"This usually happens when the encryption key has changed. Credential will be skipped.")
                 # Skip this credential - it will need to be re-added with the new key
-            
-        return credentials
+        
+        self._credential_cache[integration_id] = credentials
+        return dict(credentials)
+    
+    def invalidate_credentials(self, integration_id: Optional[str] = None) -> None:
+        """Drop cached decrypted credentials for one integration, or all of them"""
+        if integration_id is None:
+            self._credential_cache.clear()
+        else:
+            self._credential_cache.pop(integration_id, None)
         
     async def update_credentials(self, integration_id: str, credentials: Dict[str, str]) -> None:
         """Update credentials for an existing integration"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async def db_operation(db):
             # First remove existing credentials for this integration
             await db.execute("""
                 DELETE FROM credentials WHERE integration_id = ?
@@ -470,6 +462,11 @@ class IntegrationManager:
             
             await db.commit()
         
+        try:
+            await self._execute_db_operation(db_operation)
+        finally:
+            self.invalidate_credentials(integration_id)
+        
         logger.info(f"Updated {len(credentials)} credentials for integration {integration_id}")
         
         # If the integration is currently active, update its credentials
@@ -516,6 +513,7 @@ class IntegrationManager:
                 logger.info(f"Cleaned up {len(invalid_rowids)} invalid credentials for integration '{integration_id}'")
         
         await self._execute_db_operation(db_operation)
+        self.invalidate_credentials(integration_id)
         
     def get_active_integrations(self) -> Dict[str, Integration]:
         """Get currently active integration instances"""
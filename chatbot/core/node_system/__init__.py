@@ -3,16 +3,18 @@ Node System Package
 
 This package handles all node-based processing functionality:
 - Node management (expansion, collapse, LRU, pinning)
-- Node summary generation
+- Node summary generation, including idle-time pre-summarizing
 - AI tools for node interaction
 """
 
 from .node_manager import NodeManager
 from .summary_service import NodeSummaryService
 from .interaction_tools import NodeInteractionTools
+from .pre_summarizer import NodePreSummarizer
 
 __all__ = [
     "NodeManager",
     "NodeSummaryService",
-    "NodeInteractionTools"
+    "NodeInteractionTools",
+    "NodePreSummarizer"
 ]
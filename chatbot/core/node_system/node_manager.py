@@ -3,16 +3,32 @@ Node Manager for JSON Observer and Interactive Executor Pattern
 
 This module provides the core infrastructure for managing expandable/collapsible nodes
 in the WorldState with LRU auto-collapse functionality and pinning support.
+
+Expanded nodes are tracked in their own LRU-ordered structure, so expansion
+bookkeeping never scans node_metadata, which holds an entry for every node
+ever seen until evict_missing_nodes drops the ones that no longer exist.
 """
 
 import hashlib
 import json
 import time
-from collections import deque
+from collections import OrderedDict, deque
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, Iterable, List, Optional, Set
 from datetime import datetime
 
+try:
+    import xxhash
+except ImportError:  # pragma: no cover - exercised only without the optional dependency
+    xxhash = None
+
+
+def _fast_digest(data: bytes) -> str:
+    """Non-cryptographic digest for change detection; xxh3 when available."""
+    if xxhash is not None:
+        return xxhash.xxh3_64_hexdigest(data)
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
 
 @dataclass
 class SystemEvent:
@@ -42,6 +58,8 @@ class NodeMetadata:
     last_summary_update_ts: Optional[float] = None
     last_expanded_ts: Optional[float] = None
     data_hash: Optional[str] = None
+    data_version: Optional[int] = None
+    summary_version: Optional[int] = None
     
     def update_expanded_timestamp(self):
         """Update the last expanded timestamp to current time."""
@@ -61,6 +79,9 @@ class NodeManager:
         self.max_expanded_nodes = max_expanded_nodes
         self.default_pinned_nodes = default_pinned_nodes or []
         self.node_metadata: Dict[str, NodeMetadata] = {}
+        # Expanded node paths, least recently expanded first
+        self._expanded: "OrderedDict[str, None]" = OrderedDict()
+        self._evicted_generation: Optional[int] = None
         self.system_events: deque = deque(maxlen=20)  # Keep last 20 events
         self._initialize_default_pins()
     
@@ -94,14 +115,26 @@ class NodeManager:
         """Calculate a hash of the node's data for change detection."""
         try:
             json_str = json.dumps(data, sort_keys=True, default=str)
-            return hashlib.md5(json_str.encode()).hexdigest()
         except Exception:
             # Fallback for non-serializable data
-            return hashlib.md5(str(data).encode()).hexdigest()
+            json_str = str(data)
+        return _fast_digest(json_str.encode())
     
-    def is_data_changed(self, node_path: str, current_data: Any) -> bool:
-        """Check if the node's data has changed since last hash calculation."""
+    def is_data_changed(self, node_path: str, current_data: Any, version: Optional[int] = None) -> bool:
+        """
+        Check if the node's data has changed since the last check.
+        
+        Nodes from the world state's node index pass their version stamp, which
+        turns the check into an integer compare. Data without a version (volatile
+        or externally supplied nodes) falls back to hashing its serialized form.
+        """
         metadata = self.get_node_metadata(node_path)
+        
+        if version is not None:
+            changed = metadata.data_version != version
+            metadata.data_version = version
+            return changed
+        
         current_hash = self.calculate_data_hash(current_data)
         
         if metadata.data_hash is None:
@@ -115,28 +148,18 @@ class NodeManager:
         return False
     
     def get_expanded_nodes(self) -> List[str]:
-        """Get list of all currently expanded node paths."""
-        return [
-            path for path, metadata in self.node_metadata.items()
-            if metadata.is_expanded
-        ]
+        """Get list of all currently expanded node paths, least recently expanded first."""
+        return list(self._expanded)
     
     def get_unpinned_expanded_nodes(self) -> List[str]:
         """Get list of currently expanded but unpinned node paths, sorted by LRU."""
-        unpinned_expanded = [
-            (path, metadata) for path, metadata in self.node_metadata.items()
-            if metadata.is_expanded and not metadata.is_pinned
-        ]
-        
-        # Sort by last_expanded_ts (oldest first)
-        unpinned_expanded.sort(key=lambda x: x[1].last_expanded_ts or 0)
-        
-        return [path for path, _ in unpinned_expanded]
+        # Pins can be set directly on the metadata, so check them here; this
+        # walks at most max_expanded_nodes entries
+        return [path for path in self._expanded if not self.node_metadata[path].is_pinned]
     
     def find_lru_unpinned_node(self) -> Optional[str]:
         """Find the least recently used unpinned expanded node."""
-        unpinned_nodes = self.get_unpinned_expanded_nodes()
-        return unpinned_nodes[0] if unpinned_nodes else None
+        return next((path for path in self._expanded if not self.node_metadata[path].is_pinned), None)
     
     def can_expand_node(self, node_path: str) -> tuple[bool, Optional[str]]:
         """
@@ -153,10 +176,8 @@ class NodeManager:
         if metadata.is_expanded:
             return True, None
         
-        expanded_nodes = self.get_expanded_nodes()
-        
         # If under limit, can expand freely
-        if len(expanded_nodes) < self.max_expanded_nodes:
+        if len(self._expanded) < self.max_expanded_nodes:
             return True, None
         
         # At or over limit - need to find a node to auto-collapse
@@ -188,6 +209,7 @@ class NodeManager:
         # If already expanded, just update timestamp
         if metadata.is_expanded:
             metadata.update_expanded_timestamp()
+            self._expanded.move_to_end(node_path)
             return True, None, f"Node {node_path} was already expanded, updated access time"
         
         auto_collapsed_node = None
@@ -200,6 +222,7 @@ class NodeManager:
         # Expand the requested node
         metadata.is_expanded = True
         metadata.update_expanded_timestamp()
+        self._expanded[node_path] = None
         
         message = f"Expanded {node_path}"
         if auto_collapsed_node:
@@ -227,6 +250,7 @@ class NodeManager:
             return False, f"Node {node_path} was already collapsed"
         
         metadata.is_expanded = False
+        self._expanded.pop(node_path, None)
         # Don't update expanded timestamp on collapse
         
         collapse_type = "auto-collapsed" if is_auto_collapse else "collapsed"
@@ -286,6 +310,20 @@ class NodeManager:
         
         return True, f"Successfully unpinned {node_path}"
     
+    def needs_summary(self, node_path: str, version: Optional[int] = None) -> bool:
+        """
+        Whether a collapsed node lacks a summary, or has one generated from
+        an older version of its data when ``version`` is given.
+        """
+        metadata = self.node_metadata.get(node_path)
+        if metadata is None:
+            return True
+        if metadata.is_expanded:
+            return False
+        if metadata.ai_summary is None or metadata.last_summary_update_ts is None:
+            return True
+        return version is not None and metadata.summary_version != version
+    
     def get_nodes_needing_summary(self, all_node_paths: List[str]) -> List[str]:
         """
         Get list of node paths that need AI summary generation.
@@ -294,48 +332,67 @@ class NodeManager:
         - Collapsed nodes without summaries
         - Collapsed nodes whose data has changed since last summary
         """
-        needs_summary = []
-        
-        for node_path in all_node_paths:
-            metadata = self.get_node_metadata(node_path)
-            
-            # Only collapsed nodes need summaries
-            if metadata.is_expanded:
-                continue
-            
-            # Needs summary if no summary exists or data hash doesn't match
-            if (metadata.ai_summary is None or 
-                metadata.last_summary_update_ts is None):
-                needs_summary.append(node_path)
-        
-        return needs_summary
+        return [node_path for node_path in all_node_paths if self.needs_summary(node_path)]
     
-    def update_node_summary(self, node_path: str, summary: str):
-        """Update the AI-generated summary for a node."""
+    def update_node_summary(self, node_path: str, summary: str, version: Optional[int] = None):
+        """Update the AI-generated summary for a node, noting the data version it describes."""
         metadata = self.get_node_metadata(node_path)
         metadata.ai_summary = summary
+        metadata.summary_version = version
         metadata.update_summary_timestamp()
     
+    def evict_missing_nodes(self, existing_paths: Iterable[str], generation: Optional[int] = None) -> List[str]:
+        """
+        Drop metadata for nodes that no longer exist so it stays bounded.
+        
+        Pinned nodes are kept even when absent, since pins can name nodes that
+        appear later. Pass the node index's generation to skip the scan when no
+        node was added or removed since the previous call.
+        
+        Returns:
+            The evicted node paths
+        """
+        if generation is not None and generation == self._evicted_generation:
+            return []
+        self._evicted_generation = generation
+        
+        existing = existing_paths if isinstance(existing_paths, (set, frozenset)) else set(existing_paths)
+        evicted = [
+            path for path, metadata in self.node_metadata.items()
+            if path not in existing and not metadata.is_pinned
+        ]
+        collapsed = [path for path in evicted if path in self._expanded]
+        for path in evicted:
+            del self.node_metadata[path]
+            self._expanded.pop(path, None)
+        
+        if collapsed:
+            self._log_system_event(
+                "node_evicted",
+                f"Collapsed {len(collapsed)} expanded node(s) that no longer exist",
+                collapsed
+            )
+        return evicted
+    
     def get_expansion_status_summary(self) -> Dict[str, Any]:
         """Get a summary of current expansion status for logging/debugging."""
-        expanded_nodes = self.get_expanded_nodes()
-        pinned_expanded = [
-            path for path in expanded_nodes
-            if self.node_metadata[path].is_pinned
-        ]
-        unpinned_expanded = [
-            path for path in expanded_nodes
-            if not self.node_metadata[path].is_pinned
-        ]
+        pinned_expanded = []
+        unpinned_expanded = []
+        for path in self._expanded:
+            if self.node_metadata[path].is_pinned:
+                pinned_expanded.append(path)
+            else:
+                unpinned_expanded.append(path)
+        expanded_count = len(self._expanded)
         
         return {
-            "total_expanded": len(expanded_nodes),
+            "total_expanded": expanded_count,
             "max_allowed": self.max_expanded_nodes,
             "pinned_expanded": len(pinned_expanded),
             "unpinned_expanded": len(unpinned_expanded),
             "pinned_nodes": pinned_expanded,
             "unpinned_nodes": unpinned_expanded,
-            "utilization": f"{len(expanded_nodes)}/{self.max_expanded_nodes}"
+            "utilization": f"{expanded_count}/{self.max_expanded_nodes}"
         }
     
     def get_system_events(self) -> List[Dict[str, Any]]:
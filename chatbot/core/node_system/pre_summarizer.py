@@ -0,0 +1,138 @@
+"""
+Node Pre-Summarizer
+
+Background service that keeps collapsed-node summaries fresh so a node-based
+cycle rarely has to wait on the summary model. While the ProcessingHub has
+been idle for ``idle_seconds``, it syncs the world state's node index, picks
+the collapsed nodes whose summary is missing or older than their data, and
+summarizes the ``batch_size`` most active of them (activity decays with
+recency, see ``NodeIndex.get_activity``).
+
+Each summary spends one "NodeSummary" action from the RateLimiter's hourly
+budget, so pre-summarizing backs off on its own when that budget runs low.
+"""
+
+import heapq
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from ...config import settings
+from ..idle_task import IdleTask
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_ACTION = "NodeSummary"
+
+
+class NodePreSummarizer(IdleTask):
+    """Pre-generates summaries for the most active collapsed nodes during idle windows."""
+
+    def __init__(
+        self,
+        world_state_manager: Any,
+        payload_builder: Any,
+        processing_hub: Optional[Any] = None,
+        rate_limiter: Optional[Any] = None,
+        summary_service: Optional[Any] = None,
+        check_interval: Optional[float] = None,
+        idle_seconds: Optional[float] = None,
+        batch_size: Optional[int] = None,
+    ):
+        super().__init__(
+            processing_hub,
+            check_interval if check_interval is not None else settings.NODE_PRESUMMARY_INTERVAL,
+            idle_seconds if idle_seconds is not None else settings.NODE_PRESUMMARY_IDLE_SECONDS,
+        )
+        self.world_state_manager = world_state_manager
+        self.payload_builder = payload_builder
+        self.rate_limiter = rate_limiter
+        self.summary_service = summary_service
+        self.batch_size = batch_size or settings.NODE_PRESUMMARY_BATCH_SIZE
+
+        self.last_run: Optional[float] = None
+        self.stats: Dict[str, int] = {"runs": 0, "summarized": 0, "pending": 0, "rate_limited": 0}
+
+    @property
+    def node_manager(self) -> Optional[Any]:
+        # Attached to the payload builder only when node-based processing is in use
+        return getattr(self.payload_builder, "node_manager", None)
+
+    def describe(self) -> str:
+        return f"batch {self.batch_size}, idle {self.idle_seconds}s"
+
+    def select_candidates(self) -> List[str]:
+        """Collapsed nodes with missing or stale summaries, most active first, up to batch_size."""
+        node_manager = self.node_manager
+        if node_manager is None:
+            return []
+        world_state_data = self.world_state_manager.state
+        node_index = world_state_data.node_index
+        all_node_paths = self.payload_builder.sync_node_index(world_state_data)
+
+        pending = [
+            path for path in all_node_paths
+            if node_manager.needs_summary(path, node_index.get_version(path))
+        ]
+        self.stats["pending"] = len(pending)
+        now = time.time()
+        return heapq.nlargest(self.batch_size, pending, key=lambda path: node_index.get_activity(path, now))
+
+    def _reserve(self, candidates: List[str]) -> List[str]:
+        """Spend rate-limit budget on as many candidates as it allows, in order."""
+        if self.rate_limiter is None:
+            return candidates
+        now = time.time()
+        reserved = []
+        for path in candidates:
+            can_execute, _ = self.rate_limiter.can_execute_action(SUMMARY_ACTION, now)
+            if not can_execute:
+                self.stats["rate_limited"] += 1
+                break
+            self.rate_limiter.record_action(SUMMARY_ACTION, now)
+            reserved.append(path)
+        return reserved
+
+    async def run_once(self) -> int:
+        """Summarize one batch of the most active stale nodes; returns how many were updated."""
+        node_manager = self.node_manager
+        if node_manager is None or self.summary_service is None or not self.is_idle():
+            return 0
+
+        batch = self._reserve(self.select_candidates())
+        if not batch:
+            return 0
+
+        world_state_data = self.world_state_manager.state
+        node_index = world_state_data.node_index
+        # Versions are captured before the await so a node that changes while
+        # its summary is generated stays stale and is picked up next time
+        versions = {path: node_index.get_version(path) for path in batch}
+        requests = [
+            {"node_path": path, "node_data": node_index.get_data(world_state_data, path)}
+            for path in batch
+        ]
+        summaries = await self.summary_service.generate_multiple_summaries(requests)
+
+        updated = 0
+        for path, summary in summaries.items():
+            # Skip nodes that disappeared from the tree during the await
+            if path in versions and summary and path in node_index:
+                node_manager.update_node_summary(path, summary, version=versions[path])
+                updated += 1
+
+        self.last_run = time.time()
+        self.stats["runs"] += 1
+        self.stats["summarized"] += updated
+        logger.debug(f"NodePreSummarizer: Summarized {updated} nodes ({self.stats['pending'] - updated} pending)")
+        return updated
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "active": self.node_manager is not None and self.summary_service is not None,
+            "batch_size": self.batch_size,
+            "idle": self.is_idle(),
+            "last_run": self.last_run,
+            "totals": dict(self.stats),
+        }
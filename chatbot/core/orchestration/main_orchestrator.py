@@ -16,10 +16,13 @@ from typing import Any, Dict, Optional
 from ...config import settings
 from ...core.ai_engine import AIDecisionEngine, ActionPlan
 from ...core.context import ContextManager
+from ...core.history_compaction import HistoryCompactionService
 from ...core.integration_manager import IntegrationManager
 from ...integrations.arweave_uploader_client import ArweaveUploaderClient
 from ...integrations.farcaster import FarcasterObserver
 from ..node_system.node_manager import NodeManager
+from ..node_system.pre_summarizer import NodePreSummarizer
+from ..node_system.summary_service import NodeSummaryService
 from ...integrations.matrix.observer import MatrixObserver
 from ...integrations.base_nft_service import BaseNFTService
 from ...integrations.eligibility_service import UserEligibilityService
@@ -241,6 +244,24 @@ class MainOrchestrator:
             config=self.config.processing_config
         )
         
+        # Background retention for the history database
+        self.history_compaction = HistoryCompactionService(
+            history_recorder=self.context_manager.history_recorder,
+            processing_hub=self.processing_hub
+        )
+        
+        # Idle-time summaries for collapsed nodes, active once a NodeManager is attached
+        self.node_pre_summarizer = NodePreSummarizer(
+            world_state_manager=self.world_state,
+            payload_builder=self.payload_builder,
+            processing_hub=self.processing_hub,
+            rate_limiter=self.rate_limiter,
+            summary_service=(
+                NodeSummaryService(api_key=settings.OPENROUTER_API_KEY)
+                if settings.OPENROUTER_API_KEY else None
+            )
+        )
+        
         # Proactive conversation engine (Initiative C)
         self.proactive_engine = ProactiveConversationEngine(
             world_state_manager=self.world_state,
@@ -475,6 +496,12 @@ class MainOrchestrator:
             # Start the proactive conversation engine
             await self.proactive_engine.start()
             
+            if settings.HISTORY_COMPACTION_ENABLED:
+                await self.history_compaction.start()
+            
+            if settings.NODE_PRESUMMARY_ENABLED:
+                await self.node_pre_summarizer.start()
+            
             # Start the processing loop
             await self.processing_hub.start_processing_loop()
             
@@ -516,6 +543,12 @@ class MainOrchestrator:
         if self.farcaster_observer:
             await self.farcaster_observer.stop()
 
+        await self.node_pre_summarizer.stop()
+
+        # Commit any queued history records and close the writer connection
+        await self.history_compaction.stop()
+        await self.context_manager.history_recorder.close()
+
         logger.info("Main orchestrator system stopped")
 
     def _setup_processing_components(self):
@@ -64,6 +64,9 @@ class ProcessingHub:
         self.running = False
         self.cycle_count = 0
         self.last_cycle_time = 0
+        # Idle tracking for background maintenance (compaction, pre-summarization)
+        self.cycle_in_progress = False
+        self.last_cycle_end = time.time()
         self.current_processing_mode = "traditional"
         self.payload_size_history: List[int] = []
         
@@ -155,7 +158,12 @@ class ProcessingHub:
                     active_channels = self._get_active_channels(current_state)
 
                     # Process using selected strategy
-                    await self._process_world_state(active_channels)
+                    self.cycle_in_progress = True
+                    try:
+                        await self._process_world_state(active_channels)
+                    finally:
+                        self.cycle_in_progress = False
+                        self.last_cycle_end = time.time()
 
                     # Update tracking
                     last_state_hash = current_hash
@@ -361,6 +369,12 @@ class ProcessingHub:
         except Exception as e:
             logger.error(f"Error logging rate limit status: {e}")
 
+    def idle_seconds(self) -> float:
+        """Seconds since the last cycle finished, or 0.0 while a cycle is running."""
+        if self.cycle_in_progress:
+            return 0.0
+        return max(0.0, time.time() - self.last_cycle_end)
+
     def get_processing_status(self) -> Dict[str, Any]:
         """Get comprehensive processing status."""
         return {
@@ -368,6 +382,7 @@ class ProcessingHub:
             "current_mode": self.current_processing_mode,
             "cycle_count": self.cycle_count,
             "last_cycle_time": self.last_cycle_time,
+            "idle_seconds": round(self.idle_seconds(), 1),
             "payload_size_history": self.payload_size_history[-5:],  # Last 5 estimates
             "traditional_processor_available": self.traditional_processor is not None,
             "node_processor_available": self.node_processor is not None,
@@ -45,6 +45,8 @@ class RateLimitConfig:
             "SearchCastsTool": 100,
             "GetTrendingCastsTool": 80,
             "GetCastByUrlTool": 200,
+            # Background node summaries generated while processing is idle
+            "NodeSummary": 120,
         }
     )
 
@@ -0,0 +1,97 @@
+"""
+Ring Buffer
+
+Fixed-capacity, list-like buffer for the in-memory tiers of conversation and
+state-change history. Appending past capacity evicts the oldest entry in O(1)
+(instead of re-slicing a list) and hands it back to the caller, which is
+responsible for making sure it already lives in, or is spilled to, the
+database tier.
+
+Each buffer can estimate the memory held by its entries so the status API can
+report what the in-memory tiers cost. The estimate walks every entry, so it is
+computed only when stats are requested, never on append.
+"""
+
+import sys
+from collections import deque
+from typing import Any, Deque, Dict, Generic, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+_ATOMIC = (str, bytes, int, float, bool, type(None))
+
+
+def approximate_size(obj: Any, _depth: int = 0) -> int:
+    """Rough deep size in bytes of a JSON-like object or dataclass instance."""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, _ATOMIC) or _depth > 8:
+        return size
+    if isinstance(obj, dict):
+        return size + sum(
+            approximate_size(k, _depth + 1) + approximate_size(v, _depth + 1) for k, v in obj.items()
+        )
+    if isinstance(obj, (list, tuple, set, frozenset, deque)):
+        return size + sum(approximate_size(item, _depth + 1) for item in obj)
+    if hasattr(obj, "__dict__"):
+        return size + approximate_size(vars(obj), _depth + 1)
+    return size
+
+
+class RingBuffer(Generic[T]):
+    """Bounded FIFO that evicts its oldest entry and estimates its memory on demand."""
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError(f"RingBuffer capacity must be at least 1, got {capacity}")
+        self.capacity = capacity
+        self._items: Deque[T] = deque()
+        self.evicted = 0
+
+    def append(self, item: T) -> Optional[T]:
+        """Add ``item``; returns the evicted oldest entry when the buffer was full."""
+        evicted = None
+        if len(self._items) >= self.capacity:
+            evicted = self._items.popleft()
+            self.evicted += 1
+        self._items.append(item)
+        return evicted
+
+    def clear(self) -> None:
+        self._items.clear()
+
+    @property
+    def approx_bytes(self) -> int:
+        """Approximate memory held by the current entries (walks every entry)."""
+        return sum(approximate_size(item) for item in self._items)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "count": len(self._items),
+            "capacity": self.capacity,
+            "evicted": self.evicted,
+            "approx_bytes": self.approx_bytes,
+        }
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self._items)
+
+    def __reversed__(self) -> Iterator[T]:
+        return reversed(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self._items)[index]
+        return self._items[index]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, RingBuffer):
+            return list(self._items) == list(other._items)
+        if isinstance(other, (list, tuple)):
+            return list(self._items) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"RingBuffer(capacity={self.capacity}, items={list(self._items)!r})"
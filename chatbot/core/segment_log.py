@@ -0,0 +1,163 @@
+"""
+Segmented Log
+
+Append-only JSONL log split into numbered segment files. The active segment
+is appended to until it reaches ``max_segment_bytes``; it is then sealed
+(optionally gzip-compressed) and a new one is started. Every instance starts
+a fresh segment, so a segment that was being written during a crash is never
+appended to again.
+
+Sealed segments can be rewritten or deleted whole, which is how retention
+trims the log. The writer methods are blocking and are meant to be driven
+from a single worker thread (HistoryRecorder calls them from its writer
+executor).
+"""
+
+import gzip
+import json
+import logging
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+FSYNC_NONE = "none"  # leave flushing to the OS
+FSYNC_ROTATE = "rotate"  # fsync a segment when it is sealed
+FSYNC_BATCH = "batch"  # fsync after every appended batch
+FSYNC_POLICIES = (FSYNC_NONE, FSYNC_ROTATE, FSYNC_BATCH)
+
+
+class SegmentedLog:
+    """Rotated, optionally compressed JSONL segment writer and reader."""
+
+    def __init__(
+        self,
+        directory: Path,
+        prefix: str,
+        max_segment_bytes: int = 16 * 1024 * 1024,
+        compress: bool = True,
+        fsync: str = FSYNC_ROTATE,
+    ):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy {fsync!r}, expected one of {FSYNC_POLICIES}")
+        self.directory = Path(directory)
+        self.prefix = prefix
+        self.max_segment_bytes = max_segment_bytes
+        self.compress = compress
+        self.fsync = fsync
+
+        self._segment_re = re.compile(rf"^{re.escape(prefix)}-(\d+)\.jsonl(\.gz)?$")
+        self._file: Optional[IO[str]] = None
+        self._path: Optional[Path] = None
+        self._size = 0
+
+    def append(self, records: Iterable[Dict[str, Any]]) -> None:
+        """Append records as one JSON object per line, rotating when full."""
+        lines = "".join(json.dumps(r, ensure_ascii=False, default=str) + "\n" for r in records)
+        if not lines:
+            return
+        if self._file is None:
+            self._open_next_segment()
+        self._file.write(lines)
+        self._file.flush()
+        self._size += len(lines.encode("utf-8"))
+        if self.fsync == FSYNC_BATCH:
+            os.fsync(self._file.fileno())
+        if self._size >= self.max_segment_bytes:
+            self._seal()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._seal()
+
+    def segments(self) -> List[Path]:
+        """All segment files, oldest first."""
+        if not self.directory.exists():
+            return []
+        found: Dict[int, Path] = {}
+        for path in self.directory.iterdir():
+            match = self._segment_re.match(path.name)
+            if match:
+                number = int(match.group(1))
+                # Mid-compression both files exist; the .gz is complete once renamed
+                if number not in found or match.group(2):
+                    found[number] = path
+        return [found[number] for number in sorted(found)]
+
+    def sealed_segments(self) -> List[Path]:
+        """Segments no longer being appended to by this instance, oldest first."""
+        active = self._path.name if self._path is not None else None
+        return [path for path in self.segments() if path.name != active]
+
+    def iter_lines(self) -> Iterator[str]:
+        """Stream complete JSONL lines from every segment, oldest first."""
+        for path in self.segments():
+            try:
+                yield from self.read_segment(path)
+            except FileNotFoundError:
+                # Compressed and removed between listing and opening
+                continue
+
+    def read_segment(self, path: Path) -> Iterator[str]:
+        """Complete JSONL lines of one segment."""
+        opener = gzip.open if path.suffix == ".gz" else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                # A line without its newline is still being written
+                if line.endswith("\n"):
+                    yield line
+
+    def rewrite_segment(self, path: Path, records: Iterable[Dict[str, Any]]) -> int:
+        """Atomically replace a sealed segment's records; returns bytes reclaimed."""
+        before = path.stat().st_size
+        partial = path.with_name(path.name + ".tmp")
+        opener = gzip.open if path.suffix == ".gz" else open
+        with opener(partial, "wt", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        os.replace(partial, path)
+        return before - path.stat().st_size
+
+    def delete_segment(self, path: Path) -> int:
+        """Remove a sealed segment; returns bytes reclaimed."""
+        size = path.stat().st_size
+        path.unlink()
+        return size
+
+    def _open_next_segment(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        numbers = [int(self._segment_re.match(p.name).group(1)) for p in self.segments()]
+        number = max(numbers, default=0) + 1
+        while True:
+            path = self.directory / f"{self.prefix}-{number:06d}.jsonl"
+            try:
+                # Exclusive create: another writer may share the directory
+                self._file = open(path, "x", encoding="utf-8")
+                break
+            except FileExistsError:
+                number += 1
+        self._path = path
+        self._size = 0
+
+    def _seal(self) -> None:
+        if self.fsync in (FSYNC_ROTATE, FSYNC_BATCH):
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._file.close()
+        path, self._file, self._path = self._path, None, None
+        if self.compress and self._size:
+            self._compress(path)
+
+    def _compress(self, path: Path) -> None:
+        target = path.with_name(path.name + ".gz")
+        partial = path.with_name(path.name + ".gz.tmp")
+        try:
+            with open(path, "rb") as src, gzip.open(partial, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.replace(partial, target)
+            path.unlink()
+        except OSError as e:
+            logger.warning(f"SegmentedLog: Could not compress {path}: {e}")
@@ -5,11 +5,13 @@ This package handles all aspects of world state management:
 - Data structures (Message, Channel, ActionHistory, WorldStateData)
 - Core state management operations
 - AI payload generation for different contexts
+- Node index for incremental node-based payloads
 """
 
 from .structures import Message, Channel, ActionHistory, WorldStateData
 from .structures import WorldStateData as WorldState  # Alias for backward compatibility
 from .manager import WorldStateManager
+from .node_index import NodeIndex
 from .payload_builder import PayloadBuilder
 
 __all__ = [
@@ -19,5 +21,6 @@ __all__ = [
     "WorldStateData",
     "WorldState",  # Backward compatibility
     "WorldStateManager",
+    "NodeIndex",
     "PayloadBuilder"
 ]
@@ -55,6 +55,23 @@ class WorldStateManager:
         }
         logger.info("WorldStateManager: Initialized empty world state")
 
+    @property
+    def version(self) -> int:
+        """Monotonic counter that changes whenever the world state is updated."""
+        return self.state.version
+
+    def mark_changed(self, *node_paths: str) -> None:
+        """
+        Bump the version after mutating state outside the manager's methods.
+
+        Pass the payload node paths the mutation affected so the node index
+        refreshes only those; with no paths every node counts as changed.
+        """
+        if node_paths:
+            self.state.touch_nodes(*node_paths)
+        else:
+            self.state.last_update = time.time()
+
     @property
     def world_state(self):
         """Compatibility property for tests expecting 'world_state' instead of 'state'."""
@@ -84,18 +101,20 @@ class WorldStateManager:
             if channel_type is None or name is None:
                 raise ValueError("channel_type and name are required when adding by parameters")
             
-            self.state.channels[channel_id] = Channel(
+            channel = Channel(
                 id=channel_id,
                 type=channel_type,
                 name=name,
                 status=status,
                 last_status_update=time.time(),
             )
+            self.state.channels[channel_id] = channel
             # Set last_checked after creation
-            self.state.channels[channel_id].update_last_checked()
+            channel.update_last_checked()
             logger.info(
                 f"WorldState: Added {channel_type} channel '{name}' ({channel_id}) with status '{status}'"
             )
+        self.state.touch_nodes(*self.state.channel_node_paths(channel), families=("feeds",))
 
     def add_message(self, *args, **kwargs):
         """Add a new message to a channel. Accepts (channel_id, message), (message_data, message), or (dict) for test compatibility."""
@@ -138,7 +157,49 @@ class WorldStateManager:
         # Limit to 50 messages per channel
         if len(self.state.channels[channel_id].recent_messages) > 50:
             self.state.channels[channel_id].recent_messages = self.state.channels[channel_id].recent_messages[-50:]
+            self.state.prune_matrix_reply_index(self.state.channels[channel_id])
         self.state.channels[channel_id].update_last_checked()
+        if message.channel_type == "matrix":
+            self.state.index_matrix_message(message)
+        self.state.touch_nodes(
+            *self.state.message_node_paths(self.state.channels[channel_id], message), families=("users",)
+        )
+
+    def add_messages(self, messages: List[Message]) -> int:
+        """
+        Add a batch of messages (e.g. sync catch-up backlog) in timestamp order.
+
+        Deduplicates like add_message, then trims and re-sorts each touched
+        channel once. Returns the number of messages actually added.
+        """
+        touched_channels = set()
+        added = 0
+        for message in sorted(messages, key=lambda m: m.timestamp):
+            if message.id in self.state.seen_messages:
+                continue
+            self.state.seen_messages.add(message.id)
+            channel_id = message.channel_id or f"{message.channel_type}:unknown"
+            if channel_id not in self.state.channels:
+                self.add_channel(channel_id, channel_type=message.channel_type, name=channel_id)
+            self.state.channels[channel_id].recent_messages.append(message)
+            if message.channel_type == "matrix":
+                self.state.index_matrix_message(message)
+            touched_channels.add(channel_id)
+            added += 1
+
+        for channel_id in touched_channels:
+            channel = self.state.channels[channel_id]
+            channel.recent_messages.sort(key=lambda m: m.timestamp)
+            # Limit to 50 messages per channel
+            if len(channel.recent_messages) > 50:
+                channel.recent_messages = channel.recent_messages[-50:]
+                self.state.prune_matrix_reply_index(channel)
+            channel.update_last_checked()
+        if added:
+            # A backlog can reshuffle every channel's message window, so let the
+            # node index rebuild rather than tracking each affected node
+            self.state.last_update = time.time()
+        return added
 
     def add_message_compat(self, channel_id_or_dict, message=None):
         """Compatibility wrapper for tests that call add_message with (dict, message) or (message_data, message)."""
@@ -158,15 +219,6 @@ class WorldStateManager:
             f"WorldState: New message in {channel.name}: {message.sender}: {message.content[:100]}..."
         )
     
-    def add_messages(self, messages: List[Message]) -> None:
-        """Batch add multiple messages to the world state."""
-        for msg in messages:
-            # Use each message's channel_id when adding
-            try:
-                self.add_message(msg.channel_id, msg)
-            except Exception as e:
-                logger.error(f"WorldStateManager: Failed to add message {getattr(msg, 'id', None)}: {e}")
-
     def add_action_result(
         self,
         action_type: str,
@@ -193,7 +245,7 @@ class WorldStateManager:
         if len(self.state.action_history) > 100:
             self.state.action_history = self.state.action_history[-100:]
 
-        self.state.last_update = time.time()
+        self.state.touch_nodes("system.action_history")
 
         logger.info(
             f"WorldState: Action completed - {action_type}: {result} (ID: {action_id})"
@@ -216,7 +268,7 @@ class WorldStateManager:
                 if cast_hash and action.action_type.startswith("send_farcaster"):
                     action.parameters["cast_hash"] = cast_hash
 
-                self.state.last_update = time.time()
+                self.state.touch_nodes("system.action_history")
                 logger.info(
                     f"WorldState: Action {action_id} updated - {action.action_type}: {old_result} -> {new_result}"
                 )
@@ -230,7 +282,7 @@ class WorldStateManager:
     def update_system_status(self, updates: Dict[str, Any]):
         """Update system status information"""
         self.state.system_status.update(updates)
-        self.state.last_update = time.time()
+        self.state.touch_nodes("system.status")
 
         for key, value in updates.items():
             logger.info(f"WorldState: System status update - {key}: {value}")
@@ -402,7 +454,7 @@ class WorldStateManager:
                 logger.info(
                     f"WorldState: Updated existing pending invite for room {room_id} from {invite_info.get('inviter')}"
                 )
-                self.state.last_update = time.time()
+                self.state.touch_nodes("system.notifications")
                 return
 
         # Add timestamp if not provided
@@ -410,7 +462,7 @@ class WorldStateManager:
             invite_info["timestamp"] = time.time()
 
         self.state.pending_matrix_invites.append(invite_info)
-        self.state.last_update = time.time()
+        self.state.touch_nodes("system.notifications", families=("system",))
         logger.info(
             f"WorldState: Added new pending Matrix invite for room {room_id} from {invite_info.get('inviter')}"
         )
@@ -434,7 +486,7 @@ class WorldStateManager:
 
         removed = len(self.state.pending_matrix_invites) < original_count
         if removed:
-            self.state.last_update = time.time()
+            self.state.touch_nodes("system.notifications", families=("system",))
             logger.info(f"WorldState: Removed pending Matrix invite for room {room_id}")
         else:
             logger.debug(f"No pending Matrix invite found for room {room_id}")
@@ -455,7 +507,7 @@ class WorldStateManager:
             old_status = self.state.channels[channel_id].status
             self.state.channels[channel_id].status = new_status
             self.state.channels[channel_id].last_status_update = time.time()
-            self.state.last_update = time.time()
+            self.state.touch_nodes(*self.state.channel_node_paths(self.state.channels[channel_id]))
             logger.info(
                 f"WorldState: Updated channel {channel_id} ({self.state.channels[channel_id].name}) status from '{old_status}' to '{new_status}'"
             )
@@ -590,7 +642,7 @@ class WorldStateManager:
         }
         
         self.state.generated_media_library.append(media_entry)
-        self.state.last_update = time.time()
+        self.state.touch_nodes()
         
         logger.info(
             f"WorldState: Added {media_type} to generated media library: {prompt[:50]}..."
@@ -621,14 +673,14 @@ class WorldStateManager:
         fid_str = str(fid)
         if fid_str not in self.state.farcaster_users:
             self.state.farcaster_users[fid_str] = FarcasterUserDetails(fid=fid_str)
-            self.state.last_update = time.time()
+            self.state.touch_nodes(f"users.farcaster.{fid_str}", families=("users",))
         return self.state.farcaster_users[fid_str]
     
     def get_or_create_matrix_user(self, user_id: str) -> MatrixUserDetails:
         """Get or create a MatrixUserDetails object for the given user ID."""
         if user_id not in self.state.matrix_users:
             self.state.matrix_users[user_id] = MatrixUserDetails(user_id=user_id)
-            self.state.last_update = time.time()
+            self.state.touch_nodes(f"users.matrix.{user_id}", families=("users",))
         return self.state.matrix_users[user_id]
     
     def update_user_sentiment(self, platform: str, user_identifier: str, sentiment_data: SentimentData):
@@ -646,7 +698,7 @@ class WorldStateManager:
                 logger.warning(f"Unknown platform for sentiment update: {platform}")
                 return
                 
-            self.state.last_update = time.time()
+            self.state.touch_nodes(f"users.{platform}.{user_identifier}.sentiment")
         except Exception as e:
             logger.error(f"Error updating user sentiment: {e}", exc_info=True)
     
@@ -667,7 +719,8 @@ class WorldStateManager:
                 memories.sort(key=lambda m: (m.importance, m.timestamp), reverse=True)
                 self.state.user_memory_bank[user_platform_id] = memories[:100]
             
-            self.state.last_update = time.time()
+            platform = user_platform_id.split(":")[0] if ":" in user_platform_id else "unknown"
+            self.state.touch_nodes("memory_bank", f"memory_bank.{platform}", families=("memory_bank",))
             logger.info(f"Added memory for user {user_platform_id}: {memory_entry.memory_type}")
             
         except Exception as e:
@@ -732,8 +785,18 @@ class WorldStateManager:
         for key in keys_to_remove:
             del self.state.tool_cache[key]
         
-        self.state.last_update = time.time()
+        changed_tools = {tool_name} | {key.split(":")[0] for key in keys_to_remove}
+        self.state.touch_nodes(
+            "tools.cache", *(f"tools.cache.{name}" for name in changed_tools), families=("tools",)
+        )
         logger.debug(f"Cached tool result: {cache_key}")
+
+    def cache_search_result(self, query_hash: str, search_data: Dict[str, Any]):
+        """Store search results under their query hash for the farcaster.search_cache nodes."""
+        self.state.search_cache[query_hash] = search_data
+        self.state.touch_nodes(
+            "farcaster.search_cache", f"farcaster.search_cache.{query_hash}", families=("search_cache",)
+        )
     
     def get_cached_tool_result(self, tool_name: str, params_key: str, max_age_seconds: int = 3600) -> Optional[Dict[str, Any]]:
         """Retrieve a cached tool result if it's still fresh."""
@@ -750,7 +813,7 @@ class WorldStateManager:
             user = self.get_or_create_farcaster_user(fid)
             user.timeline_cache = timeline_data
             user.last_timeline_fetch = time.time()
-            self.state.last_update = time.time()
+            self.state.touch_nodes(f"users.farcaster.{user.fid}.timeline_cache")
             logger.info(f"Updated timeline cache for Farcaster user {fid}")
         except Exception as e:
             logger.error(f"Error updating Farcaster user timeline cache: {e}", exc_info=True)
@@ -778,12 +841,22 @@ class WorldStateManager:
                         logger.debug(f"Bot reply found in action_history for event {original_event_id}: {action.result}")
                         return True
         
-        # Also check in messages for bot replies (as a secondary verification)
-        for channel in self.state.channels.values():
-            if channel.type == "matrix":
-                for msg in channel.recent_messages:
-                    if (msg.sender == settings.MATRIX_USER_ID and 
-                        msg.reply_to == original_event_id):
-                        logger.debug(f"Bot reply found in messages for event {original_event_id}: message_id {msg.id}")
-                        return True
+        # Also check the reply index for bot replies seen in messages (as a secondary verification)
+        if settings.MATRIX_USER_ID in self.state.matrix_repliers.get(original_event_id, ()):
+            logger.debug(f"Bot reply found in reply index for event {original_event_id}")
+            return True
         return False
+
+    def record_matrix_reply(
+        self, room_id: str, parent_event_id: str, reply_event_id: str, sender: str
+    ) -> None:
+        """Index a Matrix reply that is not stored as a message (e.g. the bot's own)."""
+        self.state.index_matrix_reply(room_id, parent_event_id, reply_event_id, sender)
+
+    def get_matrix_replies(self, room_id: str, event_id: str) -> List[str]:
+        """Event IDs of known replies to a Matrix event in a room."""
+        return list(self.state.matrix_reply_index.get(room_id, {}).get(event_id, []))
+
+    def get_matrix_thread(self, thread_root: str) -> List[Message]:
+        """Messages in a Matrix m.thread (or reply chain) rooted at ``thread_root``."""
+        return list(self.state.threads.get(thread_root, []))
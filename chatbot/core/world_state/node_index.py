@@ -0,0 +1,227 @@
+"""
+Node Index
+
+Persistent index of the node tree that PayloadBuilder exposes to the node
+system. Each entry maps a node path to the accessor that resolves its data and
+to a version stamp that world state mutators bump when the node changes.
+Resolved data is cached per version, so a node-based payload only re-resolves
+the nodes that changed since the previous cycle.
+
+Paths are grouped into families (the path's first segment, or its second for
+``farcaster.*``). A family's path list is rebuilt only after a mutation that
+can add or remove paths in it, or when its builder-supplied expiry passes.
+
+Every touch also feeds a per-node activity score that decays with a
+half-life of ``ACTIVITY_HALF_LIFE_SECONDS``, so busy and recently changed
+nodes rank first when background work has to pick a few of them.
+
+Mutators report what they touched through ``WorldStateData.touch_nodes``.
+Any other version bump (a bare ``last_update`` write, ``mark_changed()``
+without paths) is an unknown change and invalidates the whole index on the
+next sync, so code that mutates state directly stays correct, only slower.
+"""
+
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from .structures import WorldStateData
+
+logger = logging.getLogger(__name__)
+
+NodeAccessor = Callable[["WorldStateData"], Any]
+# A family builder returns its (path, accessor) pairs in payload order, plus
+# the time at which the list goes stale on its own (None if it never does)
+FamilyNodes = Tuple[List[Tuple[str, NodeAccessor]], Optional[float]]
+FamilyBuilder = Callable[["WorldStateData"], FamilyNodes]
+
+_UNRESOLVED = object()
+
+ACTIVITY_HALF_LIFE_SECONDS = 600.0
+
+# Shared by every index so a stamp is never reused, whether a path is dropped
+# and re-added or a NodeManager sees nodes from more than one world state
+_versions = itertools.count(1)
+
+
+def node_family(node_path: str) -> str:
+    """Family a node path belongs to, e.g. "channels" or "search_cache"."""
+    head, _, rest = node_path.partition(".")
+    if head == "farcaster":
+        return rest.partition(".")[0]
+    return head
+
+
+@dataclass
+class NodeEntry:
+    """One indexed node: its accessor, current version and cached data."""
+
+    path: str
+    family: str
+    accessor: NodeAccessor
+    version: int
+    volatile: bool = False
+    data: Any = _UNRESOLVED
+    data_version: int = -1
+    activity: float = 1.0
+    last_touched: float = field(default_factory=time.time)
+
+    def decayed_activity(self, now: float) -> float:
+        return self.activity * 0.5 ** ((now - self.last_touched) / ACTIVITY_HALF_LIFE_SECONDS)
+
+    def touch(self, now: float) -> None:
+        self.version = next(_versions)
+        self.activity = self.decayed_activity(now) + 1.0
+        self.last_touched = now
+
+
+class NodeIndex:
+    """Path -> (accessor, version) index kept current by world state mutators."""
+
+    def __init__(self):
+        self._entries: Dict[str, NodeEntry] = {}
+        self._families: Dict[str, List[str]] = {}
+        self._family_expiry: Dict[str, float] = {}
+        self._dirty_families: Set[str] = set()
+        self._paths: Optional[List[str]] = None
+        self._synced_version = -1
+        # Bumped whenever a node is added or removed
+        self.generation = 0
+        self.stats: Dict[str, int] = {
+            "full_invalidations": 0,
+            "family_rebuilds": 0,
+            "resolves": 0,
+            "cache_hits": 0,
+        }
+
+    def record(self, state_version: int, paths: Iterable[str], families: Iterable[str] = ()) -> None:
+        """Note the nodes touched by the mutation that produced ``state_version``."""
+        if state_version != self._synced_version + 1:
+            # An untracked change happened since the last sync; it will invalidate everything
+            return
+        self._synced_version = state_version
+        now = time.time()
+        for path in paths:
+            entry = self._entries.get(path)
+            if entry is None:
+                # A node the index does not list yet may need to appear
+                self._dirty_families.add(node_family(path))
+            else:
+                entry.touch(now)
+        self._dirty_families.update(families)
+
+    def invalidate(self) -> None:
+        """Drop all cached data and rebuild every family on the next sync."""
+        for entry in self._entries.values():
+            entry.version = next(_versions)
+        self._dirty_families.update(self._families)
+        self._family_expiry.clear()
+        self.stats["full_invalidations"] += 1
+
+    def sync(
+        self,
+        world_state_data: "WorldStateData",
+        builders: Dict[str, FamilyBuilder],
+        volatile_families: Iterable[str] = (),
+    ) -> List[str]:
+        """Bring the index up to date with the world state; returns all node paths."""
+        if world_state_data.version != self._synced_version:
+            if self._synced_version >= 0:
+                self.invalidate()
+            self._synced_version = world_state_data.version
+
+        volatile = set(volatile_families)
+        now = time.time()
+        for family, builder in builders.items():
+            expires_at = self._family_expiry.get(family)
+            if (
+                family in self._dirty_families
+                or family not in self._families
+                or (expires_at is not None and now >= expires_at)
+            ):
+                self._rebuild_family(world_state_data, family, builder, family in volatile)
+        self._dirty_families.clear()
+
+        if self._paths is None:
+            self._paths = [path for family in builders for path in self._families.get(family, [])]
+        return self._paths
+
+    def _rebuild_family(
+        self, world_state_data: "WorldStateData", family: str, builder: FamilyBuilder, volatile: bool
+    ) -> None:
+        nodes, expires_at = builder(world_state_data)
+        paths: List[str] = []
+        for path, accessor in nodes:
+            entry = self._entries.get(path)
+            if entry is None:
+                self._entries[path] = NodeEntry(path, family, accessor, next(_versions), volatile)
+            elif entry.family == family:
+                entry.accessor = accessor
+            else:
+                continue
+            paths.append(path)
+
+        kept = set(paths)
+        previous = self._families.get(family, [])
+        for path in previous:
+            if path not in kept:
+                del self._entries[path]
+        if kept != set(previous):
+            self.generation += 1
+
+        self._families[family] = paths
+        if expires_at is None:
+            self._family_expiry.pop(family, None)
+        else:
+            self._family_expiry[family] = expires_at
+        self._paths = None
+        self.stats["family_rebuilds"] += 1
+
+    def get_data(self, world_state_data: "WorldStateData", node_path: str) -> Any:
+        """Node data, re-resolved only when the node's version moved since the last call."""
+        entry = self._entries.get(node_path)
+        if entry is None:
+            return None
+        if not entry.volatile and entry.data_version == entry.version:
+            self.stats["cache_hits"] += 1
+            return entry.data
+
+        self.stats["resolves"] += 1
+        try:
+            data = entry.accessor(world_state_data)
+        except Exception as e:
+            logger.error(f"Error getting data for node path {node_path}: {e}")
+            return None
+        entry.data = data
+        entry.data_version = entry.version
+        return data
+
+    def get_accessor(self, node_path: str) -> Optional[NodeAccessor]:
+        entry = self._entries.get(node_path)
+        return entry.accessor if entry else None
+
+    def get_version(self, node_path: str) -> Optional[int]:
+        """Version stamp of an indexed node; None if it is unindexed or volatile."""
+        entry = self._entries.get(node_path)
+        if entry is None or entry.volatile:
+            return None
+        return entry.version
+
+    def get_activity(self, node_path: str, now: Optional[float] = None) -> float:
+        """Decayed count of recent changes to a node; 0.0 if it is not indexed."""
+        entry = self._entries.get(node_path)
+        if entry is None:
+            return 0.0
+        return entry.decayed_activity(now if now is not None else time.time())
+
+    def __contains__(self, node_path: str) -> bool:
+        return node_path in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {"nodes": len(self._entries), "families": len(self._families), **self.stats}
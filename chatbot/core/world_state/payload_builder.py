@@ -15,8 +15,10 @@ import json
 import logging
 import time
 from dataclasses import asdict
+from functools import partial
 from typing import Any, Dict, List, Optional, Set, TYPE_CHECKING
 
+from .node_index import FamilyBuilder, FamilyNodes
 from .structures import WorldStateData, Channel
 
 if TYPE_CHECKING:
@@ -24,6 +26,13 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# Threads with a message in this window get a node
+ACTIVE_THREAD_SECONDS = 7200
+
+# System nodes hand out live dicts that integrations update in place without
+# touching the index, so they are re-resolved every time instead of cached
+VOLATILE_NODE_FAMILIES = ("system",)
+
 
 class PayloadBuilder:
     """
@@ -233,6 +242,12 @@ class PayloadBuilder:
 
         return payload
 
+    def sync_node_index(self, world_state_data: WorldStateData) -> List[str]:
+        """Bring the world state's node index up to date; returns all node paths."""
+        return world_state_data.node_index.sync(
+            world_state_data, self._node_family_builders(), VOLATILE_NODE_FAMILIES
+        )
+
     def build_node_based_payload(
         self,
         world_state_data: WorldStateData,
@@ -273,8 +288,11 @@ class PayloadBuilder:
             }
         }
         
-        # Get all available node paths from world state
-        all_node_paths = self._get_node_paths_from_world_state(world_state_data)
+        # Node paths and data come from the persistent node index, which only
+        # rebuilds families and re-resolves nodes that changed since last cycle
+        node_index = world_state_data.node_index
+        all_node_paths = self.sync_node_index(world_state_data)
+        node_manager.evict_missing_nodes(all_node_paths, generation=node_index.generation)
         
         # Separate expanded and collapsed nodes
         expanded_nodes = {}
@@ -282,7 +300,7 @@ class PayloadBuilder:
         
         for node_path in all_node_paths:
             metadata = node_manager.get_node_metadata(node_path)
-            node_data = self._get_node_data_by_path(world_state_data, node_path)
+            node_data = node_index.get_data(world_state_data, node_path)
             
             if node_data is None:
                 continue
@@ -299,7 +317,9 @@ class PayloadBuilder:
                 summary = metadata.ai_summary or f"Node {node_path} (no summary available)"
                 
                 # Check if data has changed since last summary
-                data_changed = node_manager.is_data_changed(node_path, node_data)
+                data_changed = node_manager.is_data_changed(
+                    node_path, node_data, version=node_index.get_version(node_path)
+                )
                 
                 collapsed_node_summaries[node_path] = {
                     "summary": summary,
@@ -367,147 +387,195 @@ class PayloadBuilder:
             # Return conservative estimate if calculation fails
             return 50000  # 50KB fallback
 
+    def _node_family_builders(self) -> Dict[str, FamilyBuilder]:
+        """Node families in payload order, each mapped to the builder of its (path, accessor) list."""
+        return {
+            "channels": self._channel_nodes,
+            "feeds": self._feed_nodes,
+            "users": self._user_nodes,
+            "tools": self._tool_cache_nodes,
+            "search_cache": self._search_cache_nodes,
+            "memory_bank": self._memory_bank_nodes,
+            "threads": self._thread_nodes,
+            "system": self._system_nodes,
+        }
+
     def _get_node_paths_from_world_state(self, world_state_data: WorldStateData) -> List[str]:
         """
         Extract all available node paths from the world state data.
         
+        This walks the whole state; build_node_based_payload uses the
+        world state's persistent node index instead.
+        
         Args:
             world_state_data: The world state to extract paths from
             
         Returns:
             List of node paths that can be expanded/collapsed
         """
-        paths = []
-        
-        # Channel nodes
-        for channel_id, channel in world_state_data.channels.items():
-            paths.append(f"channels.{channel.type}.{channel_id}")
-        
-        # Farcaster feed nodes (always available if Farcaster is active)
-        has_farcaster = any(ch.type == "farcaster" for ch in world_state_data.channels.values())
-        if has_farcaster:
-            paths.extend([
-                "farcaster.feeds.home",
-                "farcaster.feeds.notifications",
-                "farcaster.feeds.trending"
-            ])
-        
-        # Enhanced user nodes with cached data
-        user_fids = set()
-        user_usernames = set()
-        
+        return [
+            path
+            for builder in self._node_family_builders().values()
+            for path, _ in builder(world_state_data)[0]
+        ]
+
+    # === Node families ===
+
+    def _channel_nodes(self, world_state_data: WorldStateData) -> FamilyNodes:
+        nodes = [
+            (
+                f"channels.{channel.type}.{channel_id}",
+                partial(self._channel_node_data, channel_type=channel.type, channel_id=channel_id),
+            )
+            for channel_id, channel in world_state_data.channels.items()
+        ]
+        return nodes, None
+
+    def _feed_nodes(self, world_state_data: WorldStateData) -> FamilyNodes:
+        # Farcaster feed nodes are always available if Farcaster is active
+        if not any(ch.type == "farcaster" for ch in world_state_data.channels.values()):
+            return [], None
+        nodes = [
+            (f"farcaster.feeds.{feed_type}", partial(self._feed_node_data, feed_type=feed_type))
+            for feed_type in ("home", "notifications", "trending")
+        ]
+        return nodes, None
+
+    def _user_nodes(self, world_state_data: WorldStateData) -> FamilyNodes:
+        # Recent senders plus users from enhanced user tracking, in first-seen order
+        user_fids: Dict[str, None] = {}
+        user_usernames: Dict[str, None] = {}
         for channel in world_state_data.channels.values():
-            for msg in channel.recent_messages[-10:]:  # Recent users
+            for msg in channel.recent_messages[-10:]:
                 if msg.sender_fid:
-                    user_fids.add(msg.sender_fid)
+                    user_fids[str(msg.sender_fid)] = None
                 if msg.sender_username:
-                    user_usernames.add(msg.sender_username)
-        
-        # Add users from enhanced user tracking
-        for fid in world_state_data.farcaster_users.keys():
-            user_fids.add(fid)
-        
-        for user_id in world_state_data.matrix_users.keys():
-            user_usernames.add(user_id)
-        
-        # Create user node paths with enhanced data
+                    user_usernames[msg.sender_username] = None
+        user_fids.update(dict.fromkeys(world_state_data.farcaster_users))
+        user_usernames.update(dict.fromkeys(world_state_data.matrix_users))
+
+        nodes = []
         for fid in user_fids:
             base_path = f"users.farcaster.{fid}"
-            paths.append(base_path)
-            
+            nodes.append((base_path, partial(self._farcaster_user_node_data, user_id=fid)))
             # Add sub-nodes for cached data
-            if fid in world_state_data.farcaster_users:
-                user = world_state_data.farcaster_users[fid]
-                if user.timeline_cache:
-                    paths.append(f"{base_path}.timeline_cache")
-                if user.sentiment:
-                    paths.append(f"{base_path}.sentiment")
-                if user.memory_entries:
-                    paths.append(f"{base_path}.memories")
-        
+            user = world_state_data.farcaster_users.get(fid)
+            if user:
+                for sub_node, present in (
+                    ("timeline_cache", user.timeline_cache),
+                    ("sentiment", user.sentiment),
+                    ("memories", user.memory_entries),
+                ):
+                    if present:
+                        nodes.append((
+                            f"{base_path}.{sub_node}",
+                            partial(self._farcaster_user_node_data, user_id=fid, sub_node=sub_node),
+                        ))
+
         for username in user_usernames:
             base_path = f"users.matrix.{username}"
-            paths.append(base_path)
-            
-            # Add sub-nodes for enhanced Matrix user data
-            if username in world_state_data.matrix_users:
-                user = world_state_data.matrix_users[username]
-                if user.sentiment:
-                    paths.append(f"{base_path}.sentiment")
-                if user.memory_entries:
-                    paths.append(f"{base_path}.memories")
-        
-        # Optimized tool cache nodes - only include if substantial data exists
-        if world_state_data.tool_cache and len(world_state_data.tool_cache) > 1:
-            paths.append("tools.cache")
-            # Only add specific tool nodes for frequently used tools
-            tool_counts = {}
-            for cache_key in world_state_data.tool_cache.keys():
-                tool_name = cache_key.split(":")[0] if ":" in cache_key else cache_key
-                tool_counts[tool_name] = tool_counts.get(tool_name, 0) + 1
-            
-            # Only include tools with multiple cached results
-            for tool_name, count in tool_counts.items():
-                if count > 1:  # Only include if multiple cached results
-                    paths.append(f"tools.cache.{tool_name}")
-        
-        # Optimized search cache nodes - limit to recent searches
-        if world_state_data.search_cache and len(world_state_data.search_cache) > 0:
-            paths.append("farcaster.search_cache")
-            # Only include recent search hashes (limit to 3 most recent)
-            recent_searches = sorted(
-                world_state_data.search_cache.items(),
-                key=lambda x: x[1].get("timestamp", 0),
-                reverse=True
-            )[:3]
-            for query_hash, _ in recent_searches:
-                paths.append(f"farcaster.search_cache.{query_hash}")
-        
-        # Optimized memory bank nodes - only include platforms with significant memories
-        if world_state_data.user_memory_bank:
-            platform_memory_counts = {}
-            for user_platform_id, memories in world_state_data.user_memory_bank.items():
-                platform = user_platform_id.split(":")[0] if ":" in user_platform_id else "unknown"
-                platform_memory_counts[platform] = platform_memory_counts.get(platform, 0) + len(memories)
-            
-            # Only include memory bank if there are substantial memories
-            if sum(platform_memory_counts.values()) > 5:
-                paths.append("memory_bank")
-                for platform, count in platform_memory_counts.items():
-                    if count > 2:  # Only include platforms with multiple memories
-                        paths.append(f"memory_bank.{platform}")
-        
-        # Optimized thread nodes - limit to active threads only
-        if world_state_data.threads:
-            active_threads = []
-            current_time = time.time()
-            for thread_id, msgs in world_state_data.threads.items():
-                if msgs and msgs[-1].timestamp > (current_time - 7200):  # Active in last 2 hours
-                    active_threads.append(thread_id)
-            
-            # Only include recent active threads (limit to 3)
-            for thread_id in active_threads[:3]:
-                paths.append(f"threads.farcaster.{thread_id}")
-        
-        # Essential system nodes only
-        paths.extend([
-            "system.rate_limits", 
-            "system.status"
-        ])
-        
+            nodes.append((base_path, partial(self._matrix_user_node_data, user_id=username)))
+            user = world_state_data.matrix_users.get(username)
+            if user:
+                for sub_node, present in (("sentiment", user.sentiment), ("memories", user.memory_entries)):
+                    if present:
+                        nodes.append((
+                            f"{base_path}.{sub_node}",
+                            partial(self._matrix_user_node_data, user_id=username, sub_node=sub_node),
+                        ))
+        return nodes, None
+
+    def _tool_cache_nodes(self, world_state_data: WorldStateData) -> FamilyNodes:
+        # Only include if substantial data exists
+        if len(world_state_data.tool_cache) <= 1:
+            return [], None
+        nodes = [("tools.cache", self._tool_cache_node_data)]
+        tool_counts: Dict[str, int] = {}
+        for cache_key in world_state_data.tool_cache.keys():
+            tool_name = cache_key.split(":")[0] if ":" in cache_key else cache_key
+            tool_counts[tool_name] = tool_counts.get(tool_name, 0) + 1
+        # Only add specific tool nodes for tools with multiple cached results
+        nodes.extend(
+            (f"tools.cache.{tool_name}", partial(self._tool_node_data, tool_name=tool_name))
+            for tool_name, count in tool_counts.items()
+            if count > 1
+        )
+        return nodes, None
+
+    def _search_cache_nodes(self, world_state_data: WorldStateData) -> FamilyNodes:
+        if not world_state_data.search_cache:
+            return [], None
+        nodes = [("farcaster.search_cache", self._search_cache_node_data)]
+        # Only include the 3 most recent search hashes
+        recent_searches = sorted(
+            world_state_data.search_cache.items(),
+            key=lambda x: x[1].get("timestamp", 0),
+            reverse=True
+        )[:3]
+        nodes.extend(
+            (f"farcaster.search_cache.{query_hash}", partial(self._search_node_data, query_hash=query_hash))
+            for query_hash, _ in recent_searches
+        )
+        return nodes, None
+
+    def _memory_bank_nodes(self, world_state_data: WorldStateData) -> FamilyNodes:
+        platform_memory_counts: Dict[str, int] = {}
+        for user_platform_id, memories in world_state_data.user_memory_bank.items():
+            platform = user_platform_id.split(":")[0] if ":" in user_platform_id else "unknown"
+            platform_memory_counts[platform] = platform_memory_counts.get(platform, 0) + len(memories)
+
+        # Only include memory bank if there are substantial memories
+        if sum(platform_memory_counts.values()) <= 5:
+            return [], None
+        nodes = [("memory_bank", self._memory_bank_node_data)]
+        nodes.extend(
+            (f"memory_bank.{platform}", partial(self._memory_platform_node_data, platform=platform))
+            for platform, count in platform_memory_counts.items()
+            if count > 2  # Only include platforms with multiple memories
+        )
+        return nodes, None
+
+    def _thread_nodes(self, world_state_data: WorldStateData) -> FamilyNodes:
+        # Only include the first 3 threads active in the last 2 hours
+        cutoff = time.time() - ACTIVE_THREAD_SECONDS
+        active_threads = [
+            (thread_id, msgs[-1])
+            for thread_id, msgs in world_state_data.threads.items()
+            if msgs and msgs[-1].timestamp > cutoff
+        ][:3]
+        nodes = [
+            (
+                f"threads.{last_msg.channel_type}.{thread_id}",
+                partial(self._thread_node_data, thread_type=last_msg.channel_type, thread_id=thread_id),
+            )
+            for thread_id, last_msg in active_threads
+        ]
+        # The list changes without any mutation once a listed thread goes quiet
+        expires_at = min(
+            (last_msg.timestamp + ACTIVE_THREAD_SECONDS for _, last_msg in active_threads), default=None
+        )
+        return nodes, expires_at
+
+    def _system_nodes(self, world_state_data: WorldStateData) -> FamilyNodes:
+        components = ["rate_limits", "status"]
         # Only include notifications if there are pending invites
         if world_state_data.pending_matrix_invites:
-            paths.append("system.notifications")
-        
-        # Only include action history node for node system
-        paths.append("system.action_history")
-        
-        return paths
+            components.append("notifications")
+        components.append("action_history")
+        nodes = [
+            (f"system.{component}", partial(self._system_node_data, component=component))
+            for component in components
+        ]
+        return nodes, None
+
+    # === Node data accessors ===
 
     def _get_node_data_by_path(self, world_state_data: WorldStateData, node_path: str) -> Any:
         """
         Get the actual data for a specific node path.
         
+        Indexed paths resolve through their accessor; other paths are parsed.
+        
         Args:
             world_state_data: The world state to extract data from
             node_path: The path to the node (e.g., "channels.matrix.!room_id")
@@ -516,276 +584,51 @@ class PayloadBuilder:
             The data for that node, or None if not found
         """
         try:
+            accessor = world_state_data.node_index.get_accessor(node_path)
+            if accessor is not None:
+                return accessor(world_state_data)
+
             path_parts = node_path.split(".")
             
+            if path_parts[0] == "memory_bank":
+                if len(path_parts) == 1:
+                    return self._memory_bank_node_data(world_state_data)
+                return self._memory_platform_node_data(world_state_data, path_parts[1])
+
             if len(path_parts) < 2:
                 return None
             
             if path_parts[0] == "channels" and len(path_parts) >= 3:
-                channel_type, channel_id = path_parts[1], path_parts[2]
-                channel = world_state_data.channels.get(channel_id)
-                if channel and channel.type == channel_type:
-                    return {
-                        "id": channel.id,
-                        "name": channel.name[:30] + "..." if len(channel.name) > 30 else channel.name,
-                        "type": channel.type,
-                        "status": channel.status,
-                        "recent_messages": [
-                            {
-                                "id": msg.id,
-                                "content": msg.content[:100] + "..." if len(msg.content) > 100 else msg.content,
-                                "sender": msg.sender_username or msg.sender,
-                                "timestamp": msg.timestamp,
-                                "has_images": bool(getattr(msg, 'image_urls', []))
-                            }
-                            for msg in channel.recent_messages[-5:]  # Reduced from 10 to 5
-                        ],
-                        "msg_count": len(channel.recent_messages),
-                        "last_activity": channel.recent_messages[-1].timestamp if channel.recent_messages else channel.last_checked
-                    }
+                return self._channel_node_data(world_state_data, path_parts[1], path_parts[2])
             
             elif path_parts[0] == "users" and len(path_parts) >= 3:
                 user_type, user_id = path_parts[1], path_parts[2]
-                
-                # Handle enhanced user data with sub-nodes
+                sub_node = path_parts[3] if len(path_parts) == 4 else None
                 if user_type == "farcaster":
-                    farcaster_user = world_state_data.farcaster_users.get(user_id)
-                    if farcaster_user:
-                        # Check for sub-node requests
-                        if len(path_parts) == 4:
-                            sub_node = path_parts[3]
-                            if sub_node == "timeline_cache" and farcaster_user.timeline_cache:
-                                return farcaster_user.timeline_cache
-                            elif sub_node == "sentiment" and farcaster_user.sentiment:
-                                return asdict(farcaster_user.sentiment)
-                            elif sub_node == "memories" and farcaster_user.memory_entries:
-                                return [asdict(memory) for memory in farcaster_user.memory_entries[-5:]]
-                        
-                        # Return compact user data
-                        user_data = {
-                            "fid": farcaster_user.fid,
-                            "username": farcaster_user.username,
-                            "display_name": farcaster_user.display_name,
-                            "follower_count": farcaster_user.follower_count,
-                            "power_badge": farcaster_user.power_badge
-                        }
-                        # Truncate bio for display
-                        if farcaster_user.bio and len(farcaster_user.bio) > 50:
-                            user_data["bio"] = farcaster_user.bio[:50] + "..."
-                        elif farcaster_user.bio:
-                            user_data["bio"] = farcaster_user.bio
-                        return user_data
-                    else:
-                        # Fallback - compact extraction from messages
-                        user_info = {"type": user_type, "id": user_id}
-                        for channel in world_state_data.channels.values():
-                            for msg in channel.recent_messages[-3:]:  # Reduced from 5 to 3
-                                if str(msg.sender_fid) == user_id:
-                                    bio = msg.sender_bio
-                                    if bio and len(bio) > 50:
-                                        bio = bio[:50] + "..."
-                                    user_info.update({
-                                        "username": msg.sender_username,
-                                        "display_name": msg.sender_display_name,
-                                        "fid": msg.sender_fid,
-                                        "follower_count": msg.sender_follower_count,
-                                        "bio": bio if bio else None
-                                    })
-                                    break
-                        return user_info
-                
+                    return self._farcaster_user_node_data(world_state_data, user_id, sub_node)
                 elif user_type == "matrix":
-                    matrix_user = world_state_data.matrix_users.get(user_id)
-                    if matrix_user:
-                        # Check for sub-node requests
-                        if len(path_parts) == 4:
-                            sub_node = path_parts[3]
-                            if sub_node == "sentiment" and matrix_user.sentiment:
-                                return asdict(matrix_user.sentiment)
-                            elif sub_node == "memories" and matrix_user.memory_entries:
-                                return [asdict(memory) for memory in matrix_user.memory_entries[-3:]]  # Reduced from 5 to 3
-                        
-                        # Return compact user info
-                        return {
-                            "user_id": matrix_user.user_id,
-                            "display_name": matrix_user.display_name,
-                            "avatar_url": matrix_user.avatar_url
-                        }
-                    else:
-                        # Fallback - compact extraction from messages
-                        user_info = {"type": user_type, "id": user_id}
-                        for channel in world_state_data.channels.values():
-                            for msg in channel.recent_messages[-3:]:  # Reduced from 5 to 3
-                                if msg.sender_username == user_id:
-                                    user_info.update({
-                                        "username": msg.sender_username,
-                                        "display_name": msg.sender_display_name
-                                    })
-                                    break
-                        return user_info
-            
-            elif path_parts[0] == "tools" and len(path_parts) >= 2:
-                if path_parts[1] == "cache":
-                    if len(path_parts) == 2:
-                        # Return compact overview of cached tools
-                        tool_summary = {}
-                        for cache_key, cache_data in list(world_state_data.tool_cache.items())[:10]:  # Limit to 10 entries
-                            tool_name = cache_key.split(":")[0] if ":" in cache_key else cache_key
-                            if tool_name not in tool_summary:
-                                tool_summary[tool_name] = {
-                                    "count": 0,
-                                    "most_recent": 0
-                                }
-                            tool_summary[tool_name]["count"] += 1
-                            tool_summary[tool_name]["most_recent"] = max(
-                                tool_summary[tool_name]["most_recent"],
-                                cache_data.get("timestamp", 0)
-                            )
-                        return {
-                            "cached_tools": tool_summary,
-                            "total_entries": len(world_state_data.tool_cache)
-                        }
-                    elif len(path_parts) == 3:
-                        # Return compact cached results for specific tool
-                        tool_name = path_parts[2]
-                        tool_results = {}
-                        count = 0
-                        for cache_key, cache_data in world_state_data.tool_cache.items():
-                            if cache_key.startswith(f"{tool_name}:") and count < 3:  # Limit to 3 results
-                                # Return only essential cache data
-                                tool_results[cache_key] = {
-                                    "timestamp": cache_data.get("timestamp"),
-                                    "result_type": cache_data.get("result_type"),
-                                    "size": len(str(cache_data)) if cache_data else 0
-                                }
-                                count += 1
-                        return {
-                            "tool_name": tool_name,
-                            "cached_results": tool_results,
-                            "total_cached": count
-                        }
+                    return self._matrix_user_node_data(world_state_data, user_id, sub_node)
             
-            elif path_parts[0] == "memory_bank":
-                if len(path_parts) == 1:
-                    # Return overview of memory bank
-                    memory_stats = {}
-                    for user_platform_id, memories in world_state_data.user_memory_bank.items():
-                        platform = user_platform_id.split(":")[0] if ":" in user_platform_id else "unknown"
-                        if platform not in memory_stats:
-                            memory_stats[platform] = {"users": 0, "total_memories": 0}
-                        memory_stats[platform]["users"] += 1
-                        memory_stats[platform]["total_memories"] += len(memories)
-                    return {
-                        "platform_breakdown": memory_stats,
-                        "total_users_with_memories": len(world_state_data.user_memory_bank)
-                    }
-                elif len(path_parts) == 2:
-                    # Return memories for specific platform
-                    platform = path_parts[1]
-                    platform_memories = {}
-                    for user_platform_id, memories in world_state_data.user_memory_bank.items():
-                        if user_platform_id.startswith(f"{platform}:"):
-                            platform_memories[user_platform_id] = [
-                                {
-                                    "memory_id": mem.memory_id,
-                                    "content": mem.content[:100] + "..." if len(mem.content) > 100 else mem.content,
-                                    "memory_type": mem.memory_type,
-                                    "importance": mem.importance,
-                                    "timestamp": mem.timestamp
-                                }
-                                for mem in memories[-3:]  # Recent memories
-                            ]
-                    return {
-                        "platform": platform,
-                        "user_memories": platform_memories
-                    }
+            elif path_parts[0] == "tools" and path_parts[1] == "cache":
+                if len(path_parts) == 2:
+                    return self._tool_cache_node_data(world_state_data)
+                elif len(path_parts) == 3:
+                    return self._tool_node_data(world_state_data, path_parts[2])
             
-            elif path_parts[0] == "farcaster" and len(path_parts) >= 2:
+            elif path_parts[0] == "farcaster":
                 if path_parts[1] == "search_cache":
                     if len(path_parts) == 2:
-                        # Return overview of search cache
-                        search_overview = {}
-                        for query_hash, search_data in world_state_data.search_cache.items():
-                            search_overview[query_hash] = {
-                                "query": search_data.get("query", "Unknown"),
-                                "channel_id": search_data.get("channel_id"),
-                                "result_count": search_data.get("result_count", 0),
-                                "timestamp": search_data.get("timestamp", 0)
-                            }
-                        return {
-                            "cached_searches": search_overview,
-                            "total_searches": len(world_state_data.search_cache)
-                        }
+                        return self._search_cache_node_data(world_state_data)
                     elif len(path_parts) == 3:
-                        # Return specific search results
-                        query_hash = path_parts[2]
-                        search_data = world_state_data.search_cache.get(query_hash)
-                        if search_data:
-                            return search_data
-                        return {"error": f"Search cache not found for hash: {query_hash}"}
-                
-                # Handle farcaster.feeds.* nodes
+                        return self._search_node_data(world_state_data, path_parts[2])
                 elif len(path_parts) >= 3 and path_parts[1] == "feeds":
-                    feed_type = path_parts[2]
-                    
-                    if feed_type == "home":
-                        # Aggregate recent activity from all Farcaster channels
-                        home_messages = []
-                        for channel in world_state_data.channels.values():
-                            if channel.type == "farcaster" and "home" in channel.id:
-                                home_messages.extend(channel.recent_messages[-5:])
-                        
-                        # Sort by timestamp and take most recent
-                        home_messages.sort(key=lambda x: x.timestamp, reverse=True)
-                        return {
-                            "feed_type": "home",
-                            "recent_activity": [msg.to_ai_summary_dict() for msg in home_messages[:10]],
-                            "activity_summary": f"{len(home_messages)} recent home feed messages"
-                        }
-                    
-                    elif feed_type == "notifications":
-                        # Find notification/mention related messages
-                        notification_messages = []
-                        for channel in world_state_data.channels.values():
-                            if channel.type == "farcaster" and ("notification" in channel.id or "mention" in channel.id):
-                                notification_messages.extend(channel.recent_messages[-5:])
-                        
-                        notification_messages.sort(key=lambda x: x.timestamp, reverse=True)
-                        return {
-                            "feed_type": "notifications",
-                            "recent_mentions": [msg.to_ai_summary_dict() for msg in notification_messages[:10]],
-                            "notification_summary": f"{len(notification_messages)} recent notifications/mentions"
-                        }
-                    
-                    elif feed_type == "trending":
-                        # Placeholder for trending feed data
-                        return {
-                            "feed_type": "trending",
-                            "status": "Available for expansion via get_trending_casts tool",
-                            "note": "Use get_trending_casts to fetch current trending content"
-                        }
+                    return self._feed_node_data(world_state_data, path_parts[2])
             
             elif path_parts[0] == "threads" and len(path_parts) >= 3:
-                thread_type, thread_id = path_parts[1], path_parts[2]
-                thread_messages = world_state_data.threads.get(thread_id, [])
-                return {
-                    "thread_id": thread_id,
-                    "type": thread_type,
-                    "messages": [asdict(msg) for msg in thread_messages[-5:]]  # Recent thread messages
-                }
+                return self._thread_node_data(world_state_data, path_parts[1], path_parts[2])
             
             elif path_parts[0] == "system":
-                if len(path_parts) >= 2:
-                    system_component = path_parts[1]
-                    
-                    if system_component == "notifications":
-                        return {"pending_matrix_invites": world_state_data.pending_matrix_invites}
-                    elif system_component == "rate_limits":
-                        return world_state_data.rate_limits
-                    elif system_component == "status":
-                        return world_state_data.system_status
-                    elif system_component == "action_history":
-                        return [asdict(action) for action in world_state_data.action_history[-10:]]
+                return self._system_node_data(world_state_data, path_parts[1])
             
             return None
             
@@ -793,6 +636,255 @@ class PayloadBuilder:
             logger.error(f"Error getting data for node path {node_path}: {e}")
             return None
 
+    def _channel_node_data(self, world_state_data: WorldStateData, channel_type: str, channel_id: str) -> Any:
+        channel = world_state_data.channels.get(channel_id)
+        if not channel or channel.type != channel_type:
+            return None
+        return {
+            "id": channel.id,
+            "name": channel.name[:30] + "..." if len(channel.name) > 30 else channel.name,
+            "type": channel.type,
+            "status": channel.status,
+            "recent_messages": [
+                {
+                    "id": msg.id,
+                    "content": msg.content[:100] + "..." if len(msg.content) > 100 else msg.content,
+                    "sender": msg.sender_username or msg.sender,
+                    "timestamp": msg.timestamp,
+                    "has_images": bool(getattr(msg, 'image_urls', []))
+                }
+                for msg in channel.recent_messages[-5:]  # Reduced from 10 to 5
+            ],
+            "msg_count": len(channel.recent_messages),
+            "last_activity": channel.recent_messages[-1].timestamp if channel.recent_messages else channel.last_checked
+        }
+
+    def _farcaster_user_node_data(
+        self, world_state_data: WorldStateData, user_id: str, sub_node: Optional[str] = None
+    ) -> Any:
+        farcaster_user = world_state_data.farcaster_users.get(user_id)
+        if farcaster_user:
+            if sub_node == "timeline_cache" and farcaster_user.timeline_cache:
+                return farcaster_user.timeline_cache
+            elif sub_node == "sentiment" and farcaster_user.sentiment:
+                return asdict(farcaster_user.sentiment)
+            elif sub_node == "memories" and farcaster_user.memory_entries:
+                return [asdict(memory) for memory in farcaster_user.memory_entries[-5:]]
+            
+            # Return compact user data
+            user_data = {
+                "fid": farcaster_user.fid,
+                "username": farcaster_user.username,
+                "display_name": farcaster_user.display_name,
+                "follower_count": farcaster_user.follower_count,
+                "power_badge": farcaster_user.power_badge
+            }
+            # Truncate bio for display
+            if farcaster_user.bio and len(farcaster_user.bio) > 50:
+                user_data["bio"] = farcaster_user.bio[:50] + "..."
+            elif farcaster_user.bio:
+                user_data["bio"] = farcaster_user.bio
+            return user_data
+
+        # Fallback - compact extraction from messages
+        user_info = {"type": "farcaster", "id": user_id}
+        for channel in world_state_data.channels.values():
+            for msg in channel.recent_messages[-3:]:  # Reduced from 5 to 3
+                if str(msg.sender_fid) == user_id:
+                    bio = msg.sender_bio
+                    if bio and len(bio) > 50:
+                        bio = bio[:50] + "..."
+                    user_info.update({
+                        "username": msg.sender_username,
+                        "display_name": msg.sender_display_name,
+                        "fid": msg.sender_fid,
+                        "follower_count": msg.sender_follower_count,
+                        "bio": bio if bio else None
+                    })
+                    break
+        return user_info
+
+    def _matrix_user_node_data(
+        self, world_state_data: WorldStateData, user_id: str, sub_node: Optional[str] = None
+    ) -> Any:
+        matrix_user = world_state_data.matrix_users.get(user_id)
+        if matrix_user:
+            if sub_node == "sentiment" and matrix_user.sentiment:
+                return asdict(matrix_user.sentiment)
+            elif sub_node == "memories" and matrix_user.memory_entries:
+                return [asdict(memory) for memory in matrix_user.memory_entries[-3:]]  # Reduced from 5 to 3
+            
+            # Return compact user info
+            return {
+                "user_id": matrix_user.user_id,
+                "display_name": matrix_user.display_name,
+                "avatar_url": matrix_user.avatar_url
+            }
+
+        # Fallback - compact extraction from messages
+        user_info = {"type": "matrix", "id": user_id}
+        for channel in world_state_data.channels.values():
+            for msg in channel.recent_messages[-3:]:  # Reduced from 5 to 3
+                if msg.sender_username == user_id:
+                    user_info.update({
+                        "username": msg.sender_username,
+                        "display_name": msg.sender_display_name
+                    })
+                    break
+        return user_info
+
+    def _tool_cache_node_data(self, world_state_data: WorldStateData) -> Any:
+        # Return compact overview of cached tools
+        tool_summary = {}
+        for cache_key, cache_data in list(world_state_data.tool_cache.items())[:10]:  # Limit to 10 entries
+            tool_name = cache_key.split(":")[0] if ":" in cache_key else cache_key
+            if tool_name not in tool_summary:
+                tool_summary[tool_name] = {
+                    "count": 0,
+                    "most_recent": 0
+                }
+            tool_summary[tool_name]["count"] += 1
+            tool_summary[tool_name]["most_recent"] = max(
+                tool_summary[tool_name]["most_recent"],
+                cache_data.get("timestamp", 0)
+            )
+        return {
+            "cached_tools": tool_summary,
+            "total_entries": len(world_state_data.tool_cache)
+        }
+
+    def _tool_node_data(self, world_state_data: WorldStateData, tool_name: str) -> Any:
+        # Return compact cached results for specific tool
+        tool_results = {}
+        count = 0
+        for cache_key, cache_data in world_state_data.tool_cache.items():
+            if cache_key.startswith(f"{tool_name}:") and count < 3:  # Limit to 3 results
+                # Return only essential cache data
+                tool_results[cache_key] = {
+                    "timestamp": cache_data.get("timestamp"),
+                    "result_type": cache_data.get("result_type"),
+                    "size": len(str(cache_data)) if cache_data else 0
+                }
+                count += 1
+        return {
+            "tool_name": tool_name,
+            "cached_results": tool_results,
+            "total_cached": count
+        }
+
+    def _memory_bank_node_data(self, world_state_data: WorldStateData) -> Any:
+        # Return overview of memory bank
+        memory_stats = {}
+        for user_platform_id, memories in world_state_data.user_memory_bank.items():
+            platform = user_platform_id.split(":")[0] if ":" in user_platform_id else "unknown"
+            if platform not in memory_stats:
+                memory_stats[platform] = {"users": 0, "total_memories": 0}
+            memory_stats[platform]["users"] += 1
+            memory_stats[platform]["total_memories"] += len(memories)
+        return {
+            "platform_breakdown": memory_stats,
+            "total_users_with_memories": len(world_state_data.user_memory_bank)
+        }
+
+    def _memory_platform_node_data(self, world_state_data: WorldStateData, platform: str) -> Any:
+        # Return memories for specific platform
+        platform_memories = {}
+        for user_platform_id, memories in world_state_data.user_memory_bank.items():
+            if user_platform_id.startswith(f"{platform}:"):
+                platform_memories[user_platform_id] = [
+                    {
+                        "memory_id": mem.memory_id,
+                        "content": mem.content[:100] + "..." if len(mem.content) > 100 else mem.content,
+                        "memory_type": mem.memory_type,
+                        "importance": mem.importance,
+                        "timestamp": mem.timestamp
+                    }
+                    for mem in memories[-3:]  # Recent memories
+                ]
+        return {
+            "platform": platform,
+            "user_memories": platform_memories
+        }
+
+    def _search_cache_node_data(self, world_state_data: WorldStateData) -> Any:
+        # Return overview of search cache
+        search_overview = {}
+        for query_hash, search_data in world_state_data.search_cache.items():
+            search_overview[query_hash] = {
+                "query": search_data.get("query", "Unknown"),
+                "channel_id": search_data.get("channel_id"),
+                "result_count": search_data.get("result_count", 0),
+                "timestamp": search_data.get("timestamp", 0)
+            }
+        return {
+            "cached_searches": search_overview,
+            "total_searches": len(world_state_data.search_cache)
+        }
+
+    def _search_node_data(self, world_state_data: WorldStateData, query_hash: str) -> Any:
+        search_data = world_state_data.search_cache.get(query_hash)
+        if search_data:
+            return search_data
+        return {"error": f"Search cache not found for hash: {query_hash}"}
+
+    def _feed_node_data(self, world_state_data: WorldStateData, feed_type: str) -> Any:
+        if feed_type == "home":
+            # Aggregate recent activity from all Farcaster channels
+            home_messages = []
+            for channel in world_state_data.channels.values():
+                if channel.type == "farcaster" and "home" in channel.id:
+                    home_messages.extend(channel.recent_messages[-5:])
+            
+            # Sort by timestamp and take most recent
+            home_messages.sort(key=lambda x: x.timestamp, reverse=True)
+            return {
+                "feed_type": "home",
+                "recent_activity": [msg.to_ai_summary_dict() for msg in home_messages[:10]],
+                "activity_summary": f"{len(home_messages)} recent home feed messages"
+            }
+        
+        elif feed_type == "notifications":
+            # Find notification/mention related messages
+            notification_messages = []
+            for channel in world_state_data.channels.values():
+                if channel.type == "farcaster" and ("notification" in channel.id or "mention" in channel.id):
+                    notification_messages.extend(channel.recent_messages[-5:])
+            
+            notification_messages.sort(key=lambda x: x.timestamp, reverse=True)
+            return {
+                "feed_type": "notifications",
+                "recent_mentions": [msg.to_ai_summary_dict() for msg in notification_messages[:10]],
+                "notification_summary": f"{len(notification_messages)} recent notifications/mentions"
+            }
+        
+        elif feed_type == "trending":
+            # Placeholder for trending feed data
+            return {
+                "feed_type": "trending",
+                "status": "Available for expansion via get_trending_casts tool",
+                "note": "Use get_trending_casts to fetch current trending content"
+            }
+        return None
+
+    def _thread_node_data(self, world_state_data: WorldStateData, thread_type: str, thread_id: str) -> Any:
+        thread_messages = world_state_data.threads.get(thread_id, [])
+        return {
+            "thread_id": thread_id,
+            "type": thread_type,
+            "messages": [asdict(msg) for msg in thread_messages[-5:]]  # Recent thread messages
+        }
+
+    def _system_node_data(self, world_state_data: WorldStateData, component: str) -> Any:
+        if component == "notifications":
+            return {"pending_matrix_invites": world_state_data.pending_matrix_invites}
+        elif component == "rate_limits":
+            return world_state_data.rate_limits
+        elif component == "status":
+            return world_state_data.system_status
+        elif component == "action_history":
+            return [asdict(action) for action in world_state_data.action_history[-10:]]
+        return None
+
     def _build_user_profiling_payload(self, world_state_data: WorldStateData, optimize_for_size: bool) -> Dict[str, Any]:
         """
         Build user profiling data for inclusion in AI payloads.
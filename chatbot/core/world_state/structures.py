@@ -16,10 +16,12 @@ This module defines the core data structures for the world state management syst
 import time
 import uuid
 from dataclasses import asdict, dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
 import logging
 
+from .node_index import NodeIndex
+
 logger = logging.getLogger(__name__)
 
 
@@ -781,6 +783,10 @@ class WorldStateData:
             str, List[Message]
         ] = {}  # Map root cast id to thread messages
         self.thread_roots: Dict[str, Message] = {}  # Root message for each thread
+        self.matrix_reply_index: Dict[
+            str, Dict[str, List[str]]
+        ] = {}  # room_id -> parent event id -> reply event ids
+        self.matrix_repliers: Dict[str, set[str]] = {}  # parent event id -> senders that replied
         self.seen_messages: set[str] = set()  # Deduplication of message IDs
 
         # Rate limiting and API management
@@ -811,7 +817,9 @@ class WorldStateData:
         # Stores FIDs of top holders and their details + recent activity
         self.monitored_token_holders: Dict[str, MonitoredTokenHolder] = {}
 
-        # Initialize timestamp tracking
+        # Initialize timestamp tracking; every last_update write bumps version
+        self.node_index = NodeIndex()
+        self.version = 0
         self.last_update = time.time()
         
         # Enhanced user tracking with sentiment and memory
@@ -875,7 +883,7 @@ class WorldStateData:
             last_status_update=time.time(),
         )
         self.channels[channel_id] = ch
-        self.last_update = time.time()
+        self.touch_nodes(*self.channel_node_paths(ch), families=("feeds",))
 
     def add_message(self, message):
         """Add a message to the world state, deduplicating and managing channel history. Accepts Message or dict."""
@@ -897,11 +905,52 @@ class WorldStateData:
         # Keep only last 50
         if len(ch.recent_messages) > 50:
             ch.recent_messages = ch.recent_messages[-50:]
-        self.last_update = time.time()
+            self.prune_matrix_reply_index(ch)
         # Thread management
         if message.channel_type == "farcaster":
             thread_id = message.reply_to or message.id
             self.threads.setdefault(thread_id, []).append(message)
+        elif message.channel_type == "matrix":
+            self.index_matrix_message(message)
+        self.touch_nodes(*self.message_node_paths(ch, message), families=("users",))
+
+    def index_matrix_message(self, message: Message) -> None:
+        """Record a Matrix message's reply and m.thread relations."""
+        if message.reply_to:
+            self.index_matrix_reply(
+                message.channel_id, message.reply_to, message.id, message.sender
+            )
+        thread_id = (message.metadata or {}).get("thread_root") or message.reply_to
+        if thread_id:
+            self.threads.setdefault(thread_id, []).append(message)
+
+    def index_matrix_reply(
+        self, room_id: str, parent_event_id: str, reply_event_id: str, sender: str
+    ) -> None:
+        """Add a reply edge to the per-room Matrix reply index."""
+        replies = self.matrix_reply_index.setdefault(room_id, {}).setdefault(
+            parent_event_id, []
+        )
+        if reply_event_id not in replies:
+            replies.append(reply_event_id)
+        self.matrix_repliers.setdefault(parent_event_id, set()).add(sender)
+
+    def prune_matrix_reply_index(self, channel: Channel) -> None:
+        """
+        Forget reply edges that no longer touch the channel's message window.
+
+        An edge is kept while its parent or one of its replies is still in
+        ``recent_messages``, so both indexes stay bounded by the window size.
+        """
+        room_index = self.matrix_reply_index.get(channel.id)
+        if not room_index:
+            return
+        window = {msg.id for msg in channel.recent_messages}
+        for parent_event_id in list(room_index):
+            if parent_event_id in window or window.intersection(room_index[parent_event_id]):
+                continue
+            del room_index[parent_event_id]
+            self.matrix_repliers.pop(parent_event_id, None)
 
     def get_recent_messages(self, channel_id: str, limit: int = 10) -> List[Message]:
         """Get up to `limit` most recent messages for a channel."""
@@ -939,7 +988,7 @@ class WorldStateData:
         room = invite_info.get("room_id")
         if room:
             self.pending_matrix_invites.append(invite_info)
-            self.last_update = time.time()
+            self.touch_nodes("system.notifications", families=("system",))
 
     def remove_pending_invite(self, room_id: str) -> bool:
         """Remove a pending Matrix invite by room_id."""
@@ -947,7 +996,7 @@ class WorldStateData:
         self.pending_matrix_invites = [inv for inv in self.pending_matrix_invites if inv.get("room_id") != room_id]
         removed = len(self.pending_matrix_invites) < original
         if removed:
-            self.last_update = time.time()
+            self.touch_nodes("system.notifications", families=("system",))
         return removed
 
     def track_bot_media(self, cast_hash: str, media_info: Dict[str, Any]):
@@ -955,7 +1004,7 @@ class WorldStateData:
         self.bot_media_on_farcaster[cast_hash] = media_info
         # Maintain alias
         self.bot_media = self.bot_media_on_farcaster
-        self.last_update = time.time()
+        self.touch_nodes()
 
     def add_action(self, action: ActionHistory):
         """Add an action to history with a default limit of 10 entries."""
@@ -963,7 +1012,7 @@ class WorldStateData:
         # Keep only last 10
         if len(self.action_history) > 10:
             self.action_history = self.action_history[-10:]
-        self.last_update = time.time()
+        self.touch_nodes("system.action_history")
 
     def to_dict_for_ai(self, include_channels: List[str] = None, max_messages_per_channel: int = None, message_limit_per_channel: int = None, max_actions: int = None) -> Dict[str, Any]:
         """Convert world state to AI-friendly dict with optional limits."""
@@ -1012,6 +1061,51 @@ class WorldStateData:
             all_messages.extend(channel.recent_messages)
         return sorted(all_messages, key=lambda x: x.timestamp or 0)
 
+    @property
+    def last_update(self) -> float:
+        return self._last_update
+
+    @last_update.setter
+    def last_update(self, value: float) -> None:
+        # Lets consumers detect changes by comparing an int instead of diffing dicts
+        self._last_update = value
+        self.version += 1
+
+    def touch_nodes(self, *node_paths: str, families: Iterable[str] = ()) -> None:
+        """
+        Bump the version and tell the node index what changed.
+
+        Args:
+            node_paths: Nodes whose data changed
+            families: Node families whose path list may have gained or lost entries
+        """
+        self.last_update = time.time()
+        self.node_index.record(self.version, node_paths, families)
+
+    def channel_node_paths(self, channel: Channel) -> List[str]:
+        """Node paths whose data depends on a channel's name, status or messages."""
+        paths = [f"channels.{channel.type}.{channel.id}"]
+        if channel.type == "farcaster":
+            paths += ["farcaster.feeds.home", "farcaster.feeds.notifications"]
+        return paths
+
+    def message_node_paths(self, channel: Channel, message: Message) -> List[str]:
+        """Node paths whose data can change when ``message`` was just appended to ``channel``."""
+        paths = self.channel_node_paths(channel)
+        # User nodes without profile details fall back to each channel's last
+        # three messages; the new message pushed one out of that window
+        for msg in channel.recent_messages[-4:]:
+            if msg.sender_fid:
+                paths.append(f"users.farcaster.{msg.sender_fid}")
+            if msg.sender_username:
+                paths.append(f"users.matrix.{msg.sender_username}")
+        thread_root = (message.metadata or {}).get("thread_root")
+        for thread_id in (message.id, message.reply_to, thread_root):
+            thread = self.threads.get(thread_id) if thread_id else None
+            if thread:
+                paths.append(f"threads.{thread[-1].channel_type}.{thread_id}")
+        return paths
+
     def to_json(self) -> str:
         """Convert world state to JSON for AI consumption"""
         import json
@@ -1144,13 +1238,13 @@ class WorldStateData:
     def update_codebase_structure(self, structure: Dict[str, Any]):
         """Update the codebase structure from GitHub or local analysis."""
         self.codebase_structure = structure
-        self.last_update = time.time()
+        self.touch_nodes()
 
     def add_project_task(self, task: DevelopmentTask):
         """Add a new development task to the plan (legacy compatibility)."""
         self.project_plan[task.task_id] = task
         self.development_tasks[task.task_id] = task  # Also add to new structure
-        self.last_update = time.time()
+        self.touch_nodes()
 
     def update_project_task(self, task_id: str, **kwargs):
         """Update an existing development task."""
@@ -1160,7 +1254,7 @@ class WorldStateData:
                 if hasattr(task, key):
                     setattr(task, key, value)
             task.updated_at = time.time()
-            self.last_update = time.time()
+            self.touch_nodes()
             # Keep legacy structure in sync
             if task_id in self.project_plan:
                 self.project_plan[task_id] = task
@@ -1172,7 +1266,7 @@ class WorldStateData:
     def add_target_repository(self, repo_url: str, context: TargetRepositoryContext):
         """Add or update target repository context for ACE operations."""
         self.target_repositories[repo_url] = context
-        self.last_update = time.time()
+        self.touch_nodes()
 
     def get_target_repository(self, repo_url: str) -> Optional[TargetRepositoryContext]:
         """Get target repository context by URL."""
@@ -1185,4 +1279,4 @@ class WorldStateData:
         for key, value in kwargs.items():
             if hasattr(self.github_repository_state, key):
                 setattr(self.github_repository_state, key, value)
-        self.last_update = time.time()
+        self.touch_nodes()
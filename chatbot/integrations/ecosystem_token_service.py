@@ -178,6 +178,7 @@ class EcosystemTokenService:
             del self.world_state_manager.state.monitored_token_holders[fid_to_remove]
             logger.info(f"Removed token holder from monitoring (no longer in top list): FID {fid_to_remove}")
 
+        self.world_state_manager.mark_changed()
         logger.info(f"Finished updating top token holders. Monitoring {len(self.world_state_manager.state.monitored_token_holders)} holders.")
 
     async def _update_holder_recent_casts(self, fid: str):
@@ -100,7 +100,7 @@ class UserEligibilityService:
     async def _check_all_users_eligibility(self):
         """Check eligibility for all known Farcaster users."""
         try:
-            world_state = self.world_state_manager.get_state()
+            world_state = self.world_state_manager.get_state_data()
             farcaster_users = world_state.farcaster_users
             
             logger.info(f"Checking eligibility for {len(farcaster_users)} Farcaster users")
@@ -109,10 +109,24 @@ class UserEligibilityService:
             batch_size = 10
             user_items = list(farcaster_users.items())
             
+            # Resolve all due users up front; the loader turns this into one
+            # bulk users call per 100 fids instead of one call per user
+            current_time = time.time()
+            due_fids = [
+                int(fid) for fid, user_details in user_items
+                if str(fid).isdigit() and not (
+                    user_details.last_eligibility_check and
+                    current_time - user_details.last_eligibility_check < 3600
+                )
+            ]
+            prefetched_users = await self.neynar_api_client.get_users_by_fids(due_fids) if due_fids else {}
+            
             for i in range(0, len(user_items), batch_size):
                 batch = user_items[i:i + batch_size]
                 await asyncio.gather(*[
-                    self._check_user_eligibility(fid, user_details)
+                    self._check_user_eligibility(
+                        fid, user_details, prefetched_users.get(int(fid)) if str(fid).isdigit() else None
+                    )
                     for fid, user_details in batch
                 ], return_exceptions=True)
                 
@@ -122,8 +136,10 @@ class UserEligibilityService:
         except Exception as e:
             logger.error(f"Error checking all users eligibility: {e}")
             
-    async def _check_user_eligibility(self, fid: str, user_details: FarcasterUserDetails):
-        """Check eligibility for a specific user."""
+    async def _check_user_eligibility(
+        self, fid: str, user_details: FarcasterUserDetails, user_data: Optional[Dict[str, Any]] = None
+    ):
+        """Check eligibility for a specific user, reusing prefetched Neynar user data if given."""
         try:
             # Skip if checked recently (within 1 hour)
             current_time = time.time()
@@ -132,7 +148,7 @@ class UserEligibilityService:
                 return
                 
             # Get user's verified addresses from Neynar
-            verified_addresses = await self._get_user_verified_addresses(fid)
+            verified_addresses = await self._get_user_verified_addresses(fid, user_data)
             if not verified_addresses:
                 logger.debug(f"No verified addresses found for user {fid}")
                 user_details.is_eligible_for_airdrop = False
@@ -179,29 +195,39 @@ class UserEligibilityService:
         except Exception as e:
             logger.error(f"Error checking eligibility for user {fid}: {e}")
             
-    async def _get_user_verified_addresses(self, fid: str) -> Dict[str, List[str]]:
+    async def _get_user_verified_addresses(
+        self, fid: str, user_data: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, List[str]]:
         """Get verified blockchain addresses for a Farcaster user."""
         try:
-            # Use Neynar API to get user's verified addresses
-            user_data = await self.neynar_api_client.get_user_by_fid(int(fid))
+            # Use Neynar API to get user's verified addresses (batched via the user loader)
+            if user_data is None:
+                user_data = await self.neynar_api_client.get_user_by_fid(int(fid))
             
             if not user_data:
                 return {}
                 
             verified_addresses = {'solana': [], 'evm': []}
             
-            # Extract verified addresses from user data
-            if hasattr(user_data, 'verified_addresses'):
-                for address_info in user_data.verified_addresses:
-                    address = address_info.get('address', '')
-                    if not address:
-                        continue
-                        
-                    # Determine blockchain type by address format
-                    if self._is_solana_address(address):
-                        verified_addresses['solana'].append(address)
-                    elif self._is_evm_address(address):
-                        verified_addresses['evm'].append(address)
+            # Neynar v2 groups addresses by chain; older payloads list {"address": ...} objects
+            raw_addresses = user_data.get('verified_addresses') or {}
+            if isinstance(raw_addresses, dict):
+                candidates = raw_addresses.get('eth_addresses', []) + raw_addresses.get('sol_addresses', [])
+            else:
+                candidates = [
+                    info.get('address', '') if isinstance(info, dict) else info
+                    for info in raw_addresses
+                ]
+            
+            for address in candidates:
+                if not address:
+                    continue
+                    
+                # Determine blockchain type by address format
+                if self._is_evm_address(address):
+                    verified_addresses['evm'].append(address)
+                elif self._is_solana_address(address):
+                    verified_addresses['solana'].append(address)
                         
             return verified_addresses
             
@@ -279,7 +305,7 @@ class UserEligibilityService:
             True if user is eligible, False otherwise
         """
         try:
-            world_state = self.world_state_manager.get_state()
+            world_state = self.world_state_manager.get_state_data()
             user_details = world_state.farcaster_users.get(fid)
             
             if not user_details:
@@ -303,7 +329,7 @@ class UserEligibilityService:
     def get_eligibility_summary(self) -> Dict[str, Any]:
         """Get a summary of current eligibility statistics."""
         try:
-            world_state = self.world_state_manager.get_state()
+            world_state = self.world_state_manager.get_state_data()
             farcaster_users = world_state.farcaster_users
             
             total_users = len(farcaster_users)
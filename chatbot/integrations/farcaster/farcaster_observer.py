@@ -61,15 +61,10 @@ class FarcasterObserver(Integration):
         self._enabled = bool(self.api_key)
         
         if self.api_key:
-            self.api_client = NeynarAPIClient(
-                api_key=self.api_key, signer_uuid=self.signer_uuid, bot_fid=self.bot_fid
-            )
+            self.api_client = self._create_api_client()
             self.neynar_api_client = self.api_client  # Legacy compatibility
             if self.world_state_manager:
-                self.scheduler = FarcasterScheduler(
-                    api_client=self.api_client,
-                    world_state_manager=self.world_state_manager,
-                )
+                self.scheduler = self._create_scheduler()
             else:
                 logger.warning(
                     "WorldStateManager not provided to FarcasterObserver; scheduler actions will not be recorded in WSM."
@@ -98,6 +93,32 @@ class FarcasterObserver(Integration):
         
         logger.info("Farcaster observer initialized (refactored)")
 
+    def _create_api_client(self) -> NeynarAPIClient:
+        """Create the Neynar client with the configured cache and rate governor settings."""
+        from ...config import settings
+        return NeynarAPIClient(
+            api_key=self.api_key,
+            signer_uuid=self.signer_uuid,
+            bot_fid=self.bot_fid,
+            cache_enabled=settings.NEYNAR_CACHE_ENABLED,
+            cache_max_entries=settings.NEYNAR_CACHE_MAX_ENTRIES,
+            rate_limit_per_minute=settings.NEYNAR_RATE_LIMIT_PER_MINUTE,
+            max_rate_limit_retries=settings.NEYNAR_MAX_RATE_LIMIT_RETRIES,
+        )
+
+    def _create_scheduler(self) -> FarcasterScheduler:
+        """Create the scheduler backed by the on-disk outbound queue."""
+        from ...config import settings
+        return FarcasterScheduler(
+            api_client=self.api_client,
+            world_state_manager=self.world_state_manager,
+            queue_db_path=str(self.persistence_dir / "outbound_queue.db"),
+            sender_concurrency=settings.FARCASTER_SENDER_CONCURRENCY,
+            channel_weights=settings.FARCASTER_CHANNEL_WEIGHTS,
+            mention_reply_deadline=settings.FARCASTER_MENTION_REPLY_DEADLINE_SECONDS,
+            thread_reply_deadline=settings.FARCASTER_THREAD_REPLY_DEADLINE_SECONDS,
+        )
+
     def _load_persistent_state(self) -> None:
         """Load persistent state from file"""
         try:
@@ -215,8 +236,12 @@ class FarcasterObserver(Integration):
             "signer_uuid": self.signer_uuid,
             "bot_fid": self.bot_fid,
             "scheduler_available": self.scheduler is not None,
+            "scheduler_queue": self.scheduler.get_queue_status() if self.scheduler else {},
             "world_state_collection_enabled": self.world_state_collection_enabled,
-            "ecosystem_token_service_active": self.ecosystem_token_service is not None
+            "ecosystem_token_service_active": self.ecosystem_token_service is not None,
+            "api_cache": self.api_client.get_cache_stats() if self.api_client else {"enabled": False},
+            "user_loader": dict(self.api_client.user_loader.stats) if self.api_client else {},
+            "rate_governor": self.api_client.get_rate_governor_status() if self.api_client else {},
         }
 
     async def test_connection(self) -> bool:
@@ -248,19 +273,17 @@ class FarcasterObserver(Integration):
         
         # Recreate API client with new credentials
         if self.api_key:
-            self.api_client = NeynarAPIClient(
-                api_key=self.api_key, 
-                signer_uuid=self.signer_uuid, 
-                bot_fid=self.bot_fid
-            )
+            self.api_client = self._create_api_client()
             self.neynar_api_client = self.api_client  # Legacy compatibility
             
-            # Recreate scheduler if world state manager is available
+            # Recreate scheduler if world state manager is available, stopping the
+            # old one first so its queue connection is closed
             if self.world_state_manager:
-                self.scheduler = FarcasterScheduler(
-                    api_client=self.api_client,
-                    world_state_manager=self.world_state_manager,
-                )
+                if self.scheduler:
+                    await self.scheduler.stop()
+                self.scheduler = self._create_scheduler()
+                if getattr(self, "_connected", False):
+                    await self.scheduler.start()
         
         # Update enabled status
         self._enabled = bool(self.api_key)
@@ -587,6 +610,7 @@ class FarcasterObserver(Integration):
                 new_wsm_limits = {k: v for k, v in new_wsm_limits.items() if v is not None}
 
                 self.world_state_manager.state.rate_limits['farcaster_api'] = new_wsm_limits
+                self.world_state_manager.mark_changed("system.rate_limits")
                 logger.debug(f"FarcasterObserver: Synced Farcaster API rate limits to WorldState: {new_wsm_limits}")
                 
                 # Log warning if rate limits are low
@@ -703,6 +727,7 @@ class FarcasterObserver(Integration):
         try:
             try:
                 fid = int(user_identifier)
+                user = None
             except ValueError:
                 # Try to resolve username to FID
                 user_data = await self.api_client.get_user_by_username(user_identifier)
@@ -712,7 +737,15 @@ class FarcasterObserver(Integration):
                         "casts": [],
                         "error": f"User '{user_identifier}' not found",
                     }
-                fid = user_data["users"][0]["fid"]
+                user = user_data["users"][0]
+                fid = user["fid"]
+
+            if user is None:
+                # Single lookups are micro-batched into bulk user calls by the client
+                try:
+                    user = await self.api_client.get_user_by_fid(fid)
+                except Exception as e:
+                    logger.warning(f"Could not load profile for FID {fid}: {e}")
 
             data = await self.api_client.get_casts_by_fid(fid, limit=limit)
             messages = await convert_api_casts_to_messages(
@@ -721,9 +754,20 @@ class FarcasterObserver(Integration):
                 cast_type_metadata="user_feed",
                 bot_fid=self.bot_fid,
             )
+            user_info = {"fid": fid}
+            if user:
+                user_info.update(
+                    {
+                        "username": user.get("username"),
+                        "display_name": user.get("display_name"),
+                        "follower_count": user.get("follower_count"),
+                        "following_count": user.get("following_count"),
+                    }
+                )
             return {
                 "success": True,
                 "casts": [asdict(msg) for msg in messages],
+                "user_info": user_info,
                 "error": None,
             }
         except Exception as e:
@@ -935,6 +979,7 @@ class FarcasterObserver(Integration):
                 user_details.bio = metadata["bio"]
             if isinstance(metadata, dict) and metadata.get("pfp_url"):
                 user_details.pfp_url = metadata["pfp_url"]
+            self.world_state_manager.mark_changed(f"users.farcaster.{fid}")
             
             logger.debug(f"Updated profile for Farcaster user {fid} ({user_details.username})")
             
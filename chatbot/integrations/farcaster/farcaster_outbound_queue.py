@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Farcaster Outbound Queue
+
+Durable, crash-safe storage for scheduled Farcaster posts and replies.
+
+Items are written to SQLite (WAL mode) before ``schedule_post`` /
+``schedule_reply`` return, so a restart no longer drops queued casts. Each
+item carries an idempotency key derived from its target and a hash of its
+content; enqueueing the same key again while it is pending, in flight or
+already sent is a no-op, which gives at-least-once delivery with dedup on
+replay.
+
+Items are claimed highest priority first (mention replies, then thread
+replies, then original posts). Within a priority class the caller picks
+which target channel is served next, and items past their deadline are
+dropped instead of sent.
+
+The standard library ``sqlite3`` module is used instead of ``aiosqlite``
+because the scheduling entry points are synchronous and every statement is a
+single-row write on a local WAL database.
+"""
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from enum import IntEnum
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+STATUS_PENDING = "pending"
+STATUS_INFLIGHT = "inflight"
+STATUS_SENT = "sent"
+STATUS_FAILED = "failed"
+STATUS_DROPPED = "dropped"
+
+# Statuses that no longer block rescheduling the same target
+RETRYABLE_STATUSES = (STATUS_FAILED, STATUS_DROPPED)
+
+
+class OutboundPriority(IntEnum):
+    """Lower values are sent first."""
+
+    MENTION_REPLY = 0
+    THREAD_REPLY = 1
+    POST = 2
+
+
+def make_idempotency_key(kind: str, target: Optional[str], content: str) -> str:
+    """Key a queued cast by what it targets and what it says."""
+    content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    return hashlib.sha256(f"{kind}:{target or ''}:{content_hash}".encode("utf-8")).hexdigest()
+
+
+class FarcasterOutboundQueue:
+    """SQLite-backed outbound queue with pending → inflight → sent/failed states."""
+
+    def __init__(self, db_path: str = ":memory:"):
+        self.db_path = db_path
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._db: Optional[sqlite3.Connection] = None
+        self._open()
+
+    def _open(self) -> sqlite3.Connection:
+        self._db = sqlite3.connect(self.db_path, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        if self.db_path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+        return self._db
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        # Reopened on demand so a queue closed by a stopped scheduler can be restarted
+        return self._db if self._db is not None else self._open()
+
+    def _create_schema(self) -> None:
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS outbound_queue (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                idempotency_key TEXT NOT NULL UNIQUE,
+                target TEXT,
+                payload TEXT NOT NULL,
+                action_id TEXT,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                scheduled_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                cast_hash TEXT,
+                last_error TEXT,
+                priority INTEGER NOT NULL DEFAULT 2,
+                channel TEXT NOT NULL DEFAULT '',
+                deadline REAL
+            )
+        """)
+        # Queues created before priority scheduling lack these columns
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(outbound_queue)")}
+        for name, definition in (
+            ("priority", "INTEGER NOT NULL DEFAULT 2"),
+            ("channel", "TEXT NOT NULL DEFAULT ''"),
+            ("deadline", "REAL"),
+        ):
+            if name not in columns:
+                self._conn.execute(f"ALTER TABLE outbound_queue ADD COLUMN {name} {definition}")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_outbound_queue_status ON outbound_queue (kind, status, id)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_outbound_queue_dispatch ON outbound_queue (status, priority, channel, id)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_outbound_queue_target ON outbound_queue (kind, target)"
+        )
+
+    def enqueue(
+        self,
+        kind: str,
+        target: Optional[str],
+        payload: Dict[str, Any],
+        action_id: Optional[str] = None,
+        priority: OutboundPriority = OutboundPriority.POST,
+        channel: str = "",
+        deadline: Optional[float] = None,
+    ) -> bool:
+        """
+        Persist a cast for delivery. Returns False if an item with the same
+        idempotency key is already pending, in flight or sent. Failed or
+        dropped items are reset to pending so they can be retried.
+        """
+        key = make_idempotency_key(kind, target, payload.get("content", ""))
+        now = time.time()
+        row = self._conn.execute(
+            "SELECT id, status FROM outbound_queue WHERE idempotency_key = ?", (key,)
+        ).fetchone()
+        if row is not None:
+            if row["status"] not in RETRYABLE_STATUSES:
+                return False
+            self._conn.execute(
+                """UPDATE outbound_queue
+                   SET status = ?, payload = ?, action_id = ?, attempts = 0,
+                       scheduled_at = ?, updated_at = ?, last_error = NULL,
+                       priority = ?, channel = ?, deadline = ?
+                   WHERE id = ?""",
+                (STATUS_PENDING, json.dumps(payload), action_id, now, now,
+                 int(priority), channel, deadline, row["id"]),
+            )
+            return True
+        self._conn.execute(
+            """INSERT INTO outbound_queue (
+                   kind, idempotency_key, target, payload, action_id,
+                   status, scheduled_at, updated_at, priority, channel, deadline
+               ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (kind, key, target, json.dumps(payload), action_id, STATUS_PENDING, now, now,
+             int(priority), channel, deadline),
+        )
+        return True
+
+    def claim_next(
+        self,
+        select_channel: Optional[Callable[[List[str]], str]] = None,
+        kind: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Mark the next item as in flight and return it.
+
+        Only the highest pending priority class is considered. ``select_channel``
+        chooses among the channels that have items in that class (oldest
+        channel head by default); the oldest item of that channel is claimed.
+        """
+        kind_filter, kind_args = ("AND kind = ?", (kind,)) if kind else ("", ())
+        top = self._conn.execute(
+            f"SELECT MIN(priority) FROM outbound_queue WHERE status = ? {kind_filter}",
+            (STATUS_PENDING, *kind_args),
+        ).fetchone()[0]
+        if top is None:
+            return None
+        heads = self._conn.execute(
+            f"""SELECT channel, MIN(id) AS head_id FROM outbound_queue
+                WHERE status = ? AND priority = ? {kind_filter}
+                GROUP BY channel ORDER BY head_id""",
+            (STATUS_PENDING, top, *kind_args),
+        ).fetchall()
+        head_by_channel = {h["channel"]: h["head_id"] for h in heads}
+        channel = heads[0]["channel"]
+        if select_channel and len(heads) > 1:
+            channel = select_channel(list(head_by_channel))
+        row = self._conn.execute(
+            "SELECT * FROM outbound_queue WHERE id = ?", (head_by_channel[channel],)
+        ).fetchone()
+        self._conn.execute(
+            "UPDATE outbound_queue SET status = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+            (STATUS_INFLIGHT, time.time(), row["id"]),
+        )
+        return self._row_to_item(row, attempts=row["attempts"] + 1)
+
+    def mark_sent(self, item_id: int, cast_hash: Optional[str] = None) -> None:
+        self._set_status(item_id, STATUS_SENT, cast_hash=cast_hash)
+
+    def mark_failed(self, item_id: int, error: str) -> None:
+        self._set_status(item_id, STATUS_FAILED, last_error=error)
+
+    def release(self, item_id: int) -> None:
+        """Return an in-flight item to pending (e.g. when the sender is cancelled)."""
+        self._set_status(item_id, STATUS_PENDING)
+
+    def _set_status(
+        self,
+        item_id: int,
+        status: str,
+        cast_hash: Optional[str] = None,
+        last_error: Optional[str] = None,
+    ) -> None:
+        self._conn.execute(
+            """UPDATE outbound_queue
+               SET status = ?, updated_at = ?,
+                   cast_hash = COALESCE(?, cast_hash), last_error = COALESCE(?, last_error)
+               WHERE id = ?""",
+            (status, time.time(), cast_hash, last_error, item_id),
+        )
+
+    def drop_expired(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Mark pending items whose deadline has passed as dropped and return them."""
+        now = time.time() if now is None else now
+        rows = self._conn.execute(
+            "SELECT * FROM outbound_queue WHERE status = ? AND deadline IS NOT NULL AND deadline < ?",
+            (STATUS_PENDING, now),
+        ).fetchall()
+        for row in rows:
+            self._set_status(row["id"], STATUS_DROPPED, last_error="deadline exceeded")
+        return [self._row_to_item(row, attempts=row["attempts"]) for row in rows]
+
+    def pending_by_priority(self) -> Dict[str, int]:
+        rows = self._conn.execute(
+            "SELECT priority, COUNT(*) AS n FROM outbound_queue WHERE status = ? GROUP BY priority",
+            (STATUS_PENDING,),
+        ).fetchall()
+        return {OutboundPriority(row["priority"]).name.lower(): row["n"] for row in rows}
+
+    def recover_inflight(self) -> int:
+        """Requeue items that were in flight when the process last stopped."""
+        cursor = self._conn.execute(
+            "UPDATE outbound_queue SET status = ?, updated_at = ? WHERE status = ?",
+            (STATUS_PENDING, time.time(), STATUS_INFLIGHT),
+        )
+        return cursor.rowcount
+
+    def has_active_target(self, kind: str, target: str) -> bool:
+        """True if a live (not failed or dropped) item of ``kind`` already targets ``target``."""
+        row = self._conn.execute(
+            "SELECT 1 FROM outbound_queue WHERE kind = ? AND target = ? AND status NOT IN (?, ?) LIMIT 1",
+            (kind, target, *RETRYABLE_STATUSES),
+        ).fetchone()
+        return row is not None
+
+    def active_targets(self, kind: str) -> List[str]:
+        rows = self._conn.execute(
+            "SELECT DISTINCT target FROM outbound_queue WHERE kind = ? AND status NOT IN (?, ?) AND target IS NOT NULL",
+            (kind, *RETRYABLE_STATUSES),
+        ).fetchall()
+        return [row["target"] for row in rows]
+
+    def pending_count(self, kind: Optional[str] = None) -> int:
+        if kind is None:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM outbound_queue WHERE status IN (?, ?)",
+                (STATUS_PENDING, STATUS_INFLIGHT),
+            ).fetchone()
+        else:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM outbound_queue WHERE kind = ? AND status IN (?, ?)",
+                (kind, STATUS_PENDING, STATUS_INFLIGHT),
+            ).fetchone()
+        return row[0]
+
+    def purge_completed(self, older_than_seconds: float) -> int:
+        """Delete sent/failed/dropped items older than the retention window."""
+        cursor = self._conn.execute(
+            "DELETE FROM outbound_queue WHERE status IN (?, ?, ?) AND updated_at < ?",
+            (STATUS_SENT, *RETRYABLE_STATUSES, time.time() - older_than_seconds),
+        )
+        return cursor.rowcount
+
+    def get_stats(self) -> Dict[str, Any]:
+        rows = self._conn.execute(
+            "SELECT kind, status, COUNT(*) AS n FROM outbound_queue GROUP BY kind, status"
+        ).fetchall()
+        stats: Dict[str, Dict[str, int]] = {}
+        for row in rows:
+            stats.setdefault(row["kind"], {})[row["status"]] = row["n"]
+        return stats
+
+    def close(self) -> None:
+        """Release the database connection; it is reopened on next use."""
+        if self._db is None or self.db_path == ":memory:":
+            # Closing an in-memory queue would discard everything still queued
+            return
+        self._db.close()
+        self._db = None
+
+    @staticmethod
+    def _row_to_item(row: sqlite3.Row, attempts: int) -> Dict[str, Any]:
+        item = json.loads(row["payload"])
+        item.update(
+            {
+                "id": row["id"],
+                "kind": row["kind"],
+                "action_id": row["action_id"],
+                "attempts": attempts,
+                "scheduled_at": row["scheduled_at"],
+                "priority": OutboundPriority(row["priority"]),
+                "queue_channel": row["channel"],
+                "deadline": row["deadline"],
+            }
+        )
+        return item
@@ -3,67 +3,127 @@
 Farcaster Action Scheduler
 
 Manages queuing and scheduled sending of Farcaster posts and replies.
+Queued items are persisted in a FarcasterOutboundQueue so they survive
+restarts; sending is throttled by the Neynar client's rate governor.
+
+A single pool of senders drains the queue in priority order (mention
+replies, thread replies, then posts). Within a priority class, target
+channels are served by start-time fair queuing so one busy channel cannot
+starve the others, and replies that sit past their deadline are dropped.
 """
 import asyncio
 import logging
 import time
-from typing import Any, Dict, Optional
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
 
+from .farcaster_outbound_queue import FarcasterOutboundQueue, OutboundPriority
 from .neynar_api_client import NeynarAPIClient
 
 logger = logging.getLogger(__name__)
 
 
+class ChannelFairSelector:
+    """
+    Start-time fair queuing over target channels.
+
+    Each channel keeps a virtual finish tag advanced by ``1 / weight`` per
+    item sent, so over time channels are served in proportion to their
+    weights regardless of how much each one has queued.
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, default_weight: float = 1.0):
+        self.weights = dict(weights or {})
+        self.default_weight = default_weight
+        self.virtual_time = 0.0
+        self._finish_tags: Dict[str, float] = {}
+
+    def select(self, channels: List[str]) -> str:
+        """Pick the next channel from ``channels`` (ordered oldest head first)."""
+        best_channel = channels[0]
+        best_start = None
+        for channel in channels:
+            start = max(self.virtual_time, self._finish_tags.get(channel, 0.0))
+            if best_start is None or start < best_start:
+                best_channel, best_start = channel, start
+        weight = self.weights.get(best_channel, self.default_weight) or self.default_weight
+        self.virtual_time = best_start
+        self._finish_tags[best_channel] = best_start + 1.0 / weight
+        return best_channel
+
+
 class FarcasterScheduler:
     """
     Schedules and sends Farcaster posts and replies at controlled intervals.
     """
 
     DEFAULT_SCHEDULER_INTERVAL = 60.0  # seconds
+    IDLE_POLL_INTERVAL = 5.0  # seconds to wait for new work before re-checking the queue
+    COMPLETED_RETENTION_SECONDS = 7 * 24 * 3600  # keep sent/failed rows for replay dedup
+    WAIT_SAMPLE_SIZE = 500  # recent queue wait times kept per priority for percentiles
+    MENTION_CHANNEL_PREFIXES = ("farcaster:notifications", "farcaster:mentions_and_replies")
 
     def __init__(
         self,
         api_client: NeynarAPIClient,
         world_state_manager: Any,
         scheduler_interval: Optional[float] = None,
+        queue_db_path: str = ":memory:",
+        sender_concurrency: int = 2,
+        channel_weights: Optional[Dict[str, float]] = None,
+        mention_reply_deadline: Optional[float] = 3600.0,
+        thread_reply_deadline: Optional[float] = 1800.0,
     ):
         self.api_client = api_client
         self.world_state_manager = world_state_manager
-        self.post_queue: asyncio.Queue[Dict[str, Any]] = asyncio.Queue()
-        self.reply_queue: asyncio.Queue[Dict[str, Any]] = asyncio.Queue()
+        self.outbound_queue = FarcasterOutboundQueue(queue_db_path)
         self.scheduler_interval: float = (
             scheduler_interval or self.DEFAULT_SCHEDULER_INTERVAL
         )
-        self._post_task: Optional[asyncio.Task] = None
-        self._reply_task: Optional[asyncio.Task] = None
-        self.replied_to_hashes: set[str] = set()
+        self.sender_concurrency = max(1, sender_concurrency)
+        self.channel_selector = ChannelFairSelector(channel_weights)
+        self.reply_deadlines: Dict[OutboundPriority, Optional[float]] = {
+            OutboundPriority.MENTION_REPLY: mention_reply_deadline,
+            OutboundPriority.THREAD_REPLY: thread_reply_deadline,
+        }
+        self._sender_tasks: List[asyncio.Task] = []
+        self._work_available = asyncio.Event()
+        self._wait_samples: Dict[OutboundPriority, Deque[float]] = {
+            p: deque(maxlen=self.WAIT_SAMPLE_SIZE) for p in OutboundPriority
+        }
+        self._dropped: Dict[OutboundPriority, int] = {p: 0 for p in OutboundPriority}
+        # Seed from disk so dedup survives restarts
+        self.replied_to_hashes: set[str] = set(self.outbound_queue.active_targets("reply"))
         logger.info("FarcasterScheduler initialized.")
 
     async def start(self):
-        if self._post_task is None or self._post_task.done():
-            self._post_task = asyncio.create_task(self._send_posts_loop())
-            logger.info("Post scheduler task started.")
-        if self._reply_task is None or self._reply_task.done():
-            self._reply_task = asyncio.create_task(self._send_replies_loop())
-            logger.info("Reply scheduler task started.")
+        recovered = self.outbound_queue.recover_inflight()
+        if recovered:
+            logger.warning(f"Requeued {recovered} Farcaster casts that were in flight at last shutdown.")
+        self.outbound_queue.purge_completed(self.COMPLETED_RETENTION_SECONDS)
+
+        self._sender_tasks = [t for t in self._sender_tasks if not t.done()]
+        while len(self._sender_tasks) < self.sender_concurrency:
+            self._sender_tasks.append(asyncio.create_task(self._send_loop()))
+        self._work_available.set()
+        logger.info(
+            f"Scheduler started with {self.sender_concurrency} sender(s); "
+            f"{self.outbound_queue.pending_count()} cast(s) pending."
+        )
 
     async def stop(self):
-        if self._post_task and not self._post_task.done():
-            self._post_task.cancel()
-            try:
-                await self._post_task
-            except asyncio.CancelledError:
-                logger.info("Post scheduler task cancelled successfully.")
-            except Exception as e:
-                logger.error(f"Error during post task cancellation: {e}")
-        if self._reply_task and not self._reply_task.done():
-            self._reply_task.cancel()
+        for task in self._sender_tasks:
+            if not task.done():
+                task.cancel()
+        for task in self._sender_tasks:
             try:
-                await self._reply_task
+                await task
             except asyncio.CancelledError:
-                logger.info("Reply scheduler task cancelled successfully.")
+                pass
             except Exception as e:
-                logger.error(f"Error during reply task cancellation: {e}")
+                logger.error(f"Error during scheduler task cancellation: {e}")
+        self._sender_tasks = []
+        self.outbound_queue.close()
         logger.info("FarcasterScheduler stopped.")
 
     def schedule_post(
@@ -76,26 +136,30 @@ class FarcasterScheduler:
         logger.info(
             f"Attempting to schedule post: action_id={action_id}, content='{content[:50]}...', channel={channel}, embeds={len(embeds) if embeds else 0}"
         )
-        if self._is_duplicate_in_queue(
-            self.post_queue, {"content": content, "channel": channel}
-        ):
-            logger.debug(
-                "Duplicate content for the same channel in post queue, skipping schedule."
-            )
-            return False
         post_data = {
             "content": content,
             "channel": channel,
-            "action_id": action_id,
             "embeds": embeds,
-            "scheduled_at": time.time(),
         }
-        self.post_queue.put_nowait(post_data)
-        logger.info(f"Post added to queue. New queue size: {self.post_queue.qsize()}")
+        if not self.outbound_queue.enqueue(
+            "post", channel, post_data, action_id,
+            priority=OutboundPriority.POST, channel=channel or "",
+        ):
+            logger.debug(
+                "Duplicate content for the same channel in post queue, skipping schedule."
+            )
+            return False
+        self._work_available.set()
+        logger.info(f"Post added to queue. New queue size: {self.outbound_queue.pending_count('post')}")
         return True
 
     def schedule_reply(
-        self, content: str, reply_to_hash: str, action_id: Optional[str] = None
+        self,
+        content: str,
+        reply_to_hash: str,
+        action_id: Optional[str] = None,
+        priority: Optional[OutboundPriority] = None,
+        channel: Optional[str] = None,
     ) -> bool:
         logger.info(
             f"Attempting to schedule reply: action_id={action_id}, reply_to_hash={reply_to_hash}, content='{content[:50]}...'"
@@ -105,178 +169,298 @@ class FarcasterScheduler:
                 f"Already replied or scheduled reply to cast {reply_to_hash}, skipping."
             )
             return False
-        for queued_item in list(self.reply_queue._queue):  # type: ignore
-            if queued_item.get("reply_to_hash") == reply_to_hash:
-                logger.warning(
-                    f"Duplicate reply (for hash {reply_to_hash}) in reply queue, skipping schedule."
-                )
-                return False
+        if self.outbound_queue.has_active_target("reply", reply_to_hash):
+            logger.warning(
+                f"Duplicate reply (for hash {reply_to_hash}) in reply queue, skipping schedule."
+            )
+            return False
+        if priority is None or channel is None:
+            observed_priority, observed_channel = self._classify_reply(reply_to_hash)
+            priority = observed_priority if priority is None else priority
+            channel = observed_channel if channel is None else channel
+        deadline_seconds = self.reply_deadlines.get(priority)
         reply_data = {
             "content": content,
             "reply_to_hash": reply_to_hash,
-            "action_id": action_id,
-            "scheduled_at": time.time(),
         }
-        self.reply_queue.put_nowait(reply_data)
+        if not self.outbound_queue.enqueue(
+            "reply", reply_to_hash, reply_data, action_id,
+            priority=priority,
+            channel=channel,
+            deadline=time.time() + deadline_seconds if deadline_seconds else None,
+        ):
+            return False
         self.replied_to_hashes.add(reply_to_hash)
-        logger.info(f"Reply added to queue. New queue size: {self.reply_queue.qsize()}")
+        self._work_available.set()
+        logger.info(
+            f"Reply added to queue as {priority.name.lower()}. "
+            f"New queue size: {self.outbound_queue.pending_count('reply')}"
+        )
         return True
 
+    def _classify_reply(self, reply_to_hash: str) -> tuple[OutboundPriority, str]:
+        """Derive a reply's priority and fairness channel from where its parent was observed."""
+        state = getattr(self.world_state_manager, "state", None)
+        channels = getattr(state, "channels", None)
+        if not isinstance(channels, dict):
+            return OutboundPriority.THREAD_REPLY, ""
+        for channel_id, channel in channels.items():
+            for message in getattr(channel, "recent_messages", []):
+                if message.id != reply_to_hash:
+                    continue
+                cast_type = str((message.metadata or {}).get("cast_type", ""))
+                if (
+                    cast_type.startswith("notification")
+                    or cast_type == "mention_or_reply"
+                    or channel_id.startswith(self.MENTION_CHANNEL_PREFIXES)
+                ):
+                    return OutboundPriority.MENTION_REPLY, channel_id
+                return OutboundPriority.THREAD_REPLY, channel_id
+        return OutboundPriority.THREAD_REPLY, ""
+
     def add_to_replied_hashes(self, cast_hash: str):
         self.replied_to_hashes.add(cast_hash)
         logger.info(f"Manually added {cast_hash} to replied_to_hashes set.")
 
-    async def _send_posts_loop(self) -> None:
-        logger.info("Starting Farcaster posts scheduler loop.")
+    def get_queue_status(self) -> Dict[str, Any]:
+        """Queue depth, wait-time percentiles and drop counters for monitoring."""
+        depth = self.outbound_queue.pending_by_priority()
+        wait_seconds = {}
+        for priority, samples in self._wait_samples.items():
+            ordered = sorted(samples)
+            wait_seconds[priority.name.lower()] = {
+                "samples": len(ordered),
+                **{
+                    f"p{pct}": round(ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))], 3)
+                    if ordered else None
+                    for pct in (50, 90, 99)
+                },
+            }
+        return {
+            "pending_posts": self.outbound_queue.pending_count("post"),
+            "pending_replies": self.outbound_queue.pending_count("reply"),
+            "sender_concurrency": self.sender_concurrency,
+            "depth_by_priority": {p.name.lower(): depth.get(p.name.lower(), 0) for p in OutboundPriority},
+            "wait_seconds": wait_seconds,
+            "dropped": {p.name.lower(): n for p, n in self._dropped.items()},
+            "by_status": self.outbound_queue.get_stats(),
+        }
+
+    def _drop_expired(self) -> None:
+        for item in self.outbound_queue.drop_expired():
+            self._dropped[item["priority"]] += 1
+            reply_to_hash = item.get("reply_to_hash")
+            if reply_to_hash:
+                self.replied_to_hashes.discard(reply_to_hash)
+            logger.warning(
+                f"Dropped stale {item['priority'].name.lower()} queued for "
+                f"{time.time() - item['scheduled_at']:.0f}s (target {reply_to_hash or item.get('channel')})."
+            )
+            if self.world_state_manager and item.get("action_id"):
+                self.world_state_manager.update_action_result(
+                    item["action_id"], "failure: dropped stale reply after deadline"
+                )
+
+    async def _next_item(self) -> Dict[str, Any]:
+        """Claim the next item by priority and channel fairness, waiting for work if empty."""
+        while True:
+            self._drop_expired()
+            item = self.outbound_queue.claim_next(self.channel_selector.select)
+            if item is not None:
+                self._wait_samples[item["priority"]].append(time.time() - item["scheduled_at"])
+                return item
+            self._work_available.clear()
+            try:
+                await asyncio.wait_for(self._work_available.wait(), timeout=self.IDLE_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _send_loop(self) -> None:
+        logger.info("Starting Farcaster outbound sender loop.")
         while True:
+            item: Optional[Dict[str, Any]] = None
             try:
                 logger.debug(
-                    f"Post scheduler loop: waiting for item. Queue size: {self.post_queue.qsize()}"
-                )
-                post_data = await self.post_queue.get()
-                content = post_data["content"]
-                channel_id = post_data["channel"]
-                action_id = post_data.get("action_id")
-                embeds = post_data.get("embeds")
-                logger.info(
-                    f"Dequeued scheduled post for channel {channel_id or 'default'}: {content[:70]}... (embeds: {len(embeds) if embeds else 0})"
+                    f"Sender loop: waiting for item. Queue size: {self.outbound_queue.pending_count()}"
                 )
-                cast_result_data: Optional[Dict[str, Any]] = None
-                error_message: Optional[str] = None
-                try:
-                    if not self.api_client.signer_uuid:
-                        raise ValueError(
-                            "Signer UUID not configured in API client, cannot post."
-                        )
-                    api_response = await self.api_client.publish_cast(
-                        text=content,
-                        signer_uuid=self.api_client.signer_uuid,
-                        channel_id=channel_id,
-                        embeds=embeds,
-                    )
-                    if "cast" in api_response and "hash" in api_response["cast"]:
-                        cast_result_data = api_response["cast"]
-                        logger.info(
-                            f"Successfully sent scheduled post. Cast hash: {cast_result_data.get('hash')}"
-                        )
-                    else:
-                        error_message = api_response.get(
-                            "message",
-                            f"Unknown error from API: {str(api_response)[:200]}",
-                        )
-                        logger.error(f"Failed to send scheduled post: {error_message}")
-                except Exception as e:
-                    error_message = str(e)
-                    logger.error(f"Error sending scheduled post: {e}", exc_info=True)
-                if self.world_state_manager:
-                    params_for_wsm = {"content": content, "channel": channel_id}
-                    if cast_result_data and cast_result_data.get("hash"):
-                        cast_hash = cast_result_data["hash"]
-                        params_for_wsm["cast_hash"] = cast_hash
-                        if action_id:
-                            self.world_state_manager.update_action_result(
-                                action_id, "success", cast_hash
-                            )
-                        else:
-                            self.world_state_manager.add_action_result(
-                                "send_farcaster_post", params_for_wsm, "success"
-                            )
-                    else:
-                        result_status = f"failure: {error_message or 'unknown error'}"
-                        if action_id:
-                            self.world_state_manager.update_action_result(
-                                action_id, result_status
-                            )
-                        else:
-                            self.world_state_manager.add_action_result(
-                                "send_farcaster_post", params_for_wsm, result_status
-                            )
-                self.post_queue.task_done()
+                item = await self._next_item()
+                if item["kind"] == "reply":
+                    await self._deliver_reply(item)
+                else:
+                    await self._deliver_post(item)
+                item = None
                 await asyncio.sleep(self.scheduler_interval)
             except asyncio.CancelledError:
-                logger.info("Post scheduler loop cancelled.")
+                if item is not None:
+                    # Not confirmed either way; leave it for the next start to replay
+                    self.outbound_queue.release(item["id"])
+                logger.info("Sender loop cancelled.")
                 break
             except Exception as e:
                 logger.error(
-                    f"Unexpected error in post scheduler loop: {e}", exc_info=True
+                    f"Unexpected error in sender loop: {e}", exc_info=True
                 )
+                if item is not None:
+                    self.outbound_queue.mark_failed(item["id"], str(e))
                 await asyncio.sleep(5)
 
-    async def _send_replies_loop(self) -> None:
-        logger.info("Starting Farcaster replies scheduler loop.")
-        while True:
-            try:
-                logger.debug(
-                    f"Reply scheduler loop: waiting for item. Queue size: {self.reply_queue.qsize()}"
+    async def _deliver_post(self, post_data: Dict[str, Any]) -> None:
+        content = post_data["content"]
+        channel_id = post_data["channel"]
+        action_id = post_data.get("action_id")
+        embeds = post_data.get("embeds")
+        logger.info(
+            f"Dequeued scheduled post for channel {channel_id or 'default'}: {content[:70]}... (embeds: {len(embeds) if embeds else 0})"
+        )
+        cast_result_data: Optional[Dict[str, Any]] = None
+        error_message: Optional[str] = None
+        try:
+            if not self.api_client.signer_uuid:
+                raise ValueError(
+                    "Signer UUID not configured in API client, cannot post."
                 )
-                reply_data = await self.reply_queue.get()
-                content = reply_data["content"]
-                reply_to_hash = reply_data["reply_to_hash"]
-                action_id = reply_data.get("action_id")
+            api_response = await self.api_client.publish_cast(
+                text=content,
+                signer_uuid=self.api_client.signer_uuid,
+                channel_id=channel_id,
+                embeds=embeds,
+            )
+            if "cast" in api_response and "hash" in api_response["cast"]:
+                cast_result_data = api_response["cast"]
                 logger.info(
-                    f"Dequeued scheduled reply to {reply_to_hash}: {content[:70]}..."
+                    f"Successfully sent scheduled post. Cast hash: {cast_result_data.get('hash')}"
+                )
+            else:
+                error_message = api_response.get(
+                    "message",
+                    f"Unknown error from API: {str(api_response)[:200]}",
                 )
-                cast_result_data: Optional[Dict[str, Any]] = None
-                error_message: Optional[str] = None
-                try:
-                    if not self.api_client.signer_uuid:
-                        raise ValueError(
-                            "Signer UUID not configured in API client, cannot reply."
-                        )
-                    api_response = await self.api_client.publish_cast(
-                        text=content,
-                        signer_uuid=self.api_client.signer_uuid,
-                        parent=reply_to_hash,
+                logger.error(f"Failed to send scheduled post: {error_message}")
+        except Exception as e:
+            error_message = str(e)
+            logger.error(f"Error sending scheduled post: {e}", exc_info=True)
+
+        if cast_result_data and cast_result_data.get("hash"):
+            self.outbound_queue.mark_sent(post_data["id"], cast_result_data["hash"])
+        else:
+            self.outbound_queue.mark_failed(post_data["id"], error_message or "unknown error")
+
+        if self.world_state_manager:
+            params_for_wsm = {"content": content, "channel": channel_id}
+            if cast_result_data and cast_result_data.get("hash"):
+                cast_hash = cast_result_data["hash"]
+                params_for_wsm["cast_hash"] = cast_hash
+                if action_id:
+                    self.world_state_manager.update_action_result(
+                        action_id, "success", cast_hash
                     )
-                    if "cast" in api_response and "hash" in api_response["cast"]:
-                        cast_result_data = api_response["cast"]
-                        logger.info(
-                            f"Successfully sent scheduled reply. Cast hash: {cast_result_data.get('hash')}"
-                        )
-                    else:
-                        error_message = api_response.get(
-                            "message",
-                            f"Unknown error from API: {str(api_response)[:200]}",
-                        )
-                        logger.error(f"Failed to send scheduled reply: {error_message}")
-                        self.replied_to_hashes.discard(reply_to_hash)
-                except Exception as e:
-                    error_message = str(e)
-                    logger.error(f"Error sending scheduled reply: {e}", exc_info=True)
-                    self.replied_to_hashes.discard(reply_to_hash)
-                if self.world_state_manager:
-                    params_for_wsm = {
-                        "content": content,
-                        "reply_to_hash": reply_to_hash,
-                    }
-                    if cast_result_data and cast_result_data.get("hash"):
-                        cast_hash = cast_result_data["hash"]
-                        params_for_wsm["cast_hash"] = cast_hash
-                        if action_id:
-                            self.world_state_manager.update_action_result(
-                                action_id, "success", cast_hash
-                            )
-                        else:
-                            self.world_state_manager.add_action_result(
-                                "send_farcaster_reply", params_for_wsm, "success"
-                            )
-                    else:
-                        result_status = f"failure: {error_message or 'unknown error'}"
-                        if action_id:
-                            self.world_state_manager.update_action_result(
-                                action_id, result_status
-                            )
-                        else:
-                            self.world_state_manager.add_action_result(
-                                "send_farcaster_reply", params_for_wsm, result_status
-                            )
-                self.reply_queue.task_done()
-                await asyncio.sleep(self.scheduler_interval)
-            except asyncio.CancelledError:
-                logger.info("Reply scheduler loop cancelled.")
-                break
-            except Exception as e:
-                logger.error(
-                    f"Unexpected error in reply scheduler loop: {e}", exc_info=True
+                else:
+                    self.world_state_manager.add_action_result(
+                        "send_farcaster_post", params_for_wsm, "success"
+                    )
+            else:
+                result_status = f"failure: {error_message or 'unknown error'}"
+                if action_id:
+                    self.world_state_manager.update_action_result(
+                        action_id, result_status
+                    )
+                else:
+                    self.world_state_manager.add_action_result(
+                        "send_farcaster_post", params_for_wsm, result_status
+                    )
+
+    async def _find_existing_bot_reply(self, reply_to_hash: str) -> Optional[str]:
+        """Return the hash of a bot reply already on Farcaster, if any (replay dedup)."""
+        bot_fid = self.api_client.bot_fid
+        if not bot_fid:
+            return None
+        try:
+            conversation = await self.api_client.lookup_cast_conversation(reply_to_hash)
+        except Exception as e:
+            logger.warning(f"Replay dedup lookup failed for {reply_to_hash}: {e}")
+            return None
+        thread = (conversation or {}).get("result", {}).get("conversation", {})
+        casts = list(thread.get("cast", {}).get("direct_replies", [])) + list(thread.get("casts", []))
+        for cast in casts:
+            if cast and str(cast.get("author", {}).get("fid")) == str(bot_fid):
+                return cast.get("hash") or "unknown"
+        return None
+
+    async def _deliver_reply(self, reply_data: Dict[str, Any]) -> None:
+        content = reply_data["content"]
+        reply_to_hash = reply_data["reply_to_hash"]
+        action_id = reply_data.get("action_id")
+        logger.info(
+            f"Dequeued scheduled reply to {reply_to_hash}: {content[:70]}..."
+        )
+        cast_result_data: Optional[Dict[str, Any]] = None
+        error_message: Optional[str] = None
+
+        # A replayed item may have been delivered before the crash; check the thread first
+        if reply_data.get("attempts", 1) > 1:
+            existing_hash = await self._find_existing_bot_reply(reply_to_hash)
+            if existing_hash:
+                logger.info(
+                    f"Replayed reply to {reply_to_hash} was already delivered as {existing_hash}; not resending."
                 )
-                await asyncio.sleep(5)
+                cast_result_data = {"hash": existing_hash}
+
+        try:
+            if cast_result_data is None:
+                if not self.api_client.signer_uuid:
+                    raise ValueError(
+                        "Signer UUID not configured in API client, cannot reply."
+                    )
+                api_response = await self.api_client.publish_cast(
+                    text=content,
+                    signer_uuid=self.api_client.signer_uuid,
+                    parent=reply_to_hash,
+                )
+                if "cast" in api_response and "hash" in api_response["cast"]:
+                    cast_result_data = api_response["cast"]
+                    logger.info(
+                        f"Successfully sent scheduled reply. Cast hash: {cast_result_data.get('hash')}"
+                    )
+                else:
+                    error_message = api_response.get(
+                        "message",
+                        f"Unknown error from API: {str(api_response)[:200]}",
+                    )
+                    logger.error(f"Failed to send scheduled reply: {error_message}")
+                    self.replied_to_hashes.discard(reply_to_hash)
+        except Exception as e:
+            error_message = str(e)
+            logger.error(f"Error sending scheduled reply: {e}", exc_info=True)
+            self.replied_to_hashes.discard(reply_to_hash)
+
+        if cast_result_data and cast_result_data.get("hash"):
+            self.outbound_queue.mark_sent(reply_data["id"], cast_result_data["hash"])
+        else:
+            self.outbound_queue.mark_failed(reply_data["id"], error_message or "unknown error")
+
+        if self.world_state_manager:
+            params_for_wsm = {
+                "content": content,
+                "reply_to_hash": reply_to_hash,
+            }
+            if cast_result_data and cast_result_data.get("hash"):
+                cast_hash = cast_result_data["hash"]
+                params_for_wsm["cast_hash"] = cast_hash
+                if action_id:
+                    self.world_state_manager.update_action_result(
+                        action_id, "success", cast_hash
+                    )
+                else:
+                    self.world_state_manager.add_action_result(
+                        "send_farcaster_reply", params_for_wsm, "success"
+                    )
+            else:
+                result_status = f"failure: {error_message or 'unknown error'}"
+                if action_id:
+                    self.world_state_manager.update_action_result(
+                        action_id, result_status
+                    )
+                else:
+                    self.world_state_manager.add_action_result(
+                        "send_farcaster_reply", params_for_wsm, result_status
+                    )
@@ -4,11 +4,16 @@ Neynar API Client for Farcaster
 
 This module provides a client for interacting with the Neynar Farcaster API.
 """
+import asyncio
 import logging
 from typing import Any, Dict, List, Optional
 
 import httpx
 
+from .neynar_cache import NeynarResponseCache
+from .neynar_rate_governor import NeynarRateGovernor, priority_for
+from .neynar_user_loader import NeynarUserLoader
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,6 +30,11 @@ class NeynarAPIClient:
         signer_uuid: Optional[str] = None,
         bot_fid: Optional[str] = None,
         base_url: Optional[str] = None,
+        cache_enabled: bool = True,
+        cache_max_entries: int = 1000,
+        cache_ttls: Optional[Dict[str, float]] = None,
+        rate_limit_per_minute: int = 300,
+        max_rate_limit_retries: int = 3,
     ):
         if not api_key:
             raise ValueError("API key is required for NeynarAPIClient.")
@@ -33,6 +43,22 @@ class NeynarAPIClient:
         self.bot_fid = bot_fid
         self.base_url = base_url or self.DEFAULT_BASE_URL
         self._client = httpx.AsyncClient(timeout=30.0)
+
+        # Read-through cache for idempotent GETs (None disables caching)
+        self.response_cache: Optional[NeynarResponseCache] = (
+            NeynarResponseCache(max_entries=cache_max_entries, endpoint_ttls=cache_ttls)
+            if cache_enabled
+            else None
+        )
+
+        # Client-side token bucket, corrected from rate limit headers
+        self.rate_governor = NeynarRateGovernor(
+            requests_per_minute=rate_limit_per_minute,
+            max_retries=max_rate_limit_retries,
+        )
+
+        # Micro-batches single-user lookups into bulk calls
+        self.user_loader = NeynarUserLoader(self)
         
         # Rate limit tracking
         self.rate_limit_info = {
@@ -57,17 +83,53 @@ class NeynarAPIClient:
         endpoint: str,
         params: Optional[Dict] = None,
         json_data: Optional[Dict] = None,
+    ) -> httpx.Response:
+        if self.response_cache and self.response_cache.is_cacheable(method, endpoint):
+            return await self.response_cache.get_or_fetch(
+                endpoint,
+                params,
+                lambda: self._send_request(method, endpoint, params, json_data),
+            )
+
+        response = await self._send_request(method, endpoint, params, json_data)
+        if self.response_cache and method.upper() != "GET":
+            self.response_cache.invalidate_for_write(endpoint)
+        return response
+
+    async def _send_request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        json_data: Optional[Dict] = None,
     ) -> httpx.Response:
         url = f"{self.base_url}{endpoint}"
         headers = self._get_headers(is_post=(method.upper() == "POST"))
+        priority = priority_for(method, endpoint)
         logger.debug(
             f"Making {method.upper()} request to {url} with params={params} json={json_data}"
         )
         try:
-            response = await self._client.request(
-                method, url, params=params, json=json_data, headers=headers
-            )
-            self._update_rate_limits(response)
+            attempt = 0
+            while True:
+                await self.rate_governor.acquire(priority)
+                response = await self._client.request(
+                    method, url, params=params, json=json_data, headers=headers
+                )
+                self._update_rate_limits(response)
+                if response.status_code != 429 or attempt >= self.rate_governor.max_retries:
+                    break
+
+                # A 429 means the request was rejected outright, so retrying is safe
+                self.rate_governor.record_throttled()
+                self.rate_governor.record_retry()
+                delay = self.rate_governor.backoff_delay(attempt, self._parse_retry_after(response))
+                logger.warning(
+                    f"Neynar rate limited {method.upper()} {endpoint}; retry {attempt + 1}/"
+                    f"{self.rate_governor.max_retries} in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+                attempt += 1
             response.raise_for_status()
             return response
         except httpx.HTTPStatusError as e:
@@ -79,6 +141,14 @@ class NeynarAPIClient:
             logger.error(f"Request error for {method.upper()} {url}: {e}")
             raise
 
+    @staticmethod
+    def _parse_retry_after(response: httpx.Response) -> Optional[float]:
+        value = response.headers.get("retry-after") or response.headers.get("x-ratelimit-retry-after")
+        try:
+            return float(value) if value else None
+        except ValueError:
+            return None
+
     def _update_rate_limits(self, response: httpx.Response):
         """
         Parse and store rate limit information from Neynar API response headers.
@@ -132,6 +202,11 @@ class NeynarAPIClient:
             if updated:
                 import time
                 self.rate_limit_info["last_updated_client"] = time.time()
+                self.rate_governor.update_from_headers(
+                    limit=int(limit_hdr) if limit_hdr else None,
+                    remaining=self.rate_limit_info["remaining"] if remaining_hdr else None,
+                    retry_after=self.rate_limit_info.get("retry_after") if retry_after_hdr else None,
+                )
                 logger.debug(f"NeynarAPIClient: Updated internal rate limits: {self.rate_limit_info}")
 
         except (ValueError, TypeError) as e:
@@ -139,6 +214,16 @@ class NeynarAPIClient:
         except Exception as e:
             logger.error(f"NeynarAPIClient: Unexpected error updating rate limits: {e}", exc_info=True)
 
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Return response cache hit rates, or a disabled marker."""
+        if not self.response_cache:
+            return {"enabled": False}
+        return {"enabled": True, **self.response_cache.get_stats()}
+
+    def get_rate_governor_status(self) -> Dict[str, Any]:
+        """Return the client-side rate governor's budget and queueing counters."""
+        return self.rate_governor.get_status()
+
     async def get_casts_by_fid(
         self, fid: int, limit: int = 25, include_replies: bool = True
     ) -> Dict[str, Any]:
@@ -484,6 +569,17 @@ class NeynarAPIClient:
         response = await self._make_request("GET", "/farcaster/user/bulk", params=params)
         return response.json()
 
+    async def get_user_by_fid(self, fid: int) -> Optional[Dict[str, Any]]:
+        """
+        Fetch a single user's details. Concurrent lookups are batched into one
+        bulk users call, so prefer this over looping get_user_details_for_fids.
+        """
+        return await self.user_loader.load(fid)
+
+    async def get_users_by_fids(self, fids: List[int]) -> Dict[int, Optional[Dict[str, Any]]]:
+        """Fetch many users keyed by fid, chunked to the bulk endpoint limit."""
+        return await self.user_loader.load_many(fids)
+
     async def get_relevant_fungible_owners(
         self,
         contract_address: str,
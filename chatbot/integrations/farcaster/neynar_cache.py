@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Neynar Response Cache
+
+Read-through cache for idempotent Neynar GET requests with per-endpoint TTLs,
+size-bounded LRU eviction and single-flight coalescing of concurrent
+identical requests.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+# Seconds each endpoint's responses stay fresh. Endpoints not listed here are
+# never cached (feeds, notifications and search results change constantly).
+DEFAULT_ENDPOINT_TTLS: Dict[str, float] = {
+    "/farcaster/cast": 120.0,
+    "/farcaster/cast/conversation": 15.0,
+    "/farcaster/user/by-username": 600.0,
+    "/farcaster/user/bulk": 300.0,
+}
+
+# Writes to these endpoints invalidate cached reads of the listed endpoints,
+# so duplicate detection never looks at a conversation the bot just replied to.
+INVALIDATED_BY_WRITES: Dict[str, Tuple[str, ...]] = {
+    "/farcaster/cast": ("/farcaster/cast", "/farcaster/cast/conversation"),
+    "/farcaster/reaction": ("/farcaster/cast", "/farcaster/cast/conversation"),
+    "/farcaster/user/follow": ("/farcaster/user/bulk", "/farcaster/user/by-username"),
+    "/farcaster/user/unfollow": ("/farcaster/user/bulk", "/farcaster/user/by-username"),
+}
+
+
+class NeynarResponseCache:
+    """
+    LRU + TTL cache keyed by endpoint and query parameters.
+
+    Concurrent callers asking for the same key while a fetch is in flight
+    await the same future instead of issuing duplicate API calls.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        endpoint_ttls: Optional[Dict[str, float]] = None,
+    ):
+        self.max_entries = max_entries
+        self.endpoint_ttls = dict(DEFAULT_ENDPOINT_TTLS if endpoint_ttls is None else endpoint_ttls)
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[CacheKey, asyncio.Future] = {}
+        self._stats: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0}
+        )
+
+    def is_cacheable(self, method: str, endpoint: str) -> bool:
+        """Only GETs against endpoints with a positive TTL are cached."""
+        return method.upper() == "GET" and self.endpoint_ttls.get(endpoint, 0) > 0
+
+    @staticmethod
+    def make_key(endpoint: str, params: Optional[Dict[str, Any]]) -> CacheKey:
+        items = tuple(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+        return endpoint, items
+
+    async def get_or_fetch(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        fetch: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Return a fresh cached value or run ``fetch`` once for all concurrent callers."""
+        key = self.make_key(endpoint, params)
+        stats = self._stats[endpoint]
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                stats["hits"] += 1
+                return value
+            del self._entries[key]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            stats["coalesced"] += 1
+            # Shield so one cancelled waiter does not cancel the shared fetch
+            return await asyncio.shield(inflight)
+
+        stats["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await fetch()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an exception nobody else awaited is not logged
+            future.exception()
+            raise
+        else:
+            self._store(key, endpoint, value)
+            future.set_result(value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def _store(self, key: CacheKey, endpoint: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.endpoint_ttls[endpoint], value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted_key, _ = self._entries.popitem(last=False)
+            self._stats[evicted_key[0]]["evictions"] += 1
+
+    def invalidate_endpoint(self, endpoint: str) -> int:
+        """Drop every cached response for an endpoint. Returns the number removed."""
+        stale = [key for key in self._entries if key[0] == endpoint]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
+    def invalidate_for_write(self, endpoint: str) -> None:
+        """Invalidate reads that a successful write to ``endpoint`` may have changed."""
+        for target in INVALIDATED_BY_WRITES.get(endpoint, ()):
+            removed = self.invalidate_endpoint(target)
+            if removed:
+                logger.debug(f"NeynarResponseCache: Invalidated {removed} entries for {target} after write to {endpoint}")
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters per endpoint plus overall hit rate."""
+        endpoints = {}
+        total_hits = total_lookups = 0
+        for endpoint, counters in self._stats.items():
+            served = counters["hits"] + counters["coalesced"]
+            lookups = served + counters["misses"]
+            total_hits += served
+            total_lookups += lookups
+            endpoints[endpoint] = {
+                **counters,
+                "hit_rate": round(served / lookups, 4) if lookups else 0.0,
+            }
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "inflight": len(self._inflight),
+            "hit_rate": round(total_hits / total_lookups, 4) if total_lookups else 0.0,
+            "api_calls_saved": total_hits,
+            "endpoints": endpoints,
+        }
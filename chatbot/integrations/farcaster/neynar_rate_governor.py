@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Neynar Rate Governor
+
+Client-side token bucket for the Neynar API. The bucket is seeded from a
+configured per-minute budget and continuously corrected from the
+``x-ratelimit-*`` / ``retry-after`` response headers. Requests are grouped
+into priority classes so that replies and mention handling keep flowing
+while background polls queue up once the remaining budget runs low.
+"""
+import asyncio
+import logging
+import random
+import time
+from enum import IntEnum
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RequestPriority(IntEnum):
+    """Lower values are served first."""
+
+    CRITICAL = 0  # Publishing, replies, mentions, reply duplicate checks
+    NORMAL = 1  # Tool-driven lookups
+    BACKGROUND = 2  # Trending feeds, holder polls, periodic collection
+
+
+# Default priority per GET endpoint; writes are always CRITICAL
+ENDPOINT_PRIORITIES: Dict[str, RequestPriority] = {
+    "/farcaster/notifications": RequestPriority.CRITICAL,
+    "/farcaster/cast/conversation": RequestPriority.CRITICAL,
+    "/farcaster/feed": RequestPriority.BACKGROUND,
+    "/farcaster/feed/channels": RequestPriority.BACKGROUND,
+    "/farcaster/fungible/owner/relevant": RequestPriority.BACKGROUND,
+    "/farcaster/user/balance": RequestPriority.BACKGROUND,
+}
+
+# Fraction of the bucket each class must leave untouched for higher classes
+RESERVED_FRACTION: Dict[RequestPriority, float] = {
+    RequestPriority.CRITICAL: 0.0,
+    RequestPriority.NORMAL: 0.1,
+    RequestPriority.BACKGROUND: 0.3,
+}
+
+
+def priority_for(method: str, endpoint: str) -> RequestPriority:
+    """Classify a request by method and endpoint."""
+    if method.upper() != "GET":
+        return RequestPriority.CRITICAL
+    return ENDPOINT_PRIORITIES.get(endpoint, RequestPriority.NORMAL)
+
+
+class NeynarRateGovernor:
+    """
+    Token bucket with priority admission.
+
+    A request of a given priority is admitted once at least one token is
+    available above that class's reserve and no higher-priority request is
+    waiting. Header updates overwrite the local estimate, so drift between
+    the client and Neynar's view is corrected on every response.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = 300,
+        window_seconds: float = 60.0,
+        max_retries: int = 3,
+        retry_base_delay: float = 1.0,
+        retry_max_delay: float = 60.0,
+    ):
+        self.capacity = float(requests_per_minute)
+        self.window_seconds = window_seconds
+        self.refill_rate = self.capacity / window_seconds
+        self.tokens = self.capacity
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiting: Dict[RequestPriority, int] = {p: 0 for p in RequestPriority}
+        self._condition = asyncio.Condition()
+        self.stats: Dict[str, Any] = {
+            "admitted": {p.name.lower(): 0 for p in RequestPriority},
+            "queued": {p.name.lower(): 0 for p in RequestPriority},
+            "total_wait_seconds": 0.0,
+            "throttled_responses": 0,
+            "retries": 0,
+        }
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_rate)
+            self._last_refill = now
+
+    def _can_admit(self, priority: RequestPriority) -> bool:
+        if time.monotonic() < self._blocked_until:
+            return False
+        if any(self._waiting[p] for p in RequestPriority if p < priority):
+            return False
+        reserve = self.capacity * RESERVED_FRACTION[priority]
+        return self.tokens - reserve >= 1.0
+
+    def _seconds_until_admissible(self, priority: RequestPriority) -> float:
+        now = time.monotonic()
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        deficit = 1.0 + self.capacity * RESERVED_FRACTION[priority] - self.tokens
+        return max(deficit / self.refill_rate, 0.01) if self.refill_rate > 0 else 1.0
+
+    async def acquire(self, priority: RequestPriority = RequestPriority.NORMAL) -> None:
+        """Wait until a request of ``priority`` may be sent and consume one token."""
+        async with self._condition:
+            self._refill()
+            if self._can_admit(priority):
+                self.tokens -= 1.0
+                self.stats["admitted"][priority.name.lower()] += 1
+                return
+
+            started = time.monotonic()
+            self._waiting[priority] += 1
+            self.stats["queued"][priority.name.lower()] += 1
+            try:
+                while True:
+                    delay = self._seconds_until_admissible(priority)
+                    try:
+                        # Woken early when a higher-priority request leaves the queue
+                        await asyncio.wait_for(self._condition.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    self._refill()
+                    if self._can_admit(priority):
+                        break
+            finally:
+                self._waiting[priority] -= 1
+                self._condition.notify_all()
+
+            self.tokens -= 1.0
+            self.stats["admitted"][priority.name.lower()] += 1
+            self.stats["total_wait_seconds"] += time.monotonic() - started
+
+    def update_from_headers(
+        self,
+        limit: Optional[int] = None,
+        remaining: Optional[int] = None,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        """
+        Correct the local bucket from rate limit response headers.
+
+        Queued requests pick the new budget up when their current wait expires.
+        """
+        self._refill()
+        if limit:
+            self.capacity = float(limit)
+            self.refill_rate = self.capacity / self.window_seconds
+        if remaining is not None:
+            # Neynar's count is authoritative for the current window
+            self.tokens = min(float(remaining), self.capacity)
+        if retry_after:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Jittered exponential backoff for a 429, never shorter than retry-after."""
+        exponential = min(self.retry_max_delay, self.retry_base_delay * (2 ** attempt))
+        delay = random.uniform(exponential / 2, exponential)
+        if retry_after:
+            delay = max(delay, retry_after)
+        return delay
+
+    def record_throttled(self) -> None:
+        self.stats["throttled_responses"] += 1
+
+    def record_retry(self) -> None:
+        self.stats["retries"] += 1
+
+    def get_status(self) -> Dict[str, Any]:
+        self._refill()
+        return {
+            "capacity": self.capacity,
+            "tokens": round(self.tokens, 2),
+            "blocked_for_seconds": round(max(0.0, self._blocked_until - time.monotonic()), 2),
+            "waiting": {p.name.lower(): n for p, n in self._waiting.items()},
+            **self.stats,
+        }
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Neynar User Loader
+
+DataLoader-style micro-batcher for Farcaster user lookups. Individual fid
+lookups issued within a short window are collected and resolved with a single
+call to the bulk users endpoint.
+"""
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Set
+
+if TYPE_CHECKING:
+    from .neynar_api_client import NeynarAPIClient
+
+logger = logging.getLogger(__name__)
+
+# Neynar's /farcaster/user/bulk accepts at most 100 fids per request
+MAX_BULK_USER_FIDS = 100
+
+
+class NeynarUserLoader:
+    """
+    Collects fid lookups for ``batch_window`` seconds (or until
+    ``max_batch_size`` fids are pending) and fans one bulk response back out
+    to every waiting caller.
+    """
+
+    def __init__(
+        self,
+        api_client: "NeynarAPIClient",
+        batch_window: float = 0.05,
+        max_batch_size: int = MAX_BULK_USER_FIDS,
+    ):
+        self.api_client = api_client
+        self.batch_window = batch_window
+        self.max_batch_size = min(max_batch_size, MAX_BULK_USER_FIDS)
+        self._pending: Dict[int, List[asyncio.Future]] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks: Set[asyncio.Task] = set()
+        self.stats = {"lookups": 0, "bulk_calls": 0, "fids_fetched": 0}
+
+    async def load(self, fid: int) -> Optional[Dict[str, Any]]:
+        """Resolve one fid to its Neynar user object, or None if unknown."""
+        fid = int(fid)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(fid, []).append(future)
+        self.stats["lookups"] += 1
+
+        if len(self._pending) >= self.max_batch_size:
+            self._dispatch()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._dispatch)
+
+        return await future
+
+    async def load_many(self, fids: Iterable[int]) -> Dict[int, Optional[Dict[str, Any]]]:
+        """Resolve several fids at once, sharing bulk calls with any concurrent lookups."""
+        unique_fids = list(dict.fromkeys(int(fid) for fid in fids))
+        results = await asyncio.gather(
+            *(self.load(fid) for fid in unique_fids), return_exceptions=True
+        )
+        users: Dict[int, Optional[Dict[str, Any]]] = {}
+        for fid, result in zip(unique_fids, results):
+            if isinstance(result, Exception):
+                logger.warning(f"NeynarUserLoader: Lookup failed for fid {fid}: {result}")
+                users[fid] = None
+            else:
+                users[fid] = result
+        return users
+
+    def _dispatch(self) -> None:
+        """Hand all pending fids to a background flush, in bulk-sized chunks."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, {}
+        fids = list(pending)
+        for start in range(0, len(fids), self.max_batch_size):
+            chunk = {fid: pending[fid] for fid in fids[start:start + self.max_batch_size]}
+            task = asyncio.create_task(self._flush(chunk))
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush(self, batch: Dict[int, List[asyncio.Future]]) -> None:
+        fids = list(batch)
+        self.stats["bulk_calls"] += 1
+        self.stats["fids_fetched"] += len(fids)
+        try:
+            response = await self.api_client.get_user_details_for_fids(fids)
+        except Exception as e:
+            logger.error(f"NeynarUserLoader: Bulk lookup of {len(fids)} fids failed: {e}")
+            for futures in batch.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        users_by_fid = {
+            int(user["fid"]): user
+            for user in (response or {}).get("users", [])
+            if user.get("fid") is not None
+        }
+        for fid, futures in batch.items():
+            for future in futures:
+                if not future.done():
+                    future.set_result(users_by_fid.get(fid))
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Matrix Join Executor
+
+Runs room joins and invite acceptances with bounded concurrency. Homeservers
+rate limit joins aggressively; when one returns ``M_LIMIT_EXCEEDED`` the
+executor honours its ``retry_after_ms`` and pauses every worker until the
+window has passed, instead of letting the other in-flight joins hit the
+same limit.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_ERRCODE = "M_LIMIT_EXCEEDED"
+
+JoinFn = Callable[[str], Awaitable[Any]]
+
+
+def is_rate_limited(response: Any) -> bool:
+    """True if a nio response is an M_LIMIT_EXCEEDED error"""
+    return getattr(response, "status_code", None) == RATE_LIMIT_ERRCODE
+
+
+class MatrixJoinExecutor:
+    """Bounded-concurrency join runner with shared rate-limit backoff."""
+
+    def __init__(
+        self,
+        join: JoinFn,
+        concurrency: int = 4,
+        max_retries: int = 5,
+        default_retry_after: float = 1.0,
+        max_retry_after: float = 60.0,
+    ):
+        self.join_fn = join
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+        self.default_retry_after = default_retry_after
+        self.max_retry_after = max_retry_after
+
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._blocked_until = 0.0
+        self.stats: Dict[str, int] = {
+            "joined": 0,
+            "failed": 0,
+            "rate_limited": 0,
+            "in_flight": 0,
+        }
+
+    async def join(self, room_identifier: str) -> Any:
+        """Join one room, retrying after rate limits; returns the last response"""
+        attempt = 0
+        while True:
+            async with self._semaphore:
+                await self._wait_for_backoff()
+                self.stats["in_flight"] += 1
+                try:
+                    response = await self.join_fn(room_identifier)
+                finally:
+                    self.stats["in_flight"] -= 1
+
+            if not is_rate_limited(response):
+                key = "joined" if hasattr(response, "room_id") else "failed"
+                self.stats[key] += 1
+                return response
+
+            self.stats["rate_limited"] += 1
+            if attempt >= self.max_retries:
+                logger.warning(
+                    f"MatrixJoinExecutor: Giving up on {room_identifier} after {attempt} rate-limited retries"
+                )
+                self.stats["failed"] += 1
+                return response
+
+            delay = self._retry_delay(response)
+            logger.info(
+                f"MatrixJoinExecutor: Rate limited joining {room_identifier}, retrying in {delay:.1f}s"
+            )
+            self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+            attempt += 1
+
+    async def join_many(self, room_identifiers: Iterable[str]) -> Dict[str, Any]:
+        """Join several rooms concurrently; maps identifier to response or exception"""
+        identifiers = list(dict.fromkeys(room_identifiers))
+        results = await asyncio.gather(
+            *(self.join(identifier) for identifier in identifiers),
+            return_exceptions=True,
+        )
+        return dict(zip(identifiers, results))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "concurrency": self.concurrency,
+            "backoff_remaining": max(0.0, self._blocked_until - time.monotonic()),
+        }
+
+    def _retry_delay(self, response: Any) -> float:
+        retry_after_ms = getattr(response, "retry_after_ms", None)
+        if retry_after_ms is None:
+            return self.default_retry_after
+        return min(retry_after_ms / 1000.0, self.max_retry_after)
+
+    async def _wait_for_backoff(self) -> None:
+        # Re-check after sleeping: another worker may have extended the window
+        while True:
+            remaining = self._blocked_until - time.monotonic()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(remaining)
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Matrix Media Pipeline
+
+Moves Matrix image handling (download, dedup, Arweave upload) off the sync
+callback path. ``MatrixObserver._on_message`` ingests the message right away
+with a pending-media marker and submits a job here; a bounded pool of
+workers fetches and uploads the media with retry, then patches the
+Message's ``image_urls`` in place and calls ``on_complete`` so the owner can
+bump the world state version for the patched message.
+
+Uploads are deduplicated by mxc URI and by a SHA-256 hash of the content, so
+the same image re-posted across rooms is uploaded once.
+"""
+
+import asyncio
+import hashlib
+import logging
+import random
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ...core.world_state import Message
+
+logger = logging.getLogger(__name__)
+
+MEDIA_PENDING = "pending"
+MEDIA_READY = "ready"
+MEDIA_FALLBACK = "fallback"
+MEDIA_FAILED = "failed"
+
+FetchFn = Callable[[str], Awaitable[Optional[Tuple[bytes, str]]]]
+UploadFn = Callable[[bytes, str], Awaitable[Optional[str]]]
+FallbackFn = Callable[[str], Awaitable[Optional[str]]]
+CompleteFn = Callable[[Message], None]
+
+
+@dataclass
+class MediaJob:
+    message: Message
+    mxc_uri: str
+
+
+class MatrixMediaPipeline:
+    """Background worker pool that resolves Matrix mxc URIs to public URLs."""
+
+    def __init__(
+        self,
+        fetch: FetchFn,
+        upload: UploadFn,
+        fallback_url: Optional[FallbackFn] = None,
+        on_complete: Optional[CompleteFn] = None,
+        concurrency: int = 3,
+        max_retries: int = 3,
+        retry_base_delay: float = 1.0,
+        max_cached_urls: int = 1000,
+    ):
+        self.fetch = fetch
+        self.upload = upload
+        self.fallback_url = fallback_url
+        self.on_complete = on_complete
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.max_cached_urls = max_cached_urls
+
+        self._queue: "asyncio.Queue[MediaJob]" = asyncio.Queue()
+        self._workers: List[asyncio.Task] = []
+        self._url_by_mxc: "OrderedDict[str, str]" = OrderedDict()
+        self._url_by_hash: "OrderedDict[str, str]" = OrderedDict()
+        self.stats: Dict[str, int] = {
+            "submitted": 0,
+            "uploaded": 0,
+            "deduplicated": 0,
+            "fallback": 0,
+            "failed": 0,
+            "retries": 0,
+        }
+
+    def submit(self, message: Message, mxc_uri: str) -> None:
+        """Mark ``message`` as waiting for media and queue the work."""
+        message.metadata["media_status"] = MEDIA_PENDING
+        message.metadata["pending_media"] = mxc_uri
+        self.stats["submitted"] += 1
+
+        cached = self._url_by_mxc.get(mxc_uri)
+        if cached:
+            self._url_by_mxc.move_to_end(mxc_uri)
+            self.stats["deduplicated"] += 1
+            self._complete(message, cached, MEDIA_READY)
+            return
+
+        self._ensure_workers()
+        self._queue.put_nowait(MediaJob(message, mxc_uri))
+
+    async def drain(self) -> None:
+        """Wait until every submitted job has finished."""
+        await self._queue.join()
+
+    async def stop(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        for task in self._workers:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._workers = []
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "queued": self._queue.qsize(),
+            "workers": len([t for t in self._workers if not t.done()]),
+            "cached_urls": len(self._url_by_hash),
+        }
+
+    def _ensure_workers(self) -> None:
+        self._workers = [t for t in self._workers if not t.done()]
+        while len(self._workers) < self.concurrency:
+            self._workers.append(asyncio.create_task(self._worker()))
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._process(job)
+            except Exception as e:
+                logger.error(f"MatrixMediaPipeline: Unexpected error for {job.mxc_uri}: {e}", exc_info=True)
+                self.stats["failed"] += 1
+                self._complete(job.message, None, MEDIA_FAILED)
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, job: MediaJob) -> None:
+        # A duplicate submitted while the first copy was in flight
+        cached = self._url_by_mxc.get(job.mxc_uri)
+        if cached:
+            self.stats["deduplicated"] += 1
+            self._complete(job.message, cached, MEDIA_READY)
+            return
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.stats["retries"] += 1
+                delay = self.retry_base_delay * (2 ** (attempt - 1))
+                await asyncio.sleep(random.uniform(delay / 2, delay))
+            try:
+                url = await self._fetch_and_upload(job.mxc_uri)
+            except Exception as e:
+                logger.warning(
+                    f"MatrixMediaPipeline: Attempt {attempt + 1} for {job.mxc_uri} failed: {e}"
+                )
+                continue
+            if url:
+                self._remember(self._url_by_mxc, job.mxc_uri, url)
+                self._complete(job.message, url, MEDIA_READY)
+                return
+
+        fallback = None
+        if self.fallback_url:
+            try:
+                fallback = await self.fallback_url(job.mxc_uri)
+            except Exception as e:
+                logger.warning(f"MatrixMediaPipeline: MXC to HTTP conversion failed for {job.mxc_uri}: {e}")
+        if fallback:
+            self.stats["fallback"] += 1
+            logger.info(f"MatrixMediaPipeline: Using HTTP fallback URL: {fallback}")
+            self._complete(job.message, fallback, MEDIA_FALLBACK)
+        else:
+            self.stats["failed"] += 1
+            self._complete(job.message, None, MEDIA_FAILED)
+
+    async def _fetch_and_upload(self, mxc_uri: str) -> Optional[str]:
+        downloaded = await self.fetch(mxc_uri)
+        if not downloaded:
+            raise RuntimeError("download failed")
+        data, content_type = downloaded
+
+        content_hash = hashlib.sha256(data).hexdigest()
+        cached = self._url_by_hash.get(content_hash)
+        if cached:
+            self._url_by_hash.move_to_end(content_hash)
+            self.stats["deduplicated"] += 1
+            return cached
+
+        url = await self.upload(data, content_type)
+        if not url:
+            raise RuntimeError("upload returned no URL")
+        self.stats["uploaded"] += 1
+        self._remember(self._url_by_hash, content_hash, url)
+        logger.info(f"MatrixMediaPipeline: Uploaded Matrix image {mxc_uri} to {url}")
+        return url
+
+    def _remember(self, cache: "OrderedDict[str, str]", key: str, url: str) -> None:
+        cache[key] = url
+        cache.move_to_end(key)
+        while len(cache) > self.max_cached_urls:
+            cache.popitem(last=False)
+
+    def _complete(self, message: Message, url: Optional[str], status: str) -> None:
+        if url:
+            message.image_urls = [url]
+        message.metadata["media_status"] = status
+        message.metadata.pop("pending_media", None)
+        if self.on_complete:
+            try:
+                self.on_complete(message)
+            except Exception as e:
+                logger.warning(f"MatrixMediaPipeline: Completion callback failed for {message.id}: {e}")
@@ -12,7 +12,7 @@ import logging
 import os
 import time
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import httpx
 from dotenv import load_dotenv
@@ -20,23 +20,74 @@ from nio import (
     AsyncClient,
     LoginResponse,
     MatrixRoom,
+    PowerLevelsEvent,
     RoomMessageImage,
     RoomMessageText,
-    RoomSendError,
+    RoomNameEvent,
     RoomSendResponse,
+    RoomTopicEvent,
+    SyncResponse,
+    UploadFilterResponse,
 )
 
 from ...config import settings
 from ...core.world_state import Channel, Message, WorldStateManager
 from ..base import Integration, IntegrationError, IntegrationConnectionError
+from .join_executor import MatrixJoinExecutor
+from .media_pipeline import MatrixMediaPipeline
+from .room_sender import MatrixRoomSender, describe_failure
 
 logger = logging.getLogger(__name__)
 load_dotenv()
 
+# Server-side sync filter: only the event types consumed by _on_message,
+# _on_invite and _on_membership_change, with lazy-loaded membership so large
+# rooms don't ship every member event on each full-state sync.
+SYNC_FILTER: Dict[str, Any] = {
+    "presence": {"types": []},
+    "account_data": {"types": []},
+    "room": {
+        "state": {
+            "lazy_load_members": True,
+            "types": [
+                "m.room.create",
+                "m.room.name",
+                "m.room.topic",
+                "m.room.avatar",
+                "m.room.canonical_alias",
+                "m.room.join_rules",
+                "m.room.power_levels",
+                "m.room.encryption",
+                "m.room.member",
+            ],
+        },
+        "timeline": {
+            "lazy_load_members": True,
+            "limit": 20,
+            # m.room.encrypted is decrypted by nio into the message types above.
+            # nio only runs event callbacks for timeline events, so the state
+            # changes that refresh cached room details must be let through too
+            "types": [
+                "m.room.message",
+                "m.room.encrypted",
+                "m.room.member",
+                "m.room.name",
+                "m.room.topic",
+                "m.room.power_levels",
+            ],
+        },
+        "ephemeral": {"types": []},
+        "account_data": {"types": []},
+    },
+}
+
 
 class MatrixObserver(Integration):
     """Observes Matrix channels and reports to world state"""
 
+    SYNC_TOKEN_SAVE_INTERVAL = 5.0  # seconds between since-token flushes
+    INVITE_ACCEPT_DEBOUNCE = 2.0  # seconds to collect an invite burst before bulk accepting
+
     def __init__(self, integration_id: str = "matrix", display_name: str = "Matrix Integration", 
                  config: Dict[str, Any] = None, world_state_manager: WorldStateManager = None, 
                  arweave_client=None):
@@ -64,6 +115,49 @@ class MatrixObserver(Integration):
         # Create store directory for Matrix client data
         self.store_path = Path("matrix_store")
         self.store_path.mkdir(parents=True, exist_ok=True)
+
+        # Incremental sync state, persisted next to matrix_token.json
+        self.sync_token_file = Path("matrix_sync_token.json")
+        self._sync_token: Optional[str] = None
+        self._sync_token_saved_at = 0.0
+        self._sync_token_restored = False
+        self._sync_filter_id: Optional[str] = None
+
+        # Per-room metadata, refreshed by state events rather than per message
+        self._room_details_cache: Dict[str, Dict[str, Any]] = {}
+
+        # Catch-up mode: backlog from the first sync after (re)connecting is
+        # buffered and ingested as one batch with a single state-change trigger
+        self.on_state_change: Optional[callable] = None
+        self._catching_up = False
+        self._catch_up_buffer: List[Message] = []
+        self._last_catch_up: Dict[str, Any] = {}
+
+        # Image download/upload runs off the sync callback path
+        self.media_pipeline = MatrixMediaPipeline(
+            fetch=self._download_media,
+            upload=self._upload_media,
+            fallback_url=self._media_fallback_url,
+            on_complete=self._on_media_complete,
+            concurrency=settings.MATRIX_MEDIA_WORKERS,
+            max_retries=settings.MATRIX_MEDIA_MAX_RETRIES,
+        )
+
+        # Joins and invite acceptances share one rate-limit-aware executor
+        self.join_executor = MatrixJoinExecutor(
+            join=self._client_join,
+            concurrency=settings.MATRIX_JOIN_CONCURRENCY,
+            max_retries=settings.MATRIX_JOIN_MAX_RETRIES,
+        )
+        self._invite_accept_task: Optional[asyncio.Task] = None
+
+        # Bot messages are shaped to the homeserver rate limit per room
+        self.room_sender = MatrixRoomSender(
+            send=self._room_send,
+            messages_per_second=settings.MATRIX_SEND_RATE_PER_SECOND,
+            burst=settings.MATRIX_SEND_BURST,
+            coalesce_window=settings.MATRIX_SEND_COALESCE_WINDOW,
+        )
         
         # Check for Matrix configuration - disable if not available
         self._enabled = all([self.homeserver, self.user_id, self.password])
@@ -104,15 +198,7 @@ class MatrixObserver(Integration):
             store_path=str(self.store_path),
         )
 
-        # Set up event callbacks
-        self.client.add_event_callback(self._on_message, RoomMessageText)
-        self.client.add_event_callback(self._on_message, RoomMessageImage)
-
-        # Import required Matrix event types
-        from nio import InviteMemberEvent, RoomMemberEvent
-
-        self.client.add_event_callback(self._on_invite, InviteMemberEvent)
-        self.client.add_event_callback(self._on_membership_change, RoomMemberEvent)
+        self._register_callbacks()
 
         try:
             # Try to load saved token
@@ -138,26 +224,11 @@ class MatrixObserver(Integration):
             self.world_state.update_system_status({"matrix_connected": True})
 
             # Join channels we want to monitor
-            for channel_id in self.channels_to_monitor:
-                try:
-                    response = await self.client.join(channel_id)
-                    logger.info(f"MatrixObserver: Joined channel {channel_id}")
-
-                    # If we joined by alias, update our monitoring list with the real room ID
-                    if hasattr(response, "room_id") and response.room_id != channel_id:
-                        logger.info(
-                            f"MatrixObserver: Room alias {channel_id} resolved to {response.room_id}"
-                        )
-                        # Add the real room ID to our world state
-                        self.world_state.add_channel(
-                            response.room_id, "matrix", f"Room {response.room_id}"
-                        )
-
-                except Exception as e:
-                    logger.warning(f"MatrixObserver: Failed to join {channel_id}: {e}")
+            await self._join_configured_rooms()
 
             # Start syncing in background task
             logger.info("MatrixObserver: Starting sync...")
+            self._begin_catch_up()
             self.sync_task = asyncio.create_task(self._sync_forever())
             logger.info("MatrixObserver: Sync task started successfully")
             self._connected = True
@@ -181,6 +252,14 @@ class MatrixObserver(Integration):
             except asyncio.CancelledError:
                 pass
             self.sync_task = None
+
+        self._finish_catch_up()
+        self._save_sync_token()
+        await self.media_pipeline.stop()
+        await self.room_sender.stop()
+        if self._invite_accept_task:
+            self._invite_accept_task.cancel()
+            self._invite_accept_task = None
             
         if self.client:
             await self.client.close()
@@ -205,7 +284,14 @@ class MatrixObserver(Integration):
             "homeserver": self.homeserver,
             "user_id": self.user_id,
             "channels_monitored": len(self.channels_to_monitor),
-            "sync_task_running": self.sync_task is not None and not self.sync_task.done()
+            "sync_task_running": self.sync_task is not None and not self.sync_task.done(),
+            "sync_token_restored": self._sync_token_restored,
+            "sync_filter": "uploaded" if self._sync_filter_id else "inline",
+            "media_pipeline": self.media_pipeline.get_stats(),
+            "join_executor": self.join_executor.get_stats(),
+            "room_sender": self.room_sender.get_stats(),
+            "catching_up": self._catching_up,
+            "last_catch_up": self._last_catch_up,
         }
 
     async def test_connection(self) -> bool:
@@ -262,18 +348,24 @@ class MatrixObserver(Integration):
             # Fallback to default WorldStateManager if not provided
             from ...core.world_state import WorldStateManager
             self.world_state = WorldStateManager()
-        # Skip our own messages
+        reply_to, thread_root = self._extract_relations(event)
+
+        # Skip our own messages, but keep the reply index aware of them
         if event.sender == self.user_id:
+            if reply_to:
+                self.world_state.record_matrix_reply(
+                    room.room_id, reply_to, event.event_id, event.sender
+                )
             return
 
-        # Extract comprehensive room details
-        room_details = self._extract_room_details(room)
+        # Room details are cached; state events keep them current
+        room_details, refreshed = self._get_room_details_cached(room)
 
         # Auto-register room if not known
         if room.room_id not in self.world_state.state.channels:
             logger.info(f"MatrixObserver: Auto-registering room {room.room_id}")
             self._register_room(room.room_id, room_details)
-        else:
+        elif refreshed:
             # Update existing room details
             self._update_room_details(room.room_id, room_details)
 
@@ -281,72 +373,22 @@ class MatrixObserver(Integration):
             f"MatrixObserver: Processing message from {room.room_id} ({room.display_name})"
         )
 
-        # Detect image URLs
-        image_urls_list = []
         content = ""
 
         # Handle image messages (detect by presence of URL attribute)
+        pending_mxc_uri = None
         if hasattr(event, 'url'):
-            # Handle image messages
+            # Handle image messages; media is resolved by the pipeline after ingestion
             mxc_uri = event.url
             if mxc_uri and self.client:  # Ensure client is available
-                try:
-                    # Check if client is authenticated
-                    if not self.client.access_token:
-                        logger.warning(
-                            f"MatrixObserver: Client not authenticated, cannot download {mxc_uri}"
-                        )
-                    else:
-                        # Use nio client's built-in download method which handles authentication
-                        download_response = await self.client.download(mxc_uri)
-
-                        if hasattr(download_response, "body") and download_response.body:
-                            # Upload Matrix image data directly to Arweave for permanent access
-                            original_filename = getattr(event, "body", "matrix_image.jpg")
-
-                            # Use the content-type from download response if available
-                            content_type = getattr(
-                                download_response, "content_type", "image/jpeg"
-                            )
-
-                            if self.arweave_client:
-                                arweave_tx_id = await self.arweave_client.upload_data(
-                                    download_response.body, content_type, tags={"source": "matrix"}
-                                )
-                                if arweave_tx_id:
-                                    arweave_url = self.arweave_client.get_arweave_url(arweave_tx_id)
-                                    image_urls_list.append(arweave_url)
-                                    logger.info(
-                                        f"MatrixObserver: Uploaded Matrix image to Arweave: {arweave_url}"
-                                    )
-                                else:
-                                    logger.warning("Failed to upload Matrix media to Arweave, no URL available.")
-                            else:
-                                logger.warning("Arweave client not configured, cannot upload Matrix media.")
-                        else:
-                            # Enhanced error logging
-                            error_type = type(download_response).__name__
-                            error_details = getattr(download_response, 'message', str(download_response))
-                            logger.warning(
-                                f"MatrixObserver: Failed to download Matrix image {mxc_uri}: {error_type} - {error_details}"
-                            )
-                            
-                            # Try alternative approach with HTTP conversion
-                            try:
-                                http_url = await self.client.mxc_to_http(mxc_uri)
-                                if http_url:
-                                    image_urls_list.append(http_url)
-                                    logger.info(
-                                        f"MatrixObserver: Using HTTP fallback URL: {http_url}"
-                                    )
-                            except Exception as convert_error:
-                                logger.warning(
-                                    f"MatrixObserver: MXC to HTTP conversion also failed: {convert_error}"
-                                )
-                except Exception as e:
-                    logger.error(
-                        f"MatrixObserver: Failed to process Matrix image {mxc_uri}: {e}"
+                if not self.client.access_token:
+                    logger.warning(
+                        f"MatrixObserver: Client not authenticated, cannot download {mxc_uri}"
                     )
+                elif not self.arweave_client:
+                    logger.warning("Arweave client not configured, cannot upload Matrix media.")
+                else:
+                    pending_mxc_uri = mxc_uri
 
             # For image messages, enhance content to reduce AI confusion
             original_body = getattr(event, "body", "Image")
@@ -376,6 +418,8 @@ class MatrixObserver(Integration):
         # Add original filename to metadata for image messages if available
         if isinstance(event, RoomMessageImage) and 'image_filename' in locals() and image_filename:
             metadata["original_filename"] = image_filename
+        if thread_root:
+            metadata["thread_root"] = thread_root
         
         message = Message(
             id=event.event_id,
@@ -383,24 +427,86 @@ class MatrixObserver(Integration):
             channel_type="matrix",
             sender=event.sender,
             content=content,
-            timestamp=time.time(),
-            reply_to=None,  # TODO: Extract reply information if present
-            image_urls=image_urls_list if image_urls_list else None,
+            timestamp=self._event_timestamp(event),
+            reply_to=reply_to,
+            image_urls=None,
             metadata=metadata,
         )
 
-        # Add to world state
-        self.world_state.add_message(room.room_id, message)
+        # Add to world state (or hold it for the catch-up batch)
+        if self._catching_up:
+            self._catch_up_buffer.append(message)
+        else:
+            self.world_state.add_message(room.room_id, message)
+            self._notify_state_change()
+        if pending_mxc_uri:
+            self.media_pipeline.submit(message, pending_mxc_uri)
 
         log_content = content[:100] + "..." if len(content) > 100 else content
-        if image_urls_list:
-            log_content += f" [Image: {image_urls_list[0]}]"
+        if pending_mxc_uri:
+            log_content += f" [Image pending: {pending_mxc_uri}]"
 
         logger.info(
             f"MatrixObserver: New message in {room.display_name or room.room_id}: "
             f"{event.sender}: {log_content}"
         )
 
+    @staticmethod
+    def _event_timestamp(event) -> float:
+        """Server-side origin_server_ts in seconds, falling back to receipt time"""
+        server_timestamp = getattr(event, "server_timestamp", None)
+        if isinstance(server_timestamp, (int, float)) and server_timestamp > 0:
+            return server_timestamp / 1000
+        return time.time()
+
+    @staticmethod
+    def _extract_relations(event) -> Tuple[Optional[str], Optional[str]]:
+        """Return (reply_to, thread_root) from the event's m.relates_to"""
+        source = getattr(event, "source", None)
+        if not isinstance(source, dict):
+            return None, None
+        relates_to = source.get("content", {}).get("m.relates_to") or {}
+        in_reply_to = (relates_to.get("m.in_reply_to") or {}).get("event_id")
+        thread_root = None
+        if relates_to.get("rel_type") == "m.thread":
+            thread_root = relates_to.get("event_id")
+            # Clients set a fallback in_reply_to to the latest thread event; it is not a real reply
+            if relates_to.get("is_falling_back"):
+                in_reply_to = None
+        return in_reply_to, thread_root
+
+    async def _download_media(self, mxc_uri: str) -> Optional[Tuple[bytes, str]]:
+        """Download Matrix media with the authenticated nio client"""
+        if not self.client:
+            return None
+        download_response = await self.client.download(mxc_uri)
+        if hasattr(download_response, "body") and download_response.body:
+            content_type = getattr(download_response, "content_type", None) or "image/jpeg"
+            return download_response.body, content_type
+        error_type = type(download_response).__name__
+        error_details = getattr(download_response, 'message', str(download_response))
+        logger.warning(
+            f"MatrixObserver: Failed to download Matrix image {mxc_uri}: {error_type} - {error_details}"
+        )
+        return None
+
+    async def _upload_media(self, data: bytes, content_type: str) -> Optional[str]:
+        """Upload Matrix image data to Arweave for permanent access"""
+        if not self.arweave_client:
+            return None
+        arweave_tx_id = await self.arweave_client.upload_data(
+            data, content_type, tags={"source": "matrix"}
+        )
+        if not arweave_tx_id:
+            logger.warning("Failed to upload Matrix media to Arweave, no URL available.")
+            return None
+        return self.arweave_client.get_arweave_url(arweave_tx_id)
+
+    async def _media_fallback_url(self, mxc_uri: str) -> Optional[str]:
+        if not self.client:
+            return None
+        return await self.client.mxc_to_http(mxc_uri)
+
     async def _on_invite(self, room, event):
         """Handle incoming Matrix room invites"""
         from nio import InviteMemberEvent
@@ -436,6 +542,8 @@ class MatrixObserver(Integration):
                 logger.info(
                     f"MatrixObserver: Added pending invite to world state: {invite_info}"
                 )
+                if settings.MATRIX_AUTO_ACCEPT_INVITES:
+                    self._schedule_invite_acceptance()
             else:
                 logger.warning(
                     "MatrixObserver: No world state manager available for invite"
@@ -451,6 +559,8 @@ class MatrixObserver(Integration):
         if not isinstance(event, RoomMemberEvent):
             return
 
+        self._apply_membership_to_room_details(room, event)
+
         # Only track changes involving our bot user
         if event.state_key != self.user_id:
             return
@@ -540,6 +650,71 @@ class MatrixObserver(Integration):
                 exc_info=True,
             )
 
+    def _on_media_complete(self, message: Message) -> None:
+        """Bump the world state version for a message the media pipeline patched in place"""
+        channel = self.world_state.state.channels.get(message.channel_id) if self.world_state else None
+        # Messages still in the catch-up buffer are ingested with their media later
+        if channel is not None and message in channel.recent_messages:
+            self.world_state.mark_changed(*self.world_state.state.message_node_paths(channel, message))
+
+    def _register_callbacks(self) -> None:
+        """Set up event and sync response callbacks on the client"""
+        from nio import InviteMemberEvent, RoomMemberEvent
+
+        self.client.add_event_callback(self._on_message, RoomMessageText)
+        self.client.add_event_callback(self._on_message, RoomMessageImage)
+        self.client.add_event_callback(self._on_invite, InviteMemberEvent)
+        self.client.add_event_callback(self._on_membership_change, RoomMemberEvent)
+        self.client.add_event_callback(
+            self._on_room_state_change, (PowerLevelsEvent, RoomNameEvent, RoomTopicEvent)
+        )
+        self.client.add_response_callback(self._on_sync_response, SyncResponse)
+
+    async def _on_room_state_change(self, room: MatrixRoom, event):
+        """Refresh cached room metadata on power level, name and topic changes"""
+        self._room_details_cache.pop(room.room_id, None)
+        if self.world_state and room.room_id in self.world_state.state.channels:
+            room_details, _ = self._get_room_details_cached(room)
+            self._update_room_details(room.room_id, room_details)
+
+    def _get_room_details_cached(self, room: MatrixRoom) -> Tuple[Dict[str, Any], bool]:
+        """Return (room_details, refreshed); extraction only runs on a cache miss"""
+        room_details = self._room_details_cache.get(room.room_id)
+        if room_details is not None:
+            return room_details, False
+        room_details = self._extract_room_details(room)
+        self._room_details_cache[room.room_id] = room_details
+        return room_details, True
+
+    def _apply_membership_to_room_details(self, room: MatrixRoom, event) -> None:
+        """Patch cached details for a single membership change instead of re-extracting"""
+        user_id = event.state_key
+        if user_id == self.user_id and event.membership in ("leave", "ban"):
+            self._room_details_cache.pop(room.room_id, None)
+            return
+        room_details = self._room_details_cache.get(room.room_id)
+        if room_details is None:
+            return
+        room_details["member_count"] = getattr(room, "member_count", room_details["member_count"])
+        if event.membership == "join":
+            level = 0
+            if getattr(room, "power_levels", None):
+                level = room.power_levels.users.get(user_id, 0)
+            room_details["power_levels"].setdefault(user_id, level)
+        elif event.membership in ("leave", "ban"):
+            room_details["power_levels"].pop(user_id, None)
+
+        if self.world_state and room.room_id in self.world_state.state.channels:
+            channel = self.world_state.state.channels[room.room_id]
+            before = (channel.member_count, channel.power_levels.get(user_id))
+            channel.member_count = room_details["member_count"]
+            if user_id in room_details["power_levels"]:
+                channel.power_levels[user_id] = room_details["power_levels"][user_id]
+            else:
+                channel.power_levels.pop(user_id, None)
+            if (channel.member_count, channel.power_levels.get(user_id)) != before:
+                self.world_state.mark_changed(f"channels.matrix.{room.room_id}")
+
     def _extract_room_details(self, room: MatrixRoom) -> Dict[str, Any]:
         """Extract comprehensive details from a Matrix room"""
         return {
@@ -591,6 +766,7 @@ class MatrixObserver(Integration):
         )
 
         self.world_state.state.channels[room_id] = channel
+        self.world_state.mark_changed(f"channels.matrix.{room_id}")
         logger.info(
             f"WorldState: Added matrix channel '{room_details['name']}' ({room_id})"
         )
@@ -610,6 +786,7 @@ class MatrixObserver(Integration):
             channel.topic = room_details["topic"]
             channel.power_levels.update(room_details["power_levels"])
             channel.last_checked = room_details["last_checked"]
+            self.world_state.mark_changed(f"channels.matrix.{room_id}")
 
     async def _load_token(self) -> bool:
         """Load saved authentication token"""
@@ -661,12 +838,150 @@ class MatrixObserver(Integration):
         except Exception as e:
             logger.error(f"MatrixObserver: Failed to save token: {e}")
 
+    def _load_sync_token(self) -> Optional[str]:
+        """Load the persisted since-token if it belongs to this account"""
+        if not self.sync_token_file.exists():
+            return None
+        try:
+            with open(self.sync_token_file, "r") as f:
+                data = json.load(f)
+            if data.get("user_id") != self.user_id or data.get("homeserver") != self.homeserver:
+                logger.info("MatrixObserver: Ignoring sync token saved for a different account")
+                return None
+            return data.get("next_batch")
+        except Exception as e:
+            logger.warning(f"MatrixObserver: Failed to load sync token: {e}")
+            return None
+
+    def _save_sync_token(self):
+        """Persist the latest since-token (atomic replace)"""
+        if not self._sync_token:
+            return
+        try:
+            self.sync_token_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.sync_token_file.with_suffix(".tmp")
+            with open(tmp_file, "w") as f:
+                json.dump(
+                    {
+                        "next_batch": self._sync_token,
+                        "user_id": self.user_id,
+                        "homeserver": self.homeserver,
+                        "saved_at": time.time(),
+                    },
+                    f,
+                )
+            os.replace(tmp_file, self.sync_token_file)
+            self._sync_token_saved_at = time.time()
+        except Exception as e:
+            logger.error(f"MatrixObserver: Failed to save sync token: {e}")
+
+    async def _on_sync_response(self, response: SyncResponse):
+        """Track next_batch; flush to disk at most every SYNC_TOKEN_SAVE_INTERVAL seconds"""
+        self._sync_token = response.next_batch
+        if self._catching_up:
+            self._finish_catch_up()
+        if time.time() - self._sync_token_saved_at >= self.SYNC_TOKEN_SAVE_INTERVAL:
+            self._save_sync_token()
+
+    def _begin_catch_up(self):
+        """Buffer messages from the next sync instead of ingesting them one by one"""
+        self._catching_up = True
+
+    def _finish_catch_up(self):
+        """Ingest the buffered backlog in timestamp order and notify once"""
+        self._catching_up = False
+        buffered, self._catch_up_buffer = self._catch_up_buffer, []
+        if not buffered:
+            return
+        added = self.world_state.add_messages(buffered)
+        self._last_catch_up = {
+            "buffered": len(buffered),
+            "added": added,
+            "rooms": len({m.channel_id for m in buffered}),
+            "completed_at": time.time(),
+        }
+        logger.info(
+            f"MatrixObserver: Catch-up ingested {added} of {len(buffered)} backlog messages "
+            f"across {self._last_catch_up['rooms']} rooms"
+        )
+        if added:
+            self._notify_state_change()
+
+    def _notify_state_change(self):
+        if self.on_state_change:
+            try:
+                self.on_state_change()
+            except Exception as e:
+                logger.error(f"MatrixObserver: Error triggering state change: {e}", exc_info=True)
+
+    def _schedule_invite_acceptance(self) -> None:
+        """Accept a burst of invites as one batch once it settles"""
+        if self._invite_accept_task and not self._invite_accept_task.done():
+            return
+
+        async def accept_after_debounce():
+            await asyncio.sleep(self.INVITE_ACCEPT_DEBOUNCE)
+            result = await self.accept_pending_invites()
+            if result.get("failed"):
+                logger.warning(f"MatrixObserver: Some invites were not accepted: {result['failed']}")
+
+        self._invite_accept_task = asyncio.create_task(accept_after_debounce())
+
+    async def _client_join(self, room_identifier: str):
+        return await self.client.join(room_identifier)
+
+    async def _join_configured_rooms(self) -> None:
+        """Join every monitored room through the executor rather than one at a time"""
+        results = await self.join_executor.join_many(self.channels_to_monitor)
+        for channel_id, response in results.items():
+            if isinstance(response, Exception) or not hasattr(response, "room_id"):
+                logger.warning(f"MatrixObserver: Failed to join {channel_id}: {response}")
+                continue
+            logger.info(f"MatrixObserver: Joined channel {channel_id}")
+
+            # If we joined by alias, add the real room ID to our world state
+            if response.room_id != channel_id:
+                logger.info(
+                    f"MatrixObserver: Room alias {channel_id} resolved to {response.room_id}"
+                )
+                self.world_state.add_channel(
+                    response.room_id, "matrix", f"Room {response.room_id}"
+                )
+
+    async def _get_sync_filter(self):
+        """Upload SYNC_FILTER once per connection, falling back to sending it inline"""
+        if self._sync_filter_id:
+            return self._sync_filter_id
+        try:
+            response = await self.client.upload_filter(
+                presence=SYNC_FILTER["presence"],
+                account_data=SYNC_FILTER["account_data"],
+                room=SYNC_FILTER["room"],
+            )
+            if isinstance(response, UploadFilterResponse):
+                self._sync_filter_id = response.filter_id
+                return self._sync_filter_id
+            logger.warning(f"MatrixObserver: Filter upload failed, using inline filter: {response}")
+        except Exception as e:
+            logger.warning(f"MatrixObserver: Filter upload failed, using inline filter: {e}")
+        return SYNC_FILTER
+
     async def _sync_forever(self):
         """Background sync task that runs the Matrix client sync"""
         try:
-            await self.client.sync_forever(timeout=30000, full_state=True)
+            sync_filter = await self._get_sync_filter()
+            since = self._load_sync_token()
+            self._sync_token_restored = since is not None
+            if since:
+                logger.info("MatrixObserver: Resuming sync from saved token")
+            # full_state applies to the first sync only: with a since-token it
+            # rebuilds room state (members lazy-loaded) without replaying history
+            await self.client.sync_forever(
+                timeout=30000, sync_filter=sync_filter, since=since, full_state=True
+            )
         except Exception as e:
             logger.error(f"MatrixObserver: Sync error: {e}")
+            self._finish_catch_up()
             self.world_state.update_system_status({"matrix_connected": False})
 
     async def stop(self):
@@ -679,6 +994,14 @@ class MatrixObserver(Integration):
             except asyncio.CancelledError:
                 logger.info("MatrixObserver: Sync task cancelled")
 
+        self._finish_catch_up()
+        self._save_sync_token()
+        await self.media_pipeline.stop()
+        await self.room_sender.stop()
+        if self._invite_accept_task:
+            self._invite_accept_task.cancel()
+            self._invite_accept_task = None
+
         if self.client:
             await self.client.close()
             logger.info("MatrixObserver: Client closed")
@@ -754,25 +1077,7 @@ class MatrixObserver(Integration):
             return {"success": False, "error": "Matrix client not connected"}
 
         try:
-            response = await self.client.room_send(
-                room_id=room_id,
-                message_type="m.room.message",
-                content={"msgtype": "m.text", "body": content},
-            )
-
-            if isinstance(response, RoomSendResponse):
-                logger.info(
-                    f"MatrixObserver: Sent message to {room_id} (event: {response.event_id})"
-                )
-                return {
-                    "success": True,
-                    "event_id": response.event_id,
-                    "room_id": room_id,
-                }
-            else:
-                logger.error(f"MatrixObserver: Failed to send message: {response}")
-                return {"success": False, "error": str(response)}
-
+            return await self._send_room_message(room_id, {"msgtype": "m.text", "body": content})
         except Exception as e:
             logger.error(f"MatrixObserver: Error sending message: {e}")
             return {"success": False, "error": str(e)}
@@ -803,82 +1108,9 @@ class MatrixObserver(Integration):
             }
 
             logger.info(f"Sending reply with content: {reply_content}")
-
-            # Add retry logic with exponential backoff
-            max_retries = 3
-            for attempt in range(max_retries):
-                response = await self.client.room_send(
-                    room_id=room_id,
-                    message_type="m.room.message",
-                    content=reply_content,
-                )
-
-                logger.info(
-                    f"Matrix client room_send response (attempt {attempt + 1}): {response} (type: {type(response)})"
-                )
-
-                if isinstance(response, RoomSendResponse):
-                    logger.info(
-                        f"MatrixObserver: Sent reply to {room_id} (event: {response.event_id}, reply_to: {reply_to_event_id})"
-                    )
-                    return {
-                        "success": True,
-                        "event_id": response.event_id,
-                        "room_id": room_id,
-                        "reply_to_event_id": reply_to_event_id,
-                    }
-                elif isinstance(response, RoomSendError):
-                    # Enhanced error logging for RoomSendError
-                    error_details = {
-                        "message": getattr(response, "message", "unknown error"),
-                        "status_code": getattr(response, "status_code", None),
-                        "retry_after_ms": getattr(response, "retry_after_ms", None),
-                        "transport_response": str(
-                            getattr(response, "transport_response", None)
-                        ),
-                    }
-
-                    logger.error(
-                        f"MatrixObserver: RoomSendError (attempt {attempt + 1}/{max_retries}): {error_details}"
-                    )
-
-                    # Handle rate limiting
-                    if error_details["retry_after_ms"]:
-                        wait_time = error_details["retry_after_ms"] / 1000
-                        logger.info(f"Rate limited, waiting {wait_time}s before retry")
-                        await asyncio.sleep(wait_time)
-                        continue
-
-                    # For other errors, wait with exponential backoff
-                    if attempt < max_retries - 1:
-                        wait_time = 2**attempt
-                        logger.info(f"Waiting {wait_time}s before retry")
-                        await asyncio.sleep(wait_time)
-                        continue
-
-                    # Final attempt failed
-                    return {
-                        "success": False,
-                        "error": f"RoomSendError: {error_details['message']} (Status: {error_details['status_code']})",
-                    }
-                else:
-                    # Unknown response type
-                    logger.error(
-                        f"MatrixObserver: Unknown response type: {type(response)}, value: {response}"
-                    )
-                    if attempt < max_retries - 1:
-                        wait_time = 2**attempt
-                        logger.info(f"Waiting {wait_time}s before retry")
-                        await asyncio.sleep(wait_time)
-                        continue
-
-                    return {
-                        "success": False,
-                        "error": f"Unknown response type: {type(response)} - {str(response)}",
-                    }
-
-            # Should not reach here, but just in case
-            return {"success": False, "error": f"Failed after {max_retries} attempts"}
+            return await self._send_room_message(
+                room_id, reply_content, reply_to_event_id=reply_to_event_id
+            )
 
         except Exception as e:
             logger.error(
@@ -911,79 +1143,7 @@ class MatrixObserver(Integration):
                 "format": "org.matrix.custom.html",
                 "formatted_body": html_content,
             }
-
-            # Add retry logic with exponential backoff
-            max_retries = 3
-            for attempt in range(max_retries):
-                response = await self.client.room_send(
-                    room_id=room_id, message_type="m.room.message", content=content
-                )
-
-                logger.info(
-                    f"Matrix client room_send response (attempt {attempt + 1}): {response} (type: {type(response)})"
-                )
-
-                if isinstance(response, RoomSendResponse):
-                    logger.info(
-                        f"MatrixObserver: Successfully sent formatted message to {room_id} (event: {response.event_id})"
-                    )
-                    return {
-                        "success": True,
-                        "event_id": response.event_id,
-                        "room_id": room_id,
-                    }
-                elif isinstance(response, RoomSendError):
-                    # Enhanced error logging for RoomSendError
-                    error_details = {
-                        "message": getattr(response, "message", "unknown error"),
-                        "status_code": getattr(response, "status_code", None),
-                        "retry_after_ms": getattr(response, "retry_after_ms", None),
-                        "transport_response": str(
-                            getattr(response, "transport_response", None)
-                        ),
-                    }
-
-                    logger.error(
-                        f"MatrixObserver: RoomSendError (attempt {attempt + 1}/{max_retries}): {error_details}"
-                    )
-
-                    # Handle rate limiting
-                    if error_details["retry_after_ms"]:
-                        wait_time = error_details["retry_after_ms"] / 1000
-                        logger.info(f"Rate limited, waiting {wait_time}s before retry")
-                        await asyncio.sleep(wait_time)
-                        continue
-
-                    # For other errors, wait with exponential backoff
-                    if attempt < max_retries - 1:
-                        wait_time = 2**attempt
-                        logger.info(f"Waiting {wait_time}s before retry")
-                        await asyncio.sleep(wait_time)
-                        continue
-
-                    # Final attempt failed
-                    return {
-                        "success": False,
-                        "error": f"RoomSendError: {error_details['message']} (Status: {error_details['status_code']})",
-                    }
-                else:
-                    # Unknown response type
-                    logger.error(
-                        f"MatrixObserver: Unknown response type: {type(response)}, value: {response}"
-                    )
-                    if attempt < max_retries - 1:
-                        wait_time = 2**attempt
-                        logger.info(f"Waiting {wait_time}s before retry")
-                        await asyncio.sleep(wait_time)
-                        continue
-
-                    return {
-                        "success": False,
-                        "error": f"Unknown response type: {type(response)} - {str(response)}",
-                    }
-
-            # Should not reach here, but just in case
-            return {"success": False, "error": f"Failed after {max_retries} attempts"}
+            return await self._send_room_message(room_id, content)
 
         except Exception as e:
             logger.error(f"MatrixObserver: Error sending formatted message: {e}", exc_info=True)
@@ -1021,85 +1181,36 @@ class MatrixObserver(Integration):
                 "formatted_body": html_content,
                 "m.relates_to": {"m.in_reply_to": {"event_id": reply_to_event_id}},
             }
-
-            # Add retry logic with exponential backoff
-            max_retries = 3
-            for attempt in range(max_retries):
-                response = await self.client.room_send(
-                    room_id=room_id, message_type="m.room.message", content=content
-                )
-
-                logger.info(
-                    f"Matrix client room_send response (attempt {attempt + 1}): {response} (type: {type(response)})"
-                )
-
-                if isinstance(response, RoomSendResponse):
-                    logger.info(
-                        f"MatrixObserver: Successfully sent formatted reply to {room_id} (event: {response.event_id}, reply_to: {reply_to_event_id})"
-                    )
-                    return {
-                        "success": True,
-                        "event_id": response.event_id,
-                        "room_id": room_id,
-                        "reply_to": reply_to_event_id,
-                    }
-                elif isinstance(response, RoomSendError):
-                    # Enhanced error logging for RoomSendError
-                    error_details = {
-                        "message": getattr(response, "message", "unknown error"),
-                        "status_code": getattr(response, "status_code", None),
-                        "retry_after_ms": getattr(response, "retry_after_ms", None),
-                        "transport_response": str(
-                            getattr(response, "transport_response", None)
-                        ),
-                    }
-
-                    logger.error(
-                        f"MatrixObserver: RoomSendError (attempt {attempt + 1}/{max_retries}): {error_details}"
-                    )
-
-                    # Handle rate limiting
-                    if error_details["retry_after_ms"]:
-                        wait_time = error_details["retry_after_ms"] / 1000
-                        logger.info(f"Rate limited, waiting {wait_time}s before retry")
-                        await asyncio.sleep(wait_time)
-                        continue
-
-                    # For other errors, wait with exponential backoff
-                    if attempt < max_retries - 1:
-                        wait_time = 2**attempt
-                        logger.info(f"Waiting {wait_time}s before retry")
-                        await asyncio.sleep(wait_time)
-                        continue
-
-                    # Final attempt failed
-                    return {
-                        "success": False,
-                        "error": f"RoomSendError: {error_details['message']} (Status: {error_details['status_code']})",
-                    }
-                else:
-                    # Unknown response type
-                    logger.error(
-                        f"MatrixObserver: Unknown response type: {type(response)}, value: {response}"
-                    )
-                    if attempt < max_retries - 1:
-                        wait_time = 2**attempt
-                        logger.info(f"Waiting {wait_time}s before retry")
-                        await asyncio.sleep(wait_time)
-                        continue
-
-                    return {
-                        "success": False,
-                        "error": f"Unknown response type: {type(response)} - {str(response)}",
-                    }
-
-            # Should not reach here, but just in case
-            return {"success": False, "error": f"Failed after {max_retries} attempts"}
+            return await self._send_room_message(
+                room_id, content, reply_to=reply_to_event_id
+            )
 
         except Exception as e:
             logger.error(f"MatrixObserver: Error sending formatted reply: {e}", exc_info=True)
             return {"success": False, "error": str(e)}
 
+    async def _send_room_message(
+        self, room_id: str, content: Dict[str, Any], **extra: Any
+    ) -> Dict[str, Any]:
+        """Send through the shaped per-room sender and build the result dict"""
+        result = await self.room_sender.send(room_id, content)
+        response = result.response
+        if not isinstance(response, RoomSendResponse):
+            error = describe_failure(response)
+            logger.error(f"MatrixObserver: Failed to send to {room_id} after {result.attempts} attempts: {error}")
+            return {"success": False, "error": error}
+
+        logger.info(f"MatrixObserver: Sent message to {room_id} (event: {response.event_id})")
+        sent = {"success": True, "event_id": response.event_id, "room_id": room_id, **extra}
+        if result.coalesced > 1:
+            sent["coalesced"] = result.coalesced
+        return sent
+
+    async def _room_send(self, room_id: str, content: Dict[str, Any]):
+        return await self.client.room_send(
+            room_id=room_id, message_type="m.room.message", content=content
+        )
+
     async def join_room(self, room_identifier: str) -> Dict[str, Any]:
         """Join a Matrix room by room ID or alias"""
         logger.info(
@@ -1111,8 +1222,7 @@ class MatrixObserver(Integration):
             return {"success": False, "error": "Matrix client not connected"}
 
         try:
-            # Use the Matrix client to join the room
-            response = await self.client.join(room_identifier)
+            response = await self.join_executor.join(room_identifier)
 
             if hasattr(response, "room_id"):
                 # Successful join
@@ -1241,7 +1351,7 @@ class MatrixObserver(Integration):
                 )
 
             # Accept the invitation by joining the room
-            response = await self.client.join(room_id)
+            response = await self.join_executor.join(room_id)
 
             if hasattr(response, "room_id"):
                 # Successful acceptance
@@ -1283,6 +1393,33 @@ class MatrixObserver(Integration):
             logger.error(f"MatrixObserver: {error_msg}", exc_info=True)
             return {"success": False, "error": error_msg}
 
+    async def accept_pending_invites(
+        self, room_ids: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Accept pending invitations concurrently (all of them unless room_ids is given)"""
+        if not self.client:
+            logger.error("Matrix client not connected")
+            return {"success": False, "error": "Matrix client not connected"}
+
+        if room_ids is None:
+            pending = [inv.get("room_id") for inv in self.world_state.get_pending_matrix_invites()]
+            pending.extend(getattr(self.client, "invited_rooms", {}).keys())
+            room_ids = [room_id for room_id in pending if room_id]
+        room_ids = list(dict.fromkeys(room_ids))
+        if not room_ids:
+            return {"success": True, "accepted": [], "failed": {}}
+
+        logger.info(f"MatrixObserver: Accepting {len(room_ids)} pending invitations")
+        results = await asyncio.gather(*(self.accept_invite(room_id) for room_id in room_ids))
+
+        accepted = [r["room_id"] for r in results if r.get("success")]
+        failed = {
+            room_id: result.get("error", "unknown error")
+            for room_id, result in zip(room_ids, results)
+            if not result.get("success")
+        }
+        return {"success": not failed, "accepted": accepted, "failed": failed}
+
     async def get_invites(self) -> Dict[str, Any]:
         """Get pending Matrix room invitations from both client and world state"""
         logger.info("MatrixObserver.get_invites called")
@@ -1617,8 +1754,12 @@ class MatrixObserver(Integration):
         if not await self.check_connection_health():
             logger.info("Connection unhealthy, attempting to reconnect...")
             try:
-                # Try a quick sync to refresh the connection
-                await self.client.sync(timeout=1000)
+                # Try a quick sync to refresh the connection; its backlog is ingested as one batch
+                self._begin_catch_up()
+                try:
+                    await self.client.sync(timeout=1000)
+                finally:
+                    self._finish_catch_up()
                 logger.info("Connection refresh successful")
                 
                 # Verify the connection is now healthy
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Matrix Room Sender
+
+Outbound path for bot messages. Each room gets its own ordered queue, drained
+by a short-lived worker, and all rooms share one token bucket sized to the
+homeserver's per-user message limit. An ``M_LIMIT_EXCEEDED`` response pauses
+every room for its ``retry_after_ms`` instead of each send sleeping on its own.
+
+With a coalescing window configured, plain (non-reply) text messages queued
+for the same room within the window are merged into a single event, so
+several actions targeting one room in a cycle cost one homeserver request.
+"""
+
+import asyncio
+import html
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from nio import RoomSendError, RoomSendResponse
+
+logger = logging.getLogger(__name__)
+
+SendFn = Callable[[str, Dict[str, Any]], Awaitable[Any]]
+
+
+@dataclass
+class SendResult:
+    response: Any
+    attempts: int
+    coalesced: int = 1
+
+
+@dataclass
+class _PendingSend:
+    content: Dict[str, Any]
+    future: "asyncio.Future[SendResult]"
+    queued_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class _RoomState:
+    queue: Deque[_PendingSend] = field(default_factory=deque)
+    worker: Optional[asyncio.Task] = None
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=200))
+    sent: int = 0
+    failed: int = 0
+    coalesced: int = 0
+
+
+def is_coalescible(content: Dict[str, Any]) -> bool:
+    """Only standalone text messages are merged; replies keep their own event"""
+    return content.get("msgtype") == "m.text" and "m.relates_to" not in content
+
+
+class MatrixRoomSender:
+    """Per-room ordered sender with shared rate shaping and optional coalescing."""
+
+    LATENCY_PERCENTILES = (50, 90, 99)
+
+    def __init__(
+        self,
+        send: SendFn,
+        messages_per_second: float = 2.0,
+        burst: int = 5,
+        coalesce_window: float = 0.0,
+        max_coalesce: int = 5,
+        max_retries: int = 3,
+        retry_base_delay: float = 1.0,
+    ):
+        self.send_fn = send
+        self.rate = messages_per_second
+        self.burst = max(1, burst)
+        self.coalesce_window = coalesce_window
+        self.max_coalesce = max(1, max_coalesce)
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._bucket_lock = asyncio.Lock()
+        self._blocked_until = 0.0
+        self._rooms: Dict[str, _RoomState] = {}
+        self.stats: Dict[str, int] = {"sent": 0, "failed": 0, "coalesced": 0, "rate_limited": 0}
+
+    async def send(self, room_id: str, content: Dict[str, Any]) -> SendResult:
+        """Queue ``content`` for ``room_id`` and wait for the homeserver's answer"""
+        room = self._rooms.setdefault(room_id, _RoomState())
+        future = asyncio.get_running_loop().create_future()
+        room.queue.append(_PendingSend(content, future))
+        if room.worker is None or room.worker.done():
+            room.worker = asyncio.create_task(self._drain_room(room_id, room))
+        return await future
+
+    async def stop(self) -> None:
+        workers = [room.worker for room in self._rooms.values() if room.worker and not room.worker.done()]
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Global counters plus per-room depth and send latency percentiles"""
+        rooms = {}
+        for room_id, room in self._rooms.items():
+            ordered = sorted(room.latencies)
+            latency = {"samples": len(ordered)}
+            if ordered:
+                for pct in self.LATENCY_PERCENTILES:
+                    latency[f"p{pct}"] = round(ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))], 3)
+            rooms[room_id] = {
+                "queued": len(room.queue),
+                "sent": room.sent,
+                "failed": room.failed,
+                "coalesced": room.coalesced,
+                "latency_seconds": latency,
+            }
+        return {
+            **self.stats,
+            "messages_per_second": self.rate,
+            "coalesce_window": self.coalesce_window,
+            "backoff_remaining": max(0.0, self._blocked_until - time.monotonic()),
+            "rooms": rooms,
+        }
+
+    async def _drain_room(self, room_id: str, room: _RoomState) -> None:
+        while room.queue:
+            if self.coalesce_window > 0 and is_coalescible(room.queue[0].content):
+                await asyncio.sleep(self.coalesce_window)
+            batch = self._take_batch(room)
+            content = batch[0].content if len(batch) == 1 else self._merge(batch)
+
+            try:
+                result = await self._send_with_retry(room_id, content)
+            except asyncio.CancelledError:
+                for pending in batch:
+                    pending.future.cancel()
+                raise
+            except Exception as e:
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_exception(e)
+                room.failed += len(batch)
+                self.stats["failed"] += len(batch)
+                continue
+
+            result.coalesced = len(batch)
+            succeeded = isinstance(result.response, RoomSendResponse)
+            completed_at = time.monotonic()
+            for pending in batch:
+                room.latencies.append(completed_at - pending.queued_at)
+                if not pending.future.done():
+                    pending.future.set_result(result)
+            key = "sent" if succeeded else "failed"
+            setattr(room, key, getattr(room, key) + len(batch))
+            self.stats[key] += len(batch)
+            if len(batch) > 1:
+                room.coalesced += len(batch) - 1
+                self.stats["coalesced"] += len(batch) - 1
+
+    def _take_batch(self, room: _RoomState) -> List[_PendingSend]:
+        batch = [room.queue.popleft()]
+        if self.coalesce_window <= 0 or not is_coalescible(batch[0].content):
+            return batch
+        while room.queue and len(batch) < self.max_coalesce and is_coalescible(room.queue[0].content):
+            batch.append(room.queue.popleft())
+        return batch
+
+    @staticmethod
+    def _merge(batch: List[_PendingSend]) -> Dict[str, Any]:
+        contents = [pending.content for pending in batch]
+        merged = {"msgtype": "m.text", "body": "\n\n".join(c.get("body", "") for c in contents)}
+        if any("formatted_body" in c for c in contents):
+            merged["format"] = "org.matrix.custom.html"
+            merged["formatted_body"] = "<br><br>".join(
+                c.get("formatted_body") or html.escape(c.get("body", "")).replace("\n", "<br>")
+                for c in contents
+            )
+        return merged
+
+    async def _send_with_retry(self, room_id: str, content: Dict[str, Any]) -> SendResult:
+        response = None
+        for attempt in range(1, self.max_retries + 1):
+            await self._acquire()
+            response = await self.send_fn(room_id, content)
+            if isinstance(response, RoomSendResponse):
+                return SendResult(response, attempt)
+
+            retry_after_ms = getattr(response, "retry_after_ms", None)
+            logger.error(
+                f"MatrixRoomSender: Send to {room_id} failed (attempt {attempt}/{self.max_retries}): "
+                f"{getattr(response, 'message', response)} (Status: {getattr(response, 'status_code', None)})"
+            )
+            if attempt == self.max_retries:
+                break
+            if retry_after_ms:
+                # The limit is per user, so every room waits it out
+                self.stats["rate_limited"] += 1
+                self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after_ms / 1000)
+            else:
+                await asyncio.sleep(self.retry_base_delay * 2 ** (attempt - 1))
+        return SendResult(response, self.max_retries)
+
+    async def _acquire(self) -> None:
+        """Wait for the shared rate-limit window and a token from the bucket"""
+        async with self._bucket_lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                if self.rate <= 0:
+                    return
+                self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+                self._refilled_at = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self._tokens) / self.rate)
+
+
+def describe_failure(response: Any) -> str:
+    """Error string for a failed send, matching the observer's previous wording"""
+    if isinstance(response, RoomSendError):
+        return f"RoomSendError: {getattr(response, 'message', 'unknown error')} (Status: {getattr(response, 'status_code', None)})"
+    return f"Unknown response type: {type(response)} - {str(response)}"
@@ -1 +1,40 @@
-"""Storage and persistence layer."""
+"""Storage and persistence layer.
+
+A shared async key-value and append-log API (:class:`StorageBackend`) with an
+SQLite-WAL backend and an optional LMDB backend. Use :func:`open_storage` to
+get the backend selected by ``STORAGE_BACKEND``.
+"""
+
+from pathlib import Path
+from typing import Optional
+
+from ..config import settings
+from .base import NamespaceMetrics, StorageBackend, StorageError, StorageSnapshot
+from .lmdb_backend import LMDB_AVAILABLE, LMDBStorage
+from .sqlite_backend import SQLiteStorage
+
+BACKENDS = ("sqlite", "lmdb")
+
+
+def open_storage(backend: Optional[str] = None, path: Optional[str] = None) -> StorageBackend:
+    """Open the configured storage backend under ``path`` (a directory)."""
+    backend = backend or settings.STORAGE_BACKEND
+    directory = Path(path or settings.STORAGE_PATH)
+    if backend == "sqlite":
+        return SQLiteStorage(str(directory / "storage.db"))
+    if backend == "lmdb":
+        return LMDBStorage(str(directory / "lmdb"), map_size=settings.STORAGE_LMDB_MAP_SIZE)
+    raise StorageError(f"Unknown storage backend {backend!r}, expected one of {BACKENDS}")
+
+
+__all__ = [
+    "BACKENDS",
+    "LMDB_AVAILABLE",
+    "LMDBStorage",
+    "NamespaceMetrics",
+    "SQLiteStorage",
+    "StorageBackend",
+    "StorageError",
+    "StorageSnapshot",
+    "open_storage",
+]
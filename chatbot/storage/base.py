@@ -0,0 +1,242 @@
+"""
+Storage Backend Base
+
+Async key-value and append-log API shared by every storage backend.
+
+Values are JSON-serializable objects. Keys live in namespaces; logs are
+named, and each appended record gets a monotonically increasing sequence
+number within its log. Backends wrap blocking libraries, so every call runs
+on a dedicated single-thread executor: writes are serialized without extra
+locking, and batched calls (``put_many``, ``append``) commit once.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar, Union
+
+logger = logging.getLogger(__name__)
+
+R = TypeVar("R")
+
+Items = Union[Dict[str, Any], Iterable[Tuple[str, Any]]]
+
+
+class StorageError(Exception):
+    """Raised when a storage backend cannot be opened or used"""
+
+
+def encode_value(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def decode_value(data: Optional[bytes]) -> Any:
+    return None if data is None else json.loads(data)
+
+
+@dataclass
+class NamespaceMetrics:
+    """Operation counts, bytes and cumulative latency for one namespace or log."""
+
+    reads: int = 0
+    writes: int = 0
+    deletes: int = 0
+    records_written: int = 0
+    bytes_read: int = 0
+    bytes_written: int = 0
+    read_seconds: float = 0.0
+    write_seconds: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "reads": self.reads,
+            "writes": self.writes,
+            "deletes": self.deletes,
+            "records_written": self.records_written,
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+            "avg_read_ms": round(self.read_seconds / self.reads * 1000, 3) if self.reads else 0.0,
+            "avg_write_ms": round(self.write_seconds / self.writes * 1000, 3) if self.writes else 0.0,
+        }
+
+
+class StorageSnapshot(ABC):
+    """Read-only, point-in-time view; writes made after it was opened are invisible."""
+
+    def __init__(self, storage: "StorageBackend"):
+        self._storage = storage
+
+    async def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        data = await self._storage._run(self._get, namespace, key)
+        return default if data is None else decode_value(data)
+
+    async def scan(self, namespace: str, prefix: str = "") -> List[Tuple[str, Any]]:
+        rows = await self._storage._run(self._scan, namespace, prefix)
+        return [(key, decode_value(data)) for key, data in rows]
+
+    async def read_log(self, log: str, after: int = 0, limit: int = 1000) -> List[Tuple[int, Any]]:
+        rows = await self._storage._run(self._read_log, log, after, limit)
+        return [(seq, decode_value(data)) for seq, data in rows]
+
+    @abstractmethod
+    def _get(self, namespace: str, key: str) -> Optional[bytes]: ...
+
+    @abstractmethod
+    def _scan(self, namespace: str, prefix: str) -> List[Tuple[str, bytes]]: ...
+
+    @abstractmethod
+    def _read_log(self, log: str, after: int, limit: int) -> List[Tuple[int, bytes]]: ...
+
+    @abstractmethod
+    def _release(self) -> None: ...
+
+
+class StorageBackend(ABC):
+    """Async key-value store plus append-only logs with per-namespace metrics."""
+
+    name = "base"
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"storage-{self.name}")
+        self._metrics: Dict[str, NamespaceMetrics] = {}
+        self._closed = False
+
+    # Key-value API
+
+    async def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        started = time.perf_counter()
+        data = await self._run(self._get, namespace, key)
+        self._record_read(namespace, started, len(data) if data else 0)
+        return default if data is None else decode_value(data)
+
+    async def put(self, namespace: str, key: str, value: Any) -> None:
+        await self.put_many(namespace, {key: value})
+
+    async def put_many(self, namespace: str, items: Items) -> None:
+        """Write several keys in one transaction."""
+        pairs = list(items.items() if isinstance(items, dict) else items)
+        if not pairs:
+            return
+        encoded = [(key, encode_value(value)) for key, value in pairs]
+        started = time.perf_counter()
+        await self._run(self._put_many, namespace, encoded)
+        self._record_write(namespace, started, encoded)
+
+    async def delete(self, namespace: str, key: str) -> bool:
+        deleted = await self._run(self._delete, namespace, key)
+        self._metrics_for(namespace).deletes += 1
+        return deleted
+
+    async def scan(self, namespace: str, prefix: str = "") -> List[Tuple[str, Any]]:
+        """All (key, value) pairs in a namespace whose key starts with prefix, in key order."""
+        started = time.perf_counter()
+        rows = await self._run(self._scan, namespace, prefix)
+        self._record_read(namespace, started, sum(len(data) for _, data in rows))
+        return [(key, decode_value(data)) for key, data in rows]
+
+    # Append-log API
+
+    async def append(self, log: str, records: Iterable[Any]) -> List[int]:
+        """Append records in one transaction; returns their sequence numbers."""
+        encoded = [encode_value(record) for record in records]
+        if not encoded:
+            return []
+        started = time.perf_counter()
+        seqs = await self._run(self._append, log, encoded)
+        self._record_write(log, started, [(None, data) for data in encoded])
+        return seqs
+
+    async def read_log(self, log: str, after: int = 0, limit: int = 1000) -> List[Tuple[int, Any]]:
+        """Up to ``limit`` (seq, record) pairs with seq greater than ``after``, oldest first."""
+        started = time.perf_counter()
+        rows = await self._run(self._read_log, log, after, limit)
+        self._record_read(log, started, sum(len(data) for _, data in rows))
+        return [(seq, decode_value(data)) for seq, data in rows]
+
+    async def trim_log(self, log: str, up_to: int) -> int:
+        """Drop records with seq <= ``up_to``; returns how many were removed."""
+        removed = await self._run(self._trim_log, log, up_to)
+        self._metrics_for(log).deletes += removed
+        return removed
+
+    # Snapshots, metrics and lifecycle
+
+    @asynccontextmanager
+    async def snapshot(self) -> AsyncIterator[StorageSnapshot]:
+        """Consistent read-only view of every namespace and log."""
+        snapshot = await self._run(self._open_snapshot)
+        try:
+            yield snapshot
+        finally:
+            await self._run(snapshot._release)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "namespaces": {name: metrics.to_dict() for name, metrics in sorted(self._metrics.items())},
+        }
+
+    async def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._close)
+        self._executor.shutdown(wait=False)
+
+    async def _run(self, fn: Callable[..., R], *args: Any) -> R:
+        if self._closed:
+            raise StorageError(f"{self.name} storage is closed")
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _metrics_for(self, namespace: str) -> NamespaceMetrics:
+        metrics = self._metrics.get(namespace)
+        if metrics is None:
+            metrics = self._metrics[namespace] = NamespaceMetrics()
+        return metrics
+
+    def _record_read(self, namespace: str, started: float, size: int) -> None:
+        metrics = self._metrics_for(namespace)
+        metrics.reads += 1
+        metrics.bytes_read += size
+        metrics.read_seconds += time.perf_counter() - started
+
+    def _record_write(self, namespace: str, started: float, encoded: List[Tuple[Any, bytes]]) -> None:
+        metrics = self._metrics_for(namespace)
+        metrics.writes += 1
+        metrics.records_written += len(encoded)
+        metrics.bytes_written += sum(len(data) for _, data in encoded)
+        metrics.write_seconds += time.perf_counter() - started
+
+    # Blocking implementations, always called on the backend's executor thread
+
+    @abstractmethod
+    def _get(self, namespace: str, key: str) -> Optional[bytes]: ...
+
+    @abstractmethod
+    def _put_many(self, namespace: str, items: List[Tuple[str, bytes]]) -> None: ...
+
+    @abstractmethod
+    def _delete(self, namespace: str, key: str) -> bool: ...
+
+    @abstractmethod
+    def _scan(self, namespace: str, prefix: str) -> List[Tuple[str, bytes]]: ...
+
+    @abstractmethod
+    def _append(self, log: str, records: List[bytes]) -> List[int]: ...
+
+    @abstractmethod
+    def _read_log(self, log: str, after: int, limit: int) -> List[Tuple[int, bytes]]: ...
+
+    @abstractmethod
+    def _trim_log(self, log: str, up_to: int) -> int: ...
+
+    @abstractmethod
+    def _open_snapshot(self) -> StorageSnapshot: ...
+
+    @abstractmethod
+    def _close(self) -> None: ...
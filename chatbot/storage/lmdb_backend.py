@@ -0,0 +1,177 @@
+"""
+LMDB Storage Backend
+
+Each key-value namespace and each log is a named LMDB database inside one
+environment. Log records are keyed by their sequence number as a big-endian
+u64, so cursor order is append order; the highest sequence number handed out
+per log is kept in a separate database so trimming a log empty does not
+restart its numbering. Snapshots are plain LMDB read
+transactions, which are MVCC views by design.
+
+Requires the optional ``lmdb`` package.
+"""
+
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .base import StorageBackend, StorageError, StorageSnapshot
+
+try:
+    import lmdb
+except ImportError:  # pragma: no cover - exercised only without the optional dependency
+    lmdb = None
+
+logger = logging.getLogger(__name__)
+
+LMDB_AVAILABLE = lmdb is not None
+
+LOG_SEQ_DB = "meta:log_seq"
+
+
+def _seq_key(seq: int) -> bytes:
+    return seq.to_bytes(8, "big")
+
+
+def _scan(txn: Any, db: Any, prefix: str) -> List[Tuple[str, bytes]]:
+    encoded = prefix.encode("utf-8")
+    cursor = txn.cursor(db=db)
+    rows = []
+    if cursor.set_range(encoded):
+        for key, value in cursor:
+            if not key.startswith(encoded):
+                break
+            rows.append((key.decode("utf-8"), bytes(value)))
+    return rows
+
+
+def _read_log(txn: Any, db: Any, after: int, limit: int) -> List[Tuple[int, bytes]]:
+    cursor = txn.cursor(db=db)
+    rows = []
+    if cursor.set_range(_seq_key(after + 1)):
+        for key, value in cursor:
+            rows.append((int.from_bytes(key, "big"), bytes(value)))
+            if len(rows) >= limit:
+                break
+    return rows
+
+
+class LMDBSnapshot(StorageSnapshot):
+    def __init__(self, storage: "LMDBStorage", txn: Any):
+        super().__init__(storage)
+        self._lmdb = storage
+        self._txn = txn
+
+    def _get(self, namespace: str, key: str) -> Optional[bytes]:
+        value = self._txn.get(key.encode("utf-8"), db=self._lmdb._db(f"kv:{namespace}"))
+        return bytes(value) if value is not None else None
+
+    def _scan(self, namespace: str, prefix: str) -> List[Tuple[str, bytes]]:
+        return _scan(self._txn, self._lmdb._db(f"kv:{namespace}"), prefix)
+
+    def _read_log(self, log: str, after: int, limit: int) -> List[Tuple[int, bytes]]:
+        return _read_log(self._txn, self._lmdb._db(f"log:{log}"), after, limit)
+
+    def _release(self) -> None:
+        self._txn.abort()
+
+
+class LMDBStorage(StorageBackend):
+    """Storage backend on an LMDB environment, growing the map when it fills."""
+
+    name = "lmdb"
+
+    def __init__(self, path: str, map_size: int = 256 * 1024 * 1024, max_namespaces: int = 256, sync: bool = True):
+        if not LMDB_AVAILABLE:
+            raise StorageError("LMDB backend requires the 'lmdb' package (pip install lmdb)")
+        super().__init__()
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._env = lmdb.open(str(self.path), map_size=map_size, max_dbs=max_namespaces, sync=sync)
+        self._dbs: Dict[str, Any] = {}
+
+    def _db(self, name: str) -> Any:
+        db = self._dbs.get(name)
+        if db is None:
+            db = self._dbs[name] = self._env.open_db(name.encode("utf-8"))
+        return db
+
+    def _write(self, fn) -> Any:
+        """Run ``fn(txn)`` in a write transaction, doubling the map size if it is full."""
+        while True:
+            try:
+                with self._env.begin(write=True) as txn:
+                    return fn(txn)
+            except lmdb.MapFullError:
+                new_size = self._env.info()["map_size"] * 2
+                logger.info(f"LMDBStorage: Map full, growing to {new_size} bytes")
+                self._env.set_mapsize(new_size)
+
+    def _get(self, namespace: str, key: str) -> Optional[bytes]:
+        with self._env.begin() as txn:
+            value = txn.get(key.encode("utf-8"), db=self._db(f"kv:{namespace}"))
+            return bytes(value) if value is not None else None
+
+    def _put_many(self, namespace: str, items: List[Tuple[str, bytes]]) -> None:
+        db = self._db(f"kv:{namespace}")
+
+        def write(txn):
+            for key, value in items:
+                txn.put(key.encode("utf-8"), value, db=db)
+
+        self._write(write)
+
+    def _delete(self, namespace: str, key: str) -> bool:
+        db = self._db(f"kv:{namespace}")
+        return self._write(lambda txn: txn.delete(key.encode("utf-8"), db=db))
+
+    def _scan(self, namespace: str, prefix: str) -> List[Tuple[str, bytes]]:
+        with self._env.begin() as txn:
+            return _scan(txn, self._db(f"kv:{namespace}"), prefix)
+
+    def _append(self, log: str, records: List[bytes]) -> List[int]:
+        db = self._db(f"log:{log}")
+        meta = self._db(LOG_SEQ_DB)
+        name = log.encode("utf-8")
+
+        def write(txn):
+            cursor = txn.cursor(db=db)
+            last = int.from_bytes(cursor.key(), "big") if cursor.last() else 0
+            # Logs written before the high-water mark existed fall back to their last key
+            stored = txn.get(name, db=meta)
+            start = max(last, int.from_bytes(stored, "big") if stored is not None else 0) + 1
+            seqs = list(range(start, start + len(records)))
+            for seq, record in zip(seqs, records):
+                txn.put(_seq_key(seq), record, db=db, append=True)
+            txn.put(name, _seq_key(seqs[-1]), db=meta)
+            return seqs
+
+        return self._write(write)
+
+    def _read_log(self, log: str, after: int, limit: int) -> List[Tuple[int, bytes]]:
+        with self._env.begin() as txn:
+            return _read_log(txn, self._db(f"log:{log}"), after, limit)
+
+    def _trim_log(self, log: str, up_to: int) -> int:
+        db = self._db(f"log:{log}")
+
+        def write(txn):
+            cursor = txn.cursor(db=db)
+            removed = 0
+            if cursor.first():
+                while int.from_bytes(cursor.key(), "big") <= up_to:
+                    # delete() moves the cursor to the next record
+                    if not cursor.delete():
+                        break
+                    removed += 1
+                    if not cursor.key():
+                        break
+            return removed
+
+        return self._write(write)
+
+    def _open_snapshot(self) -> LMDBSnapshot:
+        return LMDBSnapshot(self, self._env.begin())
+
+    def _close(self) -> None:
+        self._env.close()
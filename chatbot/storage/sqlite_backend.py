@@ -0,0 +1,184 @@
+"""
+SQLite Storage Backend
+
+Key-value namespaces and append logs in one SQLite database in WAL mode.
+Snapshots open a second connection and hold a read transaction, which WAL
+pins to the database state at its first read while the main connection keeps
+writing.
+"""
+
+import logging
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .base import StorageBackend, StorageError, StorageSnapshot
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS kv (
+        namespace TEXT NOT NULL,
+        key TEXT NOT NULL,
+        value BLOB NOT NULL,
+        PRIMARY KEY (namespace, key)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS log (
+        name TEXT NOT NULL,
+        seq INTEGER NOT NULL,
+        value BLOB NOT NULL,
+        PRIMARY KEY (name, seq)
+    ) WITHOUT ROWID
+    """,
+    # Highest sequence number ever handed out per log, so trimming a log
+    # empty does not restart its numbering
+    """
+    CREATE TABLE IF NOT EXISTS log_meta (
+        name TEXT PRIMARY KEY,
+        last_seq INTEGER NOT NULL
+    ) WITHOUT ROWID
+    """,
+)
+
+
+def _prefix_bounds(prefix: str) -> Tuple[str, Optional[str]]:
+    """Key range [prefix, upper) so prefix scans use the primary key index."""
+    if not prefix:
+        return "", None
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def _scan(db: sqlite3.Connection, namespace: str, prefix: str) -> List[Tuple[str, bytes]]:
+    lower, upper = _prefix_bounds(prefix)
+    if upper is None:
+        query = "SELECT key, value FROM kv WHERE namespace = ? AND key >= ? ORDER BY key"
+        params: tuple = (namespace, lower)
+    else:
+        query = "SELECT key, value FROM kv WHERE namespace = ? AND key >= ? AND key < ? ORDER BY key"
+        params = (namespace, lower, upper)
+    return db.execute(query, params).fetchall()
+
+
+def _read_log(db: sqlite3.Connection, log: str, after: int, limit: int) -> List[Tuple[int, bytes]]:
+    return db.execute(
+        "SELECT seq, value FROM log WHERE name = ? AND seq > ? ORDER BY seq LIMIT ?",
+        (log, after, limit),
+    ).fetchall()
+
+
+def _get(db: sqlite3.Connection, namespace: str, key: str) -> Optional[bytes]:
+    row = db.execute("SELECT value FROM kv WHERE namespace = ? AND key = ?", (namespace, key)).fetchone()
+    return row[0] if row else None
+
+
+class SQLiteSnapshot(StorageSnapshot):
+    def __init__(self, storage: "SQLiteStorage", db: sqlite3.Connection):
+        super().__init__(storage)
+        self._db = db
+
+    def _get(self, namespace: str, key: str) -> Optional[bytes]:
+        return _get(self._db, namespace, key)
+
+    def _scan(self, namespace: str, prefix: str) -> List[Tuple[str, bytes]]:
+        return _scan(self._db, namespace, prefix)
+
+    def _read_log(self, log: str, after: int, limit: int) -> List[Tuple[int, bytes]]:
+        return _read_log(self._db, log, after, limit)
+
+    def _release(self) -> None:
+        self._db.rollback()
+        self._db.close()
+
+
+class SQLiteStorage(StorageBackend):
+    """Storage backend on a single SQLite database in WAL mode."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str, synchronous: str = "NORMAL"):
+        super().__init__()
+        if path == ":memory:":
+            raise StorageError("SQLiteStorage needs a file path; snapshots open a second connection")
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.synchronous = synchronous
+        self._db: Optional[sqlite3.Connection] = None
+        self._next_seq: Dict[str, int] = {}
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            db = sqlite3.connect(str(self.path))
+            try:
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute(f"PRAGMA synchronous={self.synchronous}")
+                for statement in SCHEMA:
+                    db.execute(statement)
+                db.commit()
+            except sqlite3.Error as e:
+                db.close()
+                raise StorageError(f"Could not open SQLite storage at {self.path}: {e}") from e
+            self._db = db
+        return self._db
+
+    def _get(self, namespace: str, key: str) -> Optional[bytes]:
+        return _get(self._connection(), namespace, key)
+
+    def _put_many(self, namespace: str, items: List[Tuple[str, bytes]]) -> None:
+        db = self._connection()
+        with db:
+            db.executemany(
+                "INSERT OR REPLACE INTO kv (namespace, key, value) VALUES (?, ?, ?)",
+                ((namespace, key, value) for key, value in items),
+            )
+
+    def _delete(self, namespace: str, key: str) -> bool:
+        db = self._connection()
+        with db:
+            return db.execute("DELETE FROM kv WHERE namespace = ? AND key = ?", (namespace, key)).rowcount > 0
+
+    def _scan(self, namespace: str, prefix: str) -> List[Tuple[str, bytes]]:
+        return _scan(self._connection(), namespace, prefix)
+
+    def _append(self, log: str, records: List[bytes]) -> List[int]:
+        db = self._connection()
+        start = self._next_seq.get(log)
+        if start is None:
+            # Logs written before log_meta existed fall back to their highest seq
+            start = db.execute(
+                "SELECT MAX(COALESCE((SELECT last_seq FROM log_meta WHERE name = ?), 0), "
+                "COALESCE((SELECT MAX(seq) FROM log WHERE name = ?), 0)) + 1",
+                (log, log),
+            ).fetchone()[0]
+        seqs = list(range(start, start + len(records)))
+        with db:
+            db.executemany(
+                "INSERT INTO log (name, seq, value) VALUES (?, ?, ?)",
+                ((log, seq, record) for seq, record in zip(seqs, records)),
+            )
+            db.execute("INSERT OR REPLACE INTO log_meta (name, last_seq) VALUES (?, ?)", (log, seqs[-1]))
+        self._next_seq[log] = start + len(records)
+        return seqs
+
+    def _read_log(self, log: str, after: int, limit: int) -> List[Tuple[int, bytes]]:
+        return _read_log(self._connection(), log, after, limit)
+
+    def _trim_log(self, log: str, up_to: int) -> int:
+        db = self._connection()
+        with db:
+            return db.execute("DELETE FROM log WHERE name = ? AND seq <= ?", (log, up_to)).rowcount
+
+    def _open_snapshot(self) -> SQLiteSnapshot:
+        self._connection()
+        db = sqlite3.connect(str(self.path))
+        db.execute("BEGIN")
+        # WAL fixes the snapshot at the transaction's first read
+        db.execute("SELECT 1 FROM kv LIMIT 1").fetchall()
+        return SQLiteSnapshot(self, db)
+
+    def _close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -1503,9 +1503,7 @@ class SearchCastsTool(ToolInterface):
                     }
                     
                     # Store in search cache
-                    if query_hash not in context.world_state_manager.state.search_cache:
-                        context.world_state_manager.state.search_cache[query_hash] = {}
-                    context.world_state_manager.state.search_cache[query_hash] = search_cache_data
+                    context.world_state_manager.cache_search_result(query_hash, search_cache_data)
                     
                     # Also cache as general tool result
                     params_key = f"{query}_{channel_id or 'all'}_{limit}"
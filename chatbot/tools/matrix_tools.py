@@ -592,12 +592,13 @@ class AcceptMatrixInviteTool(ToolInterface):
 
     @property
     def description(self) -> str:
-        return "Accept a pending Matrix room invitation and join the room. Use this when you want to join a room you've been invited to. You can see pending invites in the world state."
+        return "Accept a pending Matrix room invitation and join the room. Use this when you want to join a room you've been invited to. You can see pending invites in the world state. Set accept_all to accept every pending invite at once."
 
     @property
     def parameters_schema(self) -> Dict[str, Any]:
         return {
             "room_id": "string - The room ID of the invitation to accept (e.g., !xmpqAkRnpDKKtcUWrC:chat.ratimics.com)",
+            "accept_all": "boolean (optional) - Accept all pending invitations instead of a single room_id",
         }
 
     async def execute(
@@ -614,6 +615,9 @@ class AcceptMatrixInviteTool(ToolInterface):
             logger.error(error_msg)
             return {"status": "failure", "error": error_msg, "timestamp": time.time()}
 
+        if params.get("accept_all"):
+            return await self._accept_all(context)
+
         # Extract and validate parameters
         room_id = params.get("room_id")
 
@@ -654,6 +658,29 @@ class AcceptMatrixInviteTool(ToolInterface):
             return {"status": "failure", "error": error_msg, "timestamp": time.time()}
 
 
+    async def _accept_all(self, context: ActionContext) -> Dict[str, Any]:
+        try:
+            result = await context.matrix_observer.accept_pending_invites()
+        except Exception as e:
+            error_msg = f"Error executing {self.name}: {str(e)}"
+            logger.exception(error_msg)
+            return {"status": "failure", "error": error_msg, "timestamp": time.time()}
+
+        accepted, failed = result.get("accepted", []), result.get("failed", {})
+        if not result.get("success") and not accepted:
+            error_msg = f"Failed to accept Matrix room invitations: {result.get('error') or failed}"
+            logger.error(error_msg)
+            return {"status": "failure", "error": error_msg, "failed": failed, "timestamp": time.time()}
+
+        return {
+            "status": "success",
+            "message": f"Accepted {len(accepted)} Matrix room invitations ({len(failed)} failed)",
+            "accepted": accepted,
+            "failed": failed,
+            "timestamp": time.time(),
+        }
+
+
 class IgnoreMatrixInviteTool(ToolInterface):
     """
     Tool for ignoring/declining Matrix room invitations.
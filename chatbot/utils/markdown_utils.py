@@ -2,63 +2,78 @@
 Utility functions for converting markdown to Matrix-compatible HTML.
 """
 import re
-from typing import Dict
+from collections import OrderedDict
+from typing import Dict, Tuple
 
 import markdown
 
+MARKDOWN_EXTENSIONS = ["fenced_code", "tables", "nl2br", "sane_lists"]
+
+# Code blocks are wrapped the way codehilite did, minus the Pygments spans
+# that were previously generated and then stripped again
+_CODE_BLOCK_OPEN_RE = re.compile(r'<pre><code(?: class="[^"]*")?>')
+_CODE_BLOCK_CLOSE = "</code></pre>"
+
+_PLAIN_PATTERNS = [
+    # Remove code blocks
+    (re.compile(r"```[\s\S]*?```"), "[Code Block]"),
+    (re.compile(r"`([^`]+)`"), r"\1"),
+    # Remove links but keep text
+    (re.compile(r"\[([^\]]+)\]\([^\)]+\)"), r"\1"),
+    # Remove bold/italic
+    (re.compile(r"\*\*([^\*]+)\*\*"), r"\1"),
+    (re.compile(r"\*([^\*]+)\*"), r"\1"),
+    (re.compile(r"__([^_]+)__"), r"\1"),
+    (re.compile(r"_([^_]+)_"), r"\1"),
+    # Remove headers
+    (re.compile(r"^#+\s*", re.MULTILINE), ""),
+    # Remove list markers
+    (re.compile(r"^\s*[-*+]\s+", re.MULTILINE), ""),
+    (re.compile(r"^\s*\d+\.\s+", re.MULTILINE), ""),
+    # Remove block quotes
+    (re.compile(r"^\s*>\s*", re.MULTILINE), ""),
+    # Clean up extra whitespace
+    (re.compile(r"\n\s*\n"), "\n\n"),
+]
+
 
 class MatrixMarkdownFormatter:
     """Utility class for converting markdown to Matrix-compatible HTML."""
 
-    def __init__(self):
-        self.md = markdown.Markdown(
-            extensions=["fenced_code", "codehilite", "tables", "nl2br", "sane_lists"]
-        )
+    def __init__(self, cache_size: int = 256):
+        # One parser, reset before each conversion
+        self.md = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
 
     def convert(self, markdown_text: str) -> Dict[str, str]:
         """Convert markdown to both plain text and HTML for Matrix."""
-        # Create a fresh Markdown parser for each conversion with codehilite
-        md_parser = markdown.Markdown(
-            extensions=["fenced_code", "codehilite", "tables", "nl2br", "sane_lists"]
-        )
-        html_content = md_parser.convert(markdown_text)
-        # Post-process to remove span tags inserted by codehilite, preserving class wrappers
-        html_content = re.sub(r"<span[^>]*>", "", html_content)
-        html_content = html_content.replace("</span>", "")
+        cached = self._cache.get(markdown_text)
+        if cached is not None:
+            self._cache.move_to_end(markdown_text)
+            plain_text, html_content = cached
+            return {"plain": plain_text, "html": html_content}
+
+        self.md.reset()
+        html_content = self.md.convert(markdown_text)
+        if _CODE_BLOCK_CLOSE in html_content:
+            html_content = _CODE_BLOCK_OPEN_RE.sub('<div class="codehilite"><pre><code>', html_content)
+            html_content = html_content.replace(_CODE_BLOCK_CLOSE, _CODE_BLOCK_CLOSE + "</div>")
 
         # Create plain text fallback by removing markdown syntax
         plain_text = self._markdown_to_plain(markdown_text)
 
+        if self.cache_size:
+            self._cache[markdown_text] = (plain_text, html_content)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
         return {"plain": plain_text, "html": html_content}
 
     def _markdown_to_plain(self, markdown_text: str) -> str:
         """Convert markdown to plain text by removing formatting."""
-        # Remove code blocks
-        text = re.sub(r"```[\s\S]*?```", "[Code Block]", markdown_text)
-        text = re.sub(r"`([^`]+)`", r"\1", text)
-
-        # Remove links but keep text
-        text = re.sub(r"\[([^\]]+)\]\([^\)]+\)", r"\1", text)
-
-        # Remove bold/italic
-        text = re.sub(r"\*\*([^\*]+)\*\*", r"\1", text)
-        text = re.sub(r"\*([^\*]+)\*", r"\1", text)
-        text = re.sub(r"__([^_]+)__", r"\1", text)
-        text = re.sub(r"_([^_]+)_", r"\1", text)
-
-        # Remove headers
-        text = re.sub(r"^#+\s*", "", text, flags=re.MULTILINE)
-
-        # Remove list markers
-        text = re.sub(r"^\s*[-*+]\s+", "", text, flags=re.MULTILINE)
-        text = re.sub(r"^\s*\d+\.\s+", "", text, flags=re.MULTILINE)
-
-        # Remove block quotes
-        text = re.sub(r"^\s*>\s*", "", text, flags=re.MULTILINE)
-
-        # Clean up extra whitespace
-        text = re.sub(r"\n\s*\n", "\n\n", text)
-
+        text = markdown_text
+        for pattern, replacement in _PLAIN_PATTERNS:
+            text = pattern.sub(replacement, text)
         return text.strip()
 
 
@@ -15,7 +15,7 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse, FileResponse
 from fastapi.middleware.cors import CORSMiddleware
@@ -123,19 +123,25 @@ async def get_system_status() -> SystemStatusResponse:
 
 @app.get("/api/state-changes")
 async def get_state_changes(
+    response: Response,
     channel_id: Optional[str] = None,
     change_type: Optional[str] = None,
-    limit: int = 50
+    limit: int = 50,
+    cursor: Optional[str] = None
 ) -> List[StateChangeResponse]:
-    """Get recent state changes with optional filtering"""
+    """Get recent state changes with optional filtering; the X-Next-Cursor header pages further back"""
     if not orchestrator:
         raise HTTPException(status_code=500, detail="Orchestrator not initialized")
     
-    state_changes = await orchestrator.context_manager.get_state_changes(
+    page = await orchestrator.context_manager.history_recorder.get_state_changes_page(
+        limit=limit,
+        cursor=cursor,
         channel_id=channel_id,
-        change_type=change_type,
-        limit=limit
+        change_type=change_type
     )
+    state_changes = page["items"]
+    if page["next_cursor"]:
+        response.headers["X-Next-Cursor"] = page["next_cursor"]
     
     return [
         StateChangeResponse(
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+HistoryRecorder Write Throughput Benchmark
+
+Measures sustained state-change inserts per second through
+HistoryRecorder._persist_state_change (database plus JSONL segment log),
+against the previous implementation that opened a new aiosqlite connection
+per record, re-ran CREATE TABLE and committed twice.
+
+Usage:
+    python scripts/benchmark_history_recorder.py --records 2000
+"""
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import aiosqlite
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from chatbot.core.history_recorder import (  # noqa: E402
+    INSERT_STATE_CHANGE,
+    STATE_CHANGES_SCHEMA,
+    HistoryRecorder,
+    StateChangeBlock,
+)
+
+
+def make_state_change(i):
+    return StateChangeBlock(
+        timestamp=time.time(),
+        change_type="tool_execution",
+        source="tool",
+        channel_id=f"!room{i % 8}:server",
+        observations=f"Tool 'send_matrix_reply' executed (#{i})",
+        potential_actions=None,
+        selected_actions=[{"action_type": "send_matrix_reply", "parameters": {"content": "hi"}}],
+        reasoning="Executed send_matrix_reply",
+        raw_content={"result": "success", "event_id": f"$e{i}"},
+    )
+
+
+async def legacy_persist(db_path, state_change):
+    async with aiosqlite.connect(db_path) as db:
+        await db.execute(STATE_CHANGES_SCHEMA)
+        await db.commit()
+        await db.execute(INSERT_STATE_CHANGE, HistoryRecorder._to_row(state_change))
+        await db.commit()
+
+
+async def run_legacy(db_path, records):
+    started = time.perf_counter()
+    for i in range(records):
+        await legacy_persist(db_path, make_state_change(i))
+    return time.perf_counter() - started
+
+
+async def run_writer(db_path, records):
+    recorder = HistoryRecorder(db_path, storage_path=str(Path(db_path).parent / "segments"))
+    await recorder.initialize()
+    started = time.perf_counter()
+    for i in range(records):
+        await recorder._persist_state_change(make_state_change(i))
+    await recorder.flush()
+    elapsed = time.perf_counter() - started
+    batches = recorder.writer_stats["batches"]
+    await recorder.close()
+    return elapsed, batches
+
+
+async def main(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_elapsed = await run_legacy(str(Path(tmp) / "legacy.db"), args.records)
+        writer_elapsed, batches = await run_writer(str(Path(tmp) / "writer.db"), args.records)
+
+    print(f"{args.records} state changes")
+    print(f"  per-record connection: {args.records / legacy_elapsed:10.0f} inserts/s")
+    print(f"  single WAL writer:     {args.records / writer_elapsed:10.0f} inserts/s  ({batches} commits)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--records", type=int, default=2000)
+    asyncio.run(main(parser.parse_args()))
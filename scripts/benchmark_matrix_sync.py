@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Matrix Sync Startup Benchmark
+
+Runs a local homeserver stand-in (aiohttp) that serves /sync for an account
+joined to many large rooms, then measures the first sync of a nio client the
+way MatrixObserver performs it:
+
+- baseline: full_state sync with no filter and no since-token
+- resumed:  full_state sync with SYNC_FILTER (lazy-loaded members) and a
+            persisted since-token
+
+Reports wall time and response bytes for each mode.
+
+Usage:
+    python scripts/benchmark_matrix_sync.py --rooms 300 --members 500
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from urllib.parse import unquote
+
+from aiohttp import web
+from nio import AsyncClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from chatbot.integrations.matrix.observer import SYNC_FILTER  # noqa: E402
+
+USER_ID = "@bot:bench.local"
+TIMELINE_SIZE = 20
+
+
+def state_event(event_type, state_key, content, idx):
+    return {
+        "type": event_type,
+        "state_key": state_key,
+        "content": content,
+        "sender": "@admin:bench.local",
+        "event_id": f"$state{idx}",
+        "origin_server_ts": 1700000000000,
+    }
+
+
+def build_room(room_idx, members, lazy_load, include_timeline):
+    room_id = f"!room{room_idx}:bench.local"
+    senders = [f"@user{i}:bench.local" for i in range(min(members, 5))]
+    timeline = []
+    if include_timeline:
+        timeline = [
+            {
+                "type": "m.room.message",
+                "sender": senders[i % len(senders)],
+                "event_id": f"$msg{room_idx}_{i}",
+                "origin_server_ts": 1700000000000 + i,
+                "content": {"msgtype": "m.text", "body": f"message {i} in room {room_idx}"},
+            }
+            for i in range(TIMELINE_SIZE)
+        ]
+    # With lazy loading the server only sends members relevant to the timeline
+    member_ids = senders + [USER_ID] if lazy_load else [f"@user{i}:bench.local" for i in range(members)] + [USER_ID]
+    state = [
+        state_event("m.room.create", "", {"creator": "@admin:bench.local"}, 0),
+        state_event("m.room.name", "", {"name": f"Room {room_idx}"}, 1),
+        state_event("m.room.topic", "", {"topic": "benchmark room"}, 2),
+        state_event("m.room.power_levels", "", {"users": {"@admin:bench.local": 100}}, 3),
+    ] + [
+        state_event("m.room.member", uid, {"membership": "join", "displayname": uid[1:8]}, 10 + n)
+        for n, uid in enumerate(member_ids)
+    ]
+    return room_id, {
+        "summary": {"m.joined_member_count": members + 1, "m.invited_member_count": 0},
+        "state": {"events": state},
+        "timeline": {"events": timeline, "limited": False, "prev_batch": f"p{room_idx}"},
+        "ephemeral": {"events": []},
+        "account_data": {"events": []},
+        "unread_notifications": {},
+    }
+
+
+def make_app(rooms, members, stats):
+    async def sync(request):
+        raw_filter = request.query.get("filter")
+        lazy_load = False
+        if raw_filter:
+            if raw_filter.startswith("{"):
+                filter_def = json.loads(unquote(raw_filter))
+            else:
+                filter_def = request.app["filters"][raw_filter]
+            lazy_load = filter_def.get("room", {}).get("state", {}).get("lazy_load_members", False)
+        since = request.query.get("since")
+        body = json.dumps(
+            {
+                "next_batch": "s_bench_2",
+                "rooms": {
+                    "join": dict(
+                        build_room(i, members, lazy_load, include_timeline=since is None)
+                        for i in range(rooms)
+                    ),
+                    "invite": {},
+                    "leave": {},
+                },
+                "presence": {"events": []},
+                "account_data": {"events": []},
+                "to_device": {"events": []},
+            }
+        ).encode()
+        stats["bytes"] += len(body)
+        return web.Response(body=body, content_type="application/json")
+
+    async def upload_filter(request):
+        filter_id = str(len(request.app["filters"]))
+        request.app["filters"][filter_id] = await request.json()
+        return web.json_response({"filter_id": filter_id})
+
+    app = web.Application()
+    app["filters"] = {}
+    app.router.add_get("/_matrix/client/v3/sync", sync)
+    app.router.add_post("/_matrix/client/v3/user/{user_id}/filter", upload_filter)
+    return app
+
+
+async def first_sync(base_url, use_filter, since):
+    client = AsyncClient(base_url, USER_ID)
+    client.access_token = "bench"
+    client.user_id = USER_ID
+    try:
+        sync_filter = None
+        if use_filter:
+            response = await client.upload_filter(
+                presence=SYNC_FILTER["presence"],
+                account_data=SYNC_FILTER["account_data"],
+                room=SYNC_FILTER["room"],
+            )
+            sync_filter = response.filter_id
+        started = time.perf_counter()
+        response = await client.sync(timeout=0, sync_filter=sync_filter, since=since, full_state=True)
+        await client.receive_response(response)
+        return time.perf_counter() - started, len(client.rooms)
+    finally:
+        await client.close()
+
+
+async def main(args):
+    stats = {"bytes": 0}
+    runner = web.AppRunner(make_app(args.rooms, args.members, stats))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", args.port)
+    await site.start()
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        print(f"{args.rooms} rooms x {args.members} members")
+        for label, use_filter, since in (
+            ("baseline (no filter, no since)", False, None),
+            ("lazy-load filter, no since", True, None),
+            ("lazy-load filter + since-token", True, "s_bench_1"),
+        ):
+            stats["bytes"] = 0
+            elapsed, room_count = await first_sync(base_url, use_filter, since)
+            print(
+                f"  {label:<34} {elapsed * 1000:8.1f} ms  "
+                f"{stats['bytes'] / 1024 / 1024:8.2f} MiB  rooms={room_count}"
+            )
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rooms", type=int, default=300)
+    parser.add_argument("--members", type=int, default=500)
+    parser.add_argument("--port", type=int, default=8765)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+State-Change Query Benchmark
+
+Builds a state_changes table with --rows records and times the read paths
+used by the API and control panel, first on the bare table (the previous
+schema) and then with the timestamp/change_type/channel_id indexes:
+
+  - latest page filtered by change type and by channel
+  - a deep page via LIMIT/OFFSET versus a keyset cursor
+  - the "last 24 hours" count used by get_statistics
+
+It also compares peak Python memory when exporting the whole table with
+fetchall() versus cursor iteration.
+
+Usage:
+    python scripts/benchmark_state_change_queries.py --rows 1000000
+"""
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from chatbot.core.history_recorder import (  # noqa: E402
+    INSERT_STATE_CHANGE,
+    STATE_CHANGES_INDEXES,
+    STATE_CHANGES_SCHEMA,
+)
+
+CHANGE_TYPES = ("llm_observation", "tool_execution", "user_input", "world_update")
+COLUMNS = "id, timestamp, change_type, source, channel_id, observations, raw_content"
+
+
+def populate(db, rows):
+    now = time.time()
+    db.execute(STATE_CHANGES_SCHEMA)
+    db.executemany(
+        INSERT_STATE_CHANGE,
+        (
+            (
+                now - (rows - i),
+                CHANGE_TYPES[i % len(CHANGE_TYPES)],
+                "tool",
+                f"!room{i % 50}:server",
+                f"observation {i}",
+                None,
+                None,
+                None,
+                f'{{"i": {i}}}',
+            )
+            for i in range(rows)
+        ),
+    )
+    db.commit()
+
+
+def timed(db, query, params, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        db.execute(query, params).fetchall()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def run_queries(db, rows):
+    depth = rows // 2
+    # Keyset cursor for the row that OFFSET `depth` would start at
+    cursor_ts, cursor_id = db.execute(
+        "SELECT timestamp, id FROM state_changes ORDER BY timestamp DESC, id DESC LIMIT 1 OFFSET ?",
+        (depth,),
+    ).fetchone()
+    order = " ORDER BY timestamp DESC, id DESC LIMIT 50"
+    return {
+        "recent by change_type": timed(
+            db, f"SELECT {COLUMNS} FROM state_changes WHERE change_type = ?{order}", ("user_input",)
+        ),
+        "recent by channel": timed(
+            db, f"SELECT {COLUMNS} FROM state_changes WHERE channel_id = ?{order}", ("!room7:server",)
+        ),
+        f"page at offset {depth}": timed(
+            db, f"SELECT {COLUMNS} FROM state_changes{order} OFFSET ?", (depth,)
+        ),
+        "keyset page at same depth": timed(
+            db,
+            f"SELECT {COLUMNS} FROM state_changes WHERE (timestamp, id) < (?, ?){order}",
+            (cursor_ts, cursor_id),
+        ),
+        "count last 24h": timed(
+            db, "SELECT COUNT(*) FROM state_changes WHERE timestamp > ?", (time.time() - 86400,)
+        ),
+    }
+
+
+def export_peak(db, streaming):
+    tracemalloc.start()
+    cursor = db.execute(f"SELECT {COLUMNS} FROM state_changes ORDER BY timestamp ASC")
+    count = 0
+    for _ in cursor if streaming else cursor.fetchall():
+        count += 1
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / (1024 * 1024)
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = sqlite3.connect(str(Path(tmp) / "history.db"))
+        started = time.perf_counter()
+        populate(db, args.rows)
+        print(f"{args.rows} rows inserted in {time.perf_counter() - started:.1f}s\n")
+
+        before = run_queries(db, args.rows)
+        started = time.perf_counter()
+        for statement in STATE_CHANGES_INDEXES:
+            db.execute(statement)
+        db.commit()
+        print(f"indexes built in {time.perf_counter() - started:.1f}s\n")
+        after = run_queries(db, args.rows)
+
+        print(f"  {'query':32} {'no index':>10} {'indexed':>10}")
+        for name in before:
+            print(f"  {name:32} {before[name]:8.2f}ms {after[name]:8.2f}ms")
+
+        print("\nexport peak memory")
+        print(f"  fetchall():         {export_peak(db, streaming=False):8.1f} MiB")
+        print(f"  cursor iteration:   {export_peak(db, streaming=True):8.1f} MiB")
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    main(parser.parse_args())
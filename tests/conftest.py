@@ -7,11 +7,13 @@ import logging  # Add this
 import os
 import shutil
 import tempfile
+import time
 from pathlib import Path
 from typing import AsyncGenerator, Generator
 import pytest
 import pytest_asyncio  # Import this
 from unittest.mock import AsyncMock, MagicMock
+from nio import JoinError, JoinResponse, RoomMessageText, RoomSendError, RoomSendResponse
 
 from chatbot.config import AppConfig
 from chatbot.core.context import ContextManager
@@ -210,6 +212,98 @@ def generate_image_tool(mock_action_context: ActionContext) -> GenerateImageTool
     return tool
 
 
+class FakeProcessingHub:
+    """ProcessingHub stand-in for idle-window services; set ``idle`` to change idle_seconds()."""
+
+    def __init__(self, idle: float = 999):
+        self.idle = idle
+
+    def idle_seconds(self) -> float:
+        return self.idle
+
+
+@pytest.fixture
+def fake_hub():
+    """Factory for FakeProcessingHub instances, idle by default."""
+    return FakeProcessingHub
+
+
+class FakeHomeserver:
+    """Answers Matrix joins and sends after a delay, rate limiting the first ``limited`` calls."""
+
+    def __init__(self, delay: float = 0.01, limited: int = 0, retry_after_ms: int = 100):
+        self.delay, self.limited, self.retry_after_ms = delay, limited, retry_after_ms
+        self.active = self.peak = self.calls = 0
+        self.call_times = []
+        self.sent = []  # (monotonic time, room_id, content) per send
+
+    async def _answer(self) -> bool:
+        """Count the call, wait ``delay`` and return whether it is rate limited."""
+        self.calls += 1
+        self.call_times.append(time.monotonic())
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        if self.limited:
+            self.limited -= 1
+            return True
+        return False
+
+    async def join(self, room_id):
+        if await self._answer():
+            return JoinError("Too Many Requests", "M_LIMIT_EXCEEDED", self.retry_after_ms)
+        return JoinResponse(room_id)
+
+    async def send(self, room_id, content):
+        self.sent.append((time.monotonic(), room_id, content))
+        if await self._answer():
+            return RoomSendError("Too Many Requests", "M_LIMIT_EXCEEDED", self.retry_after_ms)
+        return RoomSendResponse(f"$e{len(self.sent)}", room_id)
+
+
+@pytest.fixture
+def fake_homeserver():
+    """Factory for FakeHomeserver instances."""
+    return FakeHomeserver
+
+
+@pytest.fixture
+def matrix_text_event():
+    """Factory for real nio RoomMessageText events."""
+
+    def make(event_id, sender="@alice:server", ts_ms=1700000000123, body="hi", relates_to=None):
+        content = {"msgtype": "m.text", "body": body}
+        if relates_to:
+            content["m.relates_to"] = relates_to
+        return RoomMessageText.from_dict(
+            {
+                "event_id": event_id,
+                "sender": sender,
+                "origin_server_ts": ts_ms,
+                "type": "m.room.message",
+                "content": content,
+            }
+        )
+
+    return make
+
+
+@pytest.fixture
+def matrix_room():
+    """Factory for a minimal MatrixRoom stand-in with no members or power levels."""
+
+    def make(room_id="!room:server", name=None):
+        room = MagicMock()
+        room.room_id, room.display_name, room.name = room_id, name or room_id, name or room_id
+        room.users, room.member_count, room.power_levels = {}, 2, None
+        return room
+
+    return make
+
+
 # Test categories for easier test selection
 pytest_plugins = ["pytest_asyncio"]
 
@@ -204,3 +204,23 @@ class TestContextManagerExtended:
             # If no summarize method, just get context
             context = await self.context_manager.get_context(channel_id)
             assert context is not None
+
+    @pytest.mark.asyncio
+    async def test_system_prompt_renders_lazily_per_world_state_version(self):
+        """Messages don't serialize the world state; reading the prompt after a change does."""
+        prompt = self.context_manager.world_state_prompt
+
+        for i in range(5):
+            await self.context_manager.add_user_message(f"channel_{i % 2}", {"content": f"msg {i}"})
+            await self.context_manager.add_tool_result(f"channel_{i % 2}", "observe", {"result": "ok"})
+        assert prompt.renders == 0
+
+        context = await self.context_manager.get_context("channel_0")
+        assert "CURRENT WORLD STATE" in context.system_prompt
+        assert (await self.context_manager.get_context("channel_1")).system_prompt == context.system_prompt
+        assert prompt.renders == 1
+
+        self.world_state.add_channel("!new:server", "matrix", "New Room")
+        assert "New Room" in context.system_prompt
+        assert "!new:server" in context.world_state["channels"]
+        assert prompt.renders == 2
@@ -0,0 +1,143 @@
+"""
+Tests for priority ordering, channel fairness and deadline drops in FarcasterScheduler.
+"""
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from chatbot.core.world_state.manager import WorldStateManager
+from chatbot.core.world_state.structures import Message
+from chatbot.integrations.farcaster.farcaster_outbound_queue import (
+    FarcasterOutboundQueue,
+    OutboundPriority,
+)
+from chatbot.integrations.farcaster.farcaster_scheduler import (
+    ChannelFairSelector,
+    FarcasterScheduler,
+)
+
+
+def make_api_client():
+    client = MagicMock()
+    client.signer_uuid = "signer"
+    client.bot_fid = "42"
+    client.publish_cast = AsyncMock(return_value={"cast": {"hash": "0xnew"}})
+    return client
+
+
+def claim_order(queue, selector=None):
+    order = []
+    while (item := queue.claim_next(selector)) is not None:
+        order.append(item.get("reply_to_hash") or item["content"])
+        queue.mark_sent(item["id"])
+    return order
+
+
+class TestPriorityQueue:
+    def test_mention_replies_jump_ahead_of_backlog(self):
+        queue = FarcasterOutboundQueue()
+        queue.enqueue("post", "dev", {"content": "post", "channel": "dev"}, priority=OutboundPriority.POST)
+        for i in range(3):
+            queue.enqueue(
+                "reply", f"0xthread{i}", {"content": "t", "reply_to_hash": f"0xthread{i}"},
+                priority=OutboundPriority.THREAD_REPLY,
+            )
+        queue.enqueue(
+            "reply", "0xmention", {"content": "m", "reply_to_hash": "0xmention"},
+            priority=OutboundPriority.MENTION_REPLY,
+        )
+
+        assert claim_order(queue) == ["0xmention", "0xthread0", "0xthread1", "0xthread2", "post"]
+
+    def test_expired_items_are_dropped_and_can_be_rescheduled(self):
+        queue = FarcasterOutboundQueue()
+        queue.enqueue("reply", "0xold", {"content": "late", "reply_to_hash": "0xold"}, deadline=time.time() - 1)
+        queue.enqueue("reply", "0xnew", {"content": "ok", "reply_to_hash": "0xnew"}, deadline=time.time() + 60)
+
+        dropped = queue.drop_expired()
+
+        assert [item["reply_to_hash"] for item in dropped] == ["0xold"]
+        assert not queue.has_active_target("reply", "0xold")
+        assert claim_order(queue) == ["0xnew"]
+        assert queue.enqueue("reply", "0xold", {"content": "late", "reply_to_hash": "0xold"})
+
+
+class TestChannelFairSelector:
+    def test_busy_channel_does_not_starve_others(self):
+        queue = FarcasterOutboundQueue()
+        for i in range(4):
+            queue.enqueue("post", "busy", {"content": f"busy{i}", "channel": "busy"}, channel="busy")
+        queue.enqueue("post", "quiet", {"content": "quiet0", "channel": "quiet"}, channel="quiet")
+
+        order = claim_order(queue, ChannelFairSelector().select)
+
+        assert order.index("quiet0") <= 1
+
+    def test_weights_set_share_of_service(self):
+        selector = ChannelFairSelector({"a": 3.0, "b": 1.0})
+        picks = [selector.select(["a", "b"]) for _ in range(40)]
+
+        assert picks.count("a") == 30
+        assert picks.count("b") == 10
+
+
+class TestSchedulerPriority:
+    def test_reply_priority_is_classified_from_world_state(self):
+        world_state = WorldStateManager()
+        for msg_id, channel_id, cast_type in (
+            ("0xmention", "farcaster:notifications", "notification_mention"),
+            ("0xthread", "farcaster:dev", "channel_feed"),
+        ):
+            world_state.add_message(
+                channel_id,
+                Message(
+                    id=msg_id, channel_id=channel_id, channel_type="farcaster", sender="alice",
+                    content="hi", timestamp=time.time(), metadata={"cast_type": cast_type},
+                ),
+            )
+        scheduler = FarcasterScheduler(make_api_client(), world_state)
+
+        scheduler.schedule_reply("thanks", "0xthread")
+        scheduler.schedule_reply("hey", "0xmention")
+        scheduler.schedule_reply("?", "0xunknown")
+
+        depth = scheduler.get_queue_status()["depth_by_priority"]
+        assert depth == {"mention_reply": 1, "thread_reply": 2, "post": 0}
+        assert scheduler.outbound_queue.claim_next()["reply_to_hash"] == "0xmention"
+
+    @pytest.mark.asyncio
+    async def test_stale_reply_is_dropped_and_reported(self):
+        world_state = MagicMock()
+        api_client = make_api_client()
+        scheduler = FarcasterScheduler(
+            api_client, world_state, scheduler_interval=0.01, thread_reply_deadline=0.01
+        )
+        scheduler.schedule_reply("late", "0xparent", action_id="act-1")
+        await asyncio.sleep(0.02)
+
+        await scheduler.start()
+        await asyncio.sleep(0.05)
+        await scheduler.stop()
+
+        api_client.publish_cast.assert_not_awaited()
+        world_state.update_action_result.assert_called_once_with(
+            "act-1", "failure: dropped stale reply after deadline"
+        )
+        assert "0xparent" not in scheduler.replied_to_hashes
+        assert scheduler.get_queue_status()["dropped"]["thread_reply"] == 1
+
+    @pytest.mark.asyncio
+    async def test_wait_percentiles_are_reported(self):
+        scheduler = FarcasterScheduler(make_api_client(), MagicMock(), scheduler_interval=0.01)
+        for i in range(3):
+            scheduler.schedule_post(f"post {i}")
+
+        await scheduler.start()
+        await asyncio.sleep(0.1)
+        await scheduler.stop()
+
+        waits = scheduler.get_queue_status()["wait_seconds"]["post"]
+        assert waits["samples"] == 3
+        assert 0 <= waits["p50"] <= waits["p90"] <= waits["p99"]
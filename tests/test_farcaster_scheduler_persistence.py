@@ -0,0 +1,150 @@
+"""
+Tests for the persistent outbound queue behind FarcasterScheduler.
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from chatbot.integrations.farcaster.farcaster_outbound_queue import (
+    FarcasterOutboundQueue,
+    make_idempotency_key,
+)
+from chatbot.integrations.farcaster.farcaster_scheduler import FarcasterScheduler
+
+
+def make_api_client(bot_fid="42"):
+    client = MagicMock()
+    client.signer_uuid = "signer"
+    client.bot_fid = bot_fid
+    client.publish_cast = AsyncMock(return_value={"cast": {"hash": "0xnew"}})
+    client.lookup_cast_conversation = AsyncMock(return_value={"result": {"conversation": {"cast": {"direct_replies": []}}}})
+    return client
+
+
+@pytest.fixture
+def queue_path(tmp_path):
+    return str(tmp_path / "outbound_queue.db")
+
+
+class TestFarcasterOutboundQueue:
+    """State transitions and idempotency of the SQLite queue."""
+
+    def test_idempotency_key_depends_on_target_and_content(self):
+        key = make_idempotency_key("reply", "0xabc", "hello")
+        assert key == make_idempotency_key("reply", "0xabc", "hello")
+        assert key != make_idempotency_key("reply", "0xdef", "hello")
+        assert key != make_idempotency_key("reply", "0xabc", "hello!")
+
+    def test_duplicate_enqueue_is_rejected_until_failed(self, queue_path):
+        queue = FarcasterOutboundQueue(queue_path)
+        assert queue.enqueue("post", None, {"content": "gm"})
+        assert not queue.enqueue("post", None, {"content": "gm"})
+
+        item = queue.claim_next(kind="post")
+        queue.mark_failed(item["id"], "boom")
+        assert queue.enqueue("post", None, {"content": "gm"})
+
+    def test_sent_items_dedup_on_replay(self, queue_path):
+        queue = FarcasterOutboundQueue(queue_path)
+        queue.enqueue("reply", "0xabc", {"content": "hi", "reply_to_hash": "0xabc"})
+        queue.mark_sent(queue.claim_next(kind="reply")["id"], "0xsent")
+        queue.close()
+
+        reopened = FarcasterOutboundQueue(queue_path)
+        assert not reopened.enqueue("reply", "0xabc", {"content": "hi", "reply_to_hash": "0xabc"})
+
+    def test_inflight_items_are_recovered_after_crash(self, queue_path):
+        queue = FarcasterOutboundQueue(queue_path)
+        queue.enqueue("post", "dev", {"content": "gm", "channel": "dev"})
+        queue.claim_next(kind="post")
+        queue.close()  # simulated crash mid-send
+
+        reopened = FarcasterOutboundQueue(queue_path)
+        assert reopened.claim_next(kind="post") is None
+        assert reopened.recover_inflight() == 1
+        item = reopened.claim_next(kind="post")
+        assert item["content"] == "gm"
+        assert item["attempts"] == 2
+
+
+class TestPersistentScheduler:
+    """Scheduler delivery on top of the durable queue."""
+
+    @pytest.mark.asyncio
+    async def test_scheduled_reply_survives_restart(self, queue_path):
+        world_state = MagicMock()
+        first = FarcasterScheduler(make_api_client(), world_state, queue_db_path=queue_path)
+        assert first.schedule_reply("hello", "0xparent", action_id="act-1")
+
+        # New process: the reply is still queued and dedup state is restored
+        api_client = make_api_client()
+        second = FarcasterScheduler(api_client, world_state, scheduler_interval=0.01, queue_db_path=queue_path)
+        assert not second.schedule_reply("hello again", "0xparent")
+        await second.start()
+        await asyncio.sleep(0.05)
+        await second.stop()
+
+        api_client.publish_cast.assert_awaited_once_with(text="hello", signer_uuid="signer", parent="0xparent")
+        world_state.update_action_result.assert_called_once_with("act-1", "success", "0xnew")
+        assert second.get_queue_status()["pending_replies"] == 0
+
+    @pytest.mark.asyncio
+    async def test_replayed_reply_is_not_resent_if_already_on_chain(self, queue_path):
+        queue = FarcasterOutboundQueue(queue_path)
+        queue.enqueue("reply", "0xparent", {"content": "hello", "reply_to_hash": "0xparent"})
+        queue.claim_next(kind="reply")  # crashed after sending, before marking sent
+        queue.close()
+
+        api_client = make_api_client(bot_fid="42")
+        api_client.lookup_cast_conversation.return_value = {
+            "result": {"conversation": {"cast": {"direct_replies": [{"hash": "0xold", "author": {"fid": 42}}]}}}
+        }
+        scheduler = FarcasterScheduler(api_client, MagicMock(), scheduler_interval=0.01, queue_db_path=queue_path)
+        await scheduler.start()
+        await asyncio.sleep(0.05)
+        await scheduler.stop()
+
+        api_client.publish_cast.assert_not_awaited()
+        assert scheduler.outbound_queue.get_stats()["reply"] == {"sent": 1}
+
+    @pytest.mark.asyncio
+    async def test_parallel_senders_drain_queue(self, queue_path):
+        api_client = make_api_client()
+        scheduler = FarcasterScheduler(
+            api_client, MagicMock(), scheduler_interval=0.01, queue_db_path=queue_path, sender_concurrency=3
+        )
+        for i in range(6):
+            scheduler.schedule_post(f"post {i}", channel="dev")
+        await scheduler.start()
+        await asyncio.sleep(0.1)
+        await scheduler.stop()
+
+        assert api_client.publish_cast.await_count == 6
+        assert scheduler.get_queue_status()["pending_posts"] == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_reply_can_be_rescheduled(self, queue_path):
+        api_client = make_api_client()
+        api_client.publish_cast.side_effect = RuntimeError("neynar down")
+        scheduler = FarcasterScheduler(api_client, MagicMock(), scheduler_interval=0.01, queue_db_path=queue_path)
+        scheduler.schedule_reply("hello", "0xparent")
+        await scheduler.start()
+        await asyncio.sleep(0.05)
+        await scheduler.stop()
+
+        assert "0xparent" not in scheduler.replied_to_hashes
+        assert scheduler.schedule_reply("hello", "0xparent")
+
+
+    @pytest.mark.asyncio
+    async def test_stop_closes_queue_and_restart_reopens_it(self, queue_path):
+        scheduler = FarcasterScheduler(make_api_client(), MagicMock(), scheduler_interval=0.01, queue_db_path=queue_path)
+        scheduler.schedule_post("hello")
+        await scheduler.stop()
+        assert scheduler.outbound_queue._db is None
+
+        await scheduler.start()
+        await asyncio.sleep(0.05)
+        await scheduler.stop()
+        assert scheduler.get_queue_status()["pending_posts"] == 0
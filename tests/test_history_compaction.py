@@ -0,0 +1,135 @@
+"""
+Tests for tiered history retention and incremental VACUUM.
+"""
+import json
+import sqlite3
+import time
+
+import pytest
+
+from chatbot.core.history_compaction import DAY_SECONDS, HistoryCompactionService
+from chatbot.core.history_recorder import HistoryRecorder, StateChangeBlock
+
+
+def state_change(age_days, i):
+    return StateChangeBlock(
+        timestamp=time.time() - age_days * DAY_SECONDS,
+        change_type="llm_observation",
+        source="llm",
+        channel_id="!a:server",
+        observations="o" * 1000,
+        potential_actions=[{"action_type": "wait", "parameters": {}}],
+        selected_actions=[{"action_type": "send_matrix_reply", "parameters": {"content": "x" * 500}}],
+        reasoning="r" * 1000,
+        raw_content={"i": i, "blob": "b" * 4000},
+    )
+
+
+async def seeded_recorder(tmp_path):
+    recorder = HistoryRecorder(str(tmp_path / "history.db"), storage_path=str(tmp_path / "segments"))
+    for i in range(30):
+        await recorder._persist_state_change(state_change(age_days=(0, 60, 400)[i % 3], i=i))
+    await recorder.flush()
+    return recorder
+
+
+@pytest.mark.asyncio
+async def test_tiers_keep_summarize_and_drop(tmp_path, fake_hub):
+    recorder = await seeded_recorder(tmp_path)
+    service = HistoryCompactionService(
+        recorder, fake_hub(), full_retention_days=30, summary_retention_days=365,
+        idle_seconds=10, batch_size=4,
+    )
+    try:
+        result = await service.run_once()
+        assert result["dropped"] == 10 and result["summarized"] == 10
+
+        stats = await recorder.get_database_stats()
+        assert stats["records"] == 20 and stats["summarized_records"] == 10
+        assert stats["auto_vacuum"] == 2 and stats["freelist_count"] == 0
+
+        old = (await recorder.get_state_changes(since_timestamp=0, limit=100))[-1]
+        assert old.raw_content["compacted"] and old.raw_content["keys"] == ["blob", "i"]
+        assert old.selected_actions == ["send_matrix_reply"] and old.potential_actions is None
+        assert len(old.observations) == 280
+        recent = (await recorder.get_recent_state_changes(limit=1))[0]
+        assert recent.raw_content["blob"] == "b" * 4000
+
+        assert not any((await service.run_once()).values())
+    finally:
+        await recorder.close()
+
+
+@pytest.mark.asyncio
+async def test_busy_processing_hub_defers_compaction(tmp_path, fake_hub):
+    recorder = await seeded_recorder(tmp_path)
+    service = HistoryCompactionService(recorder, fake_hub(idle=1), idle_seconds=10)
+    try:
+        assert not any((await service.run_once()).values())
+        assert (await recorder.get_database_stats())["full_records"] == 30
+    finally:
+        await recorder.close()
+
+
+@pytest.mark.asyncio
+async def test_sealed_segments_follow_the_retention_tiers(tmp_path):
+    # Each recorder instance seals its own segment on close
+    for age_days in (400, 60, 0):
+        recorder = HistoryRecorder(str(tmp_path / "history.db"), storage_path=str(tmp_path / "segments"))
+        for i in range(5):
+            await recorder._persist_state_change(state_change(age_days=age_days, i=i))
+        await recorder.close()
+
+    recorder = HistoryRecorder(str(tmp_path / "history.db"), storage_path=str(tmp_path / "segments"))
+    service = HistoryCompactionService(recorder, None, full_retention_days=30, summary_retention_days=365)
+    try:
+        result = await service.run_once()
+        assert result["segments_dropped"] == 1 and result["segments_summarized"] == 1
+        assert result["segment_bytes_freed"] > 0
+        assert len(recorder.segment_log.segments()) == 2
+
+        exported = tmp_path / "export.jsonl"
+        assert "Exported 10 " in await recorder.export_state_changes_for_training(str(exported))
+        records = [json.loads(line) for line in exported.read_text().splitlines()]
+        old, recent = records[0], records[-1]
+        assert old["raw_content"]["compacted"] and old["raw_content"]["keys"] == ["blob", "i"]
+        assert old["selected_actions"] == ["send_matrix_reply"] and old["potential_actions"] is None
+        assert recent["raw_content"]["blob"] == "b" * 4000
+
+        result = await service.run_once()
+        assert not result["segments_summarized"] and not result["segments_dropped"]
+    finally:
+        await recorder.close()
+
+
+@pytest.mark.asyncio
+async def test_legacy_database_is_migrated_and_converted(tmp_path):
+    db_path = tmp_path / "legacy.db"
+    with sqlite3.connect(db_path) as db:
+        db.execute(
+            "CREATE TABLE state_changes (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp REAL NOT NULL, "
+            "change_type TEXT NOT NULL, source TEXT NOT NULL, channel_id TEXT, observations TEXT, "
+            "potential_actions TEXT, selected_actions TEXT, reasoning TEXT, raw_content TEXT NOT NULL, "
+            "created_at DATETIME DEFAULT CURRENT_TIMESTAMP)"
+        )
+        db.executemany(
+            "INSERT INTO state_changes (timestamp, change_type, source, raw_content) VALUES (?, 'x', 'y', ?)",
+            [(time.time() - 500 * DAY_SECONDS, json.dumps({"blob": "b" * 4000})) for _ in range(50)],
+        )
+
+    recorder = HistoryRecorder(str(db_path), storage_path=str(tmp_path / "segments"))
+    service = HistoryCompactionService(recorder, None, batch_size=100)
+    try:
+        # The blocking full VACUUM only runs when conversion is opted into
+        result = await service.run_once()
+        stats = await recorder.get_database_stats()
+        assert result["dropped"] == 50 and result["pages_freed"] == 0
+        assert service.stats["full_vacuums"] == 0 and stats["auto_vacuum"] == 0
+
+        service.convert_legacy = True
+        await service.run_once()
+        stats = await recorder.get_database_stats()
+        assert service.stats["full_vacuums"] == 1
+        assert stats["auto_vacuum"] == 2 and stats["freelist_count"] == 0
+    finally:
+        await recorder.close()
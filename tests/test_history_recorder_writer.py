@@ -0,0 +1,102 @@
+"""
+Tests for the HistoryRecorder single-connection group-commit writer.
+"""
+import sqlite3
+import time
+from datetime import datetime
+
+import pytest
+
+from chatbot.core.history_recorder import HistoryRecorder, StateChangeBlock
+
+
+def state_change(i):
+    return StateChangeBlock(
+        timestamp=time.time(),
+        change_type="tool_execution",
+        source="tool",
+        channel_id="!room:server",
+        observations=f"record {i}",
+        potential_actions=None,
+        selected_actions=None,
+        reasoning=None,
+        raw_content={"i": i},
+    )
+
+
+@pytest.mark.asyncio
+async def test_writes_are_group_committed(tmp_path):
+    recorder = HistoryRecorder(str(tmp_path / "history.db"), storage_path=str(tmp_path / "segments"), batch_size=50)
+    await recorder.initialize()
+
+    for i in range(200):
+        await recorder._persist_state_change(state_change(i))
+    await recorder.flush()
+
+    assert recorder.writer_stats["written"] == 200
+    assert recorder.writer_stats["batches"] <= 10
+    await recorder.close()
+
+
+@pytest.mark.asyncio
+async def test_database_uses_wal_and_close_commits_pending(tmp_path):
+    db_path = tmp_path / "history.db"
+    recorder = HistoryRecorder(str(db_path), storage_path=str(tmp_path / "segments"), commit_interval=10.0)
+    await recorder.initialize()
+    await recorder._persist_state_change(state_change(1))
+    await recorder.close()
+
+    with sqlite3.connect(db_path) as db:
+        assert db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert db.execute("SELECT COUNT(*) FROM state_changes").fetchone()[0] == 1
+
+
+@pytest.mark.asyncio
+async def test_reads_see_queued_writes_without_initialize(tmp_path):
+    recorder = HistoryRecorder(str(tmp_path / "history.db"), storage_path=str(tmp_path / "segments"), commit_interval=10.0)
+
+    await recorder.record_world_update("test", {"k": "v"})
+    recent = await recorder.get_recent_state_changes(limit=5)
+
+    assert [c.change_type for c in recent] == ["world_update"]
+    await recorder.close()
+
+
+@pytest.mark.asyncio
+async def test_queue_is_bounded(tmp_path):
+    recorder = HistoryRecorder(str(tmp_path / "history.db"), storage_path=str(tmp_path / "segments"), queue_size=4)
+    await recorder.initialize()
+
+    assert recorder._queue.maxsize == 4
+    for i in range(20):
+        await recorder._persist_state_change(state_change(i))
+    stats = await recorder.get_statistics()
+
+    assert stats["total_records"] == 20
+    await recorder.close()
+
+
+@pytest.mark.asyncio
+async def test_unserializable_record_does_not_drop_its_batch(tmp_path):
+    recorder = HistoryRecorder(
+        str(tmp_path / "history.db"), storage_path=str(tmp_path / "segments"), batch_size=50, commit_interval=10.0
+    )
+    await recorder.initialize()
+    circular = {}
+    circular["self"] = circular
+
+    for i in range(10):
+        await recorder._persist_state_change(state_change(i))
+    dated = state_change(10)
+    dated.raw_content = {"at": datetime(2024, 1, 1)}
+    await recorder._persist_state_change(dated)
+    broken = state_change(11)
+    broken.raw_content = circular
+    await recorder._persist_state_change(broken)
+    await recorder.flush()
+
+    assert recorder.writer_stats["written"] == 11
+    assert recorder.writer_stats["failed"] == 1
+    stats = await recorder.get_statistics()
+    assert stats["total_records"] == 11
+    await recorder.close()
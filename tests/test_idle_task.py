@@ -0,0 +1,49 @@
+"""
+Tests for the idle-window background task base.
+"""
+import asyncio
+
+import pytest
+
+from chatbot.core.idle_task import IdleTask
+
+
+class CountingTask(IdleTask):
+    def __init__(self, hub, fail=False):
+        super().__init__(hub, check_interval=0.01, idle_seconds=10)
+        self.fail = fail
+        self.runs = 0
+
+    async def run_once(self):
+        self.runs += 1
+        if self.fail:
+            raise RuntimeError("boom")
+
+
+@pytest.mark.asyncio
+async def test_runs_only_while_hub_is_idle(fake_hub):
+    hub = fake_hub(idle=1)
+    task = CountingTask(hub)
+    await task.start()
+    try:
+        assert task.running
+        await asyncio.sleep(0.05)
+        assert task.runs == 0
+
+        hub.idle = 999
+        await asyncio.sleep(0.05)
+        assert task.runs > 0
+    finally:
+        await task.stop()
+    assert not task.running
+
+
+@pytest.mark.asyncio
+async def test_failed_run_does_not_stop_the_loop():
+    task = CountingTask(None, fail=True)
+    await task.start()
+    try:
+        await asyncio.sleep(0.05)
+        assert task.runs > 1 and task.running
+    finally:
+        await task.stop()
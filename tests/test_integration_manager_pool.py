@@ -0,0 +1,90 @@
+"""
+Tests for IntegrationManager's shared connection, credential cache and
+concurrent startup.
+"""
+import asyncio
+import time
+
+import pytest
+import pytest_asyncio
+
+from chatbot.core.integration_manager import IntegrationManager
+from chatbot.integrations.base import Integration
+
+
+class SlowIntegration(Integration):
+    connect_delay = 0.1
+
+    async def connect(self) -> bool:
+        await asyncio.sleep(self.connect_delay)
+        self.is_connected = True
+        return True
+
+    async def disconnect(self) -> None:
+        self.is_connected = False
+
+    async def get_status(self):
+        return self.get_basic_status()
+
+    @property
+    def integration_type(self) -> str:
+        return "slow"
+
+    async def test_connection(self):
+        return {"success": True}
+
+
+@pytest_asyncio.fixture
+async def manager(tmp_path):
+    manager = IntegrationManager(str(tmp_path / "integrations.db"))
+    await manager.initialize()
+    manager.integration_types["slow"] = SlowIntegration
+    yield manager
+    await manager.cleanup()
+
+
+class CountingCipher:
+    def __init__(self, cipher):
+        self.cipher, self.decrypts = cipher, 0
+
+    def encrypt(self, value):
+        return self.cipher.encrypt(value)
+
+    def decrypt(self, value):
+        self.decrypts += 1
+        return self.cipher.decrypt(value)
+
+
+@pytest.mark.asyncio
+async def test_file_database_reuses_one_connection(manager):
+    db = await manager._get_db_connection()
+    await manager.add_integration("slow", "one", {}, {"token": "a"})
+    await manager.list_integrations()
+    assert await manager._get_db_connection() is db
+
+
+@pytest.mark.asyncio
+async def test_credentials_are_decrypted_once_until_updated(manager):
+    manager.cipher = CountingCipher(manager.cipher)
+    integration_id = await manager.add_integration("slow", "one", {}, {"token": "a", "secret": "b"})
+
+    assert await manager._load_credentials(integration_id) == {"token": "a", "secret": "b"}
+    assert await manager._load_credentials(integration_id) == {"token": "a", "secret": "b"}
+    assert manager.cipher.decrypts == 2
+
+    await manager.update_credentials(integration_id, {"token": "c"})
+    assert await manager._load_credentials(integration_id) == {"token": "c"}
+    assert manager.cipher.decrypts == 3
+
+
+@pytest.mark.asyncio
+async def test_connect_all_active_connects_concurrently(manager):
+    ids = [await manager.add_integration("slow", f"slow {i}", {}, {"token": str(i)}) for i in range(5)]
+
+    started = time.monotonic()
+    results = await manager.connect_all_active()
+    elapsed = time.monotonic() - started
+
+    assert results == {integration_id: True for integration_id in ids}
+    assert elapsed < 5 * SlowIntegration.connect_delay
+    assert all(i.is_connected for i in manager.get_active_integrations().values())
@@ -89,8 +89,9 @@ class TestMatrixArweaveIntegration:
         mock_arweave_client.upload_data.return_value = "test_tx_id"
         mock_arweave_client.get_arweave_url.return_value = "https://arweave.net/test_tx_id"
 
-        # Process the message
+        # Process the message; media is resolved in the background
         await matrix_observer._on_message(mock_room, mock_message)
+        await matrix_observer.media_pipeline.drain()
 
         # Verify Arweave upload was called
         mock_arweave_client.upload_data.assert_called_once()
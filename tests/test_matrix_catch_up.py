@@ -0,0 +1,87 @@
+"""
+Tests for batched Matrix catch-up ingestion after (re)connecting.
+"""
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from chatbot.core.world_state import Message, WorldStateManager
+from chatbot.integrations.matrix.observer import MatrixObserver
+
+
+@pytest.fixture
+def observer(tmp_path):
+    obs = MatrixObserver(world_state_manager=WorldStateManager())
+    obs.user_id = "@bot:server"
+    obs.sync_token_file = tmp_path / "matrix_sync_token.json"
+    obs.on_state_change = MagicMock()
+    return obs
+
+
+@pytest.mark.asyncio
+async def test_live_messages_trigger_state_change_each(observer, matrix_room, matrix_text_event):
+    room = matrix_room("!a:server")
+    await observer._on_message(room, matrix_text_event("$1", ts_ms=1000))
+    await observer._on_message(room, matrix_text_event("$2", ts_ms=2000))
+
+    assert observer.on_state_change.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_first_sync_backlog_is_ingested_as_one_batch(observer, matrix_room, matrix_text_event):
+    observer._begin_catch_up()
+    room_a, room_b = matrix_room("!a:server"), matrix_room("!b:server")
+    # Events arrive grouped by room, not in global time order
+    await observer._on_message(room_a, matrix_text_event("$a2", ts_ms=3000))
+    await observer._on_message(room_a, matrix_text_event("$a1", ts_ms=1000))
+    await observer._on_message(room_b, matrix_text_event("$b1", ts_ms=2000))
+    assert observer.world_state.state.channels["!a:server"].recent_messages == []
+    observer.on_state_change.assert_not_called()
+
+    await observer._on_sync_response(type("SyncResponse", (), {"next_batch": "s1"})())
+
+    observer.on_state_change.assert_called_once()
+    assert [m.id for m in observer.world_state.state.channels["!a:server"].recent_messages] == ["$a1", "$a2"]
+    assert observer._last_catch_up["added"] == 3
+    assert observer._last_catch_up["rooms"] == 2
+
+
+@pytest.mark.asyncio
+async def test_ensure_connection_buffers_refresh_sync(observer, matrix_room, matrix_text_event):
+    room = matrix_room("!a:server")
+
+    async def fake_sync(timeout=None):
+        await observer._on_message(room, matrix_text_event("$late1", ts_ms=1000))
+        await observer._on_message(room, matrix_text_event("$late2", ts_ms=2000))
+
+    observer.client = MagicMock()
+    observer.client.whoami = AsyncMock(side_effect=[MagicMock(spec=[]), MagicMock(user_id="@bot:server")])
+    observer.client.sync = AsyncMock(side_effect=fake_sync)
+
+    await observer.ensure_connection()
+
+    observer.on_state_change.assert_called_once()
+    assert len(observer.world_state.state.channels["!a:server"].recent_messages) == 2
+    assert observer._catching_up is False
+
+
+def test_add_messages_dedups_sorts_and_trims():
+    world_state = WorldStateManager()
+    now = time.time()
+    existing = Message(id="$x", channel_id="!a:server", channel_type="matrix", sender="@a:server",
+                       content="x", timestamp=now)
+    world_state.add_message("!a:server", existing)
+    backlog = [
+        Message(id=f"$m{i}", channel_id="!a:server", channel_type="matrix", sender="@a:server",
+                content=str(i), timestamp=now - 100 + i)
+        for i in range(60)
+    ] + [existing]
+
+    added = world_state.add_messages(backlog)
+
+    messages = world_state.state.channels["!a:server"].recent_messages
+    assert added == 60
+    assert len(messages) == 50
+    assert [m.timestamp for m in messages] == sorted(m.timestamp for m in messages)
+    assert messages[-1].id == "$x"
@@ -0,0 +1,72 @@
+"""
+Tests for concurrent Matrix room joins and bulk invite acceptance.
+"""
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from nio import JoinError, JoinResponse
+
+from chatbot.core.world_state import WorldStateManager
+from chatbot.integrations.matrix.join_executor import MatrixJoinExecutor
+from chatbot.integrations.matrix.observer import MatrixObserver
+
+
+@pytest.mark.asyncio
+async def test_join_many_is_concurrent_and_bounded(fake_homeserver):
+    server = fake_homeserver(delay=0.05)
+    executor = MatrixJoinExecutor(join=server.join, concurrency=4)
+
+    started = time.monotonic()
+    results = await executor.join_many([f"!r{i}:server" for i in range(12)])
+    elapsed = time.monotonic() - started
+
+    assert all(r.room_id == room_id for room_id, r in results.items())
+    assert server.peak == 4
+    assert elapsed < 12 * 0.05
+    assert executor.stats["joined"] == 12
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_retry_after_pauses_all_workers(fake_homeserver):
+    server = fake_homeserver(delay=0.01, limited=1, retry_after_ms=200)
+    executor = MatrixJoinExecutor(join=server.join, concurrency=1)
+
+    results = await executor.join_many(["!a:server", "!b:server"])
+
+    assert all(isinstance(r, JoinResponse) for r in results.values())
+    assert executor.stats["rate_limited"] == 1
+    # The retry and the second room both waited out retry_after_ms
+    assert server.call_times[1] - server.call_times[0] >= 0.2
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_gives_up_after_max_retries(fake_homeserver):
+    server = fake_homeserver(delay=0, limited=10, retry_after_ms=1)
+    executor = MatrixJoinExecutor(join=server.join, max_retries=2)
+
+    response = await executor.join("!a:server")
+
+    assert isinstance(response, JoinError)
+    assert server.calls == 3
+    assert executor.stats["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_accept_pending_invites_in_bulk(fake_homeserver):
+    world_state = WorldStateManager()
+    observer = MatrixObserver(world_state_manager=world_state)
+    for i in range(5):
+        world_state.add_pending_matrix_invite({"room_id": f"!inv{i}:server", "inviter": "@a:server"})
+    server = fake_homeserver(delay=0.01, limited=1, retry_after_ms=10)
+    observer.client = MagicMock()
+    observer.client.invited_rooms = {}
+    observer.client.rooms = {}
+    observer.client.join = AsyncMock(side_effect=server.join)
+
+    result = await observer.accept_pending_invites()
+
+    assert result["success"]
+    assert sorted(result["accepted"]) == [f"!inv{i}:server" for i in range(5)]
+    assert world_state.get_pending_matrix_invites() == []
+    assert all(f"!inv{i}:server" in observer.channels_to_monitor for i in range(5))
@@ -144,3 +144,24 @@ class TestMatrixMarkdownFormatter:
             assert "]" not in result
             assert "(" not in result
             assert ")" not in result
+
+    def test_reused_parser_does_not_leak_state(self):
+        """Test that the shared parser is reset between conversions."""
+        formatter = MatrixMarkdownFormatter(cache_size=0)
+
+        first = formatter.convert("| a | b |\n|---|---|\n| 1 | 2 |")
+        second = formatter.convert("just text")
+
+        assert "<table>" in first["html"]
+        assert second["html"] == "<p>just text</p>"
+
+    def test_repeated_content_is_served_from_cache(self):
+        """Test that repeated content skips rendering and returns independent dicts."""
+        formatter = MatrixMarkdownFormatter(cache_size=2)
+
+        first = formatter.convert("**hi**")
+        first["html"] = "mutated"
+        formatter.md = None  # rendering again would fail
+        second = formatter.convert("**hi**")
+
+        assert second["html"] == "<p><strong>hi</strong></p>"
@@ -0,0 +1,169 @@
+"""
+Tests for background Matrix media processing.
+"""
+import asyncio
+import json
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from nio import MatrixRoom, RoomMessageImage
+
+from chatbot.core.context import WorldStatePrompt
+from chatbot.core.world_state import Message, PayloadBuilder, WorldStateManager
+from chatbot.integrations.matrix.media_pipeline import MatrixMediaPipeline
+from chatbot.integrations.matrix.observer import MatrixObserver
+
+
+def make_message(msg_id="$img"):
+    return Message(
+        id=msg_id, channel_id="!room:server", channel_type="matrix", sender="@alice:server",
+        content="[Image]", timestamp=time.time(), metadata={},
+    )
+
+
+def make_pipeline(fetch=None, upload=None, fallback_url=None, **kwargs):
+    return MatrixMediaPipeline(
+        fetch=fetch or AsyncMock(return_value=(b"png-bytes", "image/png")),
+        upload=upload or AsyncMock(return_value="https://arweave.net/tx1"),
+        fallback_url=fallback_url,
+        retry_base_delay=0,
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_message_is_patched_when_upload_completes():
+    pipeline = make_pipeline()
+    message = make_message()
+
+    pipeline.submit(message, "mxc://server/a")
+    assert message.metadata["media_status"] == "pending"
+    assert not message.image_urls
+
+    await pipeline.drain()
+    await pipeline.stop()
+
+    assert message.image_urls == ["https://arweave.net/tx1"]
+    assert message.metadata["media_status"] == "ready"
+    assert "pending_media" not in message.metadata
+
+
+@pytest.mark.asyncio
+async def test_identical_content_is_uploaded_once():
+    upload = AsyncMock(return_value="https://arweave.net/tx1")
+    pipeline = make_pipeline(upload=upload, concurrency=1)
+    first, second, third = make_message("$1"), make_message("$2"), make_message("$3")
+
+    pipeline.submit(first, "mxc://server/a")
+    pipeline.submit(second, "mxc://server/b")  # same bytes, different mxc
+    await pipeline.drain()
+    pipeline.submit(third, "mxc://server/a")  # served from the mxc cache
+    await pipeline.drain()
+    await pipeline.stop()
+
+    upload.assert_awaited_once()
+    assert first.image_urls == second.image_urls == third.image_urls
+    assert pipeline.get_stats()["deduplicated"] == 2
+
+
+@pytest.mark.asyncio
+async def test_transient_failures_are_retried():
+    upload = AsyncMock(side_effect=[RuntimeError("gateway timeout"), "https://arweave.net/tx2"])
+    pipeline = make_pipeline(upload=upload)
+    message = make_message()
+
+    pipeline.submit(message, "mxc://server/a")
+    await pipeline.drain()
+    await pipeline.stop()
+
+    assert message.image_urls == ["https://arweave.net/tx2"]
+    assert pipeline.get_stats()["retries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_exhausted_retries_use_fallback_url():
+    pipeline = make_pipeline(
+        fetch=AsyncMock(return_value=None),
+        fallback_url=AsyncMock(return_value="https://server/_matrix/media/a"),
+        max_retries=2,
+    )
+    message = make_message()
+
+    pipeline.submit(message, "mxc://server/a")
+    await pipeline.drain()
+    await pipeline.stop()
+
+    assert pipeline.fetch.await_count == 3
+    assert message.image_urls == ["https://server/_matrix/media/a"]
+    assert message.metadata["media_status"] == "fallback"
+
+
+def make_observer(world_state, upload_data):
+    arweave_client = MagicMock()
+    arweave_client.upload_data = upload_data
+    arweave_client.get_arweave_url.return_value = "https://arweave.net/tx"
+    observer = MatrixObserver(world_state, arweave_client)
+    observer.user_id = "@bot:server"
+    observer.client = AsyncMock()
+    observer.client.access_token = "token"
+    observer.client.download.return_value = MagicMock(body=b"img", content_type="image/png")
+    return observer
+
+
+def image_room():
+    room = MagicMock(spec=MatrixRoom)
+    room.room_id, room.display_name, room.name = "!room:server", "Room", "Room"
+    room.users, room.member_count = {}, 2
+    room.power_levels = None
+    return room
+
+
+def image_event():
+    event = MagicMock(spec=RoomMessageImage)
+    event.sender, event.body, event.url, event.event_id = "@alice:server", "cat.png", "mxc://server/cat", "$img"
+    return event
+
+
+@pytest.mark.asyncio
+async def test_slow_upload_does_not_block_message_ingestion():
+    upload_started = asyncio.Event()
+    release_upload = asyncio.Event()
+
+    async def slow_upload(data, content_type, tags=None):
+        upload_started.set()
+        await release_upload.wait()
+        return "tx"
+
+    world_state = WorldStateManager()
+    observer = make_observer(world_state, slow_upload)
+
+    await asyncio.wait_for(observer._on_message(image_room(), image_event()), timeout=1)
+    stored = world_state.state.channels["!room:server"].recent_messages[-1]
+    assert stored.metadata["media_status"] == "pending"
+
+    await upload_started.wait()
+    release_upload.set()
+    await observer.media_pipeline.drain()
+    await observer.media_pipeline.stop()
+    assert stored.image_urls == ["https://arweave.net/tx"]
+
+
+@pytest.mark.asyncio
+async def test_completed_upload_refreshes_the_prompt():
+    world_state = WorldStateManager()
+    observer = make_observer(world_state, AsyncMock(return_value="tx"))
+    prompt = WorldStatePrompt(world_state, lambda state: json.dumps(state, default=str))
+
+    await observer._on_message(image_room(), image_event())
+    assert "https://arweave.net/tx" not in prompt.text
+    builder, node_path = PayloadBuilder(), "channels.matrix.!room:server"
+    builder.sync_node_index(world_state.state)
+    node_version = world_state.state.node_index.get_version(node_path)
+
+    await observer.media_pipeline.drain()
+    await observer.media_pipeline.stop()
+
+    assert "https://arweave.net/tx" in prompt.text
+    builder.sync_node_index(world_state.state)
+    assert world_state.state.node_index.get_version(node_path) > node_version
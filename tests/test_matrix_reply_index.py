@@ -0,0 +1,87 @@
+"""
+Tests for Matrix server timestamps, reply/thread relations and the reply index.
+"""
+from unittest.mock import patch
+
+import pytest
+
+from chatbot.core.world_state import Message, WorldStateManager
+from chatbot.integrations.matrix.observer import MatrixObserver
+
+ROOM_ID = "!room:server"
+
+
+@pytest.fixture
+def observer():
+    obs = MatrixObserver(world_state_manager=WorldStateManager())
+    obs.user_id = "@bot:server"
+    return obs
+
+
+@pytest.mark.asyncio
+async def test_message_uses_origin_server_ts(observer, matrix_room, matrix_text_event):
+    await observer._on_message(matrix_room(ROOM_ID), matrix_text_event("$m1"))
+
+    message = observer.world_state.state.channels[ROOM_ID].recent_messages[-1]
+    assert message.timestamp == pytest.approx(1700000000.123)
+
+
+@pytest.mark.asyncio
+async def test_reply_relation_is_indexed(observer, matrix_room, matrix_text_event):
+    await observer._on_message(
+        matrix_room(ROOM_ID), matrix_text_event("$reply", relates_to={"m.in_reply_to": {"event_id": "$parent"}})
+    )
+
+    message = observer.world_state.state.channels[ROOM_ID].recent_messages[-1]
+    assert message.reply_to == "$parent"
+    assert observer.world_state.get_matrix_replies(ROOM_ID, "$parent") == ["$reply"]
+
+
+@pytest.mark.asyncio
+async def test_thread_events_are_grouped_by_root(observer, matrix_room, matrix_text_event):
+    room = matrix_room(ROOM_ID)
+    fallback = {
+        "rel_type": "m.thread",
+        "event_id": "$root",
+        "is_falling_back": True,
+        "m.in_reply_to": {"event_id": "$t1"},
+    }
+    await observer._on_message(room, matrix_text_event("$t1", relates_to={**fallback, "m.in_reply_to": {"event_id": "$root"}}))
+    await observer._on_message(room, matrix_text_event("$t2", relates_to=fallback))
+
+    thread = observer.world_state.get_matrix_thread("$root")
+    assert [m.id for m in thread] == ["$t1", "$t2"]
+    assert thread[1].reply_to is None
+    assert thread[1].metadata["thread_root"] == "$root"
+
+
+@pytest.mark.asyncio
+async def test_bot_reply_seen_in_sync_marks_event_replied(observer, matrix_room, matrix_text_event):
+    await observer._on_message(
+        matrix_room(ROOM_ID),
+        matrix_text_event("$bot_reply", sender="@bot:server", relates_to={"m.in_reply_to": {"event_id": "$parent"}}),
+    )
+
+    assert not observer.world_state.state.channels.get(ROOM_ID)
+    with patch("chatbot.config.settings") as mock_settings:
+        mock_settings.MATRIX_USER_ID = "@bot:server"
+        assert observer.world_state.has_bot_replied_to_matrix_event("$parent")
+        assert not observer.world_state.has_bot_replied_to_matrix_event("$other")
+
+
+def test_reply_index_is_pruned_with_the_message_window():
+    world_state = WorldStateManager()
+    for i in range(60):
+        world_state.add_message(ROOM_ID, Message(
+            id=f"$m{i}", channel_id=ROOM_ID, channel_type="matrix", sender="@alice:server",
+            content="hi", timestamp=1700000000 + i, reply_to=f"$m{i - 1}" if i else None,
+        ))
+        world_state.record_matrix_reply(ROOM_ID, f"$m{i}", f"$bot{i}", "@bot:server")
+
+    room_index = world_state.state.matrix_reply_index[ROOM_ID]
+    # $m9 left the window but its reply $m10 is still in it
+    assert min(room_index, key=lambda event_id: int(event_id[2:])) == "$m9"
+    assert len(room_index) == 51
+    assert set(world_state.state.matrix_repliers) == set(room_index)
+    assert world_state.get_matrix_replies(ROOM_ID, "$m8") == []
+    assert world_state.get_matrix_replies(ROOM_ID, "$m59") == ["$bot59"]
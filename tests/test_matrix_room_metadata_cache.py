@@ -0,0 +1,146 @@
+"""
+Tests for cached Matrix room metadata in MatrixObserver.
+"""
+from unittest.mock import MagicMock, patch
+
+import pytest
+from nio import AsyncClient, AsyncClientConfig, RoomMemberEvent, SyncResponse
+
+from chatbot.core.world_state import WorldStateManager
+from chatbot.integrations.matrix.observer import SYNC_FILTER, MatrixObserver
+
+
+class FakeRoom:
+    def __init__(self, room_id="!big:server", members=5000):
+        self.room_id = room_id
+        self.display_name = self.name = "Big Room"
+        self.topic = "old topic"
+        self.users = {f"@user{i}:server": None for i in range(members)}
+        self.member_count = members
+        self.power_levels = type("PL", (), {"users": {"@admin:server": 100}})()
+
+
+def member_event(user_id, membership):
+    event = MagicMock(spec=RoomMemberEvent)
+    event.state_key, event.membership, event.sender = user_id, membership, user_id
+    event.content = {"membership": membership}
+    return event
+
+
+def raw_event(event_type, content, event_id, state_key=None, sender="@admin:server", ts=1000):
+    event = {"type": event_type, "content": content, "event_id": event_id, "sender": sender, "origin_server_ts": ts}
+    if state_key is not None:
+        event["state_key"] = state_key
+    return event
+
+
+def sync_response(next_batch, room_id, timeline, state=()):
+    """A joined-room sync response holding only the timeline events SYNC_FILTER lets through"""
+    types = SYNC_FILTER["room"]["timeline"]["types"]
+    room = {
+        "state": {"events": list(state)},
+        "timeline": {"events": [e for e in timeline if e["type"] in types], "limited": False, "prev_batch": "p"},
+        "ephemeral": {"events": []},
+        "account_data": {"events": []},
+        "summary": {},
+    }
+    return SyncResponse.from_dict({
+        "next_batch": next_batch,
+        "rooms": {"join": {room_id: room}, "invite": {}, "leave": {}},
+        "to_device": {"events": []},
+        "presence": {"events": []},
+        "account_data": {"events": []},
+        "device_lists": {},
+        "device_one_time_keys_count": {},
+    })
+
+
+@pytest.fixture
+def observer():
+    obs = MatrixObserver(world_state_manager=WorldStateManager())
+    obs.user_id = "@bot:server"
+    return obs
+
+
+@pytest.mark.asyncio
+async def test_room_details_extracted_once_for_many_messages(observer, matrix_text_event):
+    room = FakeRoom()
+    with patch.object(observer, "_extract_room_details", wraps=observer._extract_room_details) as extract:
+        for i in range(20):
+            await observer._on_message(room, matrix_text_event(f"$m{i}"))
+
+    assert extract.call_count == 1
+    assert len(observer.world_state.state.channels[room.room_id].recent_messages) == 20
+
+
+@pytest.mark.asyncio
+async def test_state_events_refresh_cached_details(observer, matrix_text_event):
+    room = FakeRoom(members=3)
+    await observer._on_message(room, matrix_text_event("$m1"))
+
+    room.topic = "new topic"
+    room.power_levels.users["@user1:server"] = 50
+    await observer._on_room_state_change(room, MagicMock())
+
+    channel = observer.world_state.state.channels[room.room_id]
+    assert channel.topic == "new topic"
+    assert channel.power_levels["@user1:server"] == 50
+
+
+@pytest.mark.asyncio
+async def test_membership_changes_patch_cache_incrementally(observer, matrix_text_event):
+    room = FakeRoom(members=3)
+    await observer._on_message(room, matrix_text_event("$m1"))
+
+    room.users["@new:server"] = None
+    room.member_count = 4
+    with patch.object(observer, "_extract_room_details") as extract:
+        await observer._on_membership_change(room, member_event("@new:server", "join"))
+        await observer._on_membership_change(room, member_event("@user0:server", "leave"))
+        await observer._on_message(room, matrix_text_event("$m2"))
+    extract.assert_not_called()
+
+    channel = observer.world_state.state.channels[room.room_id]
+    assert channel.member_count == 4
+    assert channel.power_levels["@new:server"] == 0
+    assert "@user0:server" not in channel.power_levels
+
+
+@pytest.mark.asyncio
+async def test_membership_changes_bump_world_state_version(observer, matrix_text_event):
+    room = FakeRoom(members=3)
+    await observer._on_message(room, matrix_text_event("$m1"))
+    version = observer.world_state.state.version
+
+    await observer._on_membership_change(room, member_event("@user1:server", "join"))
+    assert observer.world_state.state.version == version  # already a member at level 0
+
+    room.users["@new:server"] = None
+    room.member_count = 4
+    await observer._on_membership_change(room, member_event("@new:server", "join"))
+    assert observer.world_state.state.version > version
+
+
+@pytest.mark.asyncio
+async def test_state_events_from_sync_refresh_cached_details(observer, tmp_path):
+    observer.sync_token_file = tmp_path / "matrix_sync_token.json"
+    observer.client = AsyncClient(
+        "https://server", "@bot:server", store_path=str(tmp_path),
+        config=AsyncClientConfig(store=None, encryption_enabled=False),
+    )
+    observer._register_callbacks()
+    room_id = "!a:server"
+    state = [
+        raw_event("m.room.create", {"creator": "@admin:server"}, "$create", state_key=""),
+        raw_event("m.room.member", {"membership": "join"}, "$join", state_key="@bot:server", sender="@bot:server"),
+        raw_event("m.room.topic", {"topic": "old topic"}, "$topic0", state_key=""),
+    ]
+    message = raw_event("m.room.message", {"msgtype": "m.text", "body": "hi"}, "$m1")
+    await observer.client.receive_response(sync_response("s1", room_id, [message], state))
+    assert observer.world_state.state.channels[room_id].topic == "old topic"
+
+    topic = raw_event("m.room.topic", {"topic": "new topic"}, "$topic1", state_key="", ts=2000)
+    await observer.client.receive_response(sync_response("s2", room_id, [topic]))
+
+    assert observer.world_state.state.channels[room_id].topic == "new topic"
+    assert observer._room_details_cache[room_id]["topic"] == "new topic"
@@ -0,0 +1,100 @@
+"""
+Tests for the shaped, coalescing Matrix room sender.
+"""
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+from nio import RoomSendResponse
+
+from chatbot.core.world_state import WorldStateManager
+from chatbot.integrations.matrix.observer import MatrixObserver
+from chatbot.integrations.matrix.room_sender import MatrixRoomSender
+
+
+def text(body, reply_to=None):
+    content = {"msgtype": "m.text", "body": body}
+    if reply_to:
+        content["m.relates_to"] = {"m.in_reply_to": {"event_id": reply_to}}
+    return content
+
+
+@pytest.mark.asyncio
+async def test_messages_to_one_room_keep_order(fake_homeserver):
+    server = fake_homeserver()
+    sender = MatrixRoomSender(send=server.send, messages_per_second=0)
+
+    await asyncio.gather(*(sender.send("!a:server", text(str(i))) for i in range(5)))
+
+    assert [c["body"] for _, _, c in server.sent] == ["0", "1", "2", "3", "4"]
+    assert sender.get_stats()["rooms"]["!a:server"]["latency_seconds"]["samples"] == 5
+
+
+@pytest.mark.asyncio
+async def test_rate_shaping_spaces_sends_after_burst(fake_homeserver):
+    server = fake_homeserver()
+    sender = MatrixRoomSender(send=server.send, messages_per_second=20, burst=2)
+
+    await asyncio.gather(*(sender.send(f"!r{i}:server", text("hi")) for i in range(4)))
+
+    times = sorted(t for t, _, _ in server.sent)
+    # Two go out immediately, the rest wait for tokens at 20/s
+    assert times[3] - times[0] >= 0.09
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_pauses_other_rooms(fake_homeserver):
+    server = fake_homeserver(limited=1, retry_after_ms=150)
+    sender = MatrixRoomSender(send=server.send, messages_per_second=0)
+
+    first_task = asyncio.create_task(sender.send("!a:server", text("a")))
+    await asyncio.sleep(0.05)
+    await sender.send("!b:server", text("b"))
+    first = await first_task
+
+    assert isinstance(first.response, RoomSendResponse)
+    assert first.attempts == 2
+    assert sender.stats["rate_limited"] == 1
+    sent_b = next(t for t, room_id, _ in server.sent if room_id == "!b:server")
+    assert sent_b - server.sent[0][0] >= 0.15
+
+
+@pytest.mark.asyncio
+async def test_plain_messages_coalesce_but_replies_do_not(fake_homeserver):
+    server = fake_homeserver()
+    sender = MatrixRoomSender(send=server.send, messages_per_second=0, coalesce_window=0.05)
+
+    results = await asyncio.gather(
+        sender.send("!a:server", text("one")),
+        sender.send("!a:server", text("two")),
+        sender.send("!a:server", text("re", reply_to="$p")),
+    )
+
+    assert [c["body"] for _, _, c in server.sent] == ["one\n\ntwo", "re"]
+    assert results[0].response.event_id == results[1].response.event_id
+    assert results[0].coalesced == 2 and results[2].coalesced == 1
+    assert sender.stats["coalesced"] == 1
+
+
+def test_plain_text_is_escaped_when_merged_with_formatted():
+    formatted = {**text("bold"), "format": "org.matrix.custom.html", "formatted_body": "<b>bold</b>"}
+    batch = [MagicMock(content=formatted), MagicMock(content=text("a < b & c\nnext"))]
+
+    merged = MatrixRoomSender._merge(batch)
+
+    assert merged["formatted_body"] == "<b>bold</b><br><br>a &lt; b &amp; c<br>next"
+    assert merged["body"] == "bold\n\na < b & c\nnext"
+
+
+@pytest.mark.asyncio
+async def test_observer_send_reply_goes_through_sender(fake_homeserver):
+    observer = MatrixObserver(world_state_manager=WorldStateManager())
+    observer.client = MagicMock()
+    server = fake_homeserver(limited=1, retry_after_ms=10)
+    observer.room_sender.send_fn = server.send
+
+    result = await observer.send_reply("!a:server", "hello", "$parent")
+
+    assert result["success"]
+    assert result["reply_to_event_id"] == "$parent"
+    assert len(server.sent) == 2
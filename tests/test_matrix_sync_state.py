@@ -0,0 +1,77 @@
+"""
+Tests for persisted sync tokens and the lazy-loading sync filter in MatrixObserver.
+"""
+import json
+from unittest.mock import AsyncMock
+
+import pytest
+from nio import UploadFilterError, UploadFilterResponse
+
+from chatbot.core.world_state import WorldStateManager
+from chatbot.integrations.matrix.observer import SYNC_FILTER, MatrixObserver
+
+
+@pytest.fixture
+def observer(tmp_path):
+    obs = MatrixObserver(world_state_manager=WorldStateManager())
+    obs.user_id = "@bot:server"
+    obs.homeserver = "https://server"
+    obs.sync_token_file = tmp_path / "matrix_sync_token.json"
+    obs.client = AsyncMock()
+    obs.client.upload_filter.return_value = UploadFilterResponse(filter_id="7")
+    return obs
+
+
+def sync_response(next_batch):
+    return type("SyncResponse", (), {"next_batch": next_batch})()
+
+
+def test_sync_filter_lazy_loads_members():
+    assert SYNC_FILTER["room"]["state"]["lazy_load_members"] is True
+    assert SYNC_FILTER["room"]["timeline"]["lazy_load_members"] is True
+    assert "m.room.message" in SYNC_FILTER["room"]["timeline"]["types"]
+    assert SYNC_FILTER["presence"] == {"types": []}
+
+
+@pytest.mark.asyncio
+async def test_sync_token_is_persisted_and_restored(observer):
+    await observer._on_sync_response(sync_response("s_100"))
+    assert json.loads(observer.sync_token_file.read_text())["next_batch"] == "s_100"
+
+    # Later responses inside the save interval are flushed on shutdown
+    await observer._on_sync_response(sync_response("s_101"))
+    assert observer._load_sync_token() == "s_100"
+    observer._save_sync_token()
+    assert observer._load_sync_token() == "s_101"
+
+
+def test_sync_token_for_other_account_is_ignored(observer):
+    observer.sync_token_file.write_text(
+        json.dumps({"next_batch": "s_1", "user_id": "@other:server", "homeserver": "https://server"})
+    )
+
+    assert observer._load_sync_token() is None
+
+
+@pytest.mark.asyncio
+async def test_sync_forever_resumes_with_filter_and_token(observer):
+    observer._sync_token = "s_200"
+    observer._save_sync_token()
+
+    await observer._sync_forever()
+
+    observer.client.sync_forever.assert_awaited_once_with(
+        timeout=30000, sync_filter="7", since="s_200", full_state=True
+    )
+    assert observer._sync_token_restored is True
+
+
+@pytest.mark.asyncio
+async def test_filter_upload_failure_falls_back_to_inline_filter(observer):
+    observer.client.upload_filter.return_value = UploadFilterError("nope")
+
+    await observer._sync_forever()
+
+    observer.client.sync_forever.assert_awaited_once_with(
+        timeout=30000, sync_filter=SYNC_FILTER, since=None, full_state=True
+    )
@@ -1,10 +1,19 @@
 """
 Test the enhanced rate limiting functionality in NeynarAPIClient.
 """
+import asyncio
 import pytest
 import time
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
+
+import httpx
+
 from chatbot.integrations.farcaster.neynar_api_client import NeynarAPIClient
+from chatbot.integrations.farcaster.neynar_rate_governor import (
+    NeynarRateGovernor,
+    RequestPriority,
+    priority_for,
+)
 
 
 class MockResponse:
@@ -169,3 +178,72 @@ class TestNeynarRateLimiting:
         rate_info = api_client.rate_limit_info
         assert 'last_updated_client' in rate_info  # Field is 'last_updated_client', not 'last_updated'
         assert before_time <= rate_info['last_updated_client'] <= after_time
+
+
+class TestNeynarRateGovernor:
+    """Test the client-side token bucket and 429 retry handling."""
+
+    @staticmethod
+    def _response(status_code, headers=None):
+        request = httpx.Request("GET", "https://api.neynar.com/v2/farcaster/notifications")
+        return httpx.Response(status_code, headers=headers or {}, json={}, request=request)
+
+    def test_headers_correct_bucket(self, api_client):
+        headers = {'x-ratelimit-limit': '120', 'x-ratelimit-remaining': '7'}
+        api_client._update_rate_limits(MockResponse(headers=headers))
+
+        status = api_client.get_rate_governor_status()
+        assert status['capacity'] == 120
+        assert status['tokens'] == pytest.approx(7, abs=0.1)
+
+    def test_priority_classification(self):
+        assert priority_for("POST", "/farcaster/cast") == RequestPriority.CRITICAL
+        assert priority_for("GET", "/farcaster/notifications") == RequestPriority.CRITICAL
+        assert priority_for("GET", "/farcaster/feed") == RequestPriority.BACKGROUND
+        assert priority_for("GET", "/farcaster/user/bulk") == RequestPriority.NORMAL
+
+    @pytest.mark.asyncio
+    async def test_background_requests_queue_when_budget_low(self):
+        governor = NeynarRateGovernor(requests_per_minute=60)
+        governor.update_from_headers(remaining=10)  # below the 30% background reserve
+
+        await asyncio.wait_for(governor.acquire(RequestPriority.CRITICAL), timeout=0.1)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(governor.acquire(RequestPriority.BACKGROUND), timeout=0.1)
+
+        status = governor.get_status()
+        assert status['admitted']['critical'] == 1
+        assert status['queued']['background'] == 1
+
+    @pytest.mark.asyncio
+    async def test_429_is_retried_with_backoff(self, api_client):
+        api_client._client.request = AsyncMock(side_effect=[
+            self._response(429, {'retry-after': '2'}),
+            self._response(200),
+        ])
+
+        with patch('chatbot.integrations.farcaster.neynar_api_client.asyncio.sleep', new=AsyncMock()) as mock_sleep, \
+                patch.object(api_client.rate_governor, 'acquire', new=AsyncMock()):
+            result = await api_client.get_notifications("123")
+
+        assert result == {}
+        assert api_client._client.request.await_count == 2
+        assert mock_sleep.await_args[0][0] >= 2
+        assert api_client.get_rate_governor_status()['retries'] == 1
+
+    @pytest.mark.asyncio
+    async def test_429_raises_after_max_retries(self, api_client):
+        api_client._client.request = AsyncMock(return_value=self._response(429))
+
+        with patch('chatbot.integrations.farcaster.neynar_api_client.asyncio.sleep', new=AsyncMock()), \
+                patch.object(api_client.rate_governor, 'acquire', new=AsyncMock()):
+            with pytest.raises(httpx.HTTPStatusError):
+                await api_client.get_notifications("123")
+
+        assert api_client._client.request.await_count == api_client.rate_governor.max_retries + 1
+
+    def test_backoff_respects_retry_after_and_cap(self):
+        governor = NeynarRateGovernor(retry_base_delay=1.0, retry_max_delay=8.0)
+
+        assert governor.backoff_delay(0, retry_after=30) == 30
+        assert 4.0 <= governor.backoff_delay(10) <= 8.0
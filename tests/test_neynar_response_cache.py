@@ -0,0 +1,124 @@
+"""
+Tests for the read-through response cache in NeynarAPIClient.
+"""
+import asyncio
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+
+from chatbot.integrations.farcaster.neynar_api_client import NeynarAPIClient
+from chatbot.integrations.farcaster.neynar_cache import NeynarResponseCache
+
+
+def make_response(payload, method="GET", url="https://api.neynar.com/v2/farcaster/cast"):
+    return httpx.Response(200, json=payload, request=httpx.Request(method, url))
+
+
+@pytest.fixture
+def api_client():
+    client = NeynarAPIClient(api_key="test_key", signer_uuid="test_uuid", bot_fid="12345")
+    client._client.request = AsyncMock(return_value=make_response({"cast": {"hash": "0xabc"}}))
+    return client
+
+
+class TestNeynarResponseCache:
+    """Cache behaviour inside _make_request."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_cast_lookup_hits_cache(self, api_client):
+        first = await api_client.get_cast_by_hash("0xabc")
+        second = await api_client.get_cast_details("0xabc")
+
+        assert first == second == {"cast": {"hash": "0xabc"}}
+        assert api_client._client.request.await_count == 1
+        stats = api_client.get_cache_stats()
+        assert stats["endpoints"]["/farcaster/cast"]["hits"] == 1
+        assert stats["endpoints"]["/farcaster/cast"]["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_uncached_endpoint_always_fetches(self, api_client):
+        await api_client.get_notifications("12345")
+        await api_client.get_notifications("12345")
+
+        assert api_client._client.request.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_requests_are_coalesced(self, api_client):
+        release = asyncio.Event()
+
+        async def slow_request(*args, **kwargs):
+            await release.wait()
+            return make_response({"users": [{"fid": 1}]})
+
+        api_client._client.request = AsyncMock(side_effect=slow_request)
+        tasks = [asyncio.create_task(api_client.get_user_details_for_fids([1])) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert all(r == {"users": [{"fid": 1}]} for r in results)
+        assert api_client._client.request.await_count == 1
+        assert api_client.get_cache_stats()["endpoints"]["/farcaster/user/bulk"]["coalesced"] == 4
+
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cached(self, api_client):
+        request = httpx.Request("GET", "https://api.neynar.com/v2/farcaster/cast")
+        api_client._client.request = AsyncMock(
+            side_effect=[httpx.Response(500, request=request), make_response({"cast": {}})]
+        )
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await api_client.get_cast_by_hash("0xabc")
+        assert await api_client.get_cast_by_hash("0xabc") == {"cast": {}}
+        assert api_client._client.request.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_publishing_invalidates_conversation_cache(self, api_client):
+        await api_client.lookup_cast_conversation("0xparent")
+        api_client._client.request.return_value = make_response({"cast": {"hash": "0xreply"}}, method="POST")
+        await api_client.reply_to_cast("hello", "0xparent")
+        await api_client.lookup_cast_conversation("0xparent")
+
+        # conversation GET, publish POST, conversation GET again
+        assert api_client._client.request.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_cache_can_be_disabled(self):
+        client = NeynarAPIClient(api_key="test_key", cache_enabled=False)
+        client._client.request = AsyncMock(return_value=make_response({"cast": {}}))
+
+        await client.get_cast_by_hash("0xabc")
+        await client.get_cast_by_hash("0xabc")
+
+        assert client._client.request.await_count == 2
+        assert client.get_cache_stats() == {"enabled": False}
+
+
+class TestCacheEvictionAndExpiry:
+    """Size bound and TTL handling of NeynarResponseCache."""
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction_respects_max_entries(self):
+        cache = NeynarResponseCache(max_entries=2)
+        fetch = AsyncMock(side_effect=lambda: "value")
+
+        for identifier in ("a", "b", "c"):
+            await cache.get_or_fetch("/farcaster/cast", {"identifier": identifier}, fetch)
+
+        assert cache.get_stats()["entries"] == 2
+        assert cache.get_stats()["endpoints"]["/farcaster/cast"]["evictions"] == 1
+        # "a" was evicted, so it must be fetched again
+        await cache.get_or_fetch("/farcaster/cast", {"identifier": "a"}, fetch)
+        assert fetch.await_count == 4
+
+    @pytest.mark.asyncio
+    async def test_expired_entries_are_refetched(self):
+        cache = NeynarResponseCache(endpoint_ttls={"/farcaster/cast": 0.01})
+        fetch = AsyncMock(return_value="value")
+
+        await cache.get_or_fetch("/farcaster/cast", {"identifier": "a"}, fetch)
+        await asyncio.sleep(0.02)
+        await cache.get_or_fetch("/farcaster/cast", {"identifier": "a"}, fetch)
+
+        assert fetch.await_count == 2
@@ -0,0 +1,88 @@
+"""
+Tests for micro-batched user lookups through NeynarUserLoader.
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from chatbot.integrations.eligibility_service import UserEligibilityService
+from chatbot.integrations.farcaster.neynar_api_client import NeynarAPIClient
+from chatbot.core.world_state.manager import WorldStateManager
+
+
+def bulk_response(fids):
+    return {"users": [{"fid": fid, "username": f"user{fid}"} for fid in fids]}
+
+
+@pytest.fixture
+def api_client():
+    client = NeynarAPIClient(api_key="test_key")
+    client.get_user_details_for_fids = AsyncMock(side_effect=lambda fids: bulk_response(fids))
+    return client
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_share_one_bulk_call(api_client):
+    users = await asyncio.gather(*(api_client.get_user_by_fid(fid) for fid in range(1, 21)))
+
+    assert [u["fid"] for u in users] == list(range(1, 21))
+    api_client.get_user_details_for_fids.assert_awaited_once()
+    assert sorted(api_client.get_user_details_for_fids.await_args[0][0]) == list(range(1, 21))
+
+
+@pytest.mark.asyncio
+async def test_load_many_chunks_to_bulk_limit(api_client):
+    users = await api_client.get_users_by_fids(range(1, 251))
+
+    assert len(users) == 250
+    assert api_client.get_user_details_for_fids.await_count == 3
+    assert all(len(call[0][0]) <= 100 for call in api_client.get_user_details_for_fids.await_args_list)
+
+
+@pytest.mark.asyncio
+async def test_duplicate_fids_are_fetched_once(api_client):
+    first, second = await asyncio.gather(api_client.get_user_by_fid(7), api_client.get_user_by_fid(7))
+
+    assert first == second == {"fid": 7, "username": "user7"}
+    assert api_client.get_user_details_for_fids.await_args[0][0] == [7]
+
+
+@pytest.mark.asyncio
+async def test_unknown_fid_resolves_to_none(api_client):
+    api_client.get_user_details_for_fids = AsyncMock(return_value={"users": []})
+
+    assert await api_client.get_user_by_fid(999) is None
+
+
+@pytest.mark.asyncio
+async def test_bulk_failure_propagates_to_waiters(api_client):
+    api_client.get_user_details_for_fids = AsyncMock(side_effect=RuntimeError("boom"))
+
+    with pytest.raises(RuntimeError):
+        await api_client.get_user_by_fid(1)
+
+
+@pytest.mark.asyncio
+async def test_eligibility_sweep_uses_bulk_lookup(api_client):
+    world_state = WorldStateManager()
+    for fid in range(1, 16):
+        world_state.get_or_create_farcaster_user(str(fid))
+    api_client.get_user_details_for_fids = AsyncMock(
+        side_effect=lambda fids: {
+            "users": [
+                {"fid": fid, "verified_addresses": {"eth_addresses": ["0x" + "a" * 40], "sol_addresses": []}}
+                for fid in fids
+            ]
+        }
+    )
+    nft_service = MagicMock()
+    nft_service.get_nft_balance = AsyncMock(return_value=1)
+    service = UserEligibilityService(api_client, nft_service, world_state)
+
+    await service._check_all_users_eligibility()
+
+    api_client.get_user_details_for_fids.assert_awaited_once()
+    user = world_state.get_state_data().farcaster_users["1"]
+    assert user.verified_addresses == {"solana": [], "evm": ["0x" + "a" * 40]}
+    assert user.is_eligible_for_airdrop is True
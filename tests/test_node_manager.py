@@ -0,0 +1,86 @@
+"""
+Tests for NodeManager change detection.
+"""
+
+import time
+from unittest.mock import patch
+
+from chatbot.core.node_system.node_manager import NodeManager
+from chatbot.core.world_state import PayloadBuilder, WorldStateManager
+from chatbot.core.world_state.structures import Message
+
+
+def test_versioned_change_detection_skips_hashing():
+    manager = NodeManager()
+    with patch.object(manager, "calculate_data_hash") as calculate:
+        assert manager.is_data_changed("channels.matrix.a", {"big": "data"}, version=3) is True
+        assert manager.is_data_changed("channels.matrix.a", {"big": "data"}, version=3) is False
+        assert manager.is_data_changed("channels.matrix.a", {"big": "data"}, version=7) is True
+    calculate.assert_not_called()
+
+
+def test_unversioned_data_falls_back_to_hash():
+    manager = NodeManager()
+    assert manager.is_data_changed("system.status", {"ok": True}) is True
+    assert manager.is_data_changed("system.status", {"ok": True}) is False
+    assert manager.is_data_changed("system.status", {"ok": False}) is True
+    assert manager.calculate_data_hash({"b": 1, "a": 2}) == manager.calculate_data_hash({"a": 2, "b": 1})
+
+
+def test_payload_hashes_only_volatile_nodes():
+    world_state = WorldStateManager()
+    for i in range(3):
+        world_state.add_message(
+            f"room{i}",
+            Message(
+                id=f"m{i}", channel_id=f"room{i}", channel_type="matrix", sender="@a:x",
+                sender_username="a", content="hi", timestamp=time.time(),
+            ),
+        )
+    builder, node_manager = PayloadBuilder(), NodeManager()
+    builder.build_node_based_payload(world_state.state, node_manager, "room0")
+
+    with patch.object(node_manager, "calculate_data_hash", wraps=node_manager.calculate_data_hash) as calculate:
+        payload = builder.build_node_based_payload(world_state.state, node_manager, "room0")
+
+    summaries = payload["collapsed_node_summaries"]
+    system_nodes = [path for path in summaries if path.startswith("system.")]
+    assert calculate.call_count == len(system_nodes)
+    assert not any(summary["data_changed"] for summary in summaries.values())
+
+
+def test_lru_tracks_reexpansion_and_direct_pins():
+    manager = NodeManager(max_expanded_nodes=3)
+    for path in ("a", "b", "c"):
+        manager.expand_node(path)
+    manager.expand_node("a")  # refreshes a; b is now least recently expanded
+    manager.get_node_metadata("b").is_pinned = True
+
+    assert manager.get_expanded_nodes() == ["b", "c", "a"]
+    assert manager.get_unpinned_expanded_nodes() == ["c", "a"]
+
+    success, auto_collapsed, _ = manager.expand_node("d")
+    assert success and auto_collapsed == "c"
+    summary = manager.get_expansion_status_summary()
+    assert summary["pinned_nodes"] == ["b"]
+    assert summary["unpinned_nodes"] == ["a", "d"]
+    assert summary["utilization"] == "3/3"
+
+
+def test_evict_missing_nodes_keeps_pins_and_collapses_expanded():
+    manager = NodeManager(default_pinned_nodes=["farcaster.feeds.home"])
+    manager.expand_node("threads.matrix.old")
+    manager.get_node_metadata("users.matrix.gone")
+    manager.get_node_metadata("channels.matrix.room")
+    manager.get_system_events()
+
+    evicted = manager.evict_missing_nodes(["channels.matrix.room"], generation=1)
+
+    assert sorted(evicted) == ["threads.matrix.old", "users.matrix.gone"]
+    assert set(manager.node_metadata) == {"farcaster.feeds.home", "channels.matrix.room"}
+    assert manager.get_expanded_nodes() == []
+    assert manager.get_system_events()[0]["affected_nodes"] == ["threads.matrix.old"]
+
+    manager.get_node_metadata("users.matrix.new")
+    assert manager.evict_missing_nodes(["channels.matrix.room"], generation=1) == []
+    assert manager.evict_missing_nodes(["channels.matrix.room"], generation=2) == ["users.matrix.new"]
@@ -0,0 +1,85 @@
+"""
+Tests for idle-time node pre-summarizing.
+"""
+import time
+from unittest.mock import AsyncMock
+
+import pytest
+
+from chatbot.core.node_system import NodeManager, NodePreSummarizer
+from chatbot.core.orchestration.rate_limiter import RateLimitConfig, RateLimiter
+from chatbot.core.world_state import PayloadBuilder, WorldStateManager
+from chatbot.core.world_state.structures import Message
+
+
+def add_message(world_state, room, i):
+    world_state.add_message(
+        room,
+        Message(
+            id=f"{room}-{i}", channel_id=room, channel_type="matrix", sender=f"@{room}:x",
+            sender_username=room, content=f"hi {i}", timestamp=time.time(),
+        ),
+    )
+
+
+def fake_summary_service():
+    service = AsyncMock()
+    service.generate_multiple_summaries.side_effect = lambda requests: {
+        request["node_path"]: f"summary of {request['node_path']}" for request in requests
+    }
+    return service
+
+
+def make_summarizer(hub, rate_limiter=None, batch_size=1):
+    world_state = WorldStateManager()
+    for room in ("room0", "room1", "room2"):
+        add_message(world_state, room, 0)
+    builder = PayloadBuilder()
+    builder.node_manager = NodeManager()
+    summarizer = NodePreSummarizer(
+        world_state, builder, hub, rate_limiter=rate_limiter,
+        summary_service=fake_summary_service(), idle_seconds=10, batch_size=batch_size,
+    )
+    builder.sync_node_index(world_state.state)
+    return world_state, builder.node_manager, summarizer
+
+
+@pytest.mark.asyncio
+async def test_most_active_stale_nodes_are_summarized_first(fake_hub):
+    world_state, node_manager, summarizer = make_summarizer(fake_hub(), batch_size=2)
+    for i in range(1, 4):
+        add_message(world_state, "room1", i)
+
+    assert await summarizer.run_once() == 2
+    summarized = {path for path, metadata in node_manager.node_metadata.items() if metadata.ai_summary}
+    assert summarized == {"channels.matrix.room1", "users.matrix.room1"}
+    metadata = node_manager.node_metadata["channels.matrix.room1"]
+    assert metadata.ai_summary == "summary of channels.matrix.room1"
+    assert metadata.summary_version == world_state.state.node_index.get_version("channels.matrix.room1")
+
+
+@pytest.mark.asyncio
+async def test_summaries_go_stale_when_node_changes(fake_hub):
+    world_state, node_manager, summarizer = make_summarizer(fake_hub(), batch_size=2)
+    path = "channels.matrix.room0"
+    version = world_state.state.node_index.get_version(path)
+    node_manager.update_node_summary(path, "old", version=version)
+    assert not node_manager.needs_summary(path, version)
+
+    add_message(world_state, "room0", 1)
+    summarizer.payload_builder.sync_node_index(world_state.state)
+    assert node_manager.needs_summary(path, world_state.state.node_index.get_version(path))
+    assert path in summarizer.select_candidates()
+
+
+@pytest.mark.asyncio
+async def test_skips_when_busy_or_out_of_rate_budget(fake_hub):
+    _, _, busy = make_summarizer(fake_hub(idle=1))
+    assert await busy.run_once() == 0
+    busy.summary_service.generate_multiple_summaries.assert_not_called()
+
+    limiter = RateLimiter(RateLimitConfig(action_limits={"NodeSummary": 2}))
+    _, _, limited = make_summarizer(fake_hub(), rate_limiter=limiter, batch_size=5)
+    assert await limited.run_once() == 2
+    assert await limited.run_once() == 0
+    assert limited.stats["rate_limited"] == 2
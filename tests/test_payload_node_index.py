@@ -0,0 +1,123 @@
+"""
+Tests for the persistent node index behind node-based payloads.
+"""
+
+import time
+
+import pytest
+
+from chatbot.core.node_system.node_manager import NodeManager
+from chatbot.core.world_state import NodeIndex, PayloadBuilder, WorldStateManager
+from chatbot.core.world_state.payload_builder import VOLATILE_NODE_FAMILIES
+from chatbot.core.world_state.structures import Message
+
+
+def _message(msg_id, channel_id, channel_type, sender, **kwargs):
+    return Message(
+        id=msg_id,
+        channel_id=channel_id,
+        channel_type=channel_type,
+        sender=sender,
+        content=f"message {msg_id}",
+        timestamp=time.time(),
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def populated_manager():
+    manager = WorldStateManager()
+    for i in range(5):
+        manager.add_channel(f"!room{i}:matrix.org", "matrix", f"Room {i}")
+        for j in range(4):
+            manager.add_message(
+                f"!room{i}:matrix.org",
+                _message(f"m{i}-{j}", f"!room{i}:matrix.org", "matrix", f"@u{j}:matrix.org", sender_username=f"u{j}"),
+            )
+    manager.add_channel("farcaster:home", "farcaster", "Home")
+    manager.add_message("farcaster:home", _message("0xabc", "farcaster:home", "farcaster", "alice", sender_fid=42))
+    manager.get_or_create_farcaster_user("42").username = "alice"
+    manager.cache_tool_result("search_casts", "a", {"casts": []})
+    manager.cache_tool_result("search_casts", "b", {"casts": []})
+    manager.add_action_result("send_matrix_reply", {"room_id": "!room0:matrix.org"}, "success")
+    return manager
+
+
+def _build(builder, manager, node_manager):
+    return builder.build_node_based_payload(manager.state, node_manager, "!room0:matrix.org")
+
+
+def test_index_matches_full_walk(populated_manager):
+    builder = PayloadBuilder()
+    state = populated_manager.state
+    paths = state.node_index.sync(state, builder._node_family_builders(), VOLATILE_NODE_FAMILIES)
+
+    assert paths == builder._get_node_paths_from_world_state(state)
+    assert "channels.matrix.!room3:matrix.org" in paths
+    for path in paths:
+        assert state.node_index.get_data(state, path) == builder._get_node_data_by_path(state, path)
+    # Room ids containing dots resolve through the index instead of path parsing
+    assert state.node_index.get_data(state, "channels.matrix.!room3:matrix.org")["name"] == "Room 3"
+
+
+def test_unchanged_state_resolves_only_volatile_nodes(populated_manager):
+    builder, node_manager = PayloadBuilder(), NodeManager()
+    index = populated_manager.state.node_index
+    first = _build(builder, populated_manager, node_manager)
+
+    stats = dict(index.stats)
+    second = _build(builder, populated_manager, node_manager)
+
+    volatile = sum(1 for path in index._entries if path.startswith("system."))
+    assert index.stats["family_rebuilds"] == stats["family_rebuilds"]
+    assert index.stats["resolves"] - stats["resolves"] == volatile
+    assert second["collapsed_node_summaries"].keys() == first["collapsed_node_summaries"].keys()
+
+
+def test_message_touches_only_affected_nodes(populated_manager):
+    builder, node_manager = PayloadBuilder(), NodeManager()
+    state = populated_manager.state
+    _build(builder, populated_manager, node_manager)
+    versions = {path: state.node_index.get_version(path) for path in state.node_index._entries}
+
+    populated_manager.add_message(
+        "!room2:matrix.org", _message("new", "!room2:matrix.org", "matrix", "@u0:matrix.org", sender_username="u0")
+    )
+    payload = _build(builder, populated_manager, node_manager)
+
+    changed = {path for path, version in versions.items() if state.node_index.get_version(path) != version}
+    assert "channels.matrix.!room2:matrix.org" in changed
+    assert "channels.matrix.!room1:matrix.org" not in changed
+    assert "users.farcaster.42" not in changed
+    assert state.node_index.stats["full_invalidations"] == 0
+    summary = payload["collapsed_node_summaries"]["channels.matrix.!room2:matrix.org"]
+    assert summary["data_changed"] is True
+
+
+def test_untracked_mutation_invalidates_everything(populated_manager):
+    builder, node_manager = PayloadBuilder(), NodeManager()
+    state = populated_manager.state
+    _build(builder, populated_manager, node_manager)
+
+    state.farcaster_users["42"].username = "alice2"
+    populated_manager.mark_changed()
+    _build(builder, populated_manager, node_manager)
+
+    assert state.node_index.stats["full_invalidations"] == 1
+    assert state.node_index.get_data(state, "users.farcaster.42")["username"] == "alice2"
+
+
+def test_family_rebuilds_when_expired():
+    index = NodeIndex()
+    state = WorldStateManager().state
+    calls = []
+
+    def builder(world_state_data):
+        calls.append(1)
+        return [("threads.matrix.t1", lambda data: {"thread": "t1"})], time.time() - 1
+
+    index.sync(state, {"threads": builder})
+    index.sync(state, {"threads": builder})
+
+    assert len(calls) == 2
+    assert index.get_data(state, "threads.matrix.t1") == {"thread": "t1"}
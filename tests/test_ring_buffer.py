@@ -0,0 +1,56 @@
+"""
+Tests for the bounded in-memory history tiers.
+"""
+import pytest
+
+from chatbot.config import settings
+from chatbot.core.context import ContextManager
+from chatbot.core.ring_buffer import RingBuffer, approximate_size
+from chatbot.core.world_state import WorldStateManager
+
+
+def test_ring_buffer_evicts_oldest_and_tracks_bytes():
+    ring = RingBuffer(3)
+    for i in range(3):
+        assert ring.append({"i": i}) is None
+    full_bytes = ring.approx_bytes
+
+    evicted = ring.append({"i": 3})
+
+    assert evicted == {"i": 0}
+    assert ring == [{"i": 1}, {"i": 2}, {"i": 3}]
+    assert ring[-1] == {"i": 3} and ring[:1] == [{"i": 1}]
+    assert ring.approx_bytes == full_bytes
+    assert ring.get_stats() == {"count": 3, "capacity": 3, "evicted": 1, "approx_bytes": full_bytes}
+
+    ring.clear()
+    assert ring == [] and ring.approx_bytes == 0
+
+
+def test_approximate_size_grows_with_content():
+    assert approximate_size({"body": "x" * 1000}) > approximate_size({"body": "x"}) + 900
+    with pytest.raises(ValueError):
+        RingBuffer(0)
+
+
+@pytest.mark.asyncio
+async def test_context_spills_evicted_free_form_replies(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CONTEXT_MAX_MESSAGES_PER_CHANNEL", 2)
+    manager = ContextManager(WorldStateManager(), str(tmp_path / "context.db"))
+    try:
+        for i in range(4):
+            await manager.add_user_message("!a:server", {"content": f"q{i}"})
+            await manager.add_assistant_message("!a:server", {"content": f"plain reply {i}"})
+
+        context = await manager.get_context("!a:server")
+        assert [m["content"] for m in context.assistant_messages] == ["plain reply 2", "plain reply 3"]
+
+        spilled = await manager.get_state_changes(change_type="assistant_message")
+        assert sorted(s.raw_content["content"] for s in spilled) == ["plain reply 0", "plain reply 1"]
+
+        memory = manager.get_memory_stats()
+        assert memory["buffers"]["assistant_messages"]["count"] == 2
+        assert memory["buffers"]["assistant_messages"]["evicted"] == 2
+        assert memory["total_approx_bytes"] > 0
+    finally:
+        await manager.history_recorder.close()
@@ -0,0 +1,66 @@
+"""
+Tests for the rotated JSONL segment log and segment-based history export.
+"""
+import json
+
+import pytest
+
+from chatbot.core.history_recorder import HistoryRecorder
+from chatbot.core.segment_log import FSYNC_BATCH, SegmentedLog
+
+
+def test_segments_rotate_and_compress(tmp_path):
+    log = SegmentedLog(tmp_path, "events", max_segment_bytes=200, compress=True)
+    for i in range(20):
+        log.append([{"i": i, "padding": "x" * 20}])
+    log.close()
+
+    segments = log.segments()
+    assert len(segments) > 1
+    assert all(path.name.endswith(".jsonl.gz") for path in segments)
+    assert [json.loads(line)["i"] for line in log.iter_lines()] == list(range(20))
+
+
+def test_new_instance_starts_new_segment(tmp_path):
+    first = SegmentedLog(tmp_path, "events", compress=False, fsync=FSYNC_BATCH)
+    first.append([{"n": 1}])
+    second = SegmentedLog(tmp_path, "events", compress=False)
+    second.append([{"n": 2}])
+
+    assert [p.name for p in second.segments()] == ["events-000001.jsonl", "events-000002.jsonl"]
+    assert [json.loads(line)["n"] for line in second.iter_lines()] == [1, 2]
+
+
+def test_partial_trailing_line_is_skipped(tmp_path):
+    log = SegmentedLog(tmp_path, "events", compress=False)
+    log.append([{"n": 1}])
+    with open(log.segments()[0], "a") as f:
+        f.write('{"n": 2')
+
+    assert [json.loads(line)["n"] for line in log.iter_lines()] == [1]
+
+
+def test_invalid_fsync_policy(tmp_path):
+    with pytest.raises(ValueError):
+        SegmentedLog(tmp_path, "events", fsync="sometimes")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fmt", ["jsonl", "json"])
+async def test_export_streams_from_segments(tmp_path, fmt):
+    recorder = HistoryRecorder(str(tmp_path / "history.db"), storage_path=str(tmp_path / "segments"))
+    await recorder.record_user_input("!room:server", {"message": "hello"})
+    await recorder.record_world_update("sync", {"rooms": 2})
+
+    output = tmp_path / f"export.{fmt}"
+    message = await recorder.export_state_changes_for_training(str(output), format=fmt)
+    await recorder.close()
+
+    assert message.startswith("Exported 2 state changes")
+    if fmt == "jsonl":
+        records = [json.loads(line) for line in output.read_text().splitlines()]
+    else:
+        records = json.loads(output.read_text())
+    assert [r["change_type"] for r in records] == ["user_input", "world_update"]
+    assert records[0]["observations"] == "hello"
+    assert not list((tmp_path / "segments").glob("state_change_*.json"))
@@ -0,0 +1,119 @@
+"""
+Tests for indexed, keyset-paginated state-change queries and database export.
+"""
+import json
+import sqlite3
+
+import pytest
+import pytest_asyncio
+
+from chatbot.core.history_recorder import HistoryRecorder, StateChangeBlock
+
+
+def state_change(i, timestamp, channel_id="!a:server", change_type="tool_execution"):
+    return StateChangeBlock(
+        timestamp=timestamp,
+        change_type=change_type,
+        source="tool",
+        channel_id=channel_id,
+        observations=f"record {i}",
+        potential_actions=None,
+        selected_actions=None,
+        reasoning=None,
+        raw_content={"i": i},
+    )
+
+
+@pytest_asyncio.fixture
+async def recorder(tmp_path):
+    recorder = HistoryRecorder(str(tmp_path / "history.db"), storage_path=str(tmp_path / "segments"))
+    await recorder.initialize()
+    yield recorder
+    await recorder.close()
+
+
+@pytest.mark.asyncio
+async def test_filtered_queries_use_indexes(recorder):
+    with sqlite3.connect(recorder.db_path) as db:
+        for column in ("change_type", "channel_id"):
+            plan = " ".join(
+                row[-1]
+                for row in db.execute(
+                    f"EXPLAIN QUERY PLAN SELECT * FROM state_changes WHERE {column} = ? "
+                    "ORDER BY timestamp DESC, id DESC LIMIT 10",
+                    ("x",),
+                )
+            )
+            assert "USING INDEX" in plan and "TEMP B-TREE" not in plan
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_cover_every_row_once(recorder):
+    # Duplicate timestamps must not be skipped or repeated across pages
+    for i in range(25):
+        await recorder._persist_state_change(state_change(i, 1000.0 + i // 3))
+
+    seen, cursor = [], None
+    while True:
+        page = await recorder.get_state_changes_page(limit=7, cursor=cursor)
+        seen.extend(c.raw_content["i"] for c in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert sorted(seen) == list(range(25))
+    assert len(seen) == 25
+
+
+@pytest.mark.asyncio
+async def test_page_filters_and_since_timestamp(recorder):
+    for i in range(6):
+        channel = "!a:server" if i % 2 else "!b:server"
+        await recorder._persist_state_change(state_change(i, 1000.0 + i, channel_id=channel))
+
+    page = await recorder.get_state_changes_page(channel_id="!a:server")
+    assert [c.raw_content["i"] for c in page["items"]] == [5, 3, 1]
+    assert page["next_cursor"] is None
+
+    recent = await recorder.get_state_changes(since_timestamp=1003.0)
+    assert [c.raw_content["i"] for c in recent] == [5, 4]
+
+    assert await recorder.get_state_changes_page(cursor="garbage") == {"items": [], "next_cursor": None}
+
+
+@pytest.mark.asyncio
+async def test_export_streams_from_database_without_segments(tmp_path):
+    db_path = tmp_path / "legacy.db"
+    seeded = HistoryRecorder(str(db_path), storage_path=str(tmp_path / "old_segments"))
+    for i in range(3):
+        await seeded._persist_state_change(state_change(i, 1000.0 + i))
+    await seeded.close()
+
+    recorder = HistoryRecorder(str(db_path), storage_path=str(tmp_path / "new_segments"))
+    output = tmp_path / "export.jsonl"
+    message = await recorder.export_state_changes_for_training(str(output))
+    await recorder.close()
+
+    assert message.startswith("Exported 3 state changes")
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [r["raw_content"]["i"] for r in records] == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_export_keeps_rows_written_before_the_segment_log(tmp_path):
+    db_path = tmp_path / "legacy.db"
+    seeded = HistoryRecorder(str(db_path), storage_path=str(tmp_path / "old_segments"))
+    for i in range(3):
+        await seeded._persist_state_change(state_change(i, 1000.0 + i))
+    await seeded.close()
+
+    recorder = HistoryRecorder(str(db_path), storage_path=str(tmp_path / "new_segments"))
+    for i in range(3, 5):
+        await recorder._persist_state_change(state_change(i, 2000.0 + i))
+    output = tmp_path / "export.jsonl"
+    message = await recorder.export_state_changes_for_training(str(output))
+    await recorder.close()
+
+    assert message.startswith("Exported 5 state changes")
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [r["raw_content"]["i"] for r in records] == [0, 1, 2, 3, 4]
@@ -0,0 +1,136 @@
+"""
+Tests and benchmarks for the chatbot.storage key-value/append-log backends.
+"""
+import time
+
+import pytest
+import pytest_asyncio
+
+from chatbot.storage import LMDB_AVAILABLE, StorageError, open_storage
+
+BACKENDS = [
+    "sqlite",
+    pytest.param("lmdb", marks=pytest.mark.skipif(not LMDB_AVAILABLE, reason="lmdb not installed")),
+]
+
+
+@pytest_asyncio.fixture(params=BACKENDS)
+async def storage(request, tmp_path):
+    storage = open_storage(request.param, str(tmp_path))
+    yield storage
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_key_value_roundtrip_and_prefix_scan(storage):
+    await storage.put_many("users", {"farcaster:2": {"fid": 2}, "farcaster:1": {"fid": 1}, "matrix:@a": {"n": 1}})
+    await storage.put("other", "farcaster:9", "elsewhere")
+
+    assert await storage.get("users", "farcaster:1") == {"fid": 1}
+    assert await storage.get("users", "missing", default="none") == "none"
+    assert await storage.scan("users", "farcaster:") == [("farcaster:1", {"fid": 1}), ("farcaster:2", {"fid": 2})]
+
+    assert await storage.delete("users", "farcaster:1")
+    assert not await storage.delete("users", "farcaster:1")
+    assert [key for key, _ in await storage.scan("users")] == ["farcaster:2", "matrix:@a"]
+
+
+@pytest.mark.asyncio
+async def test_append_log_sequences_reads_and_trims(storage):
+    assert await storage.append("events", [{"i": 0}, {"i": 1}, {"i": 2}]) == [1, 2, 3]
+    assert await storage.append("events", [{"i": 3}]) == [4]
+    assert await storage.append("other", ["x"]) == [1]
+
+    assert await storage.read_log("events", after=1, limit=2) == [(2, {"i": 1}), (3, {"i": 2})]
+    assert await storage.trim_log("events", up_to=2) == 2
+    assert [seq for seq, _ in await storage.read_log("events")] == [3, 4]
+    assert await storage.append("events", [{"i": 4}]) == [5]
+
+
+@pytest.mark.asyncio
+async def test_sequence_numbers_survive_trimming_the_whole_log(tmp_path, storage):
+    backend = storage.name
+    assert await storage.append("events", ["a", "b"]) == [1, 2]
+    assert await storage.trim_log("events", up_to=2) == 2
+    assert await storage.append("events", ["c"]) == [3]
+    assert await storage.trim_log("events", up_to=3) == 1
+    await storage.close()
+
+    reopened = open_storage(backend, str(tmp_path))
+    try:
+        assert await reopened.append("events", ["d"]) == [4]
+        assert await reopened.read_log("events", after=3) == [(4, "d")]
+    finally:
+        await reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_snapshot_does_not_see_later_writes(storage):
+    await storage.put("state", "cursor", 1)
+    await storage.append("events", ["a"])
+
+    async with storage.snapshot() as snapshot:
+        await storage.put("state", "cursor", 2)
+        await storage.append("events", ["b"])
+
+        assert await snapshot.get("state", "cursor") == 1
+        assert await snapshot.read_log("events") == [(1, "a")]
+        assert await snapshot.scan("state") == [("cursor", 1)]
+
+    assert await storage.get("state", "cursor") == 2
+
+
+@pytest.mark.asyncio
+async def test_metrics_are_tracked_per_namespace(storage):
+    await storage.put_many("a", {str(i): i for i in range(10)})
+    await storage.get("a", "1")
+    await storage.append("log", ["x", "y"])
+
+    metrics = storage.get_metrics()
+    assert metrics["backend"] == storage.name
+    assert metrics["namespaces"]["a"]["writes"] == 1
+    assert metrics["namespaces"]["a"]["records_written"] == 10
+    assert metrics["namespaces"]["a"]["reads"] == 1
+    assert metrics["namespaces"]["log"]["records_written"] == 2
+
+
+@pytest.mark.asyncio
+async def test_closed_or_unknown_storage_raises(tmp_path):
+    with pytest.raises(StorageError):
+        open_storage("redis", str(tmp_path))
+    storage = open_storage("sqlite", str(tmp_path))
+    await storage.close()
+    with pytest.raises(StorageError):
+        await storage.get("a", "b")
+
+
+@pytest.mark.asyncio
+async def test_benchmark_latency_and_throughput(storage):
+    """Batched writes, single-key reads and log appends; run with -s to see numbers."""
+    records = 2000
+    payload = {"observations": "x" * 200, "actions": [{"type": "reply", "n": 1}]}
+
+    started = time.perf_counter()
+    for offset in range(0, records, 100):
+        await storage.put_many("bench", {f"k{i:06d}": payload for i in range(offset, offset + 100)})
+    put_rate = records / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for offset in range(0, records, 100):
+        await storage.append("bench_log", [payload] * 100)
+    append_rate = records / (time.perf_counter() - started)
+
+    reads = 200
+    started = time.perf_counter()
+    for i in range(reads):
+        assert await storage.get("bench", f"k{i * 7:06d}") == payload
+    read_latency_ms = (time.perf_counter() - started) / reads * 1000
+
+    print(
+        f"\n{storage.name}: put_many {put_rate:,.0f} rec/s, append {append_rate:,.0f} rec/s, "
+        f"get {read_latency_ms:.3f} ms"
+    )
+    # Loose floors so CI noise doesn't fail the suite; they catch per-record commits
+    assert put_rate > 2000
+    assert append_rate > 2000
+    assert read_latency_ms < 20